@@ -11,12 +11,13 @@ from typing import List, Dict, Optional, Any, Tuple
 import json
 import uuid
 from io import BytesIO
-import aiohttp
 
+from core.http_clients import get_http_session
 from models.amazon_phase6 import (
     AplusContent, AplusModule, AplusContentStatus
 )
-from integrations.amazon.client import AmazonSPAPIClient
+from integrations.amazon.client import AmazonSPAPIClient, SPAPICredentials
+from services.amazon_connection_service import get_sp_api_credentials
 from services.gpt_content_service import gpt_content_service
 from services.image_generation_service import image_generation_service
 
@@ -119,8 +120,9 @@ class AplusContentEngine:
                 language=content_config.get('language', 'fr-FR')
             )
             
-            # Récupérer les données produit pour l'IA
-            product_data = await self._get_product_data(sku, marketplace_id)
+            # Récupérer les données produit pour l'IA (connexion du vendeur)
+            credentials = await get_sp_api_credentials(user_id, marketplace_id)
+            product_data = await self._get_product_data(sku, marketplace_id, credentials)
             
             # Générer le contenu avec l'IA si demandé
             if content_config.get('use_ai_generation', True):
@@ -140,7 +142,9 @@ class AplusContentEngine:
             logger.error(f"❌ Error creating A+ Content for SKU {sku}: {str(e)}")
             raise
     
-    async def _get_product_data(self, sku: str, marketplace_id: str) -> Dict[str, Any]:
+    async def _get_product_data(
+        self, sku: str, marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> Dict[str, Any]:
         """Récupérer les données produit via Catalog API"""
         try:
             response = await self.sp_api_client.make_request(
@@ -150,7 +154,8 @@ class AplusContentEngine:
                 params={
                     "marketplaceIds": marketplace_id,
                     "includedData": "attributes,identifiers,images,productTypes,summaries"
-                }
+                },
+                credentials=credentials
             )
             
             if response.get('success'):
@@ -446,12 +451,14 @@ class AplusContentEngine:
             # Préparer le payload pour Amazon A+ Content API
             aplus_payload = await self._build_amazon_aplus_payload(aplus_content)
             
-            # Soumettre le contenu via SP-API
+            # Soumettre le contenu via SP-API (connexion du vendeur)
+            credentials = await get_sp_api_credentials(aplus_content.user_id, aplus_content.marketplace_id)
             response = await self.sp_api_client.make_request(
                 method="POST",
                 endpoint="/aplus/2020-11-01/contentDocuments",
                 marketplace_id=aplus_content.marketplace_id,
-                data=aplus_payload
+                data=aplus_payload,
+                credentials=credentials
             )
             
             if response.get('success'):
@@ -465,7 +472,8 @@ class AplusContentEngine:
                 association_success = await self._associate_content_to_asin(
                     content_reference_id, 
                     aplus_content.sku,
-                    aplus_content.marketplace_id
+                    aplus_content.marketplace_id,
+                    credentials
                 )
                 
                 if association_success:
@@ -572,25 +580,25 @@ class AplusContentEngine:
         
         try:
             # Télécharger et valider l'image
-            async with aiohttp.ClientSession() as session:
-                async with session.get(image_url) as response:
-                    if response.status == 200:
-                        image_data = await response.read()
-                        
-                        # Vérifier la taille
-                        if len(image_data) > self.amazon_limits['max_image_size_mb'] * 1024 * 1024:
-                            logger.warning(f"⚠️ Image trop volumineuse: {len(image_data)} bytes")
-                            return None
-                        
-                        # Encoder en base64 pour l'upload (exemple simplifié)
-                        # En production, utiliser l'API d'upload d'images Amazon
-                        return {
-                            "uploadDestinationId": f"upload-{uuid.uuid4()}",
-                            "imageCropSpecification": {
-                                "size": {"width": {"value": 1200, "units": "pixels"}},
-                                "offset": {"x": {"value": 0, "units": "pixels"}, "y": {"value": 0, "units": "pixels"}}
-                            }
+            session = await get_http_session('downloads')
+            async with session.get(image_url) as response:
+                if response.status == 200:
+                    image_data = await response.read()
+                    
+                    # Vérifier la taille
+                    if len(image_data) > self.amazon_limits['max_image_size_mb'] * 1024 * 1024:
+                        logger.warning(f"⚠️ Image trop volumineuse: {len(image_data)} bytes")
+                        return None
+                    
+                    # Encoder en base64 pour l'upload (exemple simplifié)
+                    # En production, utiliser l'API d'upload d'images Amazon
+                    return {
+                        "uploadDestinationId": f"upload-{uuid.uuid4()}",
+                        "imageCropSpecification": {
+                            "size": {"width": {"value": 1200, "units": "pixels"}},
+                            "offset": {"x": {"value": 0, "units": "pixels"}, "y": {"value": 0, "units": "pixels"}}
                         }
+                    }
             
         except Exception as e:
             logger.error(f"❌ Error preparing image: {str(e)}")
@@ -613,12 +621,13 @@ class AplusContentEngine:
         self, 
         content_reference_id: str, 
         sku: str, 
-        marketplace_id: str
+        marketplace_id: str,
+        credentials: Optional[SPAPICredentials] = None
     ) -> bool:
         """Associer le contenu A+ au produit ASIN"""
         try:
             # Récupérer l'ASIN depuis le SKU
-            asin = await self._get_asin_from_sku(sku, marketplace_id)
+            asin = await self._get_asin_from_sku(sku, marketplace_id, credentials)
             
             if not asin:
                 logger.error(f"Could not get ASIN for SKU {sku}")
@@ -628,7 +637,8 @@ class AplusContentEngine:
             response = await self.sp_api_client.make_request(
                 method="POST",
                 endpoint=f"/aplus/2020-11-01/contentDocuments/{content_reference_id}/asins/{asin}",
-                marketplace_id=marketplace_id
+                marketplace_id=marketplace_id,
+                credentials=credentials
             )
             
             return response.get('success', False)
@@ -637,14 +647,17 @@ class AplusContentEngine:
             logger.error(f"❌ Error associating content to ASIN: {str(e)}")
             return False
     
-    async def _get_asin_from_sku(self, sku: str, marketplace_id: str) -> Optional[str]:
+    async def _get_asin_from_sku(
+        self, sku: str, marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> Optional[str]:
         """Récupérer l'ASIN à partir du SKU"""
         try:
             response = await self.sp_api_client.make_request(
                 method="GET",
                 endpoint=f"/catalog/2022-04-01/items/{sku}",
                 marketplace_id=marketplace_id,
-                params={"marketplaceIds": marketplace_id}
+                params={"marketplaceIds": marketplace_id},
+                credentials=credentials
             )
             
             if response.get('success'):
@@ -661,10 +674,12 @@ class AplusContentEngine:
             if not aplus_content.amazon_content_id:
                 return "no_submission"
             
+            credentials = await get_sp_api_credentials(aplus_content.user_id, aplus_content.marketplace_id)
             response = await self.sp_api_client.make_request(
                 method="GET",
                 endpoint=f"/aplus/2020-11-01/contentDocuments/{aplus_content.amazon_content_id}",
-                marketplace_id=aplus_content.marketplace_id
+                marketplace_id=aplus_content.marketplace_id,
+                credentials=credentials
             )
             
             if response.get('success'):
@@ -16,7 +16,8 @@ from models.amazon_phase6 import (
     ComplianceIssue, ComplianceReport, ComplianceIssueType, 
     ComplianceSeverity
 )
-from integrations.amazon.client import AmazonSPAPIClient
+from integrations.amazon.client import AmazonSPAPIClient, SPAPICredentials
+from services.amazon_connection_service import get_sp_api_credentials
 
 logger = logging.getLogger(__name__)
 
@@ -158,6 +159,9 @@ class ComplianceScannerEngine:
             report.skus_scanned = target_skus
             report.total_skus = len(target_skus)
             
+            # Identifiants SP-API de la connexion du vendeur, résolus une fois par scan
+            credentials = await get_sp_api_credentials(user_id, marketplace_id)
+            
             # Déterminer les types de scan à effectuer
             if not scan_types:
                 scan_types = list(ComplianceIssueType)
@@ -170,14 +174,11 @@ class ComplianceScannerEngine:
             
             for sku_batch in self._batch_skus(target_skus, self.scanner_config['batch_size']):
                 batch_issues = await self._scan_sku_batch(
-                    sku_batch, marketplace_id, user_id, scan_types
+                    sku_batch, marketplace_id, user_id, scan_types, credentials
                 )
                 all_issues.extend(batch_issues)
                 scanned_skus += len(sku_batch)
                 
-                # Éviter la limitation de débit
-                await asyncio.sleep(0.5)
-                
                 logger.info(f"📊 Progress: {scanned_skus}/{len(target_skus)} SKUs scanned")
             
             # Compiler les résultats
@@ -225,7 +226,8 @@ class ComplianceScannerEngine:
         sku_batch: List[str],
         marketplace_id: str,
         user_id: str,
-        scan_types: List[ComplianceIssueType]
+        scan_types: List[ComplianceIssueType],
+        credentials: Optional[SPAPICredentials] = None
     ) -> List[ComplianceIssue]:
         """Scanner un lot de SKUs"""
         
@@ -235,7 +237,7 @@ class ComplianceScannerEngine:
         scan_tasks = []
         for sku in sku_batch:
             task = asyncio.create_task(
-                self._scan_single_sku(sku, marketplace_id, user_id, scan_types)
+                self._scan_single_sku(sku, marketplace_id, user_id, scan_types, credentials)
             )
             scan_tasks.append(task)
         
@@ -258,13 +260,14 @@ class ComplianceScannerEngine:
         sku: str,
         marketplace_id: str,
         user_id: str,
-        scan_types: List[ComplianceIssueType]
+        scan_types: List[ComplianceIssueType],
+        credentials: Optional[SPAPICredentials] = None
     ) -> List[ComplianceIssue]:
         """Scanner un SKU individuel pour tous les types de conformité"""
         
         try:
             # Récupérer les données produit
-            product_data = await self._get_product_data_for_compliance(sku, marketplace_id)
+            product_data = await self._get_product_data_for_compliance(sku, marketplace_id, credentials)
             
             if not product_data:
                 logger.warning(f"⚠️ Could not retrieve product data for {sku}")
@@ -290,7 +293,9 @@ class ComplianceScannerEngine:
             logger.error(f"❌ Error scanning SKU {sku}: {str(e)}")
             return []
     
-    async def _get_product_data_for_compliance(self, sku: str, marketplace_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_product_data_for_compliance(
+        self, sku: str, marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> Optional[Dict[str, Any]]:
         """Récupérer les données produit nécessaires pour les scans de conformité"""
         
         try:
@@ -302,7 +307,8 @@ class ComplianceScannerEngine:
                 params={
                     "marketplaceIds": marketplace_id,
                     "includedData": "attributes,identifiers,images,productTypes,summaries"
-                }
+                },
+                credentials=credentials
             )
             
             if response.get('success'):
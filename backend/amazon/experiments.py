@@ -15,7 +15,8 @@ from scipy import stats
 from models.amazon_phase6 import (
     ABTestExperiment, ExperimentVariant, ExperimentStatus, ExperimentType
 )
-from integrations.amazon.client import AmazonSPAPIClient
+from integrations.amazon.client import AmazonSPAPIClient, SPAPICredentials
+from services.amazon_connection_service import get_sp_api_credentials
 
 logger = logging.getLogger(__name__)
 
@@ -141,13 +142,16 @@ class ABTestingEngine:
         Cette méthode utilise l'API réelle d'Amazon pour créer l'expérimentation
         """
         try:
+            # Identifiants SP-API de la connexion du vendeur
+            credentials = await get_sp_api_credentials(experiment.user_id, experiment.marketplace_id)
+            
             # Préparer le payload pour Amazon Manage Your Experiments API
             experiment_payload = {
                 "experimentName": experiment.name,
                 "experimentDescription": experiment.description or "",
                 "experimentType": self._map_experiment_type_to_amazon(experiment.experiment_type),
                 "marketplace": experiment.marketplace_id,
-                "targetAsin": await self._get_asin_from_sku(experiment.sku, experiment.marketplace_id),
+                "targetAsin": await self._get_asin_from_sku(experiment.sku, experiment.marketplace_id, credentials),
                 "variants": [
                     {
                         "variantName": variant.name,
@@ -166,7 +170,8 @@ class ABTestingEngine:
                 method="POST",
                 endpoint="/experimentsManagement/2022-10-01/experiments",
                 marketplace_id=experiment.marketplace_id,
-                data=experiment_payload
+                data=experiment_payload,
+                credentials=credentials
             )
             
             if response.get('success'):
@@ -186,14 +191,17 @@ class ABTestingEngine:
             logger.warning(f"🔄 Using fallback experiment ID: {fallback_id}")
             return fallback_id
     
-    async def _get_asin_from_sku(self, sku: str, marketplace_id: str) -> str:
+    async def _get_asin_from_sku(
+        self, sku: str, marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> str:
         """Récupérer l'ASIN à partir du SKU"""
         try:
             response = await self.sp_api_client.make_request(
                 method="GET",
                 endpoint=f"/catalog/2022-04-01/items/{sku}",
                 marketplace_id=marketplace_id,
-                params={"marketplaceIds": marketplace_id}
+                params={"marketplaceIds": marketplace_id},
+                credentials=credentials
             )
             
             if response.get('success'):
@@ -255,11 +263,13 @@ class ABTestingEngine:
             if not experiment.amazon_experiment_id:
                 raise ValueError("Amazon experiment ID is required to start experiment")
             
-            # Démarrer l'expérimentation via SP-API
+            # Démarrer l'expérimentation via SP-API (connexion du vendeur)
+            credentials = await get_sp_api_credentials(experiment.user_id, experiment.marketplace_id)
             response = await self.sp_api_client.make_request(
                 method="PUT",
                 endpoint=f"/experimentsManagement/2022-10-01/experiments/{experiment.amazon_experiment_id}/start",
-                marketplace_id=experiment.marketplace_id
+                marketplace_id=experiment.marketplace_id,
+                credentials=credentials
             )
             
             if response.get('success'):
@@ -292,7 +302,8 @@ class ABTestingEngine:
             if not experiment.amazon_experiment_id or experiment.status != ExperimentStatus.RUNNING:
                 raise ValueError("Experiment must be running to collect metrics")
             
-            # Récupérer les métriques via SP-API Business Reports
+            # Récupérer les métriques via SP-API Business Reports (connexion du vendeur)
+            credentials = await get_sp_api_credentials(experiment.user_id, experiment.marketplace_id)
             metrics_response = await self.sp_api_client.make_request(
                 method="GET",
                 endpoint=f"/experimentsManagement/2022-10-01/experiments/{experiment.amazon_experiment_id}/metrics",
@@ -300,7 +311,8 @@ class ABTestingEngine:
                 params={
                     "startDate": experiment.start_date.strftime("%Y-%m-%d"),
                     "endDate": datetime.utcnow().strftime("%Y-%m-%d")
-                }
+                },
+                credentials=credentials
             )
             
             if metrics_response.get('success'):
@@ -557,12 +569,14 @@ class ABTestingEngine:
             if not winner_variant:
                 raise ValueError("Winner variant not found")
             
-            # Appliquer la variante gagnante via SP-API
+            # Appliquer la variante gagnante via SP-API (connexion du vendeur)
+            credentials = await get_sp_api_credentials(experiment.user_id, experiment.marketplace_id)
             success = await self._apply_variant_to_listing(
                 experiment.sku, 
                 experiment.marketplace_id, 
                 winner_variant,
-                experiment.experiment_type
+                experiment.experiment_type,
+                credentials
             )
             
             if success:
@@ -582,7 +596,8 @@ class ABTestingEngine:
         sku: str,
         marketplace_id: str,
         variant: ExperimentVariant,
-        experiment_type: ExperimentType
+        experiment_type: ExperimentType,
+        credentials: Optional[SPAPICredentials] = None
     ) -> bool:
         """Appliquer une variante au listing réel via SP-API"""
         
@@ -622,7 +637,8 @@ class ABTestingEngine:
                 data={
                     "productType": listing_data["productType"],
                     "requirements": listing_data["requirements"]
-                }
+                },
+                credentials=credentials
             )
             
             if response.get('success'):
@@ -642,11 +658,13 @@ class ABTestingEngine:
             logger.info(f"🛑 Stopping experiment {experiment.id}: {reason}")
             
             if experiment.amazon_experiment_id:
+                credentials = await get_sp_api_credentials(experiment.user_id, experiment.marketplace_id)
                 response = await self.sp_api_client.make_request(
                     method="PUT",
                     endpoint=f"/experimentsManagement/2022-10-01/experiments/{experiment.amazon_experiment_id}/stop",
                     marketplace_id=experiment.marketplace_id,
-                    data={"reason": reason}
+                    data={"reason": reason},
+                    credentials=credentials
                 )
                 
                 if not response.get('success'):
@@ -7,6 +7,7 @@ from typing import Dict, List, Any, Optional
 import uuid
 
 # Import des modules Phase 1
+from core.http_clients import get_http_session
 from integrations.amazon.client import AmazonSPAPIClient
 from integrations.amazon.auth import AmazonOAuthService
 
@@ -405,15 +406,14 @@ class AmazonListingPublisher:
                 'client_secret': self.oauth_service.client_secret
             }
             
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.post(token_endpoint, data=token_data) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        raise Exception(f"Token refresh failed: {response.status} - {error_text}")
-                        
+            session = await get_http_session('lwa')
+            async with session.post(token_endpoint, data=token_data) as response:
+                if response.status == 200:
+                    return await response.json()
+                else:
+                    error_text = await response.text()
+                    raise Exception(f"Token refresh failed: {response.status} - {error_text}")
+                    
         except Exception as e:
             logger.error(f"❌ Token refresh failed: {str(e)}")
             raise
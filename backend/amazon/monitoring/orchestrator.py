@@ -3,7 +3,6 @@ Amazon Monitoring Orchestrator - Phase 5
 Orchestrateur principal pour le monitoring et l'optimisation automatique
 """
 import logging
-import asyncio
 import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
@@ -18,7 +17,8 @@ from models.amazon_monitoring import (
     MonitoringStatus, BuyBoxStatus, OptimizationAction, OptimizationStatus
 )
 from amazon.pricing_engine import pricing_engine
-from integrations.amazon.client import AmazonSPAPIClient
+from integrations.amazon.client import AmazonSPAPIClient, SPAPICredentials
+from services.amazon_connection_service import get_sp_api_credentials
 
 logger = logging.getLogger(__name__)
 
@@ -153,12 +153,10 @@ class AmazonMonitoringOrchestrator:
             # Traiter chaque job
             for job in monitoring_jobs:
                 try:
+                    # Débit SP-API réglé par le limiteur du client (quota par opération)
                     await self._process_monitoring_job(job, job_id)
                     processed_jobs += 1
                     
-                    # Rate limiting entre jobs
-                    await asyncio.sleep(2)
-                    
                 except Exception as e:
                     logger.error(f"❌ Error processing monitoring job {job.id}: {str(e)}")
                     failed_jobs += 1
@@ -186,6 +184,12 @@ class AmazonMonitoringOrchestrator:
         try:
             logger.info(f"📦 Processing monitoring job {job.id} for {len(job.skus)} SKUs")
             
+            # Identifiants SP-API de la connexion du vendeur, résolus une fois par job
+            credentials = await get_sp_api_credentials(job.user_id, job.marketplace_id)
+            if not credentials:
+                logger.warning(f"⚠️ No active Amazon connection for job {job.id}, skipping")
+                return
+            
             snapshots = []
             
             # Collecter les données pour chaque SKU
@@ -195,16 +199,14 @@ class AmazonMonitoringOrchestrator:
                         job.user_id, 
                         sku, 
                         job.marketplace_id,
-                        job.id
+                        job.id,
+                        credentials
                     )
                     
                     if snapshot:
                         snapshots.append(snapshot)
                         await self._save_product_snapshot(snapshot)
                     
-                    # Rate limiting entre SKUs
-                    await asyncio.sleep(1)
-                    
                 except Exception as e:
                     logger.error(f"❌ Error collecting data for SKU {sku}: {str(e)}")
                     continue
@@ -223,7 +225,8 @@ class AmazonMonitoringOrchestrator:
         user_id: str, 
         sku: str, 
         marketplace_id: str,
-        job_id: str
+        job_id: str,
+        credentials: Optional[SPAPICredentials] = None
     ) -> Optional[ProductSnapshot]:
         """Collecter les données complètes d'un produit via SP-API"""
         
@@ -233,13 +236,13 @@ class AmazonMonitoringOrchestrator:
             logger.debug(f"🔍 Collecting data for SKU {sku} on marketplace {marketplace_id}")
             
             # 1. Données Catalog API
-            catalog_data = await self._get_catalog_data(sku, marketplace_id)
+            catalog_data = await self._get_catalog_data(sku, marketplace_id, credentials)
             
             # 2. Données Pricing API
-            pricing_data = await self._get_pricing_data(sku, marketplace_id)
+            pricing_data = await self._get_pricing_data(sku, marketplace_id, credentials)
             
             # 3. Données Buy Box (via competitive pricing)
-            buybox_data = await self._get_buybox_data(sku, marketplace_id)
+            buybox_data = await self._get_buybox_data(sku, marketplace_id, credentials)
             
             # 4. Données Reports (si disponible)
             performance_data = await self._get_performance_data(sku, marketplace_id)
@@ -280,7 +283,9 @@ class AmazonMonitoringOrchestrator:
             logger.error(f"❌ Error collecting data for SKU {sku}: {str(e)}")
             return None
     
-    async def _get_catalog_data(self, sku: str, marketplace_id: str) -> Dict[str, Any]:
+    async def _get_catalog_data(
+        self, sku: str, marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> Dict[str, Any]:
         """Récupérer données Catalog API"""
         try:
             # Appel Catalog Items API
@@ -291,7 +296,8 @@ class AmazonMonitoringOrchestrator:
                 params={
                     "marketplaceIds": marketplace_id,
                     "includedData": "attributes,identifiers,images,productTypes,salesRanks,summaries"
-                }
+                },
+                credentials=credentials
             )
             
             if not response.get('success'):
@@ -324,13 +330,16 @@ class AmazonMonitoringOrchestrator:
             logger.error(f"Error getting catalog data for {sku}: {str(e)}")
             return {}
     
-    async def _get_pricing_data(self, sku: str, marketplace_id: str) -> Dict[str, Any]:
+    async def _get_pricing_data(
+        self, sku: str, marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> Dict[str, Any]:
         """Récupérer données Pricing API"""
         try:
             # Utiliser le pricing engine existant
             competitors, metadata = await pricing_engine.get_competitive_pricing(
                 sku=sku,
-                marketplace_id=marketplace_id
+                marketplace_id=marketplace_id,
+                credentials=credentials
             )
             
             pricing_data = {}
@@ -359,13 +368,16 @@ class AmazonMonitoringOrchestrator:
             logger.error(f"Error getting pricing data for {sku}: {str(e)}")
             return {}
     
-    async def _get_buybox_data(self, sku: str, marketplace_id: str) -> Dict[str, Any]:
+    async def _get_buybox_data(
+        self, sku: str, marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> Dict[str, Any]:
         """Récupérer données Buy Box"""
         try:
             # Réutiliser la logique du pricing engine
             competitors, metadata = await pricing_engine.get_competitive_pricing(
                 sku=sku,
-                marketplace_id=marketplace_id
+                marketplace_id=marketplace_id,
+                credentials=credentials
             )
             
             buybox_data = {
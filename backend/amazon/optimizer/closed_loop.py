@@ -15,7 +15,8 @@ from models.amazon_monitoring import (
     OptimizationAction, OptimizationStatus, BuyBoxStatus
 )
 from amazon.pricing_engine import pricing_engine
-from integrations.amazon.client import AmazonSPAPIClient
+from integrations.amazon.client import AmazonSPAPIClient, SPAPICredentials
+from services.amazon_connection_service import get_sp_api_credentials
 
 logger = logging.getLogger(__name__)
 
@@ -93,9 +94,6 @@ class AmazonClosedLoopOptimizer:
                     
                     processed += 1
                     
-                    # Rate limiting entre analyses
-                    await asyncio.sleep(1)
-                    
                 except Exception as e:
                     logger.error(f"❌ Error optimizing SKU {snapshot.sku}: {str(e)}")
                     continue
@@ -440,15 +438,21 @@ class AmazonClosedLoopOptimizer:
             
             success = False
             
+            # Identifiants SP-API de la connexion du vendeur
+            credentials = await get_sp_api_credentials(decision.user_id, decision.marketplace_id)
+            
             # Exécuter selon le type d'action
-            if decision.action_type == OptimizationAction.PRICE_UPDATE:
-                success = await self._execute_price_update(decision)
+            if not credentials:
+                decision.error_message = "No active Amazon connection"
+            
+            elif decision.action_type == OptimizationAction.PRICE_UPDATE:
+                success = await self._execute_price_update(decision, credentials)
             
             elif decision.action_type == OptimizationAction.SEO_UPDATE:
-                success = await self._execute_seo_update(decision)
+                success = await self._execute_seo_update(decision, credentials)
             
             elif decision.action_type == OptimizationAction.AUTO_CORRECTION:
-                success = await self._execute_auto_correction(decision)
+                success = await self._execute_auto_correction(decision, credentials)
             
             # Finaliser l'exécution
             decision.execution_completed_at = datetime.utcnow()
@@ -473,7 +477,9 @@ class AmazonClosedLoopOptimizer:
             logger.error(f"❌ Error executing optimization for SKU {decision.sku}: {str(e)}")
             return False
     
-    async def _execute_price_update(self, decision: OptimizationDecision) -> bool:
+    async def _execute_price_update(
+        self, decision: OptimizationDecision, credentials: Optional[SPAPICredentials] = None
+    ) -> bool:
         """Exécuter une mise à jour de prix"""
         
         try:
@@ -488,7 +494,8 @@ class AmazonClosedLoopOptimizer:
                 sku=decision.sku,
                 marketplace_id=decision.marketplace_id,
                 new_price=new_price,
-                method="listings_items"
+                method="listings_items",
+                credentials=credentials
             )
             
             # Enregistrer la réponse SP-API
@@ -505,7 +512,9 @@ class AmazonClosedLoopOptimizer:
             decision.error_message = f"Error executing price update: {str(e)}"
             return False
     
-    async def _execute_seo_update(self, decision: OptimizationDecision) -> bool:
+    async def _execute_seo_update(
+        self, decision: OptimizationDecision, credentials: Optional[SPAPICredentials] = None
+    ) -> bool:
         """Exécuter une mise à jour SEO"""
         
         try:
@@ -549,7 +558,8 @@ class AmazonClosedLoopOptimizer:
                     "patches": patches
                 },
                 marketplace_id=decision.marketplace_id,
-                params={"marketplaceIds": decision.marketplace_id}
+                params={"marketplaceIds": decision.marketplace_id},
+                credentials=credentials
             )
             
             # Enregistrer la réponse
@@ -566,7 +576,9 @@ class AmazonClosedLoopOptimizer:
             decision.error_message = f"Error executing SEO update: {str(e)}"
             return False
     
-    async def _execute_auto_correction(self, decision: OptimizationDecision) -> bool:
+    async def _execute_auto_correction(
+        self, decision: OptimizationDecision, credentials: Optional[SPAPICredentials] = None
+    ) -> bool:
         """Exécuter une correction automatique (combinaison prix + SEO)"""
         
         try:
@@ -576,7 +588,7 @@ class AmazonClosedLoopOptimizer:
             # Exécuter correction de prix si nécessaire
             if 'price' in decision.detected_changes:
                 total_actions += 1
-                if await self._execute_price_update(decision):
+                if await self._execute_price_update(decision, credentials):
                     success_count += 1
                 
                 # Attendre entre les actions
@@ -585,7 +597,7 @@ class AmazonClosedLoopOptimizer:
             # Exécuter correction SEO si nécessaire
             if 'seo' in decision.detected_changes:
                 total_actions += 1
-                if await self._execute_seo_update(decision):
+                if await self._execute_seo_update(decision, credentials):
                     success_count += 1
             
             # Succès si au moins une action réussie
@@ -8,18 +8,32 @@ import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple, Any
 from decimal import Decimal, ROUND_HALF_UP
+from urllib.parse import quote
 import json
+import math
 import os
 
 from models.amazon_pricing import (
     PricingRule, PricingCalculation, PricingHistory, CompetitorOffer,
     PricingStrategy, BuyBoxStatus, PricingRuleStatus
 )
-from integrations.amazon.client import AmazonSPAPIClient
+from integrations.amazon.client import AmazonSPAPIClient, SPAPICredentials
 from integrations.amazon.models import AmazonConnection
+from amazon.pricing_vectorized import (
+    PricingColumns, compute_prices, BUYBOX_STATUSES, ESTIMATED_COST_RATIO,
+    REASON_NO_BUYBOX, REASON_BUYBOX_MATCH, REASON_NO_MARGIN_TARGET, REASON_MARGIN_TARGET,
+    REASON_RANGE_MIDDLE, REASON_KEEP_CURRENT, REASON_RAISED_TO_MIN
+)
 
 logger = logging.getLogger(__name__)
 
+# Product Pricing API : SKUs max par appel getPricing, requêtes max par getListingOffersBatch
+PRICING_MAX_SKUS_PER_REQUEST = 20
+LISTING_OFFERS_BATCH_MAX_REQUESTS = 20
+
+PRICING_ENDPOINT = "/products/pricing/v0/price"
+LISTING_OFFERS_BATCH_ENDPOINT = "/batches/products/pricing/v0/listingOffers"
+
 
 class AmazonPricingEngine:
     """
@@ -54,12 +68,16 @@ class AmazonPricingEngine:
         self.api_timeout = 30
         self.retry_attempts = 3
         self.retry_delay = 2
+        
+        # Appels Product Pricing simultanés (le débit est réglé par le limiteur SP-API du client)
+        self.max_concurrent_pricing_requests = 2
 
     async def get_competitive_pricing(
         self, 
         sku: str, 
         marketplace_id: str,
-        item_condition: str = "New"
+        item_condition: str = "New",
+        credentials: Optional[SPAPICredentials] = None
     ) -> Tuple[List[CompetitorOffer], Dict[str, Any]]:
         """
         Récupérer les offres concurrentes via Product Pricing API
@@ -68,86 +86,252 @@ class AmazonPricingEngine:
             sku: SKU Amazon du produit
             marketplace_id: ID du marketplace
             item_condition: État du produit (New, Used, etc.)
+            credentials: Identifiants SP-API de la connexion du vendeur
             
         Returns:
             Tuple[List[CompetitorOffer], Dict[str, Any]]: Offres + métadonnées
         """
-        try:
-            logger.info(f"Getting competitive pricing for SKU {sku} on marketplace {marketplace_id}")
-            
-            # Configuration API
-            endpoint = "/products/pricing/v0/price"
-            
-            params = {
-                "MarketplaceId": marketplace_id,
-                "Skus": sku,
-                "ItemCondition": item_condition
-            }
+        logger.info(f"Getting competitive pricing for SKU {sku} on marketplace {marketplace_id}")
+        
+        results = await self.get_competitive_pricing_many([sku], marketplace_id, item_condition, credentials=credentials)
+        competitors, metadata = results[sku]
+        
+        if 'error' in metadata:
+            return [], metadata
+        
+        logger.info(f"Found {len(competitors)} competitive offers for SKU {sku}")
+        return competitors, metadata
+
+    async def get_competitive_pricing_many(
+        self,
+        skus: List[str],
+        marketplace_id: str,
+        item_condition: str = "New",
+        use_offers_batch: bool = False,
+        credentials: Optional[SPAPICredentials] = None
+    ) -> Dict[str, Tuple[List[CompetitorOffer], Dict[str, Any]]]:
+        """
+        Récupérer les offres concurrentes d'un lot de SKUs
+        
+        Les SKUs sont découpés par paquets de 20 (maximum accepté par appel) et les
+        paquets lancés en parallèle ; le quota de chaque opération (getPricing,
+        getListingOffersBatch) est appliqué par le limiteur SP-API du client.
+        
+        Args:
+            skus: SKUs Amazon (doublons ignorés)
+            marketplace_id: ID du marketplace
+            item_condition: État du produit (New, Used, etc.)
+            use_offers_batch: Utiliser getListingOffersBatch (toutes les offres, vendeur
+                de la Buy Box) plutôt que getPricing
+            credentials: Identifiants SP-API de la connexion du vendeur
             
-            # Appel SP-API Product Pricing
-            start_time = time.time()
+        Returns:
+            Dict[str, Tuple[List[CompetitorOffer], Dict[str, Any]]]: Offres + métadonnées par SKU
+        """
+        unique_skus = list(dict.fromkeys(skus))
+        if use_offers_batch:
+            chunk_size, fetch_chunk = LISTING_OFFERS_BATCH_MAX_REQUESTS, self._fetch_listing_offers_chunk
+        else:
+            chunk_size, fetch_chunk = PRICING_MAX_SKUS_PER_REQUEST, self._fetch_pricing_chunk
+        
+        chunks = [unique_skus[i:i + chunk_size] for i in range(0, len(unique_skus), chunk_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrent_pricing_requests)
+        
+        async def run_chunk(chunk: List[str]):
+            async with semaphore:
+                return await fetch_chunk(chunk, marketplace_id, item_condition, credentials)
+        
+        results: Dict[str, Tuple[List[CompetitorOffer], Dict[str, Any]]] = {}
+        for chunk_results in await asyncio.gather(*(run_chunk(chunk) for chunk in chunks)):
+            results.update(chunk_results)
+        
+        logger.info(
+            f"Competitive pricing fetched for {len(unique_skus)} SKUs in {len(chunks)} requests "
+            f"on marketplace {marketplace_id}"
+        )
+        return results
+
+    async def _fetch_pricing_chunk(
+        self,
+        skus: List[str],
+        marketplace_id: str,
+        item_condition: str,
+        credentials: Optional[SPAPICredentials] = None
+    ) -> Dict[str, Tuple[List[CompetitorOffer], Dict[str, Any]]]:
+        """Un appel Product Pricing getPricing pour au plus 20 SKUs"""
+        
+        params = {
+            "MarketplaceId": marketplace_id,
+            "ItemType": "Sku",
+            "Skus": ",".join(skus),
+            "ItemCondition": item_condition
+        }
+        
+        start_time = time.time()
+        try:
             response = await self.sp_api_client.make_request(
                 method="GET",
-                endpoint=endpoint,
+                endpoint=PRICING_ENDPOINT,
                 params=params,
-                marketplace_id=marketplace_id
+                marketplace_id=marketplace_id,
+                credentials=credentials
             )
+        except Exception as e:
+            logger.error(f"Error getting competitive pricing for SKUs {skus}: {str(e)}")
+            return {sku: ([], {'error': str(e), 'duration_ms': 0}) for sku in skus}
+        
+        api_duration = int((time.time() - start_time) * 1000)
+        
+        if not response.get('success'):
+            logger.error(f"SP-API Product Pricing failed: {response.get('error')}")
+            return {sku: ([], {'error': response.get('error'), 'duration_ms': api_duration}) for sku in skus}
+        
+        # Parser la réponse SP-API : une entrée par SKU demandé
+        payload = response.get('data', {})
+        parsed = {sku: ([], {}) for sku in skus}
+        
+        for product in payload.get('payload', []):
+            product_sku = product.get('SellerSKU') or product.get('ASIN')
+            if product_sku not in parsed:
+                continue
             
-            api_duration = int((time.time() - start_time) * 1000)
+            if product.get('status', 'Success') != 'Success':
+                parsed[product_sku] = None
+                continue
             
-            if not response.get('success'):
-                logger.error(f"SP-API Product Pricing failed: {response.get('error')}")
-                return [], {'error': response.get('error'), 'duration_ms': api_duration}
+            parsed[product_sku] = self._parse_pricing_product(product)
+        
+        return {
+            sku: self._pricing_result(
+                sku_pricing, api_duration, len(skus),
+                error=None if sku_pricing is not None else f"Pricing indisponible pour SKU {sku}"
+            )
+            for sku, sku_pricing in parsed.items()
+        }
+
+    async def _fetch_listing_offers_chunk(
+        self,
+        skus: List[str],
+        marketplace_id: str,
+        item_condition: str,
+        credentials: Optional[SPAPICredentials] = None
+    ) -> Dict[str, Tuple[List[CompetitorOffer], Dict[str, Any]]]:
+        """Un appel getListingOffersBatch pour au plus 20 SKUs"""
+        
+        payload = {
+            "requests": [
+                {
+                    "uri": f"/products/pricing/v0/listings/{quote(sku, safe='')}/offers",
+                    "method": "GET",
+                    "MarketplaceId": marketplace_id,
+                    "ItemCondition": item_condition
+                }
+                for sku in skus
+            ]
+        }
+        
+        start_time = time.time()
+        try:
+            response = await self.sp_api_client.make_request(
+                method="POST",
+                endpoint=LISTING_OFFERS_BATCH_ENDPOINT,
+                json_data=payload,
+                marketplace_id=marketplace_id,
+                credentials=credentials
+            )
+        except Exception as e:
+            logger.error(f"Error getting listing offers for SKUs {skus}: {str(e)}")
+            return {sku: ([], {'error': str(e), 'duration_ms': 0}) for sku in skus}
+        
+        api_duration = int((time.time() - start_time) * 1000)
+        
+        if not response.get('success'):
+            logger.error(f"SP-API getListingOffersBatch failed: {response.get('error')}")
+            return {sku: ([], {'error': response.get('error'), 'duration_ms': api_duration}) for sku in skus}
+        
+        parsed = {sku: ([], {}) for sku in skus}
+        
+        for item in response.get('data', {}).get('responses', []):
+            body_payload = item.get('body', {}).get('payload', {})
+            product_sku = body_payload.get('SKU') or item.get('request', {}).get('SellerSKU')
+            if product_sku not in parsed:
+                continue
             
-            # Parser la réponse SP-API
-            payload = response.get('data', {})
+            if item.get('status', {}).get('statusCode', 200) != 200:
+                parsed[product_sku] = None
+                continue
             
             competitors = []
             buybox_info = {}
-            
-            # Parser les offers
-            if 'payload' in payload:
-                for product in payload.get('payload', []):
-                    product_sku = product.get('ASIN') or product.get('SellerSKU')
-                    
-                    if product_sku != sku:
-                        continue
-                    
-                    # Product pricing details
-                    product_pricing = product.get('Product', {})
-                    competitive_pricing = product_pricing.get('CompetitivePricing', {})
-                    
-                    # Offres concurrentes
-                    for offer in competitive_pricing.get('CompetitivePrices', []):
-                        competitor_offer = self._parse_competitive_offer(offer)
-                        if competitor_offer:
-                            competitors.append(competitor_offer)
-                    
-                    # Buy Box information
-                    offers_detail = product_pricing.get('Offers', [])
-                    for offer_detail in offers_detail:
-                        if offer_detail.get('IsBuyBoxWinner', False):
-                            buybox_info = {
-                                'price': float(offer_detail.get('ListingPrice', {}).get('Amount', 0)),
-                                'seller_id': offer_detail.get('SellerId', ''),
-                                'condition': offer_detail.get('ItemCondition', 'New'),
-                                'shipping': float(offer_detail.get('Shipping', {}).get('Amount', 0))
-                            }
-            
-            logger.info(f"Found {len(competitors)} competitive offers for SKU {sku}")
-            
-            metadata = {
-                'api_duration_ms': api_duration,
-                'competitors_count': len(competitors),
-                'buybox_info': buybox_info,
-                'retrieved_at': datetime.utcnow().isoformat()
-            }
-            
-            return competitors, metadata
-            
-        except Exception as e:
-            logger.error(f"Error getting competitive pricing for SKU {sku}: {str(e)}")
-            return [], {'error': str(e), 'duration_ms': 0}
+            for offer in body_payload.get('Offers', []):
+                competitor_offer = self._parse_listing_offer(offer)
+                if competitor_offer:
+                    competitors.append(competitor_offer)
+                    if competitor_offer.is_buy_box_winner:
+                        buybox_info = {
+                            'price': competitor_offer.price,
+                            'seller_id': competitor_offer.seller_id,
+                            'condition': competitor_offer.condition,
+                            'shipping': competitor_offer.shipping
+                        }
+            parsed[product_sku] = (competitors[:self.max_competitors], buybox_info)
+        
+        return {
+            sku: self._pricing_result(
+                sku_pricing, api_duration, len(skus),
+                error=None if sku_pricing is not None else f"Offres indisponibles pour SKU {sku}"
+            )
+            for sku, sku_pricing in parsed.items()
+        }
+
+    def _pricing_result(
+        self,
+        sku_pricing: Optional[Tuple[List[CompetitorOffer], Dict[str, Any]]],
+        api_duration: int,
+        batch_size: int,
+        error: Optional[str] = None
+    ) -> Tuple[List[CompetitorOffer], Dict[str, Any]]:
+        """Offres + métadonnées d'un SKU (durée de l'appel groupé partagée)"""
+        
+        if error:
+            return [], {'error': error, 'duration_ms': api_duration}
+        
+        competitors, buybox_info = sku_pricing
+        return competitors, {
+            'api_duration_ms': api_duration,
+            'competitors_count': len(competitors),
+            'buybox_info': buybox_info,
+            'batch_size': batch_size,
+            'retrieved_at': datetime.utcnow().isoformat()
+        }
+
+    def _parse_pricing_product(self, product: Dict) -> Tuple[List[CompetitorOffer], Dict[str, Any]]:
+        """Parser les offres et la Buy Box d'un produit de la réponse getPricing"""
+        
+        competitors = []
+        buybox_info = {}
+        
+        # Product pricing details
+        product_pricing = product.get('Product', {})
+        competitive_pricing = product_pricing.get('CompetitivePricing', {})
+        
+        # Offres concurrentes
+        for offer in competitive_pricing.get('CompetitivePrices', []):
+            competitor_offer = self._parse_competitive_offer(offer)
+            if competitor_offer:
+                competitors.append(competitor_offer)
+        
+        # Buy Box information
+        for offer_detail in product_pricing.get('Offers', []):
+            if offer_detail.get('IsBuyBoxWinner', False):
+                buybox_info = {
+                    'price': float(offer_detail.get('ListingPrice', {}).get('Amount', 0)),
+                    'seller_id': offer_detail.get('SellerId', ''),
+                    'condition': offer_detail.get('ItemCondition', 'New'),
+                    'shipping': float(offer_detail.get('Shipping', {}).get('Amount', 0))
+                }
+        
+        return competitors, buybox_info
 
     def _parse_competitive_offer(self, offer_data: Dict) -> Optional[CompetitorOffer]:
         """Parser une offre concurrente depuis SP-API"""
@@ -170,11 +354,31 @@ class AmazonPricingEngine:
             logger.error(f"Error parsing competitive offer: {str(e)}")
             return None
 
+    def _parse_listing_offer(self, offer_data: Dict) -> Optional[CompetitorOffer]:
+        """Parser une offre depuis getListingOffersBatch"""
+        try:
+            price = float(offer_data.get('ListingPrice', {}).get('Amount', 0))
+            shipping = float(offer_data.get('Shipping', {}).get('Amount', 0))
+            
+            return CompetitorOffer(
+                seller_id=offer_data.get('SellerId', 'unknown'),
+                condition=offer_data.get('SubCondition', 'New'),
+                price=price,
+                shipping=shipping,
+                landed_price=price + shipping,
+                is_buy_box_winner=offer_data.get('IsBuyBoxWinner', False),
+                is_featured_merchant=offer_data.get('IsFeaturedMerchant', False)
+            )
+        except Exception as e:
+            logger.error(f"Error parsing listing offer: {str(e)}")
+            return None
+
     async def calculate_optimal_price(
         self,
         rule: PricingRule,
         current_price: Optional[float] = None,
-        competitors: Optional[List[CompetitorOffer]] = None
+        competitors: Optional[List[CompetitorOffer]] = None,
+        credentials: Optional[SPAPICredentials] = None
     ) -> PricingCalculation:
         """
         Calculer le prix optimal selon la règle et les données concurrentielles
@@ -183,6 +387,7 @@ class AmazonPricingEngine:
             rule: Règle de pricing à appliquer
             current_price: Prix actuel du produit
             competitors: Offres concurrentes (si None, sera récupéré via API)
+            credentials: Identifiants SP-API de la connexion du vendeur
             
         Returns:
             PricingCalculation: Résultat du calcul avec diagnostic complet
@@ -196,7 +401,8 @@ class AmazonPricingEngine:
             if competitors is None:
                 competitors, metadata = await self.get_competitive_pricing(
                     rule.sku, 
-                    rule.marketplace_id
+                    rule.marketplace_id,
+                    credentials=credentials
                 )
             
             # Analyser la situation Buy Box
@@ -283,6 +489,151 @@ class AmazonPricingEngine:
                 calculation_duration_ms=int((time.time() - start_time) * 1000)
             )
 
+    async def calculate_optimal_price_many(
+        self,
+        rules: List[PricingRule],
+        current_prices: Optional[Dict[str, float]] = None,
+        competitors_by_sku: Optional[Dict[str, List[CompetitorOffer]]] = None,
+        use_offers_batch: bool = False,
+        credentials: Optional[SPAPICredentials] = None
+    ) -> List[PricingCalculation]:
+        """
+        Calculer le prix optimal d'un lot de règles
+        
+        Le calcul est vectorisé (pricing_vectorized) et donne les mêmes prix,
+        statuts et confiances que calculate_optimal_price règle par règle.
+        
+        Args:
+            rules: Règles de pricing à appliquer
+            current_prices: Prix actuels par SKU
+            competitors_by_sku: Offres concurrentes par SKU (si None, récupérées par
+                appels groupés, marketplace par marketplace)
+            use_offers_batch: Récupération via getListingOffersBatch
+            credentials: Identifiants SP-API de la connexion du vendeur
+            
+        Returns:
+            List[PricingCalculation]: Un calcul par règle, dans l'ordre des règles
+        """
+        current_prices = current_prices or {}
+        
+        if competitors_by_sku is None:
+            skus_by_marketplace: Dict[str, List[str]] = {}
+            for rule in rules:
+                skus_by_marketplace.setdefault(rule.marketplace_id, []).append(rule.sku)
+            
+            competitors_by_key: Dict[Tuple[str, str], List[CompetitorOffer]] = {}
+            for marketplace_id, skus in skus_by_marketplace.items():
+                pricing = await self.get_competitive_pricing_many(
+                    skus, marketplace_id, use_offers_batch=use_offers_batch, credentials=credentials
+                )
+                for sku, (competitors, _) in pricing.items():
+                    competitors_by_key[(marketplace_id, sku)] = competitors
+        else:
+            competitors_by_key = {
+                (rule.marketplace_id, rule.sku): competitors_by_sku.get(rule.sku, [])
+                for rule in rules
+            }
+        
+        if not rules:
+            return []
+        
+        start_time = time.time()
+        rule_prices = [current_prices.get(rule.sku) for rule in rules]
+        rule_competitors = [competitors_by_key.get((rule.marketplace_id, rule.sku), []) for rule in rules]
+        
+        columns = PricingColumns.from_rules(rules, rule_prices, rule_competitors)
+        # Colonnes converties en listes Python une fois (accès par ligne sans scalaires NumPy)
+        computed = {name: values.tolist() for name, values in compute_prices(columns).items()}
+        computed['buybox_prices'] = columns.buybox_prices.tolist()
+        
+        duration_ms = int((time.time() - start_time) * 1000)
+        calculations = []
+        
+        for i, rule in enumerate(rules):
+            if computed['fallback'][i]:
+                # Cas dégénérés (division par zéro, valeurs infinies) : chemin unitaire
+                calculations.append(
+                    await self.calculate_optimal_price(rule, rule_prices[i], rule_competitors[i])
+                )
+                continue
+            
+            calculations.append(self._build_calculation(
+                rule, rule_prices[i], rule_competitors[i], columns, computed, i, duration_ms
+            ))
+        
+        logger.info(f"Batch price calculation completed for {len(rules)} rules in {int((time.time() - start_time) * 1000)}ms")
+        return calculations
+
+    def _build_calculation(
+        self,
+        rule: PricingRule,
+        current_price: Optional[float],
+        competitors: List[CompetitorOffer],
+        columns: PricingColumns,
+        computed: Dict[str, List[Any]],
+        index: int,
+        duration_ms: int
+    ) -> PricingCalculation:
+        """PricingCalculation d'une ligne du calcul vectorisé"""
+        
+        recommended_price = computed['recommended_prices'][index]
+        final_price = computed['final_prices'][index]
+        price_change_pct = computed['price_change_pcts'][index]
+        buybox_price = computed['buybox_prices'][index]
+        buybox_price = None if math.isnan(buybox_price) else buybox_price
+        
+        warnings = []
+        if final_price != recommended_price:
+            warnings.append(f"Prix ajusté de {recommended_price:.2f}€ à {final_price:.2f}€ pour respecter les contraintes")
+        if not computed['within_rules'][index]:
+            warnings.append(f"Changement de prix {price_change_pct:.1f}% dépasse la variance autorisée {rule.variance_pct}%")
+        
+        return PricingCalculation(
+            sku=rule.sku,
+            marketplace_id=rule.marketplace_id,
+            current_price=current_price,
+            competitors=competitors,
+            buybox_price=buybox_price,
+            buybox_winner=columns.buybox_winners[index],
+            our_offer=columns.our_offers[index],
+            recommended_price=final_price,
+            price_change=computed['price_changes'][index],
+            price_change_pct=price_change_pct,
+            buybox_status=BUYBOX_STATUSES[computed['status_codes'][index]],
+            within_rules=computed['within_rules'][index],
+            reasoning=self._reasoning_text(computed['reason_codes'][index], rule, buybox_price, current_price),
+            warnings=warnings,
+            confidence=computed['confidences'][index],
+            calculated_at=datetime.utcnow(),
+            calculation_duration_ms=duration_ms
+        )
+
+    def _reasoning_text(
+        self,
+        reason_code: int,
+        rule: PricingRule,
+        buybox_price: Optional[float],
+        current_price: Optional[float]
+    ) -> str:
+        """Explication du prix recommandé (mêmes textes que le calcul unitaire)"""
+        
+        if reason_code == REASON_NO_BUYBOX:
+            return "Aucune Buy Box identifiée, alignement sur prix minimum concurrent"
+        if reason_code == REASON_BUYBOX_MATCH:
+            return f"Alignement sur Buy Box à {buybox_price:.2f}€ avec réduction de 0.01€"
+        if reason_code == REASON_NO_MARGIN_TARGET:
+            return "Marge cible non définie"
+        if reason_code == REASON_MARGIN_TARGET:
+            estimated_cost = rule.min_price * ESTIMATED_COST_RATIO
+            return f"Prix calculé pour marge cible {rule.margin_target}% (coût estimé: {estimated_cost:.2f}€)"
+        if reason_code == REASON_RANGE_MIDDLE:
+            return f"Prix initial au milieu de la fourchette [{rule.min_price:.2f}€ - {rule.max_price:.2f}€]"
+        if reason_code == REASON_KEEP_CURRENT:
+            return f"Prix actuel {current_price:.2f}€ respecte les contraintes min/max"
+        if reason_code == REASON_RAISED_TO_MIN:
+            return f"Prix ajusté au minimum autorisé {rule.min_price:.2f}€"
+        return f"Prix ajusté au maximum autorisé {rule.max_price:.2f}€"
+
     def _analyze_buybox_situation(
         self, 
         competitors: List[CompetitorOffer], 
@@ -364,7 +715,7 @@ class AmazonPricingEngine:
         
         # Calcul simplifié : prix = coût / (1 - marge_target/100)
         # Estimation coût basée sur prix minimum
-        estimated_cost = rule.min_price * 0.7  # Estimation : coût = 70% du prix min
+        estimated_cost = rule.min_price * ESTIMATED_COST_RATIO  # Estimation : coût = 70% du prix min
         
         target_price = estimated_cost / (1 - rule.margin_target / 100)
         
@@ -476,7 +827,8 @@ class AmazonPricingEngine:
         sku: str, 
         marketplace_id: str, 
         new_price: float,
-        method: str = "listings_items"
+        method: str = "listings_items",
+        credentials: Optional[SPAPICredentials] = None
     ) -> Dict[str, Any]:
         """
         Publier un nouveau prix via SP-API
@@ -486,6 +838,7 @@ class AmazonPricingEngine:
             marketplace_id: ID marketplace
             new_price: Nouveau prix à publier
             method: "listings_items" ou "feeds"
+            credentials: Identifiants SP-API de la connexion du vendeur
             
         Returns:
             Dict avec résultat de la publication
@@ -496,7 +849,7 @@ class AmazonPricingEngine:
             start_time = time.time()
             
             if method == "listings_items":
-                result = await self._publish_via_listings_items(sku, marketplace_id, new_price)
+                result = await self._publish_via_listings_items(sku, marketplace_id, new_price, credentials)
             else:
                 result = await self._publish_via_feeds(sku, marketplace_id, new_price)
             
@@ -520,7 +873,8 @@ class AmazonPricingEngine:
         self, 
         sku: str, 
         marketplace_id: str, 
-        price: float
+        price: float,
+        credentials: Optional[SPAPICredentials] = None
     ) -> Dict[str, Any]:
         """Publier via Listings Items API"""
         
@@ -544,7 +898,8 @@ class AmazonPricingEngine:
             endpoint=endpoint,
             json_data=payload,
             marketplace_id=marketplace_id,
-            params={"marketplaceIds": marketplace_id}
+            params={"marketplaceIds": marketplace_id},
+            credentials=credentials
         )
         
         if response.get('success'):
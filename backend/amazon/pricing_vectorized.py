@@ -0,0 +1,274 @@
+"""
+Amazon Pricing Engine - Calcul vectorisé
+Prix recommandés et confiances d'un lot de règles en une passe NumPy
+(résultats identiques au calcul règle par règle d'AmazonPricingEngine)
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.amazon_pricing import (
+    PricingRule, CompetitorOffer, PricingStrategy, BuyBoxStatus
+)
+
+logger = logging.getLogger(__name__)
+
+# Codes des stratégies dans les colonnes
+STRATEGY_CODES = {
+    PricingStrategy.BUYBOX_MATCH: 0,
+    PricingStrategy.MARGIN_TARGET: 1,
+    PricingStrategy.FLOOR_CEILING: 2
+}
+
+# Codes des statuts Buy Box (index dans ce tuple)
+BUYBOX_STATUSES = (BuyBoxStatus.WON, BuyBoxStatus.RISK, BuyBoxStatus.LOST, BuyBoxStatus.UNKNOWN)
+_WON, _RISK, _LOST, _UNKNOWN = range(4)
+
+# Codes de justification du prix recommandé (texte construit par l'appelant)
+REASON_NO_BUYBOX = 0
+REASON_BUYBOX_MATCH = 1
+REASON_NO_MARGIN_TARGET = 2
+REASON_MARGIN_TARGET = 3
+REASON_RANGE_MIDDLE = 4
+REASON_KEEP_CURRENT = 5
+REASON_RAISED_TO_MIN = 6
+REASON_LOWERED_TO_MAX = 7
+
+# Même estimation de coût que le calcul unitaire (70% du prix minimum)
+ESTIMATED_COST_RATIO = 0.7
+
+
+def _optional(values, size: int) -> np.ndarray:
+    """Colonne float (NaN = absent)"""
+    if values is None:
+        return np.full(size, np.nan)
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _truthy(values: np.ndarray) -> np.ndarray:
+    """Équivalent vectorisé de `if value:` sur une colonne optionnelle"""
+    return ~np.isnan(values) & (values != 0)
+
+
+def round_half_up_cents(prices: np.ndarray) -> np.ndarray:
+    """
+    Arrondi au centime identique à Decimal(str(prix)).quantize(0.01, ROUND_HALF_UP)
+
+    str() donne la plus courte décimale qui relit le même float : elle atteint la
+    demi-valeur (2k+1)/200 exactement quand le float est >= au float le plus proche
+    de cette demi-valeur, calculé exactement par une seule division IEEE.
+    """
+    magnitudes = np.abs(prices)
+    cents = np.floor(magnitudes * 100)
+    cents = np.where(magnitudes >= (2 * cents + 1) / 200, cents + 1, cents)
+    return np.copysign(cents / 100, prices)
+
+
+def summarize_competitors(
+    competitors: List[CompetitorOffer]
+) -> Tuple[Optional[float], Optional[str], Optional[CompetitorOffer], Optional[float]]:
+    """Prix et vendeur Buy Box, notre offre, prix concurrent minimum"""
+
+    buybox_price = None
+    buybox_winner = None
+    our_offer = None
+
+    for offer in competitors:
+        if offer.is_buy_box_winner:
+            buybox_winner = offer.seller_id
+            buybox_price = offer.landed_price
+            break
+
+    for offer in competitors:
+        if offer.seller_id == "our_seller_id":  # À adapter selon l'identification
+            our_offer = offer
+            break
+
+    min_competitor_price = min([c.landed_price for c in competitors], default=None)
+    return buybox_price, buybox_winner, our_offer, min_competitor_price
+
+
+class PricingColumns:
+    """
+    Lot de règles de pricing en colonnes (une ligne par règle)
+
+    Les valeurs optionnelles absentes (prix actuel, MAP, marge cible, Buy Box,
+    concurrent minimum) sont NaN.
+    """
+
+    def __init__(
+        self,
+        min_prices,
+        max_prices,
+        variance_pcts,
+        strategy_codes,
+        map_prices=None,
+        margin_targets=None,
+        current_prices=None,
+        costs=None,
+        buybox_prices=None,
+        min_competitor_prices=None,
+        competitor_counts=None,
+        our_offer_wins=None
+    ):
+        self.min_prices = np.asarray(min_prices, dtype=np.float64)
+        size = len(self.min_prices)
+
+        self.max_prices = np.asarray(max_prices, dtype=np.float64)
+        self.variance_pcts = np.asarray(variance_pcts, dtype=np.float64)
+        self.strategy_codes = np.asarray(strategy_codes, dtype=np.int8)
+        self.map_prices = _optional(map_prices, size)
+        self.margin_targets = _optional(margin_targets, size)
+        self.current_prices = _optional(current_prices, size)
+        self.costs = (self.min_prices * ESTIMATED_COST_RATIO if costs is None
+                      else np.asarray(costs, dtype=np.float64))
+        self.buybox_prices = _optional(buybox_prices, size)
+        self.min_competitor_prices = _optional(min_competitor_prices, size)
+        self.competitor_counts = (np.zeros(size, dtype=np.int64) if competitor_counts is None
+                                  else np.asarray(competitor_counts, dtype=np.int64))
+        self.our_offer_wins = (np.zeros(size, dtype=bool) if our_offer_wins is None
+                               else np.asarray(our_offer_wins, dtype=bool))
+
+        # Détails par ligne pour les résultats (hors calcul)
+        self.buybox_winners: List[Optional[str]] = [None] * size
+        self.our_offers: List[Optional[CompetitorOffer]] = [None] * size
+
+    def __len__(self) -> int:
+        return len(self.min_prices)
+
+    @classmethod
+    def from_rules(
+        cls,
+        rules: List[PricingRule],
+        current_prices: List[Optional[float]],
+        competitors: List[List[CompetitorOffer]]
+    ) -> "PricingColumns":
+        """Colonnes d'un lot de règles, prix actuels et offres concurrentes (mêmes index)"""
+
+        summaries = [summarize_competitors(offers) for offers in competitors]
+
+        columns = cls(
+            min_prices=[rule.min_price for rule in rules],
+            max_prices=[rule.max_price for rule in rules],
+            variance_pcts=[rule.variance_pct for rule in rules],
+            strategy_codes=[STRATEGY_CODES[rule.strategy] for rule in rules],
+            map_prices=[rule.map_price for rule in rules],
+            margin_targets=[rule.margin_target for rule in rules],
+            current_prices=current_prices,
+            buybox_prices=[summary[0] for summary in summaries],
+            min_competitor_prices=[summary[3] for summary in summaries],
+            competitor_counts=[len(offers) for offers in competitors],
+            our_offer_wins=[summary[2] is not None and summary[2].is_buy_box_winner for summary in summaries]
+        )
+        columns.buybox_winners = [summary[1] for summary in summaries]
+        columns.our_offers = [summary[2] for summary in summaries]
+        return columns
+
+
+def compute_prices(columns: PricingColumns) -> Dict[str, np.ndarray]:
+    """
+    Prix recommandés, contraintes, statut Buy Box et confiance de toutes les lignes
+
+    Chaque étape reprend l'ordre des opérations du calcul unitaire pour produire
+    les mêmes flottants. Les lignes marquées `fallback` (division par zéro ou
+    valeurs infinies, en erreur dans le calcul unitaire) sont à recalculer
+    règle par règle.
+
+    Returns:
+        Dict de colonnes : recommended_prices, reason_codes, final_prices,
+        price_changes, price_change_pcts, status_codes, within_rules,
+        confidences, fallback
+    """
+    min_prices = columns.min_prices
+    max_prices = columns.max_prices
+    current = columns.current_prices
+    has_current = _truthy(current)
+    current_or_zero = np.where(has_current, current, 0.0)
+    has_buybox = _truthy(columns.buybox_prices)
+    buybox = np.where(has_buybox, columns.buybox_prices, 1.0)
+    strategies = columns.strategy_codes
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # Situation Buy Box
+        buybox_diff_pct = np.abs(current_or_zero - buybox) / buybox * 100
+        status_codes = np.where(
+            columns.our_offer_wins, _WON,
+            np.where(has_buybox & has_current, np.where(buybox_diff_pct <= 5, _RISK, _LOST), _UNKNOWN)
+        )
+
+        # Stratégie BUYBOX_MATCH
+        has_competitors = columns.competitor_counts > 0
+        min_competitor = np.where(has_competitors, columns.min_competitor_prices, min_prices)
+        buybox_match = np.where(has_buybox, buybox - 0.01, min_competitor)
+        buybox_reason = np.where(has_buybox, REASON_BUYBOX_MATCH, REASON_NO_BUYBOX)
+
+        # Stratégie MARGIN_TARGET
+        has_margin = _truthy(columns.margin_targets)
+        margin_price = np.where(
+            has_margin,
+            columns.costs / (1 - columns.margin_targets / 100),
+            np.where(has_current, current, min_prices)
+        )
+        margin_reason = np.where(has_margin, REASON_MARGIN_TARGET, REASON_NO_MARGIN_TARGET)
+
+        # Stratégie FLOOR_CEILING
+        in_range = (min_prices <= current) & (current <= max_prices)
+        floor_ceiling = np.where(
+            ~has_current, (min_prices + max_prices) / 2,
+            np.where(in_range, current, np.where(current < min_prices, min_prices, max_prices))
+        )
+        floor_ceiling_reason = np.where(
+            ~has_current, REASON_RANGE_MIDDLE,
+            np.where(in_range, REASON_KEEP_CURRENT,
+                     np.where(current < min_prices, REASON_RAISED_TO_MIN, REASON_LOWERED_TO_MAX))
+        )
+
+        recommended = np.select([strategies == 0, strategies == 1], [buybox_match, margin_price], floor_ceiling)
+        reason_codes = np.select([strategies == 0, strategies == 1], [buybox_reason, margin_reason],
+                                 floor_ceiling_reason)
+
+        # Contraintes min/max, MAP puis variance (appliquées dans l'ordre)
+        final = np.where(recommended < min_prices, min_prices, recommended)
+        final = np.where(final > max_prices, max_prices, final)
+        has_map = _truthy(columns.map_prices)
+        final = np.where(has_map & (final < columns.map_prices), columns.map_prices, final)
+
+        max_change = current_or_zero * (columns.variance_pcts / 100)
+        min_allowed = current_or_zero - max_change
+        max_allowed = current_or_zero + max_change
+        final = np.where(has_current & (final < min_allowed), min_allowed, final)
+        final = np.where(has_current & (final > max_allowed), max_allowed, final)
+
+        fallback = (
+            ~np.isfinite(final)
+            | (has_current & ~np.isfinite(current))
+            | ((strategies == 1) & has_margin & (columns.margin_targets == 100))
+        )
+        final = round_half_up_cents(np.where(fallback, 0.0, final))
+
+        # Changement de prix
+        price_changes = final - current_or_zero
+        price_change_pcts = np.where(has_current, price_changes / np.where(has_current, current, 1.0) * 100, 0.0)
+        within_rules = ~(np.abs(price_change_pcts) > columns.variance_pcts)
+
+        # Confiance
+        confidences = np.full(len(columns), 100.0)
+        confidences -= np.where(columns.competitor_counts < 3, 20, 0)
+        confidences -= np.where(status_codes == _UNKNOWN, 15, 0)
+        final_diff_pct = np.abs(final - buybox) / buybox * 100
+        confidences -= np.where(has_buybox & (final_diff_pct > 10), 10, 0)
+        confidences -= np.where((final == min_prices) | (final == max_prices), 5, 0)
+        confidences = np.maximum(0.0, confidences)
+
+    return {
+        'recommended_prices': recommended,
+        'reason_codes': reason_codes,
+        'final_prices': final,
+        'price_changes': price_changes,
+        'price_change_pcts': price_change_pcts,
+        'status_codes': status_codes,
+        'within_rules': within_rules,
+        'confidences': confidences,
+        'fallback': fallback
+    }
@@ -5,7 +5,6 @@ Construction automatique des familles Parent/Child via SP-API (réel)
 import logging
 import asyncio
 import time
-import aiohttp
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any, Tuple, Set
 import json
@@ -13,10 +12,12 @@ import uuid
 import re
 from collections import defaultdict
 
+from core.http_clients import get_http_session
 from models.amazon_phase6 import (
     VariationFamily, ProductRelationship, VariationStatus
 )
-from integrations.amazon.client import AmazonSPAPIClient
+from integrations.amazon.client import AmazonSPAPIClient, SPAPICredentials
+from services.amazon_connection_service import get_sp_api_credentials
 
 logger = logging.getLogger(__name__)
 
@@ -116,8 +117,11 @@ class VariationsBuilderEngine:
         try:
             logger.info(f"🔍 Detecting variation families for user {user_id} on marketplace {marketplace_id}")
             
+            # Identifiants SP-API de la connexion du vendeur
+            credentials = await get_sp_api_credentials(user_id, marketplace_id)
+            
             # Récupérer les produits de l'utilisateur
-            products_data = await self._get_user_products(user_id, marketplace_id, sku_list)
+            products_data = await self._get_user_products(user_id, marketplace_id, sku_list, credentials)
             
             if not products_data:
                 logger.warning("No products found for variation detection")
@@ -129,7 +133,7 @@ class VariationsBuilderEngine:
             # Enrichir avec les données SP-API
             enriched_families = []
             for family in detected_families:
-                enriched_family = await self._enrich_family_data(family, marketplace_id)
+                enriched_family = await self._enrich_family_data(family, marketplace_id, credentials)
                 enriched_families.append(enriched_family)
             
             logger.info(f"✅ Detected {len(enriched_families)} potential variation families")
@@ -144,7 +148,8 @@ class VariationsBuilderEngine:
         self, 
         user_id: str, 
         marketplace_id: str, 
-        sku_list: Optional[List[str]] = None
+        sku_list: Optional[List[str]] = None,
+        credentials: Optional[SPAPICredentials] = None
     ) -> List[Dict[str, Any]]:
         """Récupérer les données produits de l'utilisateur"""
         
@@ -166,12 +171,9 @@ class VariationsBuilderEngine:
             # Récupérer les données détaillées de chaque SKU
             for sku in target_skus:
                 try:
-                    product_data = await self._get_detailed_product_data(sku, marketplace_id)
+                    product_data = await self._get_detailed_product_data(sku, marketplace_id, credentials)
                     if product_data:
                         products_data.append(product_data)
-                        
-                    # Éviter la limitation de débit
-                    await asyncio.sleep(0.1)
                     
                 except Exception as e:
                     logger.warning(f"Could not retrieve data for SKU {sku}: {str(e)}")
@@ -184,7 +186,9 @@ class VariationsBuilderEngine:
             logger.error(f"❌ Error getting user products: {str(e)}")
             return []
     
-    async def _get_detailed_product_data(self, sku: str, marketplace_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_detailed_product_data(
+        self, sku: str, marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> Optional[Dict[str, Any]]:
         """Récupérer les données détaillées d'un produit"""
         try:
             response = await self.sp_api_client.make_request(
@@ -194,7 +198,8 @@ class VariationsBuilderEngine:
                 params={
                     "marketplaceIds": marketplace_id,
                     "includedData": "attributes,identifiers,images,productTypes,summaries,relationships"
-                }
+                },
+                credentials=credentials
             )
             
             if response.get('success'):
@@ -412,7 +417,9 @@ class VariationsBuilderEngine:
         
         return None
     
-    async def _enrich_family_data(self, family: Dict[str, Any], marketplace_id: str) -> Dict[str, Any]:
+    async def _enrich_family_data(
+        self, family: Dict[str, Any], marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> Dict[str, Any]:
         """Enrichir les données d'une famille avec les informations SP-API"""
         
         # Ajouter des informations sur les relations existantes
@@ -420,7 +427,7 @@ class VariationsBuilderEngine:
             sku = product['sku']
             
             # Vérifier s'il existe déjà des relations parent/child
-            existing_relationships = await self._check_existing_relationships(sku, marketplace_id)
+            existing_relationships = await self._check_existing_relationships(sku, marketplace_id, credentials)
             product['existing_relationships'] = existing_relationships
             
             # Vérifier les contraintes de catégorie pour les variations
@@ -434,7 +441,9 @@ class VariationsBuilderEngine:
         
         return family
     
-    async def _check_existing_relationships(self, sku: str, marketplace_id: str) -> List[Dict[str, Any]]:
+    async def _check_existing_relationships(
+        self, sku: str, marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> List[Dict[str, Any]]:
         """Vérifier les relations parent/child existantes"""
         try:
             # Utiliser l'API Catalog pour récupérer les relations
@@ -445,7 +454,8 @@ class VariationsBuilderEngine:
                 params={
                     "marketplaceIds": marketplace_id,
                     "includedData": "relationships"
-                }
+                },
+                credentials=credentials
             )
             
             if response.get('success'):
@@ -583,8 +593,9 @@ class VariationsBuilderEngine:
             # Créer les relations produit
             await self._create_product_relationships(variation_family, family_config)
             
-            # Publier les relations via SP-API Feed
-            feed_success = await self._publish_relationships_feed(variation_family)
+            # Publier les relations via SP-API Feed (connexion du vendeur)
+            credentials = await get_sp_api_credentials(user_id, marketplace_id)
+            feed_success = await self._publish_relationships_feed(variation_family, credentials)
             
             if feed_success:
                 variation_family.status = VariationStatus.ACTIVE
@@ -632,15 +643,22 @@ class VariationsBuilderEngine:
         
         logger.info(f"✅ Created {len(variation_family.relationships)} product relationships")
     
-    async def _publish_relationships_feed(self, variation_family: VariationFamily) -> bool:
+    async def _publish_relationships_feed(
+        self, variation_family: VariationFamily, credentials: Optional[SPAPICredentials] = None
+    ) -> bool:
         """
         Publier les relations via SP-API Feed POST_PRODUCT_RELATIONSHIP_DATA
         """
         try:
             logger.info(f"📤 Publishing relationships feed for family {variation_family.id}")
             
+            if not credentials:
+                variation_family.sync_errors.append("No active Amazon connection")
+                logger.error(f"❌ No active Amazon connection for family {variation_family.id}")
+                return False
+            
             # Construire le feed XML pour les relations
-            feed_content = await self._build_relationships_feed_xml(variation_family)
+            feed_content = await self._build_relationships_feed_xml(variation_family, credentials.seller_id)
             
             # Créer le feed via SP-API
             feed_response = await self.sp_api_client.make_request(
@@ -650,8 +668,9 @@ class VariationsBuilderEngine:
                 data={
                     "feedType": self.feed_config['feed_type'],
                     "marketplaceIds": [variation_family.marketplace_id],
-                    "inputFeedDocumentId": await self._upload_feed_document(feed_content)
-                }
+                    "inputFeedDocumentId": await self._upload_feed_document(feed_content, credentials)
+                },
+                credentials=credentials
             )
             
             if feed_response.get('success'):
@@ -661,7 +680,9 @@ class VariationsBuilderEngine:
                 logger.info(f"✅ Feed created: {feed_id}")
                 
                 # Surveiller le traitement du feed
-                processing_success = await self._monitor_feed_processing(feed_id, variation_family.marketplace_id)
+                processing_success = await self._monitor_feed_processing(
+                    feed_id, variation_family.marketplace_id, credentials
+                )
                 
                 if processing_success:
                     variation_family.last_sync_at = datetime.utcnow()
@@ -682,14 +703,14 @@ class VariationsBuilderEngine:
             logger.error(f"❌ {error_msg}")
             return False
     
-    async def _build_relationships_feed_xml(self, variation_family: VariationFamily) -> str:
+    async def _build_relationships_feed_xml(self, variation_family: VariationFamily, merchant_id: str) -> str:
         """Construire le contenu XML du feed de relations"""
         
         xml_content = f"""<?xml version="1.0" encoding="UTF-8"?>
 <AmazonEnvelope xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:noNamespaceSchemaLocation="amzn-envelope.xsd">
     <Header>
         <DocumentVersion>1.01</DocumentVersion>
-        <MerchantIdentifier>{self.sp_api_client.merchant_id}</MerchantIdentifier>
+        <MerchantIdentifier>{merchant_id}</MerchantIdentifier>
     </Header>
     <MessageType>Relationship</MessageType>
     <PurgeAndReplace>{str(self.feed_config['purge_and_replace']).lower()}</PurgeAndReplace>
@@ -739,7 +760,7 @@ class VariationsBuilderEngine:
         
         return xml_content
     
-    async def _upload_feed_document(self, feed_content: str) -> str:
+    async def _upload_feed_document(self, feed_content: str, credentials: Optional[SPAPICredentials] = None) -> str:
         """Uploader le document feed et récupérer l'ID"""
         try:
             # Créer le document feed
@@ -748,7 +769,8 @@ class VariationsBuilderEngine:
                 endpoint="/feeds/2021-06-30/documents",
                 data={
                     "contentType": "text/xml; charset=UTF-8"
-                }
+                },
+                credentials=credentials
             )
             
             if create_doc_response.get('success'):
@@ -757,17 +779,17 @@ class VariationsBuilderEngine:
                 upload_url = document_data['url']
                 
                 # Uploader le contenu
-                async with aiohttp.ClientSession() as session:
-                    async with session.put(
-                        upload_url,
-                        data=feed_content.encode('utf-8'),
-                        headers={'Content-Type': 'text/xml; charset=UTF-8'}
-                    ) as upload_response:
-                        if upload_response.status == 200:
-                            logger.info(f"✅ Feed document uploaded: {document_id}")
-                            return document_id
-                        else:
-                            raise Exception(f"Upload failed with status {upload_response.status}")
+                session = await get_http_session('downloads')
+                async with session.put(
+                    upload_url,
+                    data=feed_content.encode('utf-8'),
+                    headers={'Content-Type': 'text/xml; charset=UTF-8'}
+                ) as upload_response:
+                    if upload_response.status == 200:
+                        logger.info(f"✅ Feed document uploaded: {document_id}")
+                        return document_id
+                    else:
+                        raise Exception(f"Upload failed with status {upload_response.status}")
             else:
                 raise Exception(f"Document creation failed: {create_doc_response.get('error')}")
                 
@@ -775,7 +797,9 @@ class VariationsBuilderEngine:
             logger.error(f"❌ Error uploading feed document: {str(e)}")
             raise
     
-    async def _monitor_feed_processing(self, feed_id: str, marketplace_id: str) -> bool:
+    async def _monitor_feed_processing(
+        self, feed_id: str, marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> bool:
         """Surveiller le traitement du feed"""
         try:
             max_wait_time = self.feed_config['processing_timeout']
@@ -789,7 +813,8 @@ class VariationsBuilderEngine:
                 status_response = await self.sp_api_client.make_request(
                     method="GET",
                     endpoint=f"/feeds/2021-06-30/feeds/{feed_id}",
-                    marketplace_id=marketplace_id
+                    marketplace_id=marketplace_id,
+                    credentials=credentials
                 )
                 
                 if status_response.get('success'):
@@ -797,7 +822,9 @@ class VariationsBuilderEngine:
                     
                     if feed_status == 'DONE':
                         # Vérifier le rapport de traitement
-                        processing_success = await self._check_feed_processing_report(feed_id, marketplace_id)
+                        processing_success = await self._check_feed_processing_report(
+                            feed_id, marketplace_id, credentials
+                        )
                         return processing_success
                     
                     elif feed_status == 'FATAL':
@@ -823,14 +850,17 @@ class VariationsBuilderEngine:
             logger.error(f"❌ Error monitoring feed processing: {str(e)}")
             return False
     
-    async def _check_feed_processing_report(self, feed_id: str, marketplace_id: str) -> bool:
+    async def _check_feed_processing_report(
+        self, feed_id: str, marketplace_id: str, credentials: Optional[SPAPICredentials] = None
+    ) -> bool:
         """Vérifier le rapport de traitement du feed"""
         try:
             # Récupérer le rapport de traitement
             report_response = await self.sp_api_client.make_request(
                 method="GET",
                 endpoint=f"/feeds/2021-06-30/feeds/{feed_id}/result",
-                marketplace_id=marketplace_id
+                marketplace_id=marketplace_id,
+                credentials=credentials
             )
             
             if report_response.get('success'):
@@ -839,23 +869,23 @@ class VariationsBuilderEngine:
                 
                 if report_url:
                     # Télécharger et analyser le rapport
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(report_url) as response:
-                            if response.status == 200:
-                                report_content = await response.text()
-                                
-                                # Analyser le rapport pour détecter les erreurs
-                                success = self._analyze_processing_report(report_content)
-                                
-                                if success:
-                                    logger.info("✅ Feed processing completed successfully")
-                                else:
-                                    logger.error("❌ Feed processing completed with errors")
-                                
-                                return success
+                    session = await get_http_session('downloads')
+                    async with session.get(report_url) as response:
+                        if response.status == 200:
+                            report_content = await response.text()
+                            
+                            # Analyser le rapport pour détecter les erreurs
+                            success = self._analyze_processing_report(report_content)
+                            
+                            if success:
+                                logger.info("✅ Feed processing completed successfully")
                             else:
-                                logger.error(f"❌ Could not download processing report")
-                                return False
+                                logger.error("❌ Feed processing completed with errors")
+                            
+                            return success
+                        else:
+                            logger.error(f"❌ Could not download processing report")
+                            return False
                 else:
                     # Pas de rapport disponible, considérer comme succès
                     logger.info("✅ Feed processing completed (no detailed report)")
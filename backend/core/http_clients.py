@@ -0,0 +1,163 @@
+"""
+HTTP Client Registry - Sessions aiohttp partagées par usage
+Une session (pool de connexions keep-alive + cache DNS) par profil, réutilisée
+par tout le process au lieu d'un aiohttp.ClientSession() jetable par requête.
+Fermeture via close_http_sessions() dans server.py::on_shutdown.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HTTPClientProfile:
+    """Configuration du pool de connexions d'une session"""
+    limit: int = 100
+    limit_per_host: int = 20
+    total_timeout_s: float = 30.0
+    keepalive_timeout_s: float = 30.0
+    dns_cache_ttl_s: int = 300
+
+
+# Profils par usage (clé = purpose passé à get_session)
+DEFAULT_PROFILES: Dict[str, HTTPClientProfile] = {
+    # SP-API : beaucoup d'appels vers un petit nombre d'endpoints régionaux
+    "sp_api": HTTPClientProfile(limit=100, limit_per_host=50, total_timeout_s=30.0),
+    # Login With Amazon / OAuth : appels peu fréquents mais sensibles à la latence
+    "lwa": HTTPClientProfile(limit=20, limit_per_host=10, total_timeout_s=30.0),
+    # Shopify Admin API (une boutique = un host)
+    "shopify": HTTPClientProfile(limit=100, limit_per_host=10, total_timeout_s=30.0),
+    # Téléchargement de documents/images (feeds, rapports, médias)
+    "downloads": HTTPClientProfile(limit=50, limit_per_host=10, total_timeout_s=60.0),
+    # Scraping HTML concurrentiel
+    "scraping": HTTPClientProfile(limit=50, limit_per_host=5, total_timeout_s=30.0),
+    # APIs tierces diverses (FX, OpenAI...)
+    "default": HTTPClientProfile(),
+}
+
+
+class HTTPClientRegistry:
+    """
+    Registre process-wide de sessions aiohttp, une par usage
+
+    Les sessions sont liées à l'event loop qui les a créées : si la boucle
+    change (tests, workers), une nouvelle session est créée pour la boucle courante.
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, HTTPClientProfile]] = None):
+        self.profiles = dict(profiles or DEFAULT_PROFILES)
+        self._sessions: Dict[str, Tuple[aiohttp.ClientSession, asyncio.AbstractEventLoop]] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.sessions_created = 0
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Verrou de création, recréé si l'event loop a changé"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _create_session(self, purpose: str) -> aiohttp.ClientSession:
+        """Créer une session configurée selon le profil de l'usage"""
+        profile = self.profiles.get(purpose) or self.profiles["default"]
+        connector = aiohttp.TCPConnector(
+            limit=profile.limit,
+            limit_per_host=profile.limit_per_host,
+            ttl_dns_cache=profile.dns_cache_ttl_s,
+            keepalive_timeout=profile.keepalive_timeout_s,
+            enable_cleanup_closed=True
+        )
+        self.sessions_created += 1
+        logger.info(f"✅ HTTP session created for '{purpose}' "
+                    f"(limit={profile.limit}, per_host={profile.limit_per_host})")
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=profile.total_timeout_s)
+        )
+
+    async def get_session(self, purpose: str = "default") -> aiohttp.ClientSession:
+        """
+        Obtenir la session partagée d'un usage (créée à la demande)
+
+        Ne jamais fermer la session retournée ni l'utiliser dans un
+        `async with` : seule la fermeture du registre la libère.
+        """
+        loop = asyncio.get_running_loop()
+
+        entry = self._sessions.get(purpose)
+        if entry is not None:
+            session, session_loop = entry
+            if not session.closed and session_loop is loop:
+                return session
+
+        async with self._get_lock():
+            entry = self._sessions.get(purpose)
+            if entry is not None:
+                session, session_loop = entry
+                if not session.closed and session_loop is loop:
+                    return session
+                if session_loop is loop:
+                    await session.close()
+
+            session = self._create_session(purpose)
+            self._sessions[purpose] = (session, loop)
+            return session
+
+    async def close(self) -> None:
+        """Fermer toutes les sessions de la boucle courante"""
+        loop = asyncio.get_running_loop()
+        for purpose, (session, session_loop) in list(self._sessions.items()):
+            if session_loop is loop and not session.closed:
+                try:
+                    await session.close()
+                except Exception as e:
+                    logger.warning(f"⚠️ Error closing HTTP session '{purpose}': {e}")
+            del self._sessions[purpose]
+        logger.info("✅ HTTP sessions closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques des sessions ouvertes"""
+        return {
+            "sessions_created": self.sessions_created,
+            "open_sessions": {
+                purpose: {
+                    "closed": session.closed,
+                    "limit": session.connector.limit if session.connector else None,
+                    "limit_per_host": session.connector.limit_per_host if session.connector else None
+                }
+                for purpose, (session, _) in self._sessions.items()
+            }
+        }
+
+
+# Registre global du process
+_registry: Optional[HTTPClientRegistry] = None
+
+
+def get_http_registry() -> HTTPClientRegistry:
+    """Obtenir le registre global de sessions HTTP"""
+    global _registry
+    if _registry is None:
+        _registry = HTTPClientRegistry()
+    return _registry
+
+
+async def get_http_session(purpose: str = "default") -> aiohttp.ClientSession:
+    """Raccourci : session partagée d'un usage depuis le registre global"""
+    return await get_http_registry().get_session(purpose)
+
+
+async def close_http_sessions() -> None:
+    """Fermer les sessions du registre global (hook de shutdown)"""
+    global _registry
+    if _registry is not None:
+        await _registry.close()
+        _registry = None
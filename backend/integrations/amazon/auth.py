@@ -10,6 +10,8 @@ import aiohttp
 import json
 from urllib.parse import urlencode, quote_plus
 
+from core.http_clients import get_http_session
+
 logger = logging.getLogger(__name__)
 
 class AmazonOAuthService:
@@ -131,36 +133,36 @@ class AmazonOAuthService:
             # Échanger le code contre les tokens
             token_endpoint = self.oauth_endpoints[region]['token']
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    token_endpoint,
-                    data=urlencode(token_data),
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
+            session = await get_http_session('lwa')
+            async with session.post(
+                token_endpoint,
+                data=urlencode(token_data),
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                
+                if response.status == 200:
+                    tokens = await response.json()
+                    
+                    # Validation des tokens reçus
+                    if not all(k in tokens for k in ['access_token', 'refresh_token']):
+                        raise ValueError("Invalid token response from Amazon")
+                    
+                    logger.info("✅ Tokens successfully retrieved from Amazon")
+                    
+                    return {
+                        'access_token': tokens['access_token'],
+                        'refresh_token': tokens['refresh_token'],
+                        'token_type': tokens.get('token_type', 'bearer'),
+                        'expires_in': tokens.get('expires_in', 3600),
+                        'scope': tokens.get('scope', ''),
+                        'retrieved_at': datetime.utcnow()
+                    }
+                else:
+                    error_text = await response.text()
+                    logger.error(f"❌ Token exchange failed: {response.status} - {error_text}")
+                    raise Exception(f"Amazon token exchange failed: {response.status}")
                     
-                    if response.status == 200:
-                        tokens = await response.json()
-                        
-                        # Validation des tokens reçus
-                        if not all(k in tokens for k in ['access_token', 'refresh_token']):
-                            raise ValueError("Invalid token response from Amazon")
-                        
-                        logger.info("✅ Tokens successfully retrieved from Amazon")
-                        
-                        return {
-                            'access_token': tokens['access_token'],
-                            'refresh_token': tokens['refresh_token'],
-                            'token_type': tokens.get('token_type', 'bearer'),
-                            'expires_in': tokens.get('expires_in', 3600),
-                            'scope': tokens.get('scope', ''),
-                            'retrieved_at': datetime.utcnow()
-                        }
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"❌ Token exchange failed: {response.status} - {error_text}")
-                        raise Exception(f"Amazon token exchange failed: {response.status}")
-                        
         except Exception as e:
             logger.error(f"❌ Token exchange error: {str(e)}")
             raise
@@ -4,22 +4,65 @@ import time
 import json
 import logging
 import asyncio
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, NamedTuple, Optional, Union
 from datetime import datetime, timedelta
 import aiohttp
 import hashlib
 import hmac
+import gzip
 import base64
+import re
 from urllib.parse import quote
 
+from core.http_clients import HTTPClientRegistry, get_http_registry
+from integrations.amazon.rate_limiter import RETRY_AFTER_HEADER, SPAPIRateLimiter, get_spapi_rate_limiter, parse_retry_after
+from src.scraping.metrics import SPAPI_LATENCY, SPAPI_RATE_LIMIT_WAIT
+
 logger = logging.getLogger(__name__)
 
+# Feeds API (publication groupée)
+FEEDS_API_PATH = '/feeds/2021-06-30'
+JSON_LISTINGS_FEED = 'JSON_LISTINGS_FEED'
+FEED_CONTENT_TYPE = 'application/json; charset=UTF-8'
+FEED_TERMINAL_STATUSES = ('DONE', 'CANCELLED', 'FATAL')
+
+# Segments de version dans les chemins SP-API (2021-08-01, v0...)
+_API_VERSION_SEGMENT = re.compile(r'^(\d{4}-\d{2}-\d{2}|v\d+)$')
+
+
+def operation_name(method: str, path: str) -> str:
+    """
+    Opération SP-API d'une requête : méthode + API + ressource, sans version ni identifiants
+    
+    Ex: PUT /listings/2021-08-01/items/SELLER/SKU → "PUT listings/items"
+    """
+    segments = [s for s in path.split('?')[0].strip('/').split('/') if s and not _API_VERSION_SEGMENT.match(s)]
+    return f"{method.upper()} {'/'.join(segments[:2])}"
+
+class SPAPICredentials(NamedTuple):
+    """Identifiants SP-API d'une connexion vendeur (voir AmazonConnectionService.get_sp_api_credentials)"""
+    access_token: str
+    seller_id: str
+
+
 class AmazonSPAPIClient:
     """Amazon SP-API REST Client with comprehensive retry logic and logging"""
     
-    def __init__(self, region: str = 'eu'):
+    def __init__(self, region: str = 'eu', http_registry: Optional[HTTPClientRegistry] = None,
+                 rate_limiter: Optional[SPAPIRateLimiter] = None, access_token: Optional[str] = None,
+                 seller_id: Optional[str] = None):
         self.region = region
         
+        # Identifiants par défaut des appels make_request (client dédié à une connexion)
+        self.access_token = access_token
+        self.seller_id = seller_id
+        
+        # Sessions HTTP partagées (keep-alive, cache DNS) au lieu d'une session par requête
+        self.http_registry = http_registry or get_http_registry()
+        
+        # Quotas SP-API par vendeur et opération, partagés par tous les clients
+        self.rate_limiter = rate_limiter or get_spapi_rate_limiter()
+        
         # Endpoints SP-API par région
         self.endpoints = {
             'na': 'https://sellingpartnerapi-na.amazon.com',
@@ -37,6 +80,10 @@ class AmazonSPAPIClient:
         self.max_delay = 60.0
         self.backoff_factor = 2.0
         
+        # Configuration Feeds API (traitement asynchrone côté Amazon)
+        self.feed_poll_interval = 30.0
+        self.feed_poll_timeout = 1800.0
+        
         logger.info(f"✅ SP-API client initialized for region: {region}")
     
     async def make_authenticated_request(
@@ -53,6 +100,9 @@ class AmazonSPAPIClient:
         """
         Effectue une requête authentifiée vers SP-API avec retry automatique
         
+        Chaque tentative attend d'abord un jeton du quota (vendeur, opération) ;
+        le débit suit l'en-tête x-amzn-RateLimit-Limit des réponses.
+        
         Args:
             method: Méthode HTTP (GET, POST, PUT, DELETE)
             path: Chemin de l'API (ex: '/listings/2021-08-01/items')
@@ -83,71 +133,82 @@ class AmazonSPAPIClient:
         if headers:
             request_headers.update(headers)
         
-        # Ajouter marketplace dans les paramètres si nécessaire
+        # Ajouter marketplace dans les paramètres si nécessaire (Feeds API : pas de marketplace)
         if params is None:
             params = {}
-        if 'marketplaceIds' not in params:
+        if marketplace_id and 'marketplaceIds' not in params:
             params['marketplaceIds'] = marketplace_id
         
+        operation = operation_name(method, path)
+        
         # Retry logic avec exponential backoff
         for attempt in range(self.max_retries + 1):
+            waited = await self.rate_limiter.acquire(seller_id, operation)
+            SPAPI_RATE_LIMIT_WAIT.observe(waited, operation)
+            
+            started = time.perf_counter()
             try:
                 logger.info(f"📡 SP-API {method} {path} (attempt {attempt + 1})")
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.request(
-                        method=method.upper(),
-                        url=url,
-                        params=params,
-                        json=json_data,
-                        headers=request_headers,
-                        timeout=aiohttp.ClientTimeout(total=30)
-                    ) as response:
-                        
-                        # Log de la requête
-                        self._log_request(method, url, response.status, attempt + 1)
-                        
-                        # Gestion des codes de statut
-                        if response.status == 200:
-                            result = await response.json()
-                            logger.info(f"✅ SP-API request successful")
-                            return result
-                        
-                        elif response.status == 429:  # Rate limit
-                            retry_after = int(response.headers.get('Retry-After', 60))
-                            logger.warning(f"⚠️ Rate limited, retry after {retry_after}s")
-                            
-                            if attempt < self.max_retries:
-                                await asyncio.sleep(retry_after)
-                                continue
-                        
-                        elif response.status in [500, 502, 503, 504]:  # Server errors
-                            if attempt < self.max_retries:
-                                delay = min(
-                                    self.base_delay * (self.backoff_factor ** attempt),
-                                    self.max_delay
-                                )
-                                logger.warning(f"⚠️ Server error {response.status}, retry in {delay}s")
-                                await asyncio.sleep(delay)
-                                continue
-                        
-                        elif response.status == 401:  # Unauthorized
-                            error_text = await response.text()
-                            logger.error(f"❌ Authentication failed: {error_text}")
-                            raise AuthenticationError("Amazon SP-API authentication failed")
-                        
-                        elif response.status == 403:  # Forbidden
-                            error_text = await response.text()
-                            logger.error(f"❌ Access forbidden: {error_text}")
-                            raise AuthorizationError("Amazon SP-API access forbidden")
-                        
-                        else:
-                            # Autres erreurs
-                            error_text = await response.text()
-                            logger.error(f"❌ SP-API error {response.status}: {error_text}")
-                            raise SPAPIError(f"SP-API error {response.status}: {error_text}")
+                session = await self.http_registry.get_session('sp_api')
+                async with session.request(
+                    method=method.upper(),
+                    url=url,
+                    params=params,
+                    json=json_data,
+                    headers=request_headers,
+                    timeout=aiohttp.ClientTimeout(total=30)
+                ) as response:
+                    
+                    # Log de la requête
+                    self._log_request(method, url, response.status, attempt + 1)
+                    SPAPI_LATENCY.observe(time.perf_counter() - started, operation, response.status)
+                    self.rate_limiter.update_from_headers(seller_id, operation, response.headers)
+                    
+                    # Gestion des codes de statut
+                    if response.status in (200, 201, 202):  # createFeedDocument → 201, createFeed → 202
+                        result = await response.json()
+                        logger.info(f"✅ SP-API request successful")
+                        return result
+                    
+                    elif response.status == 429:  # Rate limit
+                        # Seau vidé jusqu'à Retry-After : la tentative suivante attend dans acquire()
+                        retry_after = parse_retry_after(response.headers.get(RETRY_AFTER_HEADER))
+                        self.rate_limiter.on_throttled(seller_id, operation, retry_after)
+                        logger.warning(f"⚠️ Rate limited on {operation}, retry after "
+                                       f"{f'{retry_after:.1f}s' if retry_after is not None else 'quota refill'}")
                         
+                        if attempt < self.max_retries:
+                            continue
+                    
+                    elif response.status in [500, 502, 503, 504]:  # Server errors
+                        if attempt < self.max_retries:
+                            delay = min(
+                                self.base_delay * (self.backoff_factor ** attempt),
+                                self.max_delay
+                            )
+                            logger.warning(f"⚠️ Server error {response.status}, retry in {delay}s")
+                            await asyncio.sleep(delay)
+                            continue
+                    
+                    elif response.status == 401:  # Unauthorized
+                        error_text = await response.text()
+                        logger.error(f"❌ Authentication failed: {error_text}")
+                        raise AuthenticationError("Amazon SP-API authentication failed")
+                    
+                    elif response.status == 403:  # Forbidden
+                        error_text = await response.text()
+                        logger.error(f"❌ Access forbidden: {error_text}")
+                        raise AuthorizationError("Amazon SP-API access forbidden")
+                    
+                    else:
+                        # Autres erreurs
+                        error_text = await response.text()
+                        logger.error(f"❌ SP-API error {response.status}: {error_text}")
+                        raise SPAPIError(f"SP-API error {response.status}: {error_text}")
+                    
             except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                SPAPI_LATENCY.observe(time.perf_counter() - started, operation, "network_error")
                 logger.error(f"❌ Network error: {str(e)}")
                 
                 if attempt < self.max_retries:
@@ -163,6 +224,65 @@ class AmazonSPAPIClient:
         
         raise SPAPIError("Max retries exceeded")
     
+    async def make_request(
+        self,
+        method: str,
+        endpoint: str,
+        marketplace_id: str = '',
+        params: Optional[Dict] = None,
+        json_data: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        access_token: Optional[str] = None,
+        seller_id: Optional[str] = None,
+        credentials: Optional[SPAPICredentials] = None
+    ) -> Dict[str, Any]:
+        """
+        Requête SP-API au format des moteurs Amazon (monitoring, conformité, pricing...)
+        
+        Passe par make_authenticated_request : quotas du limiteur, retries et
+        métriques s'appliquent. Sans identifiants (arguments, `credentials` ou
+        ceux du client), aucun appel n'est émis.
+        
+        Args:
+            method: Méthode HTTP
+            endpoint: Chemin de l'API (ex: '/catalog/2022-04-01/items/SKU')
+            marketplace_id: ID du marketplace
+            params: Paramètres de requête
+            json_data: Corps JSON (`data` accepté comme alias)
+            headers: Headers additionnels
+            access_token: Token d'accès (défaut: identifiants du client)
+            seller_id: ID vendeur (défaut: identifiants du client)
+            credentials: Identifiants de la connexion vendeur de l'appelant
+            
+        Returns:
+            {'success': True, 'data': réponse JSON} ou {'success': False, 'error': message}
+        """
+        if credentials:
+            access_token = access_token or credentials.access_token
+            seller_id = seller_id or credentials.seller_id
+        access_token = access_token or self.access_token
+        seller_id = seller_id or self.seller_id
+        if not access_token or not seller_id:
+            logger.warning(f"⚠️ SP-API {method} {endpoint} skipped: credentials not configured")
+            return {'success': False, 'error': 'SP-API credentials not configured', 'data': {}}
+        
+        try:
+            result = await self.make_authenticated_request(
+                method=method,
+                path=endpoint,
+                access_token=access_token,
+                seller_id=seller_id,
+                marketplace_id=marketplace_id,
+                params=params,
+                json_data=json_data if json_data is not None else data,
+                headers=headers
+            )
+        except SPAPIError as e:
+            return {'success': False, 'error': str(e), 'error_type': type(e).__name__, 'data': {}}
+        
+        return {'success': True, 'data': result}
+    
     async def get_seller_info(self, access_token: str, seller_id: str) -> Dict[str, Any]:
         """
         Récupère les informations du vendeur
@@ -247,6 +367,211 @@ class AmazonSPAPIClient:
             json_data=product_data
         )
     
+    async def create_feed_document(
+        self,
+        access_token: str,
+        seller_id: str,
+        content_type: str = FEED_CONTENT_TYPE
+    ) -> Dict[str, Any]:
+        """
+        Réserve un document de feed (URL présignée pour l'upload)
+        
+        Returns:
+            {'feedDocumentId': ..., 'url': ...}
+        """
+        return await self.make_authenticated_request(
+            method='POST',
+            path=f'{FEEDS_API_PATH}/documents',
+            access_token=access_token,
+            seller_id=seller_id,
+            marketplace_id='',  # Non requis pour cette API
+            params={},
+            json_data={'contentType': content_type}
+        )
+    
+    async def upload_feed_document(
+        self,
+        url: str,
+        content: Union[str, bytes],
+        content_type: str = FEED_CONTENT_TYPE
+    ):
+        """
+        Upload du contenu du feed sur l'URL présignée (sans en-têtes SP-API)
+        
+        Args:
+            url: URL présignée retournée par create_feed_document
+            content: Document du feed
+            content_type: Doit correspondre au contentType réservé
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        
+        session = await self.http_registry.get_session('sp_api')
+        async with session.put(
+            url,
+            data=content,
+            headers={'Content-Type': content_type},
+            timeout=aiohttp.ClientTimeout(total=120)
+        ) as response:
+            if response.status not in (200, 201):
+                error_text = await response.text()
+                raise SPAPIError(f"Feed document upload failed {response.status}: {error_text}")
+        
+        logger.info(f"📤 Feed document uploaded ({len(content)} bytes)")
+    
+    async def create_feed(
+        self,
+        access_token: str,
+        seller_id: str,
+        feed_type: str,
+        marketplace_ids: List[str],
+        input_feed_document_id: str
+    ) -> Dict[str, Any]:
+        """
+        Crée le feed à partir d'un document uploadé
+        
+        Returns:
+            {'feedId': ...}
+        """
+        return await self.make_authenticated_request(
+            method='POST',
+            path=f'{FEEDS_API_PATH}/feeds',
+            access_token=access_token,
+            seller_id=seller_id,
+            marketplace_id='',
+            params={},
+            json_data={
+                'feedType': feed_type,
+                'marketplaceIds': marketplace_ids,
+                'inputFeedDocumentId': input_feed_document_id
+            }
+        )
+    
+    async def get_feed(self, access_token: str, seller_id: str, feed_id: str) -> Dict[str, Any]:
+        """Statut de traitement d'un feed (processingStatus, resultFeedDocumentId)"""
+        return await self.make_authenticated_request(
+            method='GET',
+            path=f'{FEEDS_API_PATH}/feeds/{quote(feed_id)}',
+            access_token=access_token,
+            seller_id=seller_id,
+            marketplace_id='',
+            params={}
+        )
+    
+    async def get_feed_document(
+        self,
+        access_token: str,
+        seller_id: str,
+        feed_document_id: str
+    ) -> Dict[str, Any]:
+        """URL de téléchargement d'un document de feed (rapport de traitement)"""
+        return await self.make_authenticated_request(
+            method='GET',
+            path=f'{FEEDS_API_PATH}/documents/{quote(feed_document_id)}',
+            access_token=access_token,
+            seller_id=seller_id,
+            marketplace_id='',
+            params={}
+        )
+    
+    async def download_feed_document(
+        self,
+        url: str,
+        compression_algorithm: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Télécharge et décode un rapport de traitement JSON
+        
+        Args:
+            url: URL présignée du document
+            compression_algorithm: 'GZIP' si le document est compressé
+        """
+        session = await self.http_registry.get_session('sp_api')
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=120)) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise SPAPIError(f"Feed document download failed {response.status}: {error_text}")
+            content = await response.read()
+        
+        if compression_algorithm == 'GZIP':
+            content = gzip.decompress(content)
+        
+        return json.loads(content.decode('utf-8'))
+    
+    async def submit_json_listings_feed(
+        self,
+        access_token: str,
+        seller_id: str,
+        marketplace_id: str,
+        feed: Dict[str, Any]
+    ) -> str:
+        """
+        Soumet un document JSON_LISTINGS_FEED (réservation, upload, création)
+        
+        Trois appels quelle que soit la taille du feed, au lieu d'un appel
+        Listings par SKU.
+        
+        Returns:
+            feedId Amazon
+        """
+        document = await self.create_feed_document(access_token, seller_id)
+        await self.upload_feed_document(document['url'], json.dumps(feed, ensure_ascii=False))
+        
+        created = await self.create_feed(
+            access_token=access_token,
+            seller_id=seller_id,
+            feed_type=JSON_LISTINGS_FEED,
+            marketplace_ids=[marketplace_id],
+            input_feed_document_id=document['feedDocumentId']
+        )
+        
+        feed_id = created['feedId']
+        logger.info(f"✅ {JSON_LISTINGS_FEED} submitted: feed {feed_id}, {len(feed.get('messages', []))} messages")
+        return feed_id
+    
+    async def wait_for_feed_result(
+        self,
+        access_token: str,
+        seller_id: str,
+        feed_id: str,
+        poll_interval: Optional[float] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Attend la fin de traitement d'un feed et récupère son rapport
+        
+        Returns:
+            {'processing_status': ..., 'report': rapport JSON ou None}
+            processing_status vaut IN_QUEUE/IN_PROGRESS si le délai est dépassé
+        """
+        poll_interval = self.feed_poll_interval if poll_interval is None else poll_interval
+        timeout = self.feed_poll_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        
+        while True:
+            feed = await self.get_feed(access_token, seller_id, feed_id)
+            status = feed.get('processingStatus')
+            
+            if status in FEED_TERMINAL_STATUSES:
+                break
+            
+            if time.monotonic() >= deadline:
+                logger.warning(f"⚠️ Feed {feed_id} still {status} after {timeout}s")
+                return {'processing_status': status, 'report': None}
+            
+            await asyncio.sleep(poll_interval)
+        
+        report = None
+        result_document_id = feed.get('resultFeedDocumentId')
+        if result_document_id:
+            document = await self.get_feed_document(access_token, seller_id, result_document_id)
+            report = await self.download_feed_document(
+                document['url'], document.get('compressionAlgorithm')
+            )
+        
+        logger.info(f"📋 Feed {feed_id} processed: {status}")
+        return {'processing_status': status, 'report': report}
+    
     async def health_check(self) -> Dict[str, Any]:
         """
         Vérifie la santé des endpoints SP-API
@@ -260,20 +585,20 @@ class AmazonSPAPIClient:
             try:
                 start_time = time.time()
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        endpoint,
-                        timeout=aiohttp.ClientTimeout(total=10)
-                    ) as response:
-                        response_time = time.time() - start_time
-                        
-                        health_results[region] = {
-                            'status': 'healthy' if response.status in [200, 401, 403] else 'unhealthy',
-                            'response_time_ms': round(response_time * 1000),
-                            'status_code': response.status,
-                            'endpoint': endpoint
-                        }
-                        
+                session = await self.http_registry.get_session('sp_api')
+                async with session.get(
+                    endpoint,
+                    timeout=aiohttp.ClientTimeout(total=10)
+                ) as response:
+                    response_time = time.time() - start_time
+                    
+                    health_results[region] = {
+                        'status': 'healthy' if response.status in [200, 401, 403] else 'unhealthy',
+                        'response_time_ms': round(response_time * 1000),
+                        'status_code': response.status,
+                        'endpoint': endpoint
+                    }
+                    
             except Exception as e:
                 health_results[region] = {
                     'status': 'unhealthy',
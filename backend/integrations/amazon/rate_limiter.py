@@ -0,0 +1,192 @@
+# Amazon SP-API Client-Side Rate Limiter
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_HEADER = 'x-amzn-RateLimit-Limit'
+RETRY_AFTER_HEADER = 'Retry-After'
+
+# Quotas documentés SP-API (requêtes/s, burst) par opération (voir client.operation_name)
+DEFAULT_OPERATION_RATES: Dict[str, Tuple[float, int]] = {
+    'GET sellers/marketplaceParticipations': (0.016, 15),
+    'GET listings/items': (5.0, 10),
+    'PUT listings/items': (5.0, 10),
+    'PATCH listings/items': (5.0, 10),
+    'DELETE listings/items': (5.0, 10),
+    'GET listings/restrictions': (5.0, 10),
+    'GET definitions/productTypes': (5.0, 10),
+    'GET catalog/items': (2.0, 2),
+    'GET products/pricing': (0.5, 1),
+    'POST batches/products': (0.1, 1),
+    'POST products/fees': (1.0, 2),
+    'POST feeds/documents': (0.5, 15),
+    'GET feeds/documents': (0.0222, 10),
+    'POST feeds/feeds': (0.0083, 15),
+    'GET feeds/feeds': (2.0, 15),
+    'POST reports/reports': (0.0167, 15),
+    'GET reports/reports': (2.0, 15),
+    'GET reports/documents': (0.0167, 15),
+    'GET orders/orders': (0.0167, 20),
+    'GET fba/inventory': (2.0, 2),
+}
+
+# Opérations absentes de la table : quota prudent
+DEFAULT_RATE: Tuple[float, int] = (1.0, 1)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convertir un header Retry-After (secondes, éventuellement décimales, ou date HTTP) en délai"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return max(0.0, seconds) if math.isfinite(seconds) else None
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Seau à jetons asynchrone : `rate` jetons/s, au plus `burst` en réserve
+
+    Les appelants en attente sont servis dans l'ordre d'arrivée ; chacun dort
+    exactement le temps nécessaire au prochain jeton.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(float(self.burst), self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> float:
+        """Prendre un jeton (attente si le seau est vide) ; renvoie l'attente en secondes"""
+        async with self._lock:
+            self._refill()
+            waited = 0.0
+            if self.tokens < 1:
+                waited = (1 - self.tokens) / self.rate
+                await asyncio.sleep(waited)
+                self._refill()
+            self.tokens -= 1
+            return waited
+
+    def set_rate(self, rate: float) -> None:
+        """Changer le débit (jetons accumulés à l'ancien débit conservés)"""
+        self._refill()
+        self.rate = rate
+
+    def drain(self, delay: Optional[float] = None) -> None:
+        """
+        Vider le seau (requête throttlée : la suivante attend un jeton complet)
+
+        Avec `delay` (Retry-After), le prochain jeton n'arrive pas avant ce délai.
+        """
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+        if delay:
+            self.tokens = min(self.tokens, 1 - delay * self.rate)
+
+
+class SPAPIRateLimiter:
+    """
+    Limiteur de débit SP-API par vendeur et par opération
+
+    Chaque couple (seller_id, opération) a son seau, initialisé avec le quota
+    documenté puis ajusté au débit annoncé par l'en-tête x-amzn-RateLimit-Limit.
+    """
+
+    def __init__(self, operation_rates: Optional[Mapping[str, Tuple[float, int]]] = None,
+                 default_rate: Tuple[float, int] = DEFAULT_RATE):
+        self.operation_rates = dict(DEFAULT_OPERATION_RATES if operation_rates is None else operation_rates)
+        self.default_rate = default_rate
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+        self.stats = {'acquired': 0, 'waits': 0, 'total_wait_s': 0.0, 'throttled': 0, 'rate_updates': 0}
+
+    def get_bucket(self, seller_id: str, operation: str) -> TokenBucket:
+        key = (seller_id, operation)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate, burst = self.operation_rates.get(operation, self.default_rate)
+            bucket = self._buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    async def acquire(self, seller_id: str, operation: str) -> float:
+        """Attendre que le quota autorise une requête ; renvoie l'attente en secondes"""
+        waited = await self.get_bucket(seller_id, operation).acquire()
+
+        self.stats['acquired'] += 1
+        if waited > 0:
+            self.stats['waits'] += 1
+            self.stats['total_wait_s'] += waited
+        return waited
+
+    def update_from_headers(self, seller_id: str, operation: str, headers: Mapping[str, Any]) -> Optional[float]:
+        """Appliquer le débit annoncé par x-amzn-RateLimit-Limit (None si absent ou invalide)"""
+        value = headers.get(RATE_LIMIT_HEADER)
+        if value is None:
+            return None
+
+        try:
+            rate = float(value)
+        except (TypeError, ValueError):
+            return None
+        if rate <= 0:
+            return None
+
+        bucket = self.get_bucket(seller_id, operation)
+        if rate != bucket.rate:
+            logger.info(f"📏 SP-API rate for {operation}: {bucket.rate} → {rate} req/s")
+            bucket.set_rate(rate)
+            self.stats['rate_updates'] += 1
+        return rate
+
+    def on_throttled(self, seller_id: str, operation: str, retry_after: Optional[float] = None) -> None:
+        """Réponse 429 : vider le seau de l'opération (jusqu'à Retry-After s'il est fourni)"""
+        self.get_bucket(seller_id, operation).drain(retry_after)
+        self.stats['throttled'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'buckets': len(self._buckets),
+            'rates': {f"{seller_id} {operation}": bucket.rate
+                      for (seller_id, operation), bucket in self._buckets.items()}
+        }
+
+
+# Instance globale (quotas partagés par tous les clients du process)
+_spapi_rate_limiter: Optional[SPAPIRateLimiter] = None
+
+
+def get_spapi_rate_limiter() -> SPAPIRateLimiter:
+    """Obtenir le limiteur de débit SP-API global"""
+    global _spapi_rate_limiter
+    if _spapi_rate_limiter is None:
+        _spapi_rate_limiter = SPAPIRateLimiter()
+    return _spapi_rate_limiter
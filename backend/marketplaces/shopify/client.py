@@ -9,15 +9,21 @@ from datetime import datetime, timedelta
 import aiohttp
 import base64
 
+from core.http_clients import HTTPClientRegistry, get_http_registry
+
 logger = logging.getLogger(__name__)
 
 class ShopifyAPIClient:
     """Shopify REST & GraphQL Client with comprehensive retry logic and logging"""
     
-    def __init__(self, shop_domain: str, access_token: str):
+    def __init__(self, shop_domain: str, access_token: str,
+                 http_registry: Optional[HTTPClientRegistry] = None):
         self.shop_domain = shop_domain
         self.access_token = access_token
         
+        # Sessions HTTP partagées (keep-alive, cache DNS) au lieu d'une session par requête
+        self.http_registry = http_registry or get_http_registry()
+        
         # Endpoints Shopify
         self.rest_base_url = f"https://{shop_domain}/admin/api/2024-01"
         self.graphql_url = f"https://{shop_domain}/admin/api/2024-01/graphql.json"
@@ -123,70 +129,70 @@ class ShopifyAPIClient:
             try:
                 logger.info(f"📡 Shopify {method} {url} (attempt {attempt + 1})")
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.request(
-                        method=method.upper(),
-                        url=url,
-                        params=params,
-                        json=json_data,
-                        headers=headers,
-                        timeout=aiohttp.ClientTimeout(total=30)
-                    ) as response:
-                        
-                        # Log de la requête
-                        self._log_request(method, url, response.status, attempt + 1)
-                        
-                        # Gestion des codes de statut Shopify
-                        if response.status == 200:
-                            result = await response.json()
-                            logger.info(f"✅ Shopify request successful")
-                            return result
-                        
-                        elif response.status == 429:  # Rate limit exceeded
-                            retry_after = self._parse_retry_after(response.headers)
-                            logger.warning(f"⚠️ Rate limited, retry after {retry_after}s")
-                            
-                            if attempt < self.max_retries:
-                                await asyncio.sleep(retry_after)
-                                continue
-                        
-                        elif response.status in [500, 502, 503, 504]:  # Server errors
-                            if attempt < self.max_retries:
-                                delay = min(
-                                    self.base_delay * (self.backoff_factor ** attempt),
-                                    self.max_delay
-                                )
-                                logger.warning(f"⚠️ Server error {response.status}, retry in {delay}s")
-                                await asyncio.sleep(delay)
-                                continue
-                        
-                        elif response.status == 401:  # Unauthorized
-                            error_text = await response.text()
-                            logger.error(f"❌ Authentication failed: {error_text}")
-                            raise AuthenticationError("Shopify API authentication failed")
-                        
-                        elif response.status == 403:  # Forbidden
-                            error_text = await response.text()
-                            logger.error(f"❌ Access forbidden: {error_text}")
-                            raise AuthorizationError("Shopify API access forbidden")
-                        
-                        elif response.status == 404:  # Not found
-                            error_text = await response.text()
-                            logger.error(f"❌ Resource not found: {error_text}")
-                            raise NotFoundError("Shopify resource not found")
-                        
-                        elif response.status == 422:  # Unprocessable entity
-                            error_text = await response.text()
-                            error_data = await response.json() if response.content_type == 'application/json' else {}
-                            logger.error(f"❌ Validation error: {error_text}")
-                            raise ValidationError("Shopify validation error", error_data)
-                        
-                        else:
-                            # Autres erreurs
-                            error_text = await response.text()
-                            logger.error(f"❌ Shopify API error {response.status}: {error_text}")
-                            raise ShopifyAPIError(f"Shopify API error {response.status}: {error_text}")
+                session = await self.http_registry.get_session('shopify')
+                async with session.request(
+                    method=method.upper(),
+                    url=url,
+                    params=params,
+                    json=json_data,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=30)
+                ) as response:
+                    
+                    # Log de la requête
+                    self._log_request(method, url, response.status, attempt + 1)
+                    
+                    # Gestion des codes de statut Shopify
+                    if response.status == 200:
+                        result = await response.json()
+                        logger.info(f"✅ Shopify request successful")
+                        return result
+                    
+                    elif response.status == 429:  # Rate limit exceeded
+                        retry_after = self._parse_retry_after(response.headers)
+                        logger.warning(f"⚠️ Rate limited, retry after {retry_after}s")
                         
+                        if attempt < self.max_retries:
+                            await asyncio.sleep(retry_after)
+                            continue
+                    
+                    elif response.status in [500, 502, 503, 504]:  # Server errors
+                        if attempt < self.max_retries:
+                            delay = min(
+                                self.base_delay * (self.backoff_factor ** attempt),
+                                self.max_delay
+                            )
+                            logger.warning(f"⚠️ Server error {response.status}, retry in {delay}s")
+                            await asyncio.sleep(delay)
+                            continue
+                    
+                    elif response.status == 401:  # Unauthorized
+                        error_text = await response.text()
+                        logger.error(f"❌ Authentication failed: {error_text}")
+                        raise AuthenticationError("Shopify API authentication failed")
+                    
+                    elif response.status == 403:  # Forbidden
+                        error_text = await response.text()
+                        logger.error(f"❌ Access forbidden: {error_text}")
+                        raise AuthorizationError("Shopify API access forbidden")
+                    
+                    elif response.status == 404:  # Not found
+                        error_text = await response.text()
+                        logger.error(f"❌ Resource not found: {error_text}")
+                        raise NotFoundError("Shopify resource not found")
+                    
+                    elif response.status == 422:  # Unprocessable entity
+                        error_text = await response.text()
+                        error_data = await response.json() if response.content_type == 'application/json' else {}
+                        logger.error(f"❌ Validation error: {error_text}")
+                        raise ValidationError("Shopify validation error", error_data)
+                    
+                    else:
+                        # Autres erreurs
+                        error_text = await response.text()
+                        logger.error(f"❌ Shopify API error {response.status}: {error_text}")
+                        raise ShopifyAPIError(f"Shopify API error {response.status}: {error_text}")
+                    
             except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 logger.error(f"❌ Network error: {str(e)}")
                 
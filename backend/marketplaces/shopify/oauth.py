@@ -11,6 +11,8 @@ import json
 from urllib.parse import urlencode, quote_plus
 import hmac
 
+from core.http_clients import get_http_session
+
 logger = logging.getLogger(__name__)
 
 class ShopifyOAuthService:
@@ -120,34 +122,34 @@ class ShopifyOAuthService:
             # Échanger le code contre le token
             token_endpoint = f"https://{clean_shop}/admin/oauth/access_token"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    token_endpoint,
-                    json=token_data,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
+            session = await get_http_session('shopify')
+            async with session.post(
+                token_endpoint,
+                json=token_data,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                
+                if response.status == 200:
+                    token_response = await response.json()
+                    
+                    # Validation du token reçu
+                    if 'access_token' not in token_response:
+                        raise ValueError("Invalid token response from Shopify")
+                    
+                    logger.info("✅ Access token successfully retrieved from Shopify")
+                    
+                    return {
+                        'access_token': token_response['access_token'],
+                        'scope': token_response.get('scope', self.scopes),
+                        'shop_domain': clean_shop,
+                        'retrieved_at': datetime.utcnow()
+                    }
+                else:
+                    error_text = await response.text()
+                    logger.error(f"❌ Token exchange failed: {response.status} - {error_text}")
+                    raise Exception(f"Shopify token exchange failed: {response.status}")
                     
-                    if response.status == 200:
-                        token_response = await response.json()
-                        
-                        # Validation du token reçu
-                        if 'access_token' not in token_response:
-                            raise ValueError("Invalid token response from Shopify")
-                        
-                        logger.info("✅ Access token successfully retrieved from Shopify")
-                        
-                        return {
-                            'access_token': token_response['access_token'],
-                            'scope': token_response.get('scope', self.scopes),
-                            'shop_domain': clean_shop,
-                            'retrieved_at': datetime.utcnow()
-                        }
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"❌ Token exchange failed: {response.status} - {error_text}")
-                        raise Exception(f"Shopify token exchange failed: {response.status}")
-                        
         except Exception as e:
             logger.error(f"❌ Token exchange error: {str(e)}")
             raise
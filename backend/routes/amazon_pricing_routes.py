@@ -3,9 +3,8 @@ Amazon Pricing Routes - Phase 4
 Routes API pour la gestion des prix et règles Amazon
 """
 import logging
-import asyncio
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
 from pydantic import BaseModel, Field
 
@@ -16,11 +15,16 @@ from models.amazon_pricing import (
     PricingRuleStatus
 )
 from services.amazon_pricing_rules_service import pricing_rules_service
+from services.amazon_connection_service import get_sp_api_credentials
 from amazon.pricing_engine import pricing_engine
+from integrations.amazon.client import SPAPICredentials
 from modules.security import get_current_user_from_token
 
 logger = logging.getLogger(__name__)
 
+# SKUs traités entre deux mises à jour du progrès d'un batch
+BATCH_PRICING_WINDOW = 200
+
 # Créer le router
 router = APIRouter(prefix="/api/amazon/pricing", tags=["Amazon Pricing"])
 
@@ -276,10 +280,14 @@ async def calculate_price(
         # Obtenir le prix actuel (simulé pour l'instant)
         current_price = None  # TODO: Récupérer via SP-API
         
+        # Identifiants SP-API de la connexion du vendeur (token en cache)
+        credentials = await get_sp_api_credentials(current_user['user_id'], request.marketplace_id)
+        
         # Calculer le prix optimal
         calculation = await pricing_engine.calculate_optimal_price(
             rule=rule,
-            current_price=current_price
+            current_price=current_price,
+            credentials=credentials
         )
         
         return PricingCalculationResponse(
@@ -318,8 +326,11 @@ async def publish_price(
                 detail=f"Aucune règle de pricing trouvée pour SKU {request.sku}"
             )
         
+        # Identifiants SP-API de la connexion du vendeur (token en cache)
+        credentials = await get_sp_api_credentials(current_user['user_id'], request.marketplace_id)
+        
         # Calculer le prix optimal
-        calculation = await pricing_engine.calculate_optimal_price(rule=rule)
+        calculation = await pricing_engine.calculate_optimal_price(rule=rule, credentials=credentials)
         
         # Vérifier si une publication est nécessaire
         if not request.force_update and calculation.price_change == 0:
@@ -345,7 +356,8 @@ async def publish_price(
             sku=request.sku,
             marketplace_id=request.marketplace_id,
             new_price=calculation.recommended_price,
-            method=request.method
+            method=request.method,
+            credentials=credentials
         )
         
         # Sauvegarder l'historique
@@ -549,103 +561,92 @@ async def process_batch_pricing(batch_id: str, user_id: str):
             {"$set": {"status": "processing", "started_at": datetime.utcnow()}}
         )
         
-        # Traiter chaque SKU
+        # Récupérer les règles en une requête (SKU exact, parent de variante ou générique)
+        rule_index = await pricing_rules_service.load_pricing_rule_index(user_id, batch.marketplace_id)
+        rules_by_sku = {sku: rule_index.resolve(sku) for sku in dict.fromkeys(batch.skus)}
+        
+        # Connexion du vendeur chargée une fois pour le lot (token en cache)
+        credentials = await get_sp_api_credentials(user_id, batch.marketplace_id)
+        if not credentials:
+            logger.warning(f"No active Amazon connection for batch {batch_id}")
+        
+        # Traiter les SKUs par fenêtres : pricing concurrentiel récupéré par appels groupés
         results = []
         processed = 0
         successful = 0
         failed = 0
         
-        for sku in batch.skus:
+        for window_start in range(0, len(batch.skus), BATCH_PRICING_WINDOW):
+            window = batch.skus[window_start:window_start + BATCH_PRICING_WINDOW]
+            window_rules = [rules_by_sku[sku] for sku in dict.fromkeys(window) if rules_by_sku[sku]]
+            
             try:
-                # Récupérer la règle
-                rule = await pricing_rules_service.get_pricing_rule_by_sku(
-                    user_id=user_id,
-                    sku=sku,
-                    marketplace_id=batch.marketplace_id
+                calculations = await pricing_engine.calculate_optimal_price_many(
+                    window_rules, credentials=credentials
                 )
-                
-                if not rule:
-                    results.append({
-                        "sku": sku,
-                        "success": False,
-                        "error": "Aucune règle de pricing trouvée"
-                    })
-                    failed += 1
-                else:
-                    # Calculer le prix
-                    calculation = await pricing_engine.calculate_optimal_price(rule=rule)
-                    
-                    if batch.dry_run:
-                        # Mode simulation
+                calculations_by_sku = {calculation.sku: calculation for calculation in calculations}
+            except Exception as e:
+                logger.error(f"Error calculating prices in batch {batch_id}: {str(e)}")
+                calculations_by_sku = {}
+            
+            history_entries = []
+            
+            for sku in window:
+                rule = rules_by_sku[sku]
+                try:
+                    if not rule:
                         results.append({
                             "sku": sku,
-                            "success": True,
-                            "simulation": True,
-                            "calculation": calculation.model_dump()
+                            "success": False,
+                            "error": "Aucune règle de pricing trouvée"
                         })
-                        successful += 1
+                        failed += 1
+                    elif sku not in calculations_by_sku:
+                        results.append({
+                            "sku": sku,
+                            "success": False,
+                            "error": "Calcul de prix indisponible"
+                        })
+                        failed += 1
                     else:
-                        # Publication réelle
-                        if calculation.within_rules and (batch.force_update or calculation.price_change != 0):
-                            publication_result = await pricing_engine.publish_price(
-                                sku=sku,
-                                marketplace_id=batch.marketplace_id,
-                                new_price=calculation.recommended_price
-                            )
-                            
-                            # Sauvegarder l'historique
-                            history_entry = pricing_engine.create_pricing_history_entry(
-                                user_id=user_id,
-                                rule=rule,
-                                calculation=calculation,
-                                publication_result=publication_result
-                            )
-                            
-                            await pricing_rules_service.save_pricing_history(history_entry)
-                            
-                            results.append({
-                                "sku": sku,
-                                "success": publication_result.get('success', False),
-                                "calculation": calculation.model_dump(),
-                                "publication_result": publication_result
-                            })
-                            
-                            if publication_result.get('success'):
-                                successful += 1
-                            else:
-                                failed += 1
-                        else:
-                            results.append({
-                                "sku": sku,
-                                "success": True,
-                                "skipped": True,
-                                "reason": "Aucun changement nécessaire ou hors règles"
-                            })
+                        result, history_entry = await _apply_batch_calculation(
+                            batch, user_id, rule, calculations_by_sku[sku], credentials
+                        )
+                        results.append(result)
+                        if history_entry:
+                            history_entries.append(history_entry)
+                        if result["success"]:
                             successful += 1
+                        else:
+                            failed += 1
+                    
+                except Exception as e:
+                    logger.error(f"Error processing SKU {sku} in batch {batch_id}: {str(e)}")
+                    results.append({
+                        "sku": sku,
+                        "success": False,
+                        "error": str(e)
+                    })
+                    failed += 1
                 
                 processed += 1
-                
-                # Mettre à jour le progrès
-                await pricing_rules_service.update_batch_progress(
-                    batch_id=batch_id,
-                    processed_skus=processed,
-                    successful_updates=successful,
-                    failed_updates=failed,
-                    results=results
-                )
-                
-                # Pause entre les SKUs pour éviter la surcharge API
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error processing SKU {sku} in batch {batch_id}: {str(e)}")
-                results.append({
-                    "sku": sku,
-                    "success": False,
-                    "error": str(e)
-                })
-                failed += 1
-                processed += 1
+            
+            # Historique et dernière application écrits en une fois pour la fenêtre
+            if history_entries:
+                await pricing_rules_service.save_pricing_history_many(history_entries)
+                # Seules les règles dont le prix a été publié sont marquées appliquées
+                applied_rule_ids = [entry.rule_id for entry in history_entries if entry.publication_success]
+                if applied_rule_ids:
+                    await pricing_rules_service.update_rules_last_applied_many(applied_rule_ids)
+            
+            # Mettre à jour le progrès
+            await pricing_rules_service.update_batch_progress(
+                batch_id=batch_id,
+                processed_skus=processed,
+                successful_updates=successful,
+                failed_updates=failed,
+                results=results
+            )
         
         logger.info(f"Batch pricing {batch_id} completed: {successful} successful, {failed} failed")
         
@@ -662,4 +663,59 @@ async def process_batch_pricing(batch_id: str, user_id: str):
                     "errors": [str(e)]
                 }
             }
-        )
\ No newline at end of file
+        )
+
+
+async def _apply_batch_calculation(
+    batch: PricingBatch,
+    user_id: str,
+    rule: PricingRule,
+    calculation: PricingCalculation,
+    credentials: Optional[SPAPICredentials] = None
+) -> Tuple[Dict[str, Any], Optional[PricingHistory]]:
+    """
+    Simuler ou publier le prix calculé d'un SKU du lot
+    
+    Returns:
+        Résultat du SKU + entrée d'historique à sauvegarder (si publication)
+    """
+    
+    if batch.dry_run:
+        # Mode simulation
+        return {
+            "sku": rule.sku,
+            "success": True,
+            "simulation": True,
+            "calculation": calculation.model_dump()
+        }, None
+    
+    if not (calculation.within_rules and (batch.force_update or calculation.price_change != 0)):
+        return {
+            "sku": rule.sku,
+            "success": True,
+            "skipped": True,
+            "reason": "Aucun changement nécessaire ou hors règles"
+        }, None
+    
+    # Publication réelle
+    publication_result = await pricing_engine.publish_price(
+        sku=rule.sku,
+        marketplace_id=batch.marketplace_id,
+        new_price=calculation.recommended_price,
+        credentials=credentials
+    )
+    
+    # Historique sauvegardé par lot par l'appelant
+    history_entry = pricing_engine.create_pricing_history_entry(
+        user_id=user_id,
+        rule=rule,
+        calculation=calculation,
+        publication_result=publication_result
+    )
+    
+    return {
+        "sku": rule.sku,
+        "success": publication_result.get('success', False),
+        "calculation": calculation.model_dump(),
+        "publication_result": publication_result
+    }, history_entry
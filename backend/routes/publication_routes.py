@@ -0,0 +1,129 @@
+"""
+Publication Routes - Batches de publication multi-stores et suivi en direct
+Mise en queue sur l'orchestrateur de publication du process, puis flux NDJSON ou
+Server-Sent Events des transitions de tâches et compteurs incrémentaux
+"""
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.scraping.publication.orchestrator import PublicationOrchestrator, get_publication_orchestrator
+from src.scraping.semantic.product_dto import ProductDTO
+from modules.security import get_current_user_from_token as get_current_user
+
+logger = logging.getLogger(__name__)
+
+# Créer le router
+publication_router = APIRouter(prefix="/api/publication", tags=["Publication"])
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
+# Produits max par batch soumis en une requête
+MAX_BATCH_PRODUCTS = 1000
+
+
+class PublicationBatchRequest(BaseModel):
+    """Batch de produits à publier sur un store"""
+    store_id: str = Field(..., description="Store cible (shopify, woocommerce...)")
+    products: List[ProductDTO] = Field(..., min_items=1, max_items=MAX_BATCH_PRODUCTS)
+    priority: int = Field(5, ge=1, le=10, description="Priorité (1=urgent, 10=bas)")
+
+
+def _require_batch_access(orchestrator: PublicationOrchestrator, batch_id: str, current_user) -> None:
+    """Batch suivi et mis en queue par l'utilisateur (ou admin) ; 404 sinon, sans révéler son existence"""
+
+    if orchestrator.get_batch_progress(batch_id) is None or (
+        not current_user.get("is_admin") and orchestrator.get_batch_owner(batch_id) != current_user["user_id"]
+    ):
+        raise HTTPException(status_code=404, detail=f"Batch '{batch_id}' inconnu")
+
+
+def _stream_response(orchestrator: PublicationOrchestrator, batch_id: Optional[str], fmt: str,
+                     last_event_id: Optional[str]) -> StreamingResponse:
+    """Réponse streamée de la progression (reprise SSE via Last-Event-ID)"""
+
+    after_seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    return StreamingResponse(
+        orchestrator.stream_progress(batch_id=batch_id, fmt=fmt, last_event_id=after_seq),
+        media_type=MEDIA_TYPES[fmt],
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Pas de mise en tampon par le reverse proxy
+        }
+    )
+
+
+@publication_router.post("/batches")
+async def enqueue_publication_batch(
+    request: PublicationBatchRequest,
+    current_user=Depends(get_current_user),
+    orchestrator: PublicationOrchestrator = Depends(get_publication_orchestrator)
+):
+    """Mettre un batch en queue ; sa progression est suivie via /batches/{batch_id}/..."""
+
+    try:
+        batch = await orchestrator.enqueue_batch(
+            request.products, request.store_id, request.priority, owner_id=current_user["user_id"]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Workers démarrés à la première mise en queue, arrêtés avec le process
+    if not orchestrator.is_running:
+        await orchestrator.start_workers()
+
+    logger.info(f"📦 Batch {batch.batch_id} mis en queue ({batch.total_tasks} produits, {request.store_id})")
+    return {
+        "batch_id": batch.batch_id,
+        "total_tasks": batch.total_tasks,
+        "progress": orchestrator.get_batch_progress(batch.batch_id),
+        "progress_url": f"/api/publication/batches/{batch.batch_id}/progress",
+        "events_url": f"/api/publication/batches/{batch.batch_id}/events"
+    }
+
+
+@publication_router.get("/batches/{batch_id}/progress")
+async def get_batch_progress(
+    batch_id: str,
+    current_user=Depends(get_current_user),
+    orchestrator: PublicationOrchestrator = Depends(get_publication_orchestrator)
+):
+    """Compteurs courants d'un batch (lecture O(1), sans parcours des tâches)"""
+
+    _require_batch_access(orchestrator, batch_id, current_user)
+    return {"batch_id": batch_id, "progress": orchestrator.get_batch_progress(batch_id)}
+
+
+@publication_router.get("/batches/{batch_id}/events")
+async def stream_batch_events(
+    batch_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    last_event_id: Optional[str] = Header(None),
+    current_user=Depends(get_current_user),
+    orchestrator: PublicationOrchestrator = Depends(get_publication_orchestrator)
+):
+    """Flux des transitions d'un batch, terminé quand toutes ses tâches sont finies"""
+
+    _require_batch_access(orchestrator, batch_id, current_user)
+    return _stream_response(orchestrator, batch_id, format, last_event_id)
+
+
+@publication_router.get("/events")
+async def stream_all_events(
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    last_event_id: Optional[str] = Header(None),
+    current_user=Depends(get_current_user),
+    orchestrator: PublicationOrchestrator = Depends(get_publication_orchestrator)
+):
+    """Flux continu des transitions de toutes les tâches (tous utilisateurs : admins uniquement)"""
+
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs")
+
+    return _stream_response(orchestrator, None, format, last_event_id)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark du moteur de prix Amazon
+Compare le calcul règle par règle (calculate_optimal_price) au calcul vectorisé
+(calculate_optimal_price_many) sur un catalogue synthétique, et vérifie que les
+deux chemins donnent les mêmes résultats.
+
+Usage: python scripts/benchmark_pricing_engine.py [--skus 10000] [--seed 42]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from amazon.pricing_engine import AmazonPricingEngine
+from amazon.pricing_vectorized import PricingColumns, compute_prices
+from models.amazon_pricing import CompetitorOffer, PricingRule, PricingStrategy
+
+# Champs dépendant de l'horloge, exclus de la comparaison
+_TIMING_FIELDS = {'calculated_at', 'calculation_duration_ms'}
+
+
+def build_catalog(size: int, seed: int):
+    """Règles, prix actuels et offres concurrentes aléatoires"""
+    rng = random.Random(seed)
+    rules, current_prices, competitors = [], {}, {}
+
+    for i in range(size):
+        sku = f"BENCH-{i:06d}"
+        min_price = round(rng.uniform(5, 150), 2)
+        strategy = rng.choice(list(PricingStrategy))
+        rules.append(PricingRule(
+            user_id="benchmark",
+            sku=sku,
+            marketplace_id="A13V1IB3VIYZZH",
+            min_price=min_price,
+            max_price=round(min_price + rng.uniform(5, 100), 2),
+            variance_pct=rng.choice([5.0, 10.0, 20.0]),
+            map_price=rng.choice([None, round(min_price * 1.05, 2)]),
+            strategy=strategy,
+            margin_target=rng.choice([15.0, 30.0, 45.0]) if strategy == PricingStrategy.MARGIN_TARGET else None
+        ))
+        if rng.random() < 0.8:
+            current_prices[sku] = round(min_price * rng.uniform(0.8, 1.6), 2)
+
+        offers = []
+        for j in range(rng.randint(0, 8)):
+            price = round(min_price * rng.uniform(0.9, 1.8), 2)
+            shipping = rng.choice([0.0, 2.99, 4.99])
+            offers.append(CompetitorOffer(
+                seller_id=f"seller_{j}",
+                price=price,
+                shipping=shipping,
+                landed_price=price + shipping,
+                is_buy_box_winner=j == 0 and rng.random() < 0.7
+            ))
+        competitors[sku] = offers
+
+    return rules, current_prices, competitors
+
+
+async def run_benchmark(size: int, seed: int):
+    engine = AmazonPricingEngine()
+    rules, current_prices, competitors = build_catalog(size, seed)
+
+    start = time.perf_counter()
+    scalar = [
+        await engine.calculate_optimal_price(rule, current_prices.get(rule.sku), competitors[rule.sku])
+        for rule in rules
+    ]
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = await engine.calculate_optimal_price_many(rules, current_prices, competitors)
+    vectorized_s = time.perf_counter() - start
+
+    columns = PricingColumns.from_rules(
+        rules, [current_prices.get(rule.sku) for rule in rules], [competitors[rule.sku] for rule in rules]
+    )
+    start = time.perf_counter()
+    compute_prices(columns)
+    kernel_s = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for a, b in zip(scalar, vectorized)
+        if a.model_dump(exclude=_TIMING_FIELDS) != b.model_dump(exclude=_TIMING_FIELDS)
+    )
+
+    print(f"📊 Moteur de prix - {size} SKUs")
+    print(f"   Règle par règle      : {scalar_s * 1000:9.1f} ms")
+    print(f"   Vectorisé (complet)  : {vectorized_s * 1000:9.1f} ms  (x{scalar_s / vectorized_s:.1f})")
+    print(f"   Noyau NumPy seul     : {kernel_s * 1000:9.1f} ms  (x{scalar_s / kernel_s:.1f})")
+    print(f"   Résultats différents : {mismatches}")
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark calculate_optimal_price vs calculate_optimal_price_many")
+    parser.add_argument("--skus", type=int, default=10000, help="Taille du catalogue synthétique")
+    parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire")
+    args = parser.parse_args()
+
+    # Les logs par SKU du chemin unitaire fausseraient la mesure
+    logging.disable(logging.INFO)
+
+    mismatches = asyncio.run(run_benchmark(args.skus, args.seed))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
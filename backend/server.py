@@ -1,11 +1,12 @@
 import os
+import hmac
 import logging
 import asyncio
 from datetime import datetime, timedelta
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError
 
 # Import configuration centralisée
@@ -14,6 +15,24 @@ from core.config import settings, get_cors_origins
 # Import database connection
 from database import get_db, close_db
 
+# Sessions HTTP sortantes partagées
+from core.http_clients import close_http_sessions
+
+# Pool CPU du scraping (parsing HTML, images)
+from src.scraping.cpu_pool import shutdown_cpu_pool
+
+# Métriques Prometheus et retard de la boucle d'événements
+from src.scraping.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, get_event_loop_monitor, get_metrics_registry
+
+# Logs écrits par un thread dédié (jamais sur la boucle d'événements)
+from services.logging_service import attach_queue_handler
+
+# Cache des access tokens SP-API (écritures last_used_at différées)
+from services.amazon_token_cache import get_access_token_cache
+
+# Orchestrateur de publication du process (workers arrêtés à l'arrêt)
+from src.scraping.publication.orchestrator import close_publication_orchestrator
+
 # Import new routes
 from routes.messages_routes import messages_router
 from routes.ai_routes import ai_router
@@ -28,6 +47,7 @@ except Exception:
 
 logger = logging.getLogger("ecomsimply")
 logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
+attach_queue_handler(logging.getLogger())
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -98,6 +118,14 @@ except ImportError as e:
     AMAZON_MONITORING_AVAILABLE = False
     print(f"❌ Amazon Monitoring router not available: {e}")
 
+try:
+    from routes.publication_routes import publication_router
+    PUBLICATION_ROUTES_AVAILABLE = True
+    print("✅ Publication progress router loaded")
+except ImportError as e:
+    PUBLICATION_ROUTES_AVAILABLE = False
+    print(f"❌ Publication progress router not available: {e}")
+
 # Include Amazon SP-API router if available - CONSOLIDATED VERSION
 if AMAZON_SPAPI_AVAILABLE:
     # Primary Amazon router (consolidated, most complete)
@@ -134,6 +162,10 @@ if AMAZON_MONITORING_AVAILABLE:
     app.include_router(amazon_monitoring_router)
     print("✅ Amazon Monitoring routes registered")
 
+if PUBLICATION_ROUTES_AVAILABLE:
+    app.include_router(publication_router)
+    print("✅ Publication progress routes registered")
+
 # Configuration CORS sécurisée via configuration centralisée
 allowed_origins = get_cors_origins()
 logger.info(f"✅ CORS configured for origins: {allowed_origins}")
@@ -155,6 +187,7 @@ async def on_startup():
     Startup avec logs DATABASE RÉELLE et vérifications ENV
     """
     logger.info("🚀 FastAPI startup - ECOMSIMPLY API v1.0.0")
+    get_event_loop_monitor().start()
     
     # Log configuration MongoDB
     mongo_url = os.getenv("MONGO_URL")
@@ -204,6 +237,11 @@ async def on_startup():
 
 @app.on_event("shutdown")
 async def on_shutdown():
+    await get_event_loop_monitor().stop()
+    await get_access_token_cache().close()
+    await close_publication_orchestrator()
+    await close_http_sessions()
+    shutdown_cpu_pool()
     await close_db()
 
 @app.get("/api/health")
@@ -268,6 +306,21 @@ async def health():
             "timestamp": datetime.utcnow().isoformat()
         }
 
+@app.get("/api/metrics")
+async def metrics(request: Request):
+    """
+    Métriques au format texte Prometheus (latences transport/SP-API, parsing,
+    transcodage, profondeur de queue, retard de boucle)
+    Protégé par METRICS_TOKEN (Authorization: Bearer) si la variable est définie
+    """
+    metrics_token = os.getenv("METRICS_TOKEN")
+    if metrics_token:
+        authorization = request.headers.get("authorization", "")
+        if not hmac.compare_digest(authorization, f"Bearer {metrics_token}"):
+            raise HTTPException(401, "Invalid metrics token")
+    
+    return PlainTextResponse(get_metrics_registry().render(), media_type=METRICS_CONTENT_TYPE)
+
 # Healthcheck ingress simple pour emergent.sh
 @app.get("/healthz")
 async def healthz():
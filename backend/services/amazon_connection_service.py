@@ -10,6 +10,8 @@ from models.amazon_spapi import (
 )
 from services.amazon_encryption_service import AmazonTokenEncryptionService
 from services.amazon_oauth_service import AmazonOAuthService
+from services.amazon_token_cache import AccessTokenCache, get_access_token_cache
+from integrations.amazon.client import SPAPICredentials
 
 logger = logging.getLogger(__name__)
 
@@ -25,13 +27,16 @@ class AmazonConnectionService:
     - Health monitoring
     """
     
-    def __init__(self, database: AsyncIOMotorDatabase):
+    def __init__(self, database: AsyncIOMotorDatabase, token_cache: Optional[AccessTokenCache] = None):
         """Initialize connection service"""
         self.db = database
         self.connections_collection = database.amazon_connections
         self.encryption_service = AmazonTokenEncryptionService()
         self.oauth_service = AmazonOAuthService()
         
+        # Access tokens shared by every service instance of the process
+        self.token_cache = token_cache or get_access_token_cache()
+        
         logger.info("✅ Amazon Connection Service initialized")
     
     async def create_connection(
@@ -200,6 +205,8 @@ class AmazonConnectionService:
                 logger.error("❌ Failed to update connection in database")
                 return False
             
+            self.token_cache.invalidate(connection.id)
+            
             logger.info(f"✅ OAuth callback completed successfully for connection {connection.id}")
             logger.info(f"✅ Refresh token automatically generated and stored securely")
             logger.info(f"✅ Connection {connection.id} activated for seller {selling_partner_id}")
@@ -218,6 +225,7 @@ class AmazonConnectionService:
     
     async def _mark_connection_error(self, connection_id: str, error_message: str):
         """Marquer une connexion en erreur avec un message"""
+        self.token_cache.invalidate(connection_id)
         try:
             await self.connections_collection.update_one(
                 {"id": connection_id},
@@ -315,6 +323,9 @@ class AmazonConnectionService:
         """
         Get valid access token for connection, refreshing if necessary
         
+        Tokens are served from the process-wide cache; concurrent callers share a
+        single decrypt/refresh and last_used_at is written in debounced batches.
+        
         Args:
             connection: Amazon connection object
             
@@ -322,61 +333,21 @@ class AmazonConnectionService:
             Valid access token or None if failed
         """
         try:
-            # Decrypt token data
-            token_data_dict = await self.encryption_service.decrypt_token_data(
-                encrypted_data=connection.encrypted_refresh_token,
-                nonce_b64=connection.token_encryption_nonce,
-                user_id=connection.user_id,
-                connection_id=connection.id
+            access_token = await self.token_cache.get_token(
+                connection.id,
+                lambda force_refresh: self._load_token_data(connection, force_refresh)
             )
             
-            token_data = SPAPITokenData(**token_data_dict)
+            self.token_cache.mark_used(connection.id, self.connections_collection)
             
-            # Check if access token is expired (with 5 minute buffer)
-            if datetime.utcnow() + timedelta(minutes=5) >= token_data.expires_at:
-                logger.info(f"🔄 Access token expired, refreshing for connection {connection.id}")
-                
-                # Refresh access token
-                new_token_data = await self.oauth_service.refresh_access_token(
-                    refresh_token=token_data.refresh_token,
-                    region=connection.region
-                )
-                
-                # Re-encrypt and store updated tokens
-                encrypted_data, nonce = await self.encryption_service.encrypt_token_data(
-                    token_data=new_token_data.dict(),
-                    user_id=connection.user_id,
-                    connection_id=connection.id
-                )
-                
-                # Update connection in database
-                await self.connections_collection.update_one(
-                    {"id": connection.id},
-                    {
-                        "$set": {
-                            "encrypted_refresh_token": encrypted_data,
-                            "token_encryption_nonce": nonce,
-                            "last_used_at": datetime.utcnow(),
-                            "updated_at": datetime.utcnow()
-                        }
-                    }
-                )
-                
-                token_data = new_token_data
-            
-            # Update last used timestamp
-            await self.connections_collection.update_one(
-                {"id": connection.id},
-                {"$set": {"last_used_at": datetime.utcnow()}}
-            )
-            
-            logger.info(f"🔑 Valid access token retrieved for connection {connection.id}")
-            return token_data.access_token
+            logger.debug(f"🔑 Valid access token retrieved for connection {connection.id}")
+            return access_token
             
         except Exception as e:
             logger.error(f"❌ Failed to get valid access token: {type(e).__name__}")
             
             # Mark connection as error
+            self.token_cache.invalidate(connection.id)
             await self.connections_collection.update_one(
                 {"id": connection.id},
                 {
@@ -390,6 +361,86 @@ class AmazonConnectionService:
             
             return None
     
+    async def get_sp_api_credentials(
+        self,
+        user_id: str,
+        marketplace_id: Optional[str] = None
+    ) -> Optional[SPAPICredentials]:
+        """
+        Get SP-API credentials (cached access token + seller ID) for a user's active connection
+        
+        Args:
+            user_id: ECOMSIMPLY user identifier
+            marketplace_id: Specific marketplace (optional)
+            
+        Returns:
+            Credentials for AmazonSPAPIClient.make_request, or None without a usable connection
+        """
+        connection = await self.get_active_connection(user_id, marketplace_id)
+        if not connection:
+            return None
+        
+        access_token = await self.get_valid_access_token(connection)
+        if not access_token:
+            return None
+        
+        return SPAPICredentials(access_token=access_token, seller_id=connection.seller_id)
+    
+    async def _load_token_data(self, connection: AmazonConnection, force_refresh: bool = False) -> SPAPITokenData:
+        """
+        Decrypt stored tokens and refresh the access token through LWA if it expires soon
+        
+        Args:
+            connection: Amazon connection object
+            force_refresh: Refresh even if the stored access token is still valid
+            
+        Returns:
+            Token data with a valid access token
+        """
+        # Decrypt token data
+        token_data_dict = await self.encryption_service.decrypt_token_data(
+            encrypted_data=connection.encrypted_refresh_token,
+            nonce_b64=connection.token_encryption_nonce,
+            user_id=connection.user_id,
+            connection_id=connection.id
+        )
+        
+        token_data = SPAPITokenData(**token_data_dict)
+        
+        # Check if access token is expired (with 5 minute buffer)
+        if not force_refresh and datetime.utcnow() + timedelta(minutes=5) < token_data.expires_at:
+            return token_data
+        
+        logger.info(f"🔄 Access token expiring, refreshing for connection {connection.id}")
+        
+        # Refresh access token
+        new_token_data = await self.oauth_service.refresh_access_token(
+            refresh_token=token_data.refresh_token,
+            region=connection.region
+        )
+        
+        # Re-encrypt and store updated tokens
+        encrypted_data, nonce = await self.encryption_service.encrypt_token_data(
+            token_data=new_token_data.dict(),
+            user_id=connection.user_id,
+            connection_id=connection.id
+        )
+        
+        # Update connection in database
+        await self.connections_collection.update_one(
+            {"id": connection.id},
+            {
+                "$set": {
+                    "encrypted_refresh_token": encrypted_data,
+                    "token_encryption_nonce": nonce,
+                    "last_used_at": datetime.utcnow(),
+                    "updated_at": datetime.utcnow()
+                }
+            }
+        )
+        
+        return new_token_data
+    
     async def disconnect_connection(self, connection_id: str, user_id: str) -> bool:
         """
         Disconnect and revoke SP-API connection
@@ -420,6 +471,7 @@ class AmazonConnectionService:
             )
             
             if result.modified_count > 0:
+                self.token_cache.invalidate(connection_id)
                 logger.info(f"🔌 Connection {connection_id} disconnected for user {user_id[:8]}***")
                 return True
             else:
@@ -499,4 +551,27 @@ class AmazonConnectionService:
             return {
                 "error": "Health check failed",
                 "timestamp": datetime.utcnow().isoformat()
-            }
\ No newline at end of file
+            }
+
+
+# Global process instance for the Amazon engines (routes create their own per request)
+_connection_service: Optional[AmazonConnectionService] = None
+
+
+async def get_connection_service() -> AmazonConnectionService:
+    """Get the connection service bound to the process database"""
+    global _connection_service
+    if _connection_service is None:
+        from database import get_db
+        _connection_service = AmazonConnectionService(await get_db())
+    return _connection_service
+
+
+async def get_sp_api_credentials(user_id: str, marketplace_id: Optional[str] = None) -> Optional[SPAPICredentials]:
+    """Get SP-API credentials for a user's active connection (see AmazonConnectionService)"""
+    try:
+        connection_service = await get_connection_service()
+    except Exception as e:
+        logger.error(f"❌ Connection service unavailable: {type(e).__name__}")
+        return None
+    return await connection_service.get_sp_api_credentials(user_id, marketplace_id)
@@ -5,6 +5,7 @@ Service pour la gestion des règles de pricing et l'historique
 import logging
 import asyncio
 from datetime import datetime, timedelta
+from fnmatch import fnmatchcase
 from typing import List, Dict, Optional, Any
 import json
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -18,6 +19,72 @@ from models.amazon_pricing import (
 
 logger = logging.getLogger(__name__)
 
+# Documents par insert_many / update_many lors des écritures groupées
+BULK_WRITE_CHUNK_SIZE = 500
+
+
+class PricingRuleIndex:
+    """
+    Index mémoire SKU → règle de pricing d'un utilisateur sur un marketplace
+    
+    Résolution d'un SKU, du plus spécifique au plus général :
+    1. Règle du SKU exact
+    2. Règle d'un SKU parent (variante "PARENT-ROUGE-M" → "PARENT-ROUGE" → "PARENT")
+    3. Règle générique (SKU avec jokers * ou ?, ex: "TSHIRT-*"), motif le plus long d'abord
+    """
+    
+    VARIANT_SEPARATOR = "-"
+    WILDCARD_CHARS = ("*", "?", "[")
+    
+    def __init__(self, rules: List[PricingRule]):
+        self.exact_rules: Dict[str, PricingRule] = {}
+        wildcard_rules = []
+        
+        for rule in rules:
+            if any(char in rule.sku for char in self.WILDCARD_CHARS):
+                wildcard_rules.append(rule)
+            else:
+                self.exact_rules[rule.sku] = rule
+        
+        # Motifs les plus spécifiques (plus de caractères fixes) d'abord
+        self.wildcard_rules: List[PricingRule] = sorted(
+            wildcard_rules,
+            key=lambda rule: -len(rule.sku.translate({ord(c): None for c in "*?[]"}))
+        )
+    
+    def __len__(self) -> int:
+        return len(self.exact_rules) + len(self.wildcard_rules)
+    
+    def _match(self, sku: str) -> Optional[PricingRule]:
+        rule = self.exact_rules.get(sku)
+        if rule is not None:
+            return rule
+        
+        parent_sku = sku
+        while self.VARIANT_SEPARATOR in parent_sku:
+            parent_sku = parent_sku.rsplit(self.VARIANT_SEPARATOR, 1)[0]
+            rule = self.exact_rules.get(parent_sku)
+            if rule is not None:
+                return rule
+        
+        for rule in self.wildcard_rules:
+            if fnmatchcase(sku, rule.sku):
+                return rule
+        
+        return None
+    
+    def resolve(self, sku: str) -> Optional[PricingRule]:
+        """
+        Règle applicable à un SKU (None si aucune)
+        
+        Une règle héritée (parent ou générique) est renvoyée comme copie portant
+        le SKU demandé ; son id reste celui de la règle d'origine.
+        """
+        rule = self._match(sku)
+        if rule is None or rule.sku == sku:
+            return rule
+        return rule.model_copy(update={"sku": sku})
+
 
 class AmazonPricingRulesService:
     """
@@ -54,6 +121,7 @@ class AmazonPricingRulesService:
             ], unique=True)
             
             await self.pricing_rules_collection.create_index([("user_id", 1), ("status", 1)])
+            await self.pricing_rules_collection.create_index([("user_id", 1), ("marketplace_id", 1)])
             await self.pricing_rules_collection.create_index([("marketplace_id", 1)])
             
             # Index pour l'historique
@@ -171,6 +239,29 @@ class AmazonPricingRulesService:
             logger.error(f"Error getting pricing rule for SKU {sku}: {str(e)}")
             return None
 
+    async def load_pricing_rule_index(self, user_id: str, marketplace_id: str) -> PricingRuleIndex:
+        """
+        Charger en une requête toutes les règles d'un utilisateur sur un marketplace
+        
+        Les erreurs MongoDB sont propagées : un index vide ferait passer tous les
+        SKUs d'un lot pour « sans règle ».
+        """
+        cursor = self.pricing_rules_collection.find({
+            "user_id": user_id,
+            "marketplace_id": marketplace_id
+        })
+        
+        rules = []
+        async for rule_data in cursor:
+            try:
+                rules.append(PricingRule.model_validate(rule_data))
+            except Exception as e:
+                logger.error(f"Error parsing pricing rule: {str(e)}")
+        
+        logger.info(f"Loaded {len(rules)} pricing rules for user {user_id} on marketplace {marketplace_id}")
+        
+        return PricingRuleIndex(rules)
+
     async def update_pricing_rule(self, user_id: str, rule_id: str, updates: Dict[str, Any]) -> bool:
         """Mettre à jour une règle de pricing"""
         try:
@@ -224,6 +315,25 @@ class AmazonPricingRulesService:
             logger.error(f"Error updating last_applied_at for rule {rule_id}: {str(e)}")
             return False
 
+    async def update_rules_last_applied_many(self, rule_ids: List[str]) -> int:
+        """Mettre à jour la dernière application de plusieurs règles (un update_many par paquet)"""
+        unique_ids = list(dict.fromkeys(rule_ids))
+        applied_at = datetime.utcnow()
+        modified = 0
+        
+        for i in range(0, len(unique_ids), BULK_WRITE_CHUNK_SIZE):
+            chunk = unique_ids[i:i + BULK_WRITE_CHUNK_SIZE]
+            try:
+                result = await self.pricing_rules_collection.update_many(
+                    {"id": {"$in": chunk}},
+                    {"$set": {"last_applied_at": applied_at}}
+                )
+                modified += result.modified_count
+            except Exception as e:
+                logger.error(f"Error updating last_applied_at for {len(chunk)} rules: {str(e)}")
+        
+        return modified
+
     # ==================== HISTORIQUE ====================
 
     async def save_pricing_history(self, history: PricingHistory) -> str:
@@ -240,6 +350,26 @@ class AmazonPricingRulesService:
             logger.error(f"Error saving pricing history: {str(e)}")
             raise
 
+    async def save_pricing_history_many(self, entries: List[PricingHistory]) -> List[str]:
+        """Sauvegarder des entrées d'historique (insert_many non ordonné par paquet)"""
+        saved_ids = []
+        
+        for i in range(0, len(entries), BULK_WRITE_CHUNK_SIZE):
+            chunk = entries[i:i + BULK_WRITE_CHUNK_SIZE]
+            try:
+                await self.pricing_history_collection.insert_many(
+                    [entry.model_dump() for entry in chunk],
+                    ordered=False
+                )
+                saved_ids.extend(entry.id for entry in chunk)
+            except Exception as e:
+                logger.error(f"Error saving {len(chunk)} pricing history entries: {str(e)}")
+        
+        if saved_ids:
+            logger.info(f"Pricing history saved: {len(saved_ids)} entries")
+        
+        return saved_ids
+
     async def get_pricing_history(
         self,
         user_id: str,
@@ -1,6 +1,5 @@
 # Amazon Publisher Service - Phase 3
 import os
-import json
 import asyncio
 from typing import Dict, Any, List, Optional
 import logging
@@ -15,22 +14,89 @@ from models.amazon_spapi import AmazonConnection
 
 logger = logging.getLogger(__name__)
 
+# Langue des attributs et des issues de feed par marketplace
+MARKETPLACE_LANGUAGE_TAGS = {
+    'A13V1IB3VIYZZH': 'fr_FR',  # France
+    'A1PA6795UKMFR9': 'de_DE',  # Allemagne
+    'APJ6JRA9NG5V4': 'it_IT',   # Italie
+    'A1RKKUPIHCS9HS': 'es_ES',  # Espagne
+    'A1F83G8C2ARO7P': 'en_GB',  # Royaume-Uni
+    'ATVPDKIKX0DER': 'en_US'    # États-Unis
+}
+
+
+def build_listing_attributes(fields: Dict[str, Any], marketplace_id: str) -> Dict[str, Any]:
+    """
+    Convertir des champs produit simples en attributs Listings (schéma productType)
+
+    Args:
+        fields: title, bullet_points, description, search_terms, brand,
+                standard_price + currency, quantity, condition, images (URLs)
+        marketplace_id: Marketplace cible
+
+    Returns:
+        Attributs d'un message JSON_LISTINGS_FEED
+    """
+    language_tag = MARKETPLACE_LANGUAGE_TAGS.get(marketplace_id, 'en_US')
+
+    def localized(value):
+        return {'value': value, 'language_tag': language_tag, 'marketplace_id': marketplace_id}
+
+    attributes: Dict[str, Any] = {}
+
+    if fields.get('title'):
+        attributes['item_name'] = [localized(fields['title'])]
+    if fields.get('brand'):
+        attributes['brand'] = [localized(fields['brand'])]
+    if fields.get('bullet_points'):
+        attributes['bullet_point'] = [localized(bullet) for bullet in fields['bullet_points'][:5]]  # Max 5 bullets
+    if fields.get('description'):
+        attributes['product_description'] = [localized(fields['description'])]
+    if fields.get('search_terms'):
+        attributes['generic_keyword'] = [localized(fields['search_terms'])]
+    if fields.get('condition'):
+        attributes['condition_type'] = [{
+            'value': f"{fields['condition']}_{fields['condition']}",  # new → new_new
+            'marketplace_id': marketplace_id
+        }]
+
+    if fields.get('standard_price') is not None:
+        attributes['purchasable_offer'] = [{
+            'currency': fields.get('currency', 'EUR'),
+            'marketplace_id': marketplace_id,
+            'our_price': [{'schedule': [{'value_with_tax': float(fields['standard_price'])}]}]
+        }]
+
+    if fields.get('quantity') is not None:
+        attributes['fulfillment_availability'] = [{
+            'fulfillment_channel_code': 'DEFAULT',
+            'quantity': int(fields['quantity'])
+        }]
+
+    images = fields.get('images') or []
+    if images:
+        attributes['main_product_image_locator'] = [{'media_location': images[0], 'marketplace_id': marketplace_id}]
+        for i, url in enumerate(images[1:9], start=1):  # 8 images secondaires max
+            attributes[f'other_product_image_locator_{i}'] = [{'media_location': url, 'marketplace_id': marketplace_id}]
+
+    return attributes
+
+
 class AmazonPublisherService:
     """
     Service de publication automatique SEO + Prix sur Amazon via SP-API
     Mise à jour en temps réel avec validation et journalisation
     """
     
-    def __init__(self):
+    def __init__(self, sp_client: Optional[AmazonSPAPIClient] = None):
         self.oauth_service = AmazonOAuthService()
-        self.sp_client = AmazonSPAPIClient()
-        
+        self.sp_client = sp_client or AmazonSPAPIClient()
+
         # Configuration publication
         self.publication_config = {
-            'batch_size': 10,           # Produits par batch
-            'retry_attempts': 3,        # Tentatives par produit
+            'batch_size': 1000,         # Messages par feed JSON_LISTINGS_FEED
+            'retry_attempts': 3,        # Tentatives par requête SP-API (client)
             'retry_delay_base': 2,      # Délai base retry (secondes)
-            'rate_limit_delay': 1.5,    # Délai entre publications
             'validation_required': True, # Validation avant publication
             'backup_original': True     # Sauvegarde données originales
         }
@@ -90,26 +156,10 @@ class AmazonPublisherService:
                     # Filtrer les mises à jour valides seulement
                     updates = [u for u in updates if u.get('validation_status') == 'valid']
             
-            # Traiter par batches
-            all_results = []
-            batch_count = 0
-            
-            for i in range(0, len(updates), self.publication_config['batch_size']):
-                batch = updates[i:i + self.publication_config['batch_size']]
-                batch_count += 1
-                
-                logger.info(f"📦 Processing batch {batch_count}: {len(batch)} updates")
-                
-                # Publier le batch
-                batch_results = await self._publish_batch(
-                    batch, connection_status['connection'], publication_context
-                )
-                
-                all_results.extend(batch_results)
-                
-                # Délai entre batches pour respecter les quotas
-                if i + self.publication_config['batch_size'] < len(updates):
-                    await asyncio.sleep(self.publication_config['rate_limit_delay'])
+            # Publier via feeds groupés (batch_size messages par feed)
+            all_results = await self._publish_batch(
+                updates, connection_status['connection'], publication_context
+            )
             
             # Compiler les résultats finaux
             publication_summary = self._compile_publication_results(
@@ -406,176 +456,243 @@ class AmazonPublisherService:
         context: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
         """
-        Publier un batch de mises à jour via SP-API
+        Publier des mises à jour via des feeds JSON_LISTINGS_FEED groupés
         """
-        batch_results = []
-        
-        for update in batch:
+        messages = [
+            self._prepare_listings_feed_message(update, context['update_type'], context['marketplace_id'])
+            for update in batch
+        ]
+
+        feed_results = await self.publish_listings_feed(
+            access_token=connection.decrypted_refresh_token,
+            seller_id=connection.seller_id,
+            marketplace_id=context['marketplace_id'],
+            messages=messages
+        )
+
+        published_at = datetime.utcnow().isoformat()
+        for result in feed_results:
+            result.update({
+                'update_type': context['update_type'],
+                'published_at': published_at,
+                'session_id': context['session_id']
+            })
+
+        return feed_results
+
+    async def publish_listings_feed(
+        self,
+        access_token: str,
+        seller_id: str,
+        marketplace_id: str,
+        messages: List[Dict[str, Any]],
+        wait_for_result: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Publier des listings en masse : un feed JSON_LISTINGS_FEED par lot de
+        `batch_size` messages au lieu d'un appel SP-API par SKU
+
+        Les feeds sont tous soumis avant d'attendre leur traitement (en parallèle).
+
+        Args:
+            access_token: Token d'accès Amazon
+            seller_id: ID vendeur (en-tête du feed)
+            marketplace_id: Marketplace cible
+            messages: [{'sku', 'attributes', 'product_type'?, 'operation_type'?}]
+            wait_for_result: Attendre le rapport de traitement de chaque feed
+
+        Returns:
+            Un résultat par message, dans l'ordre des messages. Seul un feed
+            DONE sans issue ERROR pour le message donne `success` ; un feed dont
+            le traitement n'est pas confirmé (non attendu, suivi en erreur ou
+            délai dépassé) donne `pending` avec son feed_id.
+        """
+        batch_size = self.publication_config['batch_size']
+        chunks = [messages[i:i + batch_size] for i in range(0, len(messages), batch_size)]
+
+        submissions = []
+        # Quotas createFeedDocument/createFeed appliqués par le limiteur du client SP-API
+        for chunk in chunks:
+            feed = self._build_listings_feed(seller_id, marketplace_id, chunk)
             try:
-                # Préparer les données SP-API
-                sp_api_data = self._prepare_sp_api_payload(update, context['update_type'])
-                
-                # Publier via SP-API
-                publication_result = await self._publish_single_update(
-                    sp_api_data, connection, context
+                feed_id = await self.sp_client.submit_json_listings_feed(
+                    access_token=access_token,
+                    seller_id=seller_id,
+                    marketplace_id=marketplace_id,
+                    feed=feed
                 )
-                
-                # Ajouter métadonnées
-                result = {
-                    'sku': update.get('sku'),
-                    'update_type': context['update_type'],
-                    'success': publication_result['success'],
-                    'published_at': datetime.utcnow().isoformat(),
-                    'session_id': context['session_id']
-                }
-                
-                if publication_result['success']:
-                    result.update({
-                        'feed_id': publication_result.get('feed_id'),
-                        'submission_id': publication_result.get('submission_id'),
-                        'processing_status': 'SUBMITTED'
-                    })
-                else:
-                    result.update({
-                        'error': publication_result.get('error'),
-                        'error_code': publication_result.get('error_code'),
-                        'retry_attempted': publication_result.get('retry_attempted', False)
-                    })
-                
-                batch_results.append(result)
-                
-                # Délai entre publications individuelles
-                await asyncio.sleep(0.5)
-                
+                submissions.append((chunk, feed_id, None))
             except Exception as e:
-                logger.error(f"❌ Error publishing update for SKU {update.get('sku')}: {str(e)}")
-                batch_results.append({
-                    'sku': update.get('sku'),
-                    'success': False,
-                    'error': str(e),
-                    'published_at': datetime.utcnow().isoformat(),
-                    'session_id': context['session_id']
-                })
-        
-        return batch_results
-    
-    def _prepare_sp_api_payload(self, update: Dict[str, Any], update_type: str) -> Dict[str, Any]:
-        """
-        Préparer le payload SP-API selon le type de mise à jour
-        """
-        payload = {
-            'sku': update.get('sku'),
-            'marketplaceId': update.get('marketplace_id'),
-            'productType': update.get('product_type', 'PRODUCT')
-        }
-        
-        # Mapper les champs selon le type
-        if update_type in ['seo_only', 'full_update']:
-            if 'title' in update:
-                payload['title'] = update['title']
-            
-            if 'bullet_points' in update:
-                bullets = update['bullet_points']
-                for i, bullet in enumerate(bullets[:5]):  # Max 5 bullets
-                    payload[f'bullet_point_{i+1}'] = bullet
-            
-            if 'description' in update:
-                payload['description'] = update['description']
-            
-            if 'search_terms' in update:
-                payload['search_terms'] = update['search_terms']
-        
-        if update_type in ['price_only', 'full_update']:
-            if 'standard_price' in update:
-                payload['standard_price'] = {
-                    'amount': update['standard_price'],
-                    'currency_code': update.get('currency', 'EUR')
-                }
-        
-        # Métadonnées additionnelles
-        payload['update_timestamp'] = datetime.utcnow().isoformat()
-        payload['update_source'] = 'ECOMSIMPLY_AUTO_PUBLISHER'
-        
-        return payload
-    
-    async def _publish_single_update(
+                logger.error(f"❌ Feed submission failed ({len(chunk)} messages): {str(e)}")
+                submissions.append((chunk, None, e))
+
+        async def collect(chunk, feed_id, error):
+            if error is not None:
+                return self._failed_feed_results(chunk, str(error), type(error).__name__)
+
+            if not wait_for_result:
+                return self._pending_feed_results(chunk, feed_id, 'SUBMITTED')
+
+            try:
+                outcome = await self.sp_client.wait_for_feed_result(access_token, seller_id, feed_id)
+            except Exception as e:
+                # Feed soumis : résultat inconnu, suivi possible via feed_id
+                logger.warning(f"⚠️ Feed {feed_id} status unavailable: {str(e)}")
+                return self._pending_feed_results(chunk, feed_id, 'SUBMITTED')
+
+            return self._map_feed_report(chunk, feed_id, outcome['processing_status'], outcome['report'])
+
+        per_feed_results = await asyncio.gather(*(collect(*submission) for submission in submissions))
+
+        logger.info(f"📦 {len(messages)} listings published through {len(chunks)} feed(s)")
+        return [result for results in per_feed_results for result in results]
+
+    def _build_listings_feed(
         self,
-        sp_api_data: Dict[str, Any],
-        connection: AmazonConnection,
-        context: Dict[str, Any]
+        seller_id: str,
+        marketplace_id: str,
+        messages: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """
-        Publier une mise à jour individuelle via SP-API
+        Construire le document JSON_LISTINGS_FEED (messageId = rang dans le lot)
         """
-        for attempt in range(self.publication_config['retry_attempts']):
-            try:
-                # Appel SP-API
-                response = await self.sp_client.submit_feed(
-                    feed_type='POST_PRODUCT_DATA',
-                    feed_content=json.dumps(sp_api_data),
-                    access_token=connection.decrypted_refresh_token,
-                    marketplace_id=connection.marketplace_id
-                )
-                
-                if response.get('success'):
-                    return {
-                        'success': True,
-                        'feed_id': response.get('feed_id'),
-                        'submission_id': response.get('submission_id'),
-                        'attempts': attempt + 1
-                    }
-                else:
-                    error_code = response.get('error_code')
-                    
-                    # Vérifier si on doit retry
-                    if self._should_retry_error(error_code) and attempt < self.publication_config['retry_attempts'] - 1:
-                        delay = self.publication_config['retry_delay_base'] * (2 ** attempt)
-                        logger.warning(f"⚠️ Retry attempt {attempt + 2} for SKU {sp_api_data.get('sku')} in {delay}s")
-                        await asyncio.sleep(delay)
-                        continue
-                    
-                    return {
-                        'success': False,
-                        'error': response.get('error', 'Unknown SP-API error'),
-                        'error_code': error_code,
-                        'attempts': attempt + 1,
-                        'retry_attempted': attempt > 0
-                    }
-                    
-            except Exception as e:
-                if attempt < self.publication_config['retry_attempts'] - 1:
-                    delay = self.publication_config['retry_delay_base'] * (2 ** attempt)
-                    logger.warning(f"⚠️ Exception retry {attempt + 2} for SKU {sp_api_data.get('sku')}: {str(e)}")
-                    await asyncio.sleep(delay)
-                    continue
-                
-                return {
-                    'success': False,
-                    'error': str(e),
-                    'attempts': attempt + 1,
-                    'retry_attempted': attempt > 0
-                }
-        
         return {
-            'success': False,
-            'error': 'Max retry attempts exceeded',
-            'attempts': self.publication_config['retry_attempts']
+            'header': {
+                'sellerId': seller_id,
+                'version': '2.0',
+                'issueLocale': MARKETPLACE_LANGUAGE_TAGS.get(marketplace_id, 'en_US')
+            },
+            'messages': [
+                {
+                    'messageId': message_id,
+                    'sku': message['sku'],
+                    'operationType': message.get('operation_type', 'PARTIAL_UPDATE'),
+                    'productType': message.get('product_type', 'PRODUCT'),
+                    'attributes': message['attributes']
+                }
+                for message_id, message in enumerate(messages, start=1)
+            ]
         }
-    
-    def _should_retry_error(self, error_code: str) -> bool:
+
+    def _map_feed_report(
+        self,
+        messages: List[Dict[str, Any]],
+        feed_id: str,
+        processing_status: str,
+        report: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Rattacher les issues du rapport de traitement à chaque message
+        """
+        if processing_status in ('CANCELLED', 'FATAL'):
+            return self._failed_feed_results(
+                messages, f'Feed {feed_id} {processing_status}', f'FEED_{processing_status}', feed_id
+            )
+
+        # IN_QUEUE/IN_PROGRESS après le délai d'attente : traitement non confirmé
+        if processing_status != 'DONE':
+            return self._pending_feed_results(messages, feed_id, processing_status)
+
+        # Issues par messageId ; sans messageId elles concernent tout le feed
+        issues_by_message: Dict[Any, List[Dict[str, Any]]] = {}
+        for issue in (report or {}).get('issues', []):
+            issues_by_message.setdefault(issue.get('messageId'), []).append(issue)
+        feed_issues = issues_by_message.get(None, [])
+
+        results = []
+        for message_id, message in enumerate(messages, start=1):
+            issues = feed_issues + issues_by_message.get(message_id, [])
+            errors = [f"{i.get('code')}: {i.get('message')}" for i in issues if i.get('severity') == 'ERROR']
+            warnings = [f"{i.get('code')}: {i.get('message')}" for i in issues if i.get('severity') == 'WARNING']
+
+            result = {
+                'sku': message['sku'],
+                'success': not errors,
+                'feed_id': feed_id,
+                'message_id': message_id,
+                'processing_status': 'INVALID' if errors else 'ACCEPTED',
+                'warnings': warnings
+            }
+
+            if errors:
+                result.update({
+                    'error': '; '.join(errors),
+                    'error_code': next(i.get('code') for i in issues if i.get('severity') == 'ERROR'),
+                    'errors': errors
+                })
+
+            results.append(result)
+
+        return results
+
+    def _pending_feed_results(
+        self,
+        messages: List[Dict[str, Any]],
+        feed_id: str,
+        processing_status: str
+    ) -> List[Dict[str, Any]]:
         """
-        Déterminer si une erreur justifie un retry
+        Résultat en attente pour chaque message d'un feed soumis dont le
+        traitement Amazon n'est pas confirmé (ni succès ni échec)
         """
-        retry_codes = [
-            'RequestThrottled',
-            'ServiceUnavailable',
-            'InternalError',
-            'QuotaExceeded',
-            'TooManyRequests'
+        return [
+            {
+                'sku': message['sku'],
+                'success': False,
+                'pending': True,
+                'feed_id': feed_id,
+                'message_id': message_id,
+                'processing_status': processing_status,
+                'warnings': []
+            }
+            for message_id, message in enumerate(messages, start=1)
         ]
-        
-        return error_code in retry_codes
-    
+
+    def _failed_feed_results(
+        self,
+        messages: List[Dict[str, Any]],
+        error: str,
+        error_code: str,
+        feed_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Résultat d'échec pour chaque message d'un feed non soumis ou rejeté
+        """
+        return [
+            {
+                'sku': message['sku'],
+                'success': False,
+                'feed_id': feed_id,
+                'message_id': message_id,
+                'processing_status': 'FAILED',
+                'error': error,
+                'error_code': error_code,
+                'errors': [error]
+            }
+            for message_id, message in enumerate(messages, start=1)
+        ]
+
+    def _prepare_listings_feed_message(
+        self,
+        update: Dict[str, Any],
+        update_type: str,
+        marketplace_id: str
+    ) -> Dict[str, Any]:
+        """
+        Préparer le message JSON_LISTINGS_FEED selon le type de mise à jour
+        """
+        allowed_fields = self.update_types.get(update_type, [])
+        fields = {field: update[field] for field in allowed_fields if field in update}
+        if 'standard_price' in fields:
+            fields['currency'] = update.get('currency', 'EUR')
+
+        return {
+            'sku': update.get('sku'),
+            'product_type': update.get('product_type', 'PRODUCT'),
+            'operation_type': 'PARTIAL_UPDATE',
+            'attributes': build_listing_attributes(fields, marketplace_id)
+        }
+
     def _compile_publication_results(
         self,
         all_results: List[Dict[str, Any]],
@@ -585,27 +702,31 @@ class AmazonPublisherService:
         Compiler les résultats de publication
         """
         success_count = len([r for r in all_results if r.get('success')])
-        error_count = len(all_results) - success_count
+        pending_count = len([r for r in all_results if r.get('pending')])
+        error_count = len(all_results) - success_count - pending_count
         
         # Grouper les erreurs par type
         error_summary = {}
         for result in all_results:
-            if not result.get('success'):
+            if not result.get('success') and not result.get('pending'):
                 error_code = result.get('error_code', 'Unknown')
                 if error_code not in error_summary:
                     error_summary[error_code] = 0
                 error_summary[error_code] += 1
         
-        # Feed IDs créés
-        feed_ids = [r.get('feed_id') for r in all_results if r.get('feed_id')]
+        # Feed IDs créés (un feed couvre plusieurs SKU)
+        feed_ids = list(dict.fromkeys(r.get('feed_id') for r in all_results if r.get('feed_id')))
+        pending_feed_ids = list(dict.fromkeys(r['feed_id'] for r in all_results if r.get('pending')))
         
         return {
-            'success': error_count == 0,
+            'success': error_count == 0 and pending_count == 0,
+            'pending': pending_count > 0,
             'session_id': context['session_id'],
             'summary': {
                 'total_updates': len(all_results),
                 'success_count': success_count,
                 'error_count': error_count,
+                'pending_count': pending_count,
                 'success_rate': round((success_count / len(all_results)) * 100, 1) if all_results else 0
             },
             'timing': {
@@ -615,7 +736,8 @@ class AmazonPublisherService:
             },
             'feed_tracking': {
                 'feed_ids_created': feed_ids,
-                'feeds_count': len(feed_ids)
+                'feeds_count': len(feed_ids),
+                'pending_feed_ids': pending_feed_ids
             },
             'error_breakdown': error_summary,
             'detailed_results': all_results
@@ -639,6 +761,9 @@ class AmazonPublisherService:
             # Log niveau approprié
             if results['success']:
                 logger.info(f"✅ Publication session {results['session_id']} completed successfully")
+            elif results['pending'] and not results['summary']['error_count']:
+                logger.info(f"⏳ Publication session {results['session_id']} awaiting Amazon processing: "
+                            f"{results['feed_tracking']['pending_feed_ids']}")
             else:
                 logger.error(f"❌ Publication session {results['session_id']} completed with errors")
             
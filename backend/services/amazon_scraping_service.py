@@ -12,6 +12,8 @@ import re
 from bs4 import BeautifulSoup
 import os
 
+from core.http_clients import get_http_session
+
 logger = logging.getLogger(__name__)
 
 class AmazonScrapingService:
@@ -118,19 +120,19 @@ class AmazonScrapingService:
                 }
                 
                 timeout = aiohttp.ClientTimeout(total=self.timeout)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.get(url, headers=headers) as response:
-                        if response.status == 200:
-                            content = await response.text()
-                            logger.info(f"✅ Successfully fetched {url} (attempt {attempt + 1})")
-                            return content
-                        elif response.status == 503:
-                            logger.warning(f"⚠️ Rate limited (503) for {url}, retrying...")
-                            continue
-                        else:
-                            logger.warning(f"⚠️ HTTP {response.status} for {url}")
-                            continue
-                            
+                session = await get_http_session('scraping')
+                async with session.get(url, headers=headers, timeout=timeout) as response:
+                    if response.status == 200:
+                        content = await response.text()
+                        logger.info(f"✅ Successfully fetched {url} (attempt {attempt + 1})")
+                        return content
+                    elif response.status == 503:
+                        logger.warning(f"⚠️ Rate limited (503) for {url}, retrying...")
+                        continue
+                    else:
+                        logger.warning(f"⚠️ HTTP {response.status} for {url}")
+                        continue
+                        
             except asyncio.TimeoutError:
                 logger.warning(f"⏰ Timeout for {url} (attempt {attempt + 1})")
                 continue
@@ -0,0 +1,180 @@
+# Amazon SP-API Access Token Cache
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from models.amazon_spapi import SPAPITokenData
+
+logger = logging.getLogger(__name__)
+
+# Loader: (force_refresh) -> decrypted token data, refreshed through LWA when needed
+TokenLoader = Callable[[bool], Awaitable[SPAPITokenData]]
+
+
+class AccessTokenCache:
+    """
+    Process-wide cache of decrypted SP-API access tokens, keyed by connection id
+
+    Features:
+    - Expiry-aware reuse (no decryption or database access on a cache hit)
+    - Single-flight loading: concurrent callers share one decrypt/LWA refresh
+    - Proactive background refresh when a cached token nears expiry
+    - Debounced last_used_at writes (one bulk_write per collection per interval)
+    """
+
+    def __init__(
+        self,
+        expiry_margin: timedelta = timedelta(minutes=5),
+        proactive_refresh_window: timedelta = timedelta(minutes=10),
+        last_used_flush_interval: float = 30.0
+    ):
+        """
+        Args:
+            expiry_margin: Tokens expiring within this margin are never served
+            proactive_refresh_window: Tokens expiring within this window are
+                refreshed in the background while still being served
+            last_used_flush_interval: Seconds between last_used_at flushes
+        """
+        self.expiry_margin = expiry_margin
+        self.proactive_refresh_window = proactive_refresh_window
+        self.last_used_flush_interval = last_used_flush_interval
+
+        self._tokens: Dict[str, Tuple[str, datetime]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        # Pending last_used_at writes, grouped by collection
+        self._pending_last_used: Dict[Any, Tuple[Any, Dict[str, datetime]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "background_refreshes": 0, "last_used_writes": 0}
+
+    async def get_token(self, connection_id: str, loader: TokenLoader) -> str:
+        """
+        Get a valid access token for a connection
+
+        Args:
+            connection_id: Connection identifier
+            loader: Coroutine function loading (force_refresh=True: refreshing) token data
+
+        Returns:
+            Access token
+
+        Raises:
+            Exception raised by the loader when no valid token is cached
+        """
+        now = datetime.utcnow()
+        cached = self._tokens.get(connection_id)
+
+        if cached is not None and now + self.expiry_margin < cached[1]:
+            self.stats["hits"] += 1
+            if now + self.proactive_refresh_window >= cached[1] and connection_id not in self._inflight:
+                self.stats["background_refreshes"] += 1
+                self._start_load(connection_id, loader, force_refresh=True, background=True)
+            return cached[0]
+
+        self.stats["misses"] += 1
+
+        # shield: a cancelled caller must not cancel the load shared with other callers
+        task = self._inflight.get(connection_id)
+        if task is not None:
+            access_token = await asyncio.shield(task)
+            if access_token is not None:
+                return access_token
+
+        # No load in flight, or a failed background refresh: load in the foreground
+        task = self._inflight.get(connection_id) or self._start_load(
+            connection_id, loader, force_refresh=False, background=False
+        )
+        return await asyncio.shield(task)
+
+    def _start_load(self, connection_id: str, loader: TokenLoader, force_refresh: bool,
+                    background: bool) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(
+            self._load(connection_id, loader, force_refresh, background)
+        )
+        self._inflight[connection_id] = task
+        return task
+
+    async def _load(self, connection_id: str, loader: TokenLoader, force_refresh: bool,
+                    background: bool) -> Optional[str]:
+        try:
+            self.stats["loads"] += 1
+            token_data = await loader(force_refresh)
+            self._tokens[connection_id] = (token_data.access_token, token_data.expires_at)
+            return token_data.access_token
+
+        except Exception as e:
+            if not background:
+                raise
+            # Current token stays cached until it expires; the next miss retries
+            logger.warning(f"⚠️ Background token refresh failed for connection {connection_id}: {type(e).__name__}")
+            return None
+
+        finally:
+            self._inflight.pop(connection_id, None)
+
+    def invalidate(self, connection_id: str) -> None:
+        """Forget the cached token of a connection (new tokens, revocation, error)"""
+        self._tokens.pop(connection_id, None)
+
+    def mark_used(self, connection_id: str, collection: Any) -> None:
+        """Record a use of the connection; last_used_at is written on the next flush"""
+        key = getattr(collection, "full_name", None) or id(collection)
+        _, pending = self._pending_last_used.setdefault(key, (collection, {}))
+        pending[connection_id] = datetime.utcnow()
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.last_used_flush_interval)
+        await self.flush_last_used()
+
+    async def flush_last_used(self) -> int:
+        """Write pending last_used_at timestamps (one bulk_write per collection)"""
+        pending_by_collection, self._pending_last_used = self._pending_last_used, {}
+        written = 0
+
+        for collection, pending in pending_by_collection.values():
+            try:
+                await collection.bulk_write(
+                    [UpdateOne({"id": connection_id}, {"$set": {"last_used_at": used_at}})
+                     for connection_id, used_at in pending.items()],
+                    ordered=False
+                )
+                written += len(pending)
+            except Exception as e:
+                logger.warning(f"⚠️ last_used_at flush failed for {len(pending)} connections: {type(e).__name__}")
+
+        self.stats["last_used_writes"] += written
+        return written
+
+    async def close(self) -> None:
+        """Cancel the pending flush timer and write outstanding timestamps"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        await self.flush_last_used()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "cached_tokens": len(self._tokens),
+            "inflight_loads": len(self._inflight),
+            "pending_last_used": sum(len(pending) for _, pending in self._pending_last_used.values())
+        }
+
+
+# Global process instance (connection services are created per request)
+_access_token_cache: Optional[AccessTokenCache] = None
+
+
+def get_access_token_cache() -> AccessTokenCache:
+    """Get the global access token cache"""
+    global _access_token_cache
+    if _access_token_cache is None:
+        _access_token_cache = AccessTokenCache()
+    return _access_token_cache
@@ -16,6 +16,7 @@ from decimal import Decimal, ROUND_HALF_UP
 import json
 import logging
 
+from core.http_clients import get_http_session
 from models.market_settings import ExchangeRate
 from services.logging_service import log_info, log_error, log_operation
 
@@ -38,8 +39,11 @@ class CurrencyConversionService:
         self.cache_ttl_hours = int(os.environ.get('CURRENCY_CACHE_TTL_HOURS', '24'))
         self.default_timeout = int(os.environ.get('CURRENCY_API_TIMEOUT_MS', '10000')) / 1000
         
-        # Session HTTP réutilisable
-        self.session = None
+        # Requêtes via la session partagée 'default' du registre HTTP
+        self.headers = {
+            'User-Agent': 'ECOMSIMPLY-Currency-Service/1.0',
+            'Accept': 'application/json'
+        }
         
         # Devises supportées
         self.supported_currencies = ['EUR', 'GBP', 'USD']
@@ -53,21 +57,8 @@ class CurrencyConversionService:
             supported_currencies=self.supported_currencies
         )
     
-    async def _ensure_session(self):
-        """Créer la session HTTP si nécessaire"""
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=self.default_timeout),
-                headers={
-                    'User-Agent': 'ECOMSIMPLY-Currency-Service/1.0',
-                    'Accept': 'application/json'
-                }
-            )
-    
     async def close(self):
-        """Fermer la session HTTP"""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Rien à fermer : la session partagée est fermée au shutdown du serveur"""
     
     async def get_exchange_rate(
         self, 
@@ -248,8 +239,6 @@ class CurrencyConversionService:
     ) -> Optional[float]:
         """Récupérer le taux depuis exchangerate.host"""
         try:
-            await self._ensure_session()
-            
             url = f"https://api.exchangerate.host/convert"
             params = {
                 'from': base_currency,
@@ -257,7 +246,9 @@ class CurrencyConversionService:
                 'amount': 1
             }
             
-            async with self.session.get(url, params=params) as response:
+            session = await get_http_session('default')
+            async with session.get(url, params=params, headers=self.headers,
+                                   timeout=aiohttp.ClientTimeout(total=self.default_timeout)) as response:
                 if response.status == 200:
                     data = await response.json()
                     
@@ -313,8 +304,6 @@ class CurrencyConversionService:
             return None
             
         try:
-            await self._ensure_session()
-            
             # OXR utilise USD comme base par défaut
             url = "https://openexchangerates.org/api/latest.json"
             params = {
@@ -322,7 +311,9 @@ class CurrencyConversionService:
                 'base': base_currency
             }
             
-            async with self.session.get(url, params=params) as response:
+            session = await get_http_session('default')
+            async with session.get(url, params=params, headers=self.headers,
+                                   timeout=aiohttp.ClientTimeout(total=self.default_timeout)) as response:
                 if response.status == 200:
                     data = await response.json()
                     
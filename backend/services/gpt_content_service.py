@@ -89,7 +89,7 @@ class GPTContentService:
             try:
                 self.client = AsyncOpenAI(api_key=self.openai_key, timeout=60.0)
             except Exception as e:
-                print(f"❌ Erreur initialisation OpenAI: {e}")
+                ecomsimply_logger.error(f"❌ Erreur initialisation OpenAI: {e}")
     
     async def generate_product_content(
         self,
@@ -395,7 +395,7 @@ class GPTContentService:
             {"role": "user", "content": user_prompt}
         ]
         
-        print(f"🚀 Appel {model} avec contexte {user_level}")
+        ecomsimply_logger.debug(f"🚀 Appel {model} avec contexte {user_level}")
         
         # Appel OpenAI
         completion = await self.client.chat.completions.create(
@@ -407,7 +407,7 @@ class GPTContentService:
         )
         
         response_content = completion.choices[0].message.content
-        print(f"✅ {model} Response: {len(response_content)} caractères")
+        ecomsimply_logger.debug(f"✅ {model} Response: {len(response_content)} caractères")
         
         # Parsing JSON avec enrichissement SEO tendance
         result = self._parse_gpt_response(response_content)
@@ -553,8 +553,8 @@ Génère maintenant le JSON complet:"""
             result = json.loads(cleaned_response)
             return result
         except json.JSONDecodeError as e:
-            print(f"❌ Erreur parsing JSON: {e}")
-            print(f"📄 Contenu: {cleaned_response[:200]}...")
+            ecomsimply_logger.error(f"❌ Erreur parsing JSON: {e}")
+            ecomsimply_logger.debug(f"📄 Contenu: {cleaned_response[:200]}...")
             raise Exception(f"Erreur parsing réponse GPT: {e}")
     
     async def _generate_intelligent_fallback(
@@ -568,7 +568,7 @@ Génère maintenant le JSON complet:"""
     ) -> Dict:
         """Génération de contenu fallback intelligent"""
         
-        print("🔄 GÉNÉRATION FALLBACK INTELLIGENT")
+        ecomsimply_logger.info("🔄 GÉNÉRATION FALLBACK INTELLIGENT")
         
         # Templates de base par langue
         templates = {
@@ -644,7 +644,7 @@ Génère maintenant le JSON complet:"""
             "is_ai_generated": True
         }
         
-        print("✅ FALLBACK INTELLIGENT généré")
+        ecomsimply_logger.debug("✅ FALLBACK INTELLIGENT généré")
         return result
     
     def _enrich_seo_with_20_tags(
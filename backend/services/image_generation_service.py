@@ -14,6 +14,8 @@ import re
 import time
 from typing import List, Dict, Optional, Union
 
+from core.http_clients import get_http_session
+
 # Import du logging structuré
 from .logging_service import ecomsimply_logger, log_error, log_info, log_operation
 
@@ -231,30 +233,30 @@ class ImageGenerationService:
                 image_url = result["images"][0]["url"]
                 
                 # Téléchargement et conversion base64
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(image_url, timeout=30) as response:
-                        if response.status == 200:
-                            image_data = await response.read()
-                            image_base64 = base64.b64encode(image_data).decode('utf-8')
-                            
-                            if len(image_base64) > 5000:  # Validation taille minimale
-                                duration_ms = (time.time() - start_time) * 1000
-                                log_operation(
-                                    "ImageGenerationService",
-                                    "fal_generation",
-                                    "success",
-                                    duration_ms=duration_ms,
-                                    user_id=user_id,
-                                    product_name=product_name,
-                                    image_number=image_number,
-                                    image_size_bytes=len(image_base64),
-                                    download_size_bytes=len(image_data)
-                                )
-                                return image_base64
-                            else:
-                                raise Exception(f"Image {image_number} trop petite ({len(image_base64)} bytes)")
+                session = await get_http_session('downloads')
+                async with session.get(image_url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    if response.status == 200:
+                        image_data = await response.read()
+                        image_base64 = base64.b64encode(image_data).decode('utf-8')
+
+                        if len(image_base64) > 5000:  # Validation taille minimale
+                            duration_ms = (time.time() - start_time) * 1000
+                            log_operation(
+                                "ImageGenerationService",
+                                "fal_generation",
+                                "success",
+                                duration_ms=duration_ms,
+                                user_id=user_id,
+                                product_name=product_name,
+                                image_number=image_number,
+                                image_size_bytes=len(image_base64),
+                                download_size_bytes=len(image_data)
+                            )
+                            return image_base64
                         else:
-                            raise Exception(f"Échec téléchargement image {image_number} - Status: {response.status}")
+                            raise Exception(f"Image {image_number} trop petite ({len(image_base64)} bytes)")
+                    else:
+                        raise Exception(f"Échec téléchargement image {image_number} - Status: {response.status}")
             
             raise Exception("Pas de résultat valide de FAL.ai")
             
@@ -372,7 +374,7 @@ class ImageGenerationService:
     ) -> List[str]:
         """Scraping d'images produit depuis diverses sources (méthode alternative)"""
         
-        print(f"🌐 SCRAPING IMAGES pour: {product_name}")
+        ecomsimply_logger.info(f"🌐 SCRAPING IMAGES pour: {product_name}")
         
         images = []
         
@@ -387,41 +389,41 @@ class ImageGenerationService:
                 f"https://www.google.com/search?q={product_name.replace(' ', '+')}&tbm=isch",
             ]
             
-            async with aiohttp.ClientSession(headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as session:
-                for source in search_sources:
-                    try:
-                        async with session.get(source) as response:
-                            if response.status == 200:
-                                html = await response.text()
-                                # Extraction basique des URLs d'images
-                                soup = BeautifulSoup(html, 'html.parser')
-                                img_tags = soup.find_all('img', src=True)[:max_images]
-                                
-                                for img in img_tags:
-                                    img_url = img['src']
-                                    if img_url.startswith('http') and len(images) < max_images:
-                                        try:
-                                            # Téléchargement de l'image
-                                            async with session.get(img_url) as img_response:
-                                                if img_response.status == 200:
-                                                    img_data = await img_response.read()
-                                                    if len(img_data) > 5000:  # Taille minimale
-                                                        img_base64 = base64.b64encode(img_data).decode('utf-8')
-                                                        images.append(img_base64)
-                                        except:
-                                            continue
-                        
-                        if len(images) >= max_images:
-                            break
-                            
-                    except Exception as e:
-                        print(f"❌ Erreur scraping source: {e}")
-                        continue
+            session = await get_http_session('scraping')
+            for source in search_sources:
+                try:
+                    async with session.get(source, headers=headers) as response:
+                        if response.status == 200:
+                            html = await response.text()
+                            # Extraction basique des URLs d'images
+                            soup = BeautifulSoup(html, 'html.parser')
+                            img_tags = soup.find_all('img', src=True)[:max_images]
+
+                            for img in img_tags:
+                                img_url = img['src']
+                                if img_url.startswith('http') and len(images) < max_images:
+                                    try:
+                                        # Téléchargement de l'image
+                                        async with session.get(img_url, headers=headers) as img_response:
+                                            if img_response.status == 200:
+                                                img_data = await img_response.read()
+                                                if len(img_data) > 5000:  # Taille minimale
+                                                    img_base64 = base64.b64encode(img_data).decode('utf-8')
+                                                    images.append(img_base64)
+                                    except:
+                                        continue
+
+                    if len(images) >= max_images:
+                        break
+
+                except Exception as e:
+                    ecomsimply_logger.error(f"❌ Erreur scraping source: {e}")
+                    continue
                         
         except Exception as e:
-            print(f"❌ Erreur scraping général: {e}")
+            ecomsimply_logger.error(f"❌ Erreur scraping général: {e}")
         
-        print(f"📸 SCRAPING: {len(images)} images récupérées")
+        ecomsimply_logger.info(f"📸 SCRAPING: {len(images)} images récupérées")
         return images
 
 
@@ -1,15 +1,62 @@
 """
 Logging Service - ECOMSIMPLY
 Système de logging centralisé et structuré pour tous les services
+Écritures console/fichier déportées sur un thread (QueueHandler/QueueListener) :
+un appel de log ne bloque jamais la boucle d'événements.
 """
 
+import atexit
 import logging
 import json
+import queue
 import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict, Optional, Any
 from pathlib import Path
 
+# Listeners actifs par nom de logger ("" = racine)
+_queue_listeners: Dict[str, QueueListener] = {}
+
+
+def attach_queue_handler(logger: logging.Logger) -> Optional[QueueListener]:
+    """
+    Remplacer les handlers d'un logger par un QueueHandler
+    
+    Les handlers d'origine (console, fichier) sont servis par un QueueListener
+    sur un thread dédié ; l'appelant ne fait qu'enfiler l'enregistrement.
+    
+    Returns:
+        Listener démarré, ou None si le logger n'a pas de handler à déporter
+    """
+    handlers = [handler for handler in logger.handlers if not isinstance(handler, QueueHandler)]
+    if not handlers:
+        return None
+    
+    # Un seul listener par logger (reconfiguration)
+    previous = _queue_listeners.pop(logger.name, None)
+    if previous is not None:
+        previous.stop()
+    
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    logger.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    
+    _queue_listeners[logger.name] = listener
+    return listener
+
+
+def stop_queue_listeners() -> None:
+    """Vider les files et arrêter les threads d'écriture (arrêt du process)"""
+    while _queue_listeners:
+        _, listener = _queue_listeners.popitem()
+        listener.stop()
+
+
+atexit.register(stop_queue_listeners)
+
+
 class StructuredLogger:
     """Logger structuré avec contexte utilisateur et métadonnées"""
     
@@ -52,6 +99,9 @@ class StructuredLogger:
             # Fallback si impossible d'écrire dans le fichier
             pass
         
+        # Écritures hors boucle d'événements
+        attach_queue_handler(logger)
+        
         return logger
     
     def _format_message(
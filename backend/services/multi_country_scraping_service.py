@@ -20,6 +20,7 @@ from bs4 import BeautifulSoup
 import json
 import logging
 
+from core.http_clients import get_http_session
 from models.market_settings import MarketSource, PriceSnapshot, DEFAULT_MARKET_SOURCES
 from services.logging_service import log_info, log_error, log_operation
 
@@ -46,8 +47,8 @@ class MultiCountryScrapingService:
         self.max_retries = 3
         self.retry_backoff_base = 2  # secondes
         
-        # Sessions HTTP par domaine pour réutilisation
-        self.sessions = {}
+        # En-têtes par domaine (User-Agent fixe par domaine) ; connexions via la session partagée 'scraping'
+        self.domain_headers: Dict[str, Dict[str, str]] = {}
         
         # User agents pour rotation
         self.user_agents = [
@@ -65,32 +66,23 @@ class MultiCountryScrapingService:
             max_retries=self.max_retries
         )
     
-    async def _get_session_for_domain(self, domain: str) -> aiohttp.ClientSession:
-        """Obtenir ou créer une session HTTP pour un domaine"""
-        if domain not in self.sessions or self.sessions[domain].closed:
-            timeout = aiohttp.ClientTimeout(total=self.default_timeout_ms / 1000)
-            
-            self.sessions[domain] = aiohttp.ClientSession(
-                timeout=timeout,
-                headers={
-                    'User-Agent': random.choice(self.user_agents),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                }
-            )
+    def _get_headers_for_domain(self, domain: str) -> Dict[str, str]:
+        """En-têtes HTTP d'un domaine (User-Agent tiré une fois par domaine)"""
+        if domain not in self.domain_headers:
+            self.domain_headers[domain] = {
+                'User-Agent': random.choice(self.user_agents),
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
+                'Accept-Encoding': 'gzip, deflate, br',
+                'DNT': '1',
+                'Upgrade-Insecure-Requests': '1'
+            }
         
-        return self.sessions[domain]
+        return self.domain_headers[domain]
     
     async def close_all_sessions(self):
-        """Fermer toutes les sessions HTTP"""
-        for session in self.sessions.values():
-            if not session.closed:
-                await session.close()
-        self.sessions.clear()
+        """Oublier les en-têtes par domaine (la session partagée est fermée au shutdown du serveur)"""
+        self.domain_headers.clear()
     
     async def _respect_rate_limit(self, domain: str):
         """Respecter le rate limit par domaine"""
@@ -238,9 +230,13 @@ class MultiCountryScrapingService:
         # Scraper avec retry
         for attempt in range(self.max_retries + 1):
             try:
-                session = await self._get_session_for_domain(domain)
+                session = await get_http_session('scraping')
                 
-                async with session.get(search_url) as response:
+                async with session.get(
+                    search_url,
+                    headers=self._get_headers_for_domain(domain),
+                    timeout=aiohttp.ClientTimeout(total=self.default_timeout_ms / 1000)
+                ) as response:
                     if response.status == 200:
                         html_content = await response.text()
                         
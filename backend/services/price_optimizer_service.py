@@ -1,6 +1,5 @@
 # Price Optimizer Service - Phase 3
 import asyncio
-import aiohttp
 from typing import Dict, Any, List, Optional, Tuple
 import logging
 from datetime import datetime, timedelta
@@ -8,6 +7,8 @@ import json
 import statistics
 import os
 
+from core.http_clients import get_http_session
+
 logger = logging.getLogger(__name__)
 
 class PriceOptimizerService:
@@ -316,20 +317,20 @@ class PriceOptimizerService:
                 'symbols': 'USD,GBP,EUR'
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.fx_api_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('success'):
-                            rates = data.get('rates', {})
-                            # Ajouter EUR = 1 (base)
-                            rates['EUR'] = 1.0
-                            
-                            self.fx_cache = rates
-                            self.fx_cache_timestamp = datetime.utcnow()
-                            
-                            logger.info(f"✅ Updated FX rates: {rates}")
-                            return rates
+            session = await get_http_session('default')
+            async with session.get(self.fx_api_url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if data.get('success'):
+                        rates = data.get('rates', {})
+                        # Ajouter EUR = 1 (base)
+                        rates['EUR'] = 1.0
+                        
+                        self.fx_cache = rates
+                        self.fx_cache_timestamp = datetime.utcnow()
+                        
+                        logger.info(f"✅ Updated FX rates: {rates}")
+                        return rates
             
             logger.warning("⚠️ FX API failed, using default rates")
             return self._get_default_exchange_rates()
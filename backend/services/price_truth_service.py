@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import asdict
+import logging
 
 from models.price_truth import (
     PriceTruth, PriceSource, PriceConsensus, ConsensusPriceStatus,
@@ -18,6 +19,8 @@ from services.pricing import (
     CdiscountAdapter, FnacAdapter, PriceExtractionResult
 )
 
+logger = logging.getLogger(__name__)
+
 
 class PriceTruthService:
     """Service principal pour la vérification de prix multi-sources"""
@@ -109,7 +112,7 @@ class PriceTruthService:
         Returns:
             PriceTruth avec consensus calculé
         """
-        print(f"🔍 PriceTruth: Récupération prix pour '{query}'")
+        logger.debug(f"🔍 PriceTruth: Récupération prix pour '{query}'")
         
         # Lancer toutes les sources en parallèle avec limite de concurrence
         semaphore = asyncio.Semaphore(3)  # Max 3 sources simultanées
@@ -127,7 +130,7 @@ class PriceTruthService:
         for i, result in enumerate(extraction_results):
             if isinstance(result, Exception):
                 source_name = list(self.adapters.keys())[i]
-                print(f"❌ Erreur source {source_name}: {result}")
+                logger.error(f"❌ Erreur source {source_name}: {result}")
                 continue
             
             if result and result.success and result.price:
@@ -147,7 +150,7 @@ class PriceTruthService:
         self.stats['sources_queried'] += len(valid_sources)
         
         if len(valid_sources) < 2:
-            print(f"⚠️ PriceTruth: Seulement {len(valid_sources)} source(s) valide(s), consensus impossible")
+            logger.warning(f"⚠️ PriceTruth: Seulement {len(valid_sources)} source(s) valide(s), consensus impossible")
             consensus = PriceConsensus(
                 agreeing_sources=len(valid_sources),
                 status=ConsensusPriceStatus.INSUFFICIENT_EVIDENCE
@@ -172,7 +175,7 @@ class PriceTruthService:
             ttl_hours=self.ttl_hours
         )
         
-        print(f"✅ PriceTruth: Consensus calculé - Status: {consensus.status}, Prix: {price_truth.value}€")
+        logger.debug(f"✅ PriceTruth: Consensus calculé - Status: {consensus.status}, Prix: {price_truth.value}€")
         return price_truth
     
     async def _fetch_from_source_with_semaphore(
@@ -191,7 +194,7 @@ class PriceTruthService:
                     result.name = name
                     return result
             except Exception as e:
-                print(f"❌ Erreur adapter {name}: {e}")
+                logger.error(f"❌ Erreur adapter {name}: {e}")
                 return None
     
     def _calculate_consensus(self, sources: List[PriceSource]) -> PriceConsensus:
@@ -330,7 +333,7 @@ class PriceTruthService:
                 await self.get_price_truth(sku=record.sku, force_refresh=True)
                 refreshed += 1
             except Exception as e:
-                print(f"❌ Erreur refresh {record.sku}: {e}")
+                logger.error(f"❌ Erreur refresh {record.sku}: {e}")
                 errors += 1
         
         return {
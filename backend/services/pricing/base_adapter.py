@@ -120,7 +120,7 @@ class BasePriceAdapter(ABC):
             if hasattr(self, 'playwright'):
                 await self.playwright.stop()
         except Exception as e:
-            print(f"⚠️ Erreur cleanup browser {self.name}: {e}")
+            logger.warning(f"⚠️ Erreur cleanup browser {self.name}: {e}")
     
     async def _throttle_request(self):
         """Applique le throttling entre les requêtes"""
@@ -168,7 +168,7 @@ class BasePriceAdapter(ABC):
             return Decimal(cleaned)
             
         except (InvalidOperation, ValueError) as e:
-            print(f"⚠️ {self.name}: Impossible de parser '{price_text}': {e}")
+            logger.warning(f"⚠️ {self.name}: Impossible de parser '{price_text}': {e}")
             return None
     
     async def _take_screenshot(self, page: Page, query: str) -> Optional[str]:
@@ -181,7 +181,7 @@ class BasePriceAdapter(ABC):
             await page.screenshot(path=str(screenshot_path), full_page=False)
             return str(screenshot_path)
         except Exception as e:
-            print(f"⚠️ {self.name}: Erreur screenshot: {e}")
+            logger.warning(f"⚠️ {self.name}: Erreur screenshot: {e}")
             return None
     
     @abstractmethod
@@ -224,7 +224,7 @@ class BasePriceAdapter(ABC):
                     page.set_default_timeout(12000)
                     
                     search_url = self._get_search_url(query)
-                    print(f"🔍 {self.name}: Recherche '{query}' -> {search_url}")
+                    logger.debug(f"🔍 {self.name}: Recherche '{query}' -> {search_url}")
                     
                     await page.goto(search_url, wait_until='domcontentloaded')
                     
@@ -235,9 +235,9 @@ class BasePriceAdapter(ABC):
                     
                     if result.success:
                         self.success_count += 1
-                        print(f"✅ {self.name}: Prix trouvé {result.price}€ pour '{query}'")
+                        logger.debug(f"✅ {self.name}: Prix trouvé {result.price}€ pour '{query}'")
                     else:
-                        print(f"⚠️ {self.name}: Échec extraction '{query}': {result.error_message}")
+                        logger.warning(f"⚠️ {self.name}: Échec extraction '{query}': {result.error_message}")
                     
                     return result
                     
@@ -246,7 +246,7 @@ class BasePriceAdapter(ABC):
                     
             except Exception as e:
                 error_msg = f"Erreur tentative {attempt + 1}/{max_retries + 1}: {str(e)}"
-                print(f"❌ {self.name}: {error_msg}")
+                logger.error(f"❌ {self.name}: {error_msg}")
                 
                 if attempt == max_retries:
                     return PriceExtractionResult(
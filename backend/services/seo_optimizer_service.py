@@ -8,6 +8,8 @@ from datetime import datetime
 import asyncio
 import aiohttp
 
+from core.http_clients import get_http_session
+
 logger = logging.getLogger(__name__)
 
 class SEOOptimizerService:
@@ -183,28 +185,28 @@ class SEOOptimizerService:
                 'max_tokens': 2000
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.openai_api_url, 
-                    headers=headers, 
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=60)
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        ai_content = result['choices'][0]['message']['content']
-                        
-                        # Parser la réponse JSON
-                        try:
-                            optimized_seo = json.loads(ai_content)
-                            logger.info("✅ AI SEO optimization successful")
-                            return optimized_seo
-                        except json.JSONDecodeError:
-                            logger.warning("⚠️ AI response not valid JSON, using fallback")
-                            return self._fallback_seo_optimization(context)
-                    else:
-                        logger.warning(f"⚠️ OpenAI API error {response.status}, using fallback")
+            session = await get_http_session('default')
+            async with session.post(
+                self.openai_api_url, 
+                headers=headers, 
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=60)
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    ai_content = result['choices'][0]['message']['content']
+                    
+                    # Parser la réponse JSON
+                    try:
+                        optimized_seo = json.loads(ai_content)
+                        logger.info("✅ AI SEO optimization successful")
+                        return optimized_seo
+                    except json.JSONDecodeError:
+                        logger.warning("⚠️ AI response not valid JSON, using fallback")
                         return self._fallback_seo_optimization(context)
+                else:
+                    logger.warning(f"⚠️ OpenAI API error {response.status}, using fallback")
+                    return self._fallback_seo_optimization(context)
         
         except Exception as e:
             logger.error(f"❌ AI optimization error: {str(e)}, using fallback")
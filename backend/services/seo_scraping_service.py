@@ -15,6 +15,8 @@ from bs4 import BeautifulSoup
 import re
 from typing import Dict, List, Optional, Set
 
+from core.http_clients import get_http_session
+
 # Import du logging structuré
 from .logging_service import ecomsimply_logger, log_error, log_info, log_operation
 
@@ -267,7 +269,7 @@ class SEOScrapingService:
     ) -> Dict:
         """Scraping avancé des prix concurrents avec analyse statistique"""
         
-        print(f"💰 ANALYSE PRIX CONCURRENTS pour: {product_name}")
+        ecomsimply_logger.info(f"💰 ANALYSE PRIX CONCURRENTS pour: {product_name}")
         
         # Configuration sources prix
         price_sources = [
@@ -310,49 +312,49 @@ class SEOScrapingService:
                 if category.lower() in category_keywords:
                     search_query = f"{product_name} {category_keywords[category.lower()]}"
             
-            async with aiohttp.ClientSession(headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as session:
-                
-                for source in price_sources:
-                    try:
-                        print(f"🔍 Analyse prix sur {source['name']}...")
-                        
-                        search_url = source['search_url'].format(query=search_query.replace(' ', '+'))
-                        
-                        async with session.get(search_url) as response:
-                            if response.status == 200:
-                                html_content = await response.text()
-                                soup = BeautifulSoup(html_content, 'html.parser')
-                                
-                                # Recherche prix avec sélecteurs
-                                source_prices = []
-                                for selector in source['selectors']:
-                                    elements = soup.select(selector)
-                                    for element in elements[:3]:  # Limite à 3 par sélecteur
-                                        price_text = element.get_text(strip=True)
-                                        # Extraction prix avec regex
-                                        price_matches = re.findall(r'(\d+)[,.](\d+)', price_text)
-                                        if price_matches:
-                                            try:
-                                                price = float(f"{price_matches[0][0]}.{price_matches[0][1]}")
-                                                if 10 <= price <= 10000:  # Validation prix raisonnable
-                                                    source_prices.append({
-                                                        'price': price,
-                                                        'source': source['name'],
-                                                        'weight': source['weight']
-                                                    })
-                                            except:
-                                                continue
-                                
-                                if source_prices:
-                                    all_prices.extend(source_prices)
-                                    sources_analyzed.append(source['name'])
-                                    print(f"✅ {source['name']}: {len(source_prices)} prix trouvés")
+            session = await get_http_session('scraping')
+            
+            for source in price_sources:
+                try:
+                    ecomsimply_logger.debug(f"🔍 Analyse prix sur {source['name']}...")
+                    
+                    search_url = source['search_url'].format(query=search_query.replace(' ', '+'))
+                    
+                    async with session.get(search_url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                        if response.status == 200:
+                            html_content = await response.text()
+                            soup = BeautifulSoup(html_content, 'html.parser')
                             
-                            await asyncio.sleep(1)  # Délai entre requêtes
+                            # Recherche prix avec sélecteurs
+                            source_prices = []
+                            for selector in source['selectors']:
+                                elements = soup.select(selector)
+                                for element in elements[:3]:  # Limite à 3 par sélecteur
+                                    price_text = element.get_text(strip=True)
+                                    # Extraction prix avec regex
+                                    price_matches = re.findall(r'(\d+)[,.](\d+)', price_text)
+                                    if price_matches:
+                                        try:
+                                            price = float(f"{price_matches[0][0]}.{price_matches[0][1]}")
+                                            if 10 <= price <= 10000:  # Validation prix raisonnable
+                                                source_prices.append({
+                                                    'price': price,
+                                                    'source': source['name'],
+                                                    'weight': source['weight']
+                                                })
+                                        except:
+                                            continue
                             
-                    except Exception as e:
-                        print(f"❌ Erreur {source['name']}: {e}")
-                        continue
+                            if source_prices:
+                                all_prices.extend(source_prices)
+                                sources_analyzed.append(source['name'])
+                                ecomsimply_logger.debug(f"✅ {source['name']}: {len(source_prices)} prix trouvés")
+                        
+                        await asyncio.sleep(1)  # Délai entre requêtes
+                        
+                except Exception as e:
+                    ecomsimply_logger.error(f"❌ Erreur {source['name']}: {e}")
+                    continue
             
             # Analyse statistique
             if len(all_prices) == 0:
@@ -361,7 +363,7 @@ class SEOScrapingService:
             return self._analyze_prices(all_prices, sources_analyzed)
             
         except Exception as e:
-            print(f"❌ ERREUR ANALYSE PRIX: {e}")
+            ecomsimply_logger.error(f"❌ ERREUR ANALYSE PRIX: {e}")
             return self._empty_price_result()
     
     def _analyze_prices(self, all_prices: List[Dict], sources_analyzed: List[str]) -> Dict:
@@ -391,7 +393,7 @@ class SEOScrapingService:
             'high': len([p for p in prices_only if p > high_threshold])
         }
         
-        print(f"📊 ANALYSE: {len(all_prices)} prix | Fourchette: {min_price:.2f}€ - {max_price:.2f}€")
+        ecomsimply_logger.info(f"📊 ANALYSE: {len(all_prices)} prix | Fourchette: {min_price:.2f}€ - {max_price:.2f}€")
         
         return {
             'found_prices': len(all_prices),
@@ -423,7 +425,7 @@ class SEOScrapingService:
     ) -> Dict:
         """Scraping de données SEO depuis diverses sources"""
         
-        print(f"🔍 SCRAPING SEO DATA pour: {product_name}")
+        ecomsimply_logger.debug(f"🔍 SCRAPING SEO DATA pour: {product_name}")
         
         seo_data = {
             "titles": [],
@@ -445,48 +447,48 @@ class SEOScrapingService:
                 f"https://www.amazon.fr/s?k={product_name.replace(' ', '+')}"
             ]
             
-            async with aiohttp.ClientSession(headers=headers, timeout=aiohttp.ClientTimeout(total=20)) as session:
-                
-                for url in search_urls:
-                    try:
-                        async with session.get(url) as response:
-                            if response.status == 200:
-                                html = await response.text()
-                                soup = BeautifulSoup(html, 'html.parser')
-                                
-                                # Extraction titres
-                                titles = soup.find_all(['h1', 'h2', 'h3'], limit=5)
-                                for title in titles:
-                                    title_text = title.get_text(strip=True)
-                                    if product_name.lower() in title_text.lower():
-                                        seo_data["titles"].append(title_text)
-                                
-                                # Extraction descriptions
-                                descriptions = soup.find_all(['p', 'div'], limit=10)
-                                for desc in descriptions:
-                                    desc_text = desc.get_text(strip=True)
-                                    if len(desc_text) > 50 and product_name.lower() in desc_text.lower():
-                                        seo_data["descriptions"].append(desc_text[:200])
-                                
-                                # Extraction mots-clés depuis meta tags
-                                meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-                                if meta_keywords and meta_keywords.get('content'):
-                                    keywords = meta_keywords['content'].split(',')
-                                    seo_data["keywords"].extend([k.strip() for k in keywords[:10]])
-                        
-                        await asyncio.sleep(0.5)
-                        
-                    except Exception as e:
-                        print(f"❌ Erreur scraping SEO: {e}")
-                        continue
+            session = await get_http_session('scraping')
+            
+            for url in search_urls:
+                try:
+                    async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=20)) as response:
+                        if response.status == 200:
+                            html = await response.text()
+                            soup = BeautifulSoup(html, 'html.parser')
+                            
+                            # Extraction titres
+                            titles = soup.find_all(['h1', 'h2', 'h3'], limit=5)
+                            for title in titles:
+                                title_text = title.get_text(strip=True)
+                                if product_name.lower() in title_text.lower():
+                                    seo_data["titles"].append(title_text)
+                            
+                            # Extraction descriptions
+                            descriptions = soup.find_all(['p', 'div'], limit=10)
+                            for desc in descriptions:
+                                desc_text = desc.get_text(strip=True)
+                                if len(desc_text) > 50 and product_name.lower() in desc_text.lower():
+                                    seo_data["descriptions"].append(desc_text[:200])
+                            
+                            # Extraction mots-clés depuis meta tags
+                            meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
+                            if meta_keywords and meta_keywords.get('content'):
+                                keywords = meta_keywords['content'].split(',')
+                                seo_data["keywords"].extend([k.strip() for k in keywords[:10]])
+                    
+                    await asyncio.sleep(0.5)
+                    
+                except Exception as e:
+                    ecomsimply_logger.error(f"❌ Erreur scraping SEO: {e}")
+                    continue
             
             # Nettoyage et déduplication
             seo_data = self._clean_seo_data(seo_data)
             
         except Exception as e:
-            print(f"❌ Erreur scraping SEO général: {e}")
+            ecomsimply_logger.error(f"❌ Erreur scraping SEO général: {e}")
         
-        print(f"📋 SEO DATA: {len(seo_data['titles'])} titres, {len(seo_data['keywords'])} mots-clés")
+        ecomsimply_logger.info(f"📋 SEO DATA: {len(seo_data['titles'])} titres, {len(seo_data['keywords'])} mots-clés")
         return seo_data
     
     def _clean_seo_data(self, seo_data: Dict) -> Dict:
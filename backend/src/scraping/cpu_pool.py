@@ -0,0 +1,325 @@
+"""
+CPU Worker Pool pour le scraping ECOMSIMPLY
+Exécute hors de l'event loop le travail CPU-bound (parsing HTML, transcodage Pillow)
+- Pool de processus (défaut), de threads, ou exécution inline (tests / désactivé)
+- Callables non picklables (mocks, objets liés à la boucle) exécutés en thread
+- Backpressure : nombre borné de tâches en attente, les suivantes patientent
+- Timeout par tâche et métriques de profondeur de file / latence
+- Durée d'exécution mesurée dans le worker (histogramme optionnel, attente exclue)
+"""
+
+import asyncio
+import multiprocessing
+import os
+import pickle
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+import logging
+
+from .metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+POOL_MODES = ('process', 'thread', 'inline')
+
+
+def _timed_call(func: Callable[..., T], *args: Any) -> Tuple[T, float]:
+    """Exécuter func(*args) dans le worker : (résultat, durée d'exécution seule)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class CPUWorkerPool:
+    """
+    Pool de workers pour tâches CPU-bound appelées depuis du code async
+
+    Les fonctions soumises en mode 'process' doivent être picklables
+    (fonction de module ou méthode d'une instance picklable).
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        mode: str = 'process',
+        max_pending: Optional[int] = None,
+        task_timeout_s: float = 30.0
+    ):
+        """
+        Args:
+            max_workers: Nombre de workers (défaut: min(4, nombre de CPU))
+            mode: 'process', 'thread' ou 'inline' (exécution directe dans la boucle)
+            max_pending: Tâches soumises simultanément avant backpressure (défaut: 4 x workers)
+            task_timeout_s: Timeout par tâche (attente d'admission exclue)
+        """
+        if mode not in POOL_MODES:
+            raise ValueError(f"Mode de pool inconnu: {mode} (attendu: {', '.join(POOL_MODES)})")
+
+        self.mode = mode
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending or self.max_workers * 4
+        self.task_timeout_s = task_timeout_s
+
+        self._executor: Optional[Executor] = None
+        self._thread_executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Résultat du test de picklabilité par fonction (évite un pickle.dumps par appel)
+        self._picklable: Dict[Any, bool] = {}
+
+        # Métriques
+        self.waiting = 0
+        self.in_flight = 0
+        self.abandoned_running = 0
+        self.max_queue_depth = 0
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'timeouts': 0,
+            'pool_restarts': 0,
+            'thread_fallbacks': 0,
+            'total_task_time_s': 0.0,
+            'max_task_time_s': 0.0,
+            'total_wait_time_s': 0.0
+        }
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        """Sémaphore d'admission, recréé si l'event loop a changé"""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._slots_loop = loop
+        return self._slots
+
+    def _get_executor(self) -> Executor:
+        """Créer l'executor à la première utilisation"""
+        if self._executor is None:
+            if self.mode == 'process':
+                # spawn : pas de fork d'un process qui porte déjà des threads (motor, httpx...)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='scraping-cpu'
+                )
+            logger.info(f"✅ CPU worker pool started ({self.mode}, {self.max_workers} workers)")
+        return self._executor
+
+    def _get_thread_executor(self) -> ThreadPoolExecutor:
+        """Executor de repli pour les callables non picklables en mode process"""
+        if self._thread_executor is None:
+            self._thread_executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='scraping-cpu'
+            )
+        return self._thread_executor
+
+    def _is_picklable(self, func: Callable[..., Any]) -> bool:
+        """Test de picklabilité mis en cache par fonction (et type d'instance pour une méthode)"""
+        try:
+            key = (getattr(func, '__func__', func), type(getattr(func, '__self__', None)))
+            cached = self._picklable.get(key)
+        except TypeError:
+            # Callable non hashable : test à chaque appel
+            key, cached = None, None
+        if cached is not None:
+            return cached
+
+        try:
+            pickle.dumps(func)
+            picklable = True
+        except Exception:
+            picklable = False
+        if key is not None:
+            if len(self._picklable) >= 1024:
+                self._picklable.clear()
+            self._picklable[key] = picklable
+        return picklable
+
+    def _executor_for(self, func: Callable[..., Any]) -> Executor:
+        """Choisir l'executor : processus si func est picklable, sinon thread"""
+        if self.mode == 'thread':
+            return self._get_executor()
+        if not self._is_picklable(func):
+            self.stats['thread_fallbacks'] += 1
+            return self._get_thread_executor()
+        return self._get_executor()
+
+    def _restart_executor(self) -> None:
+        """Remplacer un pool de processus cassé (worker tué, OOM...)"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.stats['pool_restarts'] += 1
+        logger.warning("⚠️ CPU worker pool broken, restarting")
+
+    @property
+    def queue_depth(self) -> int:
+        """Tâches en attente d'admission + tâches soumises non terminées"""
+        return self.waiting + self.in_flight + self.abandoned_running
+
+    def _release_abandoned(self, slots: asyncio.Semaphore) -> None:
+        """Fin réelle d'une tâche abandonnée sur timeout : libérer son slot"""
+        self.abandoned_running -= 1
+        slots.release()
+
+    async def run(self, func: Callable[..., T], *args: Any, timeout_s: Optional[float] = None,
+                  histogram: Optional[Histogram] = None) -> T:
+        """
+        Exécuter func(*args) dans le pool et attendre le résultat
+
+        Args:
+            histogram: Reçoit la durée d'exécution dans le worker (attente d'admission
+                et de l'executor exclues)
+
+        Raises:
+            asyncio.TimeoutError: si la tâche dépasse son timeout
+            Exception: toute exception levée par func
+        """
+        timeout = self.task_timeout_s if timeout_s is None else timeout_s
+
+        slots = self._get_slots()
+        self.waiting += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        wait_start = time.perf_counter()
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.stats['total_wait_time_s'] += time.perf_counter() - wait_start
+
+        slot_held = False
+
+        def hold_slot(future) -> None:
+            """Tâche encore exécutée par un worker après timeout : slot rendu à sa fin réelle"""
+            nonlocal slot_held
+            slot_held = True
+            self.abandoned_running += 1
+            loop = asyncio.get_running_loop()
+
+            def on_done(_) -> None:
+                try:
+                    loop.call_soon_threadsafe(self._release_abandoned, slots)
+                except RuntimeError:
+                    pass  # Boucle fermée : le sémaphore est recréé avec la suivante
+
+            future.add_done_callback(on_done)
+
+        self.in_flight += 1
+        self.stats['submitted'] += 1
+        start = time.perf_counter()
+        try:
+            if self.mode == 'inline':
+                result, duration = _timed_call(func, *args)
+            else:
+                result, duration = await self._run_in_executor(func, args, timeout, hold_slot)
+            self.stats['completed'] += 1
+            if histogram is not None:
+                histogram.observe(duration)
+            return result
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            logger.warning(f"⏱️ CPU task {getattr(func, '__qualname__', func)} timed out after {timeout}s")
+            raise
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats['total_task_time_s'] += elapsed
+            self.stats['max_task_time_s'] = max(self.stats['max_task_time_s'], elapsed)
+            self.in_flight -= 1
+            if not slot_held:
+                slots.release()
+
+    async def _run_in_executor(self, func: Callable[..., T], args: tuple, timeout: float,
+                               on_abandoned: Callable[[Any], None]) -> Tuple[T, float]:
+        """Soumettre à l'executor, avec un redémarrage si le pool de processus est cassé"""
+        try:
+            return await self._submit(func, args, timeout, on_abandoned)
+        except BrokenProcessPool:
+            self._restart_executor()
+            return await self._submit(func, args, timeout, on_abandoned)
+
+    async def _submit(self, func: Callable[..., T], args: tuple, timeout: float,
+                      on_abandoned: Callable[[Any], None]) -> Tuple[T, float]:
+        future = self._executor_for(func).submit(_timed_call, func, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # Une tâche déjà démarrée dans un worker ne peut pas être interrompue :
+            # elle garde son slot d'admission jusqu'à sa fin (pas de sur-souscription)
+            if not future.cancel():
+                on_abandoned(future)
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du pool (file, latences, erreurs)"""
+        finished = self.stats['completed'] + self.stats['failed'] + self.stats['timeouts']
+        return {
+            'mode': self.mode,
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'task_timeout_s': self.task_timeout_s,
+            'waiting': self.waiting,
+            'in_flight': self.in_flight,
+            'abandoned_running': self.abandoned_running,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'avg_task_time_s': round(self.stats['total_task_time_s'] / finished, 4) if finished else 0.0,
+            'avg_wait_time_s': round(self.stats['total_wait_time_s'] / self.stats['submitted'], 4)
+            if self.stats['submitted'] else 0.0,
+            **self.stats
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrêter les workers"""
+        for executor in (self._executor, self._thread_executor):
+            if executor is not None:
+                executor.shutdown(wait=wait, cancel_futures=True)
+        if self._executor is not None:
+            logger.info("✅ CPU worker pool stopped")
+        self._executor = None
+        self._thread_executor = None
+
+
+# Pool global du process (configurable par variables d'environnement)
+_cpu_pool: Optional[CPUWorkerPool] = None
+
+
+def get_cpu_pool() -> CPUWorkerPool:
+    """
+    Obtenir le pool CPU global
+
+    Variables d'environnement:
+        SCRAPING_CPU_POOL_MODE: process | thread | inline (défaut: process)
+        SCRAPING_CPU_WORKERS: nombre de workers (défaut: min(4, CPU))
+        SCRAPING_CPU_MAX_PENDING: tâches simultanées avant backpressure
+        SCRAPING_CPU_TASK_TIMEOUT_S: timeout par tâche (défaut: 30)
+    """
+    global _cpu_pool
+    if _cpu_pool is None:
+        _cpu_pool = CPUWorkerPool(
+            max_workers=int(os.environ.get("SCRAPING_CPU_WORKERS") or 0) or None,
+            mode=os.environ.get("SCRAPING_CPU_POOL_MODE", "process"),
+            max_pending=int(os.environ.get("SCRAPING_CPU_MAX_PENDING") or 0) or None,
+            task_timeout_s=float(os.environ.get("SCRAPING_CPU_TASK_TIMEOUT_S") or 30)
+        )
+    return _cpu_pool
+
+
+def shutdown_cpu_pool() -> None:
+    """Arrêter le pool CPU global (hook de shutdown)"""
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=False)
+        _cpu_pool = None
@@ -0,0 +1,327 @@
+"""
+Métriques ECOMSIMPLY - Exposition au format texte Prometheus
+- Histogrammes (buckets cumulés), jauges et compteurs à étiquettes
+- Nombre de séries borné par métrique (valeurs d'étiquettes au-delà → "other")
+- Moniteur de retard de la boucle d'événements
+Sans dépendance : les mises à jour se font depuis la boucle d'événements,
+le rendu parcourt les séries au moment du scrape.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Buckets par défaut (secondes), proches de ceux des clients Prometheus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Séries max par métrique (protège des étiquettes à forte cardinalité, ex: hosts)
+DEFAULT_MAX_SERIES = 500
+
+OVERFLOW_LABEL = "other"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    """Base des métriques : séries indexées par tuple de valeurs d'étiquettes"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 max_series: int = DEFAULT_MAX_SERIES):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def _new_series(self):
+        """Créer l'état d'une nouvelle série"""
+
+    def _get_series(self, label_values: Tuple[str, ...]):
+        if len(label_values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: étiquettes attendues {self.labelnames}, reçu {label_values}")
+
+        series = self._series.get(label_values)
+        if series is None:
+            if len(self._series) >= self.max_series:
+                label_values = (OVERFLOW_LABEL,) * len(label_values)
+                series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = self._new_series()
+        return series
+
+    def _label_str(self, label_values: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.labelnames, label_values)]
+        if extra is not None:
+            pairs.append(f'{extra[0]}="{extra[1]}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    @abstractmethod
+    def _render_samples(self) -> List[str]:
+        """Lignes d'échantillons au format texte Prometheus"""
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self._render_samples()
+        ]
+
+
+class _HistogramSeries:
+    __slots__ = ('bucket_counts', 'sum', 'count')
+
+    def __init__(self, bucket_count: int):
+        self.bucket_counts = [0] * bucket_count
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Histogramme à buckets fixes (comptes cumulés au rendu)"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, max_series: int = DEFAULT_MAX_SERIES):
+        super().__init__(name, documentation, labelnames, max_series)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def _new_series(self) -> _HistogramSeries:
+        return _HistogramSeries(len(self.buckets))
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._get_series(tuple(str(v) for v in label_values))
+        series.bucket_counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        """Mesurer la durée du bloc (secondes)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def get_sample(self, *label_values: str) -> Optional[Dict[str, float]]:
+        """Nombre et somme des observations d'une série (None si absente)"""
+        series = self._series.get(tuple(str(v) for v in label_values))
+        if series is None:
+            return None
+        return {'count': series.count, 'sum': series.sum}
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        for label_values, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series.bucket_counts):
+                cumulative += count
+                labels = self._label_str(label_values, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = self._label_str(label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class _ValueSeries:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+
+class Gauge(_Metric):
+    """Jauge (valeur courante), éventuellement lue au rendu via une fonction"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 max_series: int = DEFAULT_MAX_SERIES):
+        super().__init__(name, documentation, labelnames, max_series)
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_series(self) -> _ValueSeries:
+        return _ValueSeries()
+
+    def set(self, value: float, *label_values: str) -> None:
+        self._get_series(tuple(str(v) for v in label_values)).value = value
+
+    def inc(self, amount: float = 1.0, *label_values: str) -> None:
+        self._get_series(tuple(str(v) for v in label_values)).value += amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Valeur calculée au moment du scrape (jauge sans étiquette)"""
+        self._function = function
+
+    def get(self, *label_values: str) -> Optional[float]:
+        if self._function is not None and not label_values:
+            return self._function()
+        series = self._series.get(tuple(str(v) for v in label_values))
+        return series.value if series is not None else None
+
+    def _render_samples(self) -> List[str]:
+        if self._function is not None:
+            try:
+                return [f"{self.name} {_format_value(float(self._function()))}"]
+            except Exception as e:
+                logger.debug(f"Jauge {self.name} illisible: {e}")
+                return []
+        return [
+            f"{self.name}{self._label_str(label_values)} {_format_value(series.value)}"
+            for label_values, series in list(self._series.items())
+        ]
+
+
+class Counter(Gauge):
+    """Compteur monotone"""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, *label_values: str) -> None:
+        if amount < 0:
+            raise ValueError(f"{self.name}: un compteur ne peut pas décroître")
+        super().inc(amount, *label_values)
+
+
+class MetricsRegistry:
+    """Ensemble des métriques exposées"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            # Réimport d'un module : réutiliser la métrique déjà enregistrée
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Texte d'exposition Prometheus de toutes les métriques"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registre global du process
+_metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Obtenir le registre de métriques global"""
+    return _metrics_registry
+
+
+# Métriques des chemins critiques
+FETCH_LATENCY = _metrics_registry.histogram(
+    "ecomsimply_transport_fetch_seconds", "Durée des requêtes HTTP de scraping par host", ("host", "status")
+)
+PARSE_DURATION = _metrics_registry.histogram(
+    "ecomsimply_parse_seconds", "Durée d'extraction HTML dans le worker CPU (attente exclue)"
+)
+IMAGE_TRANSCODE_DURATION = _metrics_registry.histogram(
+    "ecomsimply_image_transcode_seconds", "Durée de transcodage d'une image dans le worker CPU (attente exclue)"
+)
+SPAPI_LATENCY = _metrics_registry.histogram(
+    "ecomsimply_spapi_request_seconds", "Durée des appels SP-API par opération", ("operation", "status")
+)
+SPAPI_RATE_LIMIT_WAIT = _metrics_registry.histogram(
+    "ecomsimply_spapi_rate_limit_wait_seconds", "Attente du quota SP-API avant envoi par opération", ("operation",)
+)
+PUBLICATION_QUEUE_DEPTH = _metrics_registry.gauge(
+    "ecomsimply_publication_queue_depth", "Tâches de publication en attente par store", ("store",)
+)
+EVENT_LOOP_LAG = _metrics_registry.histogram(
+    "ecomsimply_event_loop_lag_seconds", "Retard de réveil de la boucle d'événements",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+
+class EventLoopLagMonitor:
+    """
+    Mesure le retard de la boucle d'événements
+
+    Une tâche dort `interval_s` ; l'écart entre réveil attendu et réel est le
+    temps pendant lequel la boucle était occupée (code bloquant, CPU).
+    """
+
+    def __init__(self, interval_s: float = 0.5, histogram: Histogram = EVENT_LOOP_LAG):
+        self.interval_s = interval_s
+        self.histogram = histogram
+        self.last_lag_s = 0.0
+        self.max_lag_s = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.is_running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            lag = max(0.0, loop.time() - expected)
+            self.last_lag_s = lag
+            self.max_lag_s = max(self.max_lag_s, lag)
+            self.histogram.observe(lag)
+
+
+_event_loop_monitor: Optional[EventLoopLagMonitor] = None
+
+
+def get_event_loop_monitor() -> EventLoopLagMonitor:
+    """Obtenir le moniteur de retard de boucle global"""
+    global _event_loop_monitor
+    if _event_loop_monitor is None:
+        _event_loop_monitor = EventLoopLagMonitor()
+    return _event_loop_monitor
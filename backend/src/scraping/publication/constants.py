@@ -21,11 +21,13 @@ DEFAULT_PUBLICATION_CONFIG = {
     "cooldown_between_publications": 300,  # 5 minutes
     "batch_size": 3,
     "max_concurrent_workers": 2,
+    "max_concurrent_per_store": 1,
     "max_retries": 3,
     "retry_delay": 1800,  # 30 minutes
     "enable_price_guardrails": True,
     "price_variance_threshold": 0.20,  # 20%
-    "min_confidence_score": 0.6
+    "min_confidence_score": 0.6,
+    "history_size": 1000
 }
 
 # Rate limiting par store (tokens par heure)
@@ -182,6 +182,8 @@ class PublicationConfig(BaseModel):
     # Batch processing
     batch_size: int = Field(default=3, ge=1, le=10, description="Taille batch")
     max_concurrent_workers: int = Field(default=2, ge=1, le=5, description="Workers concurrents max")
+    max_concurrent_per_store: int = Field(default=1, ge=1, le=5, description="Publications simultanées max par store")
+    store_weights: Dict[str, int] = Field(default_factory=dict, description="Tâches par tour d'équité (DRR) par store, défaut 1")
     
     # Retry policy
     max_retries: int = Field(default=3, ge=0, le=5, description="Tentatives max")
@@ -192,6 +194,9 @@ class PublicationConfig(BaseModel):
     price_variance_threshold: float = Field(default=0.20, ge=0.1, le=0.5, description="Seuil écart prix")
     min_confidence_score: float = Field(default=0.6, ge=0.1, le=1.0, description="Score confiance min")
     
+    # Historique
+    history_size: int = Field(default=1000, ge=1, description="Tâches terminées conservées en mémoire (par liste)")
+    
     def is_active_hours(self, current_hour: Optional[int] = None) -> bool:
         """Vérifier si on est dans les heures actives"""
         if current_hour is None:
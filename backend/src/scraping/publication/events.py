@@ -0,0 +1,198 @@
+"""
+Événements de Publication - Flux de progression incrémental ECOMSIMPLY
+- ProgressCounters : compteurs par statut mis à jour à chaque transition (O(1))
+- PublicationEventBus : diffusion des transitions de tâches aux abonnés
+  (files bornées, relecture depuis un identifiant d'événement)
+- Sérialisation NDJSON et Server-Sent Events
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Any, Deque, Dict, Optional, Set
+import logging
+
+from .dto import PublicationStatus
+
+logger = logging.getLogger(__name__)
+
+# Type d'événement selon le statut atteint
+EVENT_TYPES = {
+    PublicationStatus.PENDING: "enqueued",
+    PublicationStatus.PROCESSING: "started",
+    PublicationStatus.SUCCESS: "succeeded",
+    PublicationStatus.FAILED: "failed",
+    PublicationStatus.SKIPPED_GUARDRAIL: "skipped",
+    PublicationStatus.SKIPPED_DUPLICATE: "skipped"
+}
+
+# Statuts non terminaux (tâche encore à traiter)
+OPEN_STATUSES = (PublicationStatus.PENDING, PublicationStatus.PROCESSING)
+
+
+class ProgressCounters:
+    """Compteurs par statut tenus à jour transition par transition"""
+
+    def __init__(self):
+        self.total = 0
+        self.counts: Dict[str, int] = {status.value: 0 for status in PublicationStatus}
+        self.updated_at = time.time()
+
+    def apply(self, previous: Optional[PublicationStatus], current: PublicationStatus) -> None:
+        """
+        Appliquer une transition
+
+        Args:
+            previous: Statut précédent (None pour une nouvelle tâche)
+            current: Nouveau statut
+        """
+        if previous is None:
+            self.total += 1
+        else:
+            self.counts[previous.value] -= 1
+        self.counts[current.value] += 1
+        self.updated_at = time.time()
+
+    @property
+    def open_tasks(self) -> int:
+        return sum(self.counts[status.value] for status in OPEN_STATUSES)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.total > 0 and self.open_tasks == 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """État courant des compteurs"""
+        done = self.total - self.open_tasks
+        return {
+            'total': self.total,
+            **self.counts,
+            'completed': done,
+            'progress_percent': round(done / self.total * 100, 1) if self.total else 0.0,
+            'finished': self.is_finished,
+            'updated_at': self.updated_at
+        }
+
+
+@dataclass
+class PublicationEvent:
+    """Transition d'état d'une tâche (ou instantané des compteurs)"""
+
+    seq: int
+    type: str
+    timestamp: float
+    task_id: Optional[str] = None
+    store_id: Optional[str] = None
+    batch_id: Optional[str] = None
+    status: Optional[str] = None
+    previous_status: Optional[str] = None
+    error_message: Optional[str] = None
+    counters: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+
+def format_ndjson(event: PublicationEvent) -> str:
+    """Une ligne JSON par événement"""
+    return json.dumps(event.to_dict(), ensure_ascii=False) + "\n"
+
+
+def format_sse(event: PublicationEvent) -> str:
+    """Événement Server-Sent Events (id = seq pour la reprise via Last-Event-ID)"""
+    data = json.dumps(event.to_dict(), ensure_ascii=False)
+    return f"id: {event.seq}\nevent: {event.type}\ndata: {data}\n\n"
+
+
+class EventSubscription:
+    """Abonnement à la file bornée d'un consommateur"""
+
+    def __init__(self, batch_id: Optional[str], max_queue_size: int):
+        self.batch_id = batch_id
+        self.queue: "asyncio.Queue[PublicationEvent]" = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+
+    def matches(self, event: PublicationEvent) -> bool:
+        return self.batch_id is None or event.batch_id == self.batch_id
+
+    def push(self, event: PublicationEvent) -> None:
+        """Ajouter sans bloquer l'émetteur ; consommateur lent → plus ancien écarté"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class PublicationEventBus:
+    """Diffusion des transitions de tâches vers les flux de progression"""
+
+    def __init__(self, max_queue_size: int = 1000, history_size: int = 1000):
+        """
+        Args:
+            max_queue_size: Événements en attente max par abonné
+            history_size: Derniers événements conservés pour la reprise
+        """
+        self.max_queue_size = max_queue_size
+        self._history: Deque[PublicationEvent] = deque(maxlen=history_size)
+        self._subscribers: Set[EventSubscription] = set()
+        self._seq = 0
+
+        self.stats = {
+            'events_emitted': 0,
+            'events_dropped': 0
+        }
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def emit(self, event: PublicationEvent) -> None:
+        """Publier un événement à tous les abonnés concernés (sans attente)"""
+        self._history.append(event)
+        self.stats['events_emitted'] += 1
+
+        for subscription in self._subscribers:
+            if subscription.matches(event):
+                dropped = subscription.dropped
+                subscription.push(event)
+                self.stats['events_dropped'] += subscription.dropped - dropped
+
+    def subscribe(self, batch_id: Optional[str] = None, after_seq: Optional[int] = None) -> EventSubscription:
+        """
+        S'abonner aux événements (d'un batch ou de tous)
+
+        Args:
+            batch_id: Filtrer sur un batch
+            after_seq: Rejouer les événements conservés postérieurs à ce seq
+        """
+        subscription = EventSubscription(batch_id, self.max_queue_size)
+        if after_seq is not None:
+            for event in self._history:
+                if event.seq > after_seq and subscription.matches(event):
+                    subscription.push(event)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription) -> None:
+        self._subscribers.discard(subscription)
+
+    async def listen(self, subscription: EventSubscription, timeout: float) -> Optional[PublicationEvent]:
+        """Prochain événement de l'abonnement, ou None après `timeout` secondes"""
+        try:
+            return await asyncio.wait_for(subscription.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'subscribers': len(self._subscribers),
+            'last_seq': self._seq,
+            'history_size': len(self._history)
+        }
@@ -4,7 +4,7 @@ Validation prix, qualité données, scoring confiance avant publication
 """
 
 from typing import Dict, List, Optional, Tuple, Any
-from statistics import median, stdev
+import numpy as np
 from decimal import Decimal
 from datetime import datetime
 import logging
@@ -18,6 +18,12 @@ logger = logging.getLogger(__name__)
 class PriceGuardrail:
     """Garde-fou prix basé sur écart médian et outliers"""
     
+    # Prix marché conservés par produit (les plus récents)
+    MAX_MARKET_PRICES = 50
+    
+    # Attributs identifiant un même produit sur le marché (par priorité)
+    MARKET_KEY_ATTRIBUTES = ('ean', 'gtin', 'sku')
+    
     def __init__(self, variance_threshold: float = 0.20):
         """
         Args:
@@ -25,8 +31,41 @@ class PriceGuardrail:
         """
         self.variance_threshold = variance_threshold
         
-        # Base de données prix pour comparaison (simulée)
+        # Prix observés par clé marché (alimentés par les produits validés)
         self._price_history: Dict[str, List[float]] = {}
+        
+        # Statistiques marché précalculées par clé : (médiane, min, max, nb points)
+        self._market_stats: Dict[str, Tuple[float, float, float, int]] = {}
+    
+    @classmethod
+    def market_key(cls, product: ProductDTO) -> str:
+        """Clé marché du produit (EAN/GTIN/SKU, sinon URL source)"""
+        
+        attributes = product.attributes or {}
+        for attr in cls.MARKET_KEY_ATTRIBUTES:
+            if attributes.get(attr):
+                return f"{attr}:{attributes[attr]}"
+        return product.source_url
+    
+    def record_market_prices(self, key: str, prices: List[float]) -> None:
+        """Enregistre des prix marché observés et recalcule les statistiques de la clé"""
+        
+        history = (self._price_history.get(key, []) + [float(p) for p in prices])[-self.MAX_MARKET_PRICES:]
+        self._price_history[key] = history
+        
+        values = np.asarray(history, dtype=float)
+        self._market_stats[key] = (float(np.median(values)), float(values.min()), float(values.max()), values.size)
+    
+    def record_observed(self, products: List[ProductDTO], results: List[Tuple[bool, str, Dict]]) -> None:
+        """Ajoute au marché les prix des produits validés (une écriture par clé)"""
+        
+        observed: Dict[str, List[float]] = {}
+        for product, (is_valid, _, _) in zip(products, results):
+            if is_valid and product.price:
+                observed.setdefault(self.market_key(product), []).append(float(product.price.amount))
+        
+        for key, prices in observed.items():
+            self.record_market_prices(key, prices)
     
     def validate_price(self, product: ProductDTO, market_prices: Optional[List[float]] = None) -> Tuple[bool, str, Dict]:
         """
@@ -36,71 +75,111 @@ class PriceGuardrail:
             (is_valid, reason, analysis_data)
         """
         
-        if not product.price:
-            return False, "Aucun prix détecté", {"price_available": False}
-        
-        price_value = float(product.price.amount)
-        
-        # Si pas de données marché, utiliser données historiques simulées
-        if not market_prices:
-            market_prices = self._get_simulated_market_prices(product)
-        
-        if len(market_prices) < 2:
-            # Pas assez de données pour comparaison → accepter avec warning
-            logger.warning(f"Pas assez de données prix pour comparaison: {product.title}")
-            return True, "Données marché insuffisantes (accepté)", {
-                "price_value": price_value,
-                "market_data_points": len(market_prices),
-                "status": "insufficient_data"
-            }
-        
-        # Calcul médiane et écart
-        market_median = median(market_prices)
-        price_deviation = abs(price_value - market_median) / market_median
-        
-        analysis = {
-            "price_value": price_value,
-            "market_median": market_median,
-            "market_min": min(market_prices),
-            "market_max": max(market_prices),
-            "deviation_percentage": price_deviation * 100,
-            "threshold_percentage": self.variance_threshold * 100,
-            "market_data_points": len(market_prices)
-        }
-        
-        # Validation seuil
-        if price_deviation <= self.variance_threshold:
-            return True, f"Prix dans la fourchette (écart: {price_deviation*100:.1f}%)", analysis
-        else:
-            reason = f"Prix aberrant - écart: {price_deviation*100:.1f}% > seuil: {self.variance_threshold*100:.1f}%"
-            analysis["outlier_type"] = "above" if price_value > market_median else "below"
-            return False, reason, analysis
+        provided = {self.market_key(product): market_prices} if market_prices else None
+        return self.validate_many([product], provided)[0]
     
-    def _get_simulated_market_prices(self, product: ProductDTO) -> List[float]:
-        """Simule données prix marché pour tests"""
-        
-        if not product.price:
-            return []
+    def validate_many(self, products: List[ProductDTO],
+                      market_prices: Optional[Dict[str, List[float]]] = None) -> List[Tuple[bool, str, Dict]]:
+        """
+        Valide les prix d'un lot de produits en une passe vectorisée
         
-        base_price = float(product.price.amount)
+        Args:
+            products: Produits à valider
+            market_prices: Prix marché par clé marché (prioritaires sur l'historique)
+            
+        Returns:
+            Liste de (is_valid, reason, analysis_data) dans l'ordre des produits
+        """
         
-        # Simuler 5-10 prix marché autour du prix base
-        import random
-        market_count = random.randint(5, 10)
-        market_prices = []
+        count = len(products)
+        if count == 0:
+            return []
         
-        for _ in range(market_count):
-            # Variation ±15% autour prix base
-            variation = random.uniform(-0.15, 0.15)
-            simulated_price = base_price * (1 + variation)
-            market_prices.append(max(1.0, simulated_price))  # Prix minimum 1€
+        prices = np.array([float(p.price.amount) if p.price else np.nan for p in products])
+        has_price = ~np.isnan(prices)
+        
+        medians = np.full(count, np.nan)
+        mins = np.full(count, np.nan)
+        maxs = np.full(count, np.nan)
+        data_points = np.zeros(count, dtype=int)
+        
+        # 1. Statistiques marché précalculées (une seule fois par clé)
+        provided = {}
+        for key, values in (market_prices or {}).items():
+            if values:
+                array = np.asarray(values, dtype=float)
+                provided[key] = (float(np.median(array)), float(array.min()), float(array.max()), array.size)
+        
+        for i, product in enumerate(products):
+            if not has_price[i]:
+                continue
+            key = self.market_key(product)
+            stats = provided.get(key) or self._market_stats.get(key)
+            if stats:
+                medians[i], mins[i], maxs[i], data_points[i] = stats
+        
+        # 2. Écarts à la médiane et seuil, sur tout le lot
+        comparable = has_price & (data_points >= 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviations = np.abs(prices - medians) / medians
+        within_threshold = deviations <= self.variance_threshold
+        
+        insufficient = int((has_price & ~comparable).sum())
+        if insufficient:
+            logger.warning(f"Pas assez de données prix pour comparaison: {insufficient} produit(s)")
+        
+        results = []
+        for i in range(count):
+            if not has_price[i]:
+                results.append((False, "Aucun prix détecté", {"price_available": False}))
+                continue
+            
+            if not comparable[i]:
+                results.append((True, "Données marché insuffisantes (accepté)", {
+                    "price_value": float(prices[i]),
+                    "market_data_points": int(data_points[i]),
+                    "status": "insufficient_data"
+                }))
+                continue
+            
+            deviation = float(deviations[i])
+            analysis = {
+                "price_value": float(prices[i]),
+                "market_median": float(medians[i]),
+                "market_min": float(mins[i]),
+                "market_max": float(maxs[i]),
+                "deviation_percentage": deviation * 100,
+                "threshold_percentage": self.variance_threshold * 100,
+                "market_data_points": int(data_points[i])
+            }
+            
+            if within_threshold[i]:
+                results.append((True, f"Prix dans la fourchette (écart: {deviation*100:.1f}%)", analysis))
+            else:
+                reason = f"Prix aberrant - écart: {deviation*100:.1f}% > seuil: {self.variance_threshold*100:.1f}%"
+                analysis["outlier_type"] = "above" if prices[i] > medians[i] else "below"
+                results.append((False, reason, analysis))
         
-        return market_prices
+        return results
 
 
 class QualityGuardrail:
     """Garde-fou qualité données produit"""
     
+    # Pondération du score global
+    WEIGHTS = {
+        'title_score': 0.20,
+        'description_score': 0.15,
+        'price_score': 0.25,
+        'image_score': 0.20,
+        'attributes_score': 0.10,
+        'seo_score': 0.10
+    }
+    
+    IMPORTANT_ATTRIBUTES = ('brand', 'model', 'category', 'sku')
+    TITLE_BONUS_WORDS = ('pro', 'premium', 'ultra', 'max')
+    STANDARD_CURRENCIES = ('EUR', 'USD', 'GBP')
+    
     def __init__(self, min_confidence: float = 0.6):
         """
         Args:
@@ -116,109 +195,151 @@ class QualityGuardrail:
             (is_valid, reason, quality_analysis)
         """
         
-        scores = self._calculate_quality_scores(product)
-        overall_confidence = scores['overall_confidence']
+        return self.validate_many([product])[0]
+    
+    def validate_many(self, products: List[ProductDTO]) -> List[Tuple[bool, str, Dict]]:
+        """
+        Valide la qualité d'un lot de produits (scores calculés en tableaux)
         
-        analysis = {
-            **scores,
-            "min_confidence_required": self.min_confidence,
-            "quality_checks": self._get_quality_checks(product)
-        }
+        Returns:
+            Liste de (is_valid, reason, quality_analysis) dans l'ordre des produits
+        """
         
-        if overall_confidence >= self.min_confidence:
-            return True, f"Qualité suffisante (confiance: {overall_confidence:.2f})", analysis
-        else:
-            reason = f"Qualité insuffisante - confiance: {overall_confidence:.2f} < seuil: {self.min_confidence}"
-            return False, reason, analysis
+        if not products:
+            return []
+        
+        features = self._extract_features(products)
+        scores = self._scores_from_features(features)
+        checks = self._checks_from_features(features)
+        passed = scores['overall_confidence'] >= self.min_confidence
+        
+        results = []
+        for i in range(len(products)):
+            overall_confidence = float(scores['overall_confidence'][i])
+            analysis = {
+                **{key: float(values[i]) for key, values in scores.items()},
+                "min_confidence_required": self.min_confidence,
+                "quality_checks": {key: bool(values[i]) for key, values in checks.items()}
+            }
+            
+            if passed[i]:
+                results.append((True, f"Qualité suffisante (confiance: {overall_confidence:.2f})", analysis))
+            else:
+                reason = f"Qualité insuffisante - confiance: {overall_confidence:.2f} < seuil: {self.min_confidence}"
+                results.append((False, reason, analysis))
+        
+        return results
+    
+    def score_many(self, products: List[ProductDTO]) -> Dict[str, np.ndarray]:
+        """Scores qualité détaillés d'un lot (un tableau par score)"""
+        
+        return self._scores_from_features(self._extract_features(products))
     
     def _calculate_quality_scores(self, product: ProductDTO) -> Dict[str, float]:
         """Calcule scores qualité détaillés"""
         
+        return {key: float(values[0]) for key, values in self.score_many([product]).items()}
+    
+    def _get_quality_checks(self, product: ProductDTO) -> Dict[str, bool]:
+        """Checks booléens qualité"""
+        
+        checks = self._checks_from_features(self._extract_features([product]))
+        return {key: bool(values[0]) for key, values in checks.items()}
+    
+    def _extract_features(self, products: List[ProductDTO]) -> Dict[str, np.ndarray]:
+        """Mesures brutes de chaque produit (une seule lecture des chaînes par produit)"""
+        
+        rows = []
+        for product in products:
+            title = product.title or ""
+            description = product.description_html or ""
+            images = product.images or []
+            attributes = product.attributes or {}
+            title_lower = title.lower()
+            
+            rows.append((
+                len(title),
+                len(title.strip()),
+                any(word in title_lower for word in self.TITLE_BONUS_WORDS),
+                len(description.strip()) if description else -1,
+                '<p>' in description or '<ul>' in description,
+                bool(product.price and product.price.amount > 0),
+                bool(product.price and product.price.currency in self.STANDARD_CURRENCIES),
+                len(images),
+                sum(1 for img in images if img.url.startswith('https://')),
+                sum(1 for img in images if img.alt and len(img.alt) > 5),
+                len(attributes),
+                sum(1 for attr in self.IMPORTANT_ATTRIBUTES if attr in attributes),
+                bool(getattr(product, 'seo_title', None)),
+                bool(getattr(product, 'seo_description', None)),
+                len(getattr(product, 'seo_keywords', None) or []) >= 3,
+                product.status.value == 'complete'
+            ))
+        
+        columns = list(zip(*rows)) if rows else [()] * 16
+        names = (
+            'title_len', 'title_strip_len', 'title_bonus', 'desc_strip_len', 'desc_structured',
+            'price_ok', 'standard_currency', 'image_count', 'https_images', 'alt_images',
+            'attr_count', 'important_attrs', 'has_seo_title', 'has_seo_description',
+            'has_seo_keywords', 'status_complete'
+        )
+        return {name: np.asarray(column) for name, column in zip(names, columns)}
+    
+    def _scores_from_features(self, f: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Scores qualité vectorisés (mêmes règles que la validation unitaire)"""
+        
         scores = {}
         
-        # Score titre (longueur, contenu informatif)
-        title_score = 0.0
-        if product.title and len(product.title.strip()) >= 10:
-            title_score = min(1.0, len(product.title) / 50.0)  # Score basé sur longueur
-            if any(word in product.title.lower() for word in ['pro', 'premium', 'ultra', 'max']):
-                title_score += 0.1  # Bonus mots informatifs
-        scores['title_score'] = min(1.0, title_score)
-        
-        # Score description (richesse contenu)
-        desc_score = 0.0
-        if product.description_html:
-            desc_length = len(product.description_html.strip())
-            desc_score = min(1.0, desc_length / 200.0)  # Score basé sur longueur
-            if '<p>' in product.description_html or '<ul>' in product.description_html:
-                desc_score += 0.1  # Bonus structure HTML
-        scores['description_score'] = min(1.0, desc_score)
-        
-        # Score prix (disponibilité + réalisme)
-        price_score = 0.0
-        if product.price and product.price.amount > 0:
-            price_score = 0.8  # Base pour prix disponible
-            # Bonus pour devise standard
-            if product.price.currency in ['EUR', 'USD', 'GBP']:
-                price_score += 0.2
-        scores['price_score'] = price_score
-        
-        # Score images (nombre + qualité URLs)
-        image_score = 0.0
-        if product.images:
-            image_count_score = min(1.0, len(product.images) / 3.0)  # Optimal: 3+ images
-            https_score = sum(1 for img in product.images if img.url.startswith('https://')) / len(product.images)
-            alt_score = sum(1 for img in product.images if img.alt and len(img.alt) > 5) / len(product.images)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Score titre (longueur, contenu informatif)
+            title_score = np.minimum(1.0, f['title_len'] / 50.0) + 0.1 * f['title_bonus']
+            scores['title_score'] = np.minimum(1.0, np.where(f['title_strip_len'] >= 10, title_score, 0.0))
+            
+            # Score description (richesse contenu, -1 = absente)
+            desc_score = np.minimum(1.0, f['desc_strip_len'] / 200.0) + 0.1 * f['desc_structured']
+            scores['description_score'] = np.minimum(1.0, np.where(f['desc_strip_len'] >= 0, desc_score, 0.0))
             
-            image_score = (image_count_score + https_score + alt_score) / 3.0
-        scores['image_score'] = image_score
-        
-        # Score attributs (richesse métadonnées)
-        attr_score = 0.0
-        if product.attributes:
-            attr_count_score = min(1.0, len(product.attributes) / 5.0)  # Optimal: 5+ attributs
-            important_attrs = ['brand', 'model', 'category', 'sku']
-            important_score = sum(1 for attr in important_attrs if attr in product.attributes) / len(important_attrs)
+            # Score prix (disponibilité + devise standard)
+            scores['price_score'] = np.where(f['price_ok'], 0.8 + 0.2 * f['standard_currency'], 0.0)
             
-            attr_score = (attr_count_score + important_score) / 2.0
-        scores['attributes_score'] = attr_score
+            # Score images (nombre + qualité URLs)
+            image_count = f['image_count']
+            image_score = (np.minimum(1.0, image_count / 3.0) + f['https_images'] / image_count
+                           + f['alt_images'] / image_count) / 3.0
+            scores['image_score'] = np.where(image_count > 0, image_score, 0.0)
+            
+            # Score attributs (richesse métadonnées)
+            attr_score = (np.minimum(1.0, f['attr_count'] / 5.0)
+                          + f['important_attrs'] / len(self.IMPORTANT_ATTRIBUTES)) / 2.0
+            scores['attributes_score'] = np.where(f['attr_count'] > 0, attr_score, 0.0)
         
         # Score SEO (nouvelles données Phase 1)
-        seo_score = 0.0
-        if hasattr(product, 'seo_title') and product.seo_title:
-            seo_score += 0.3
-        if hasattr(product, 'seo_description') and product.seo_description:
-            seo_score += 0.3
-        if hasattr(product, 'seo_keywords') and len(product.seo_keywords) >= 3:
-            seo_score += 0.4
+        seo_score = np.zeros(len(f['title_len']))
+        seo_score += 0.3 * f['has_seo_title']
+        seo_score += 0.3 * f['has_seo_description']
+        seo_score += 0.4 * f['has_seo_keywords']
         scores['seo_score'] = seo_score
         
         # Score global pondéré
-        weights = {
-            'title_score': 0.20,
-            'description_score': 0.15,
-            'price_score': 0.25,
-            'image_score': 0.20,
-            'attributes_score': 0.10,
-            'seo_score': 0.10
-        }
-        
-        overall_confidence = sum(scores[key] * weights[key] for key in weights)
+        overall_confidence = np.zeros(len(f['title_len']))
+        for key, weight in self.WEIGHTS.items():
+            overall_confidence += scores[key] * weight
         scores['overall_confidence'] = overall_confidence
         
         return scores
     
-    def _get_quality_checks(self, product: ProductDTO) -> Dict[str, bool]:
-        """Checks booléens qualité"""
+    def _checks_from_features(self, f: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Checks booléens qualité vectorisés"""
         
         return {
-            'has_title': bool(product.title and len(product.title.strip()) >= 5),
-            'has_description': bool(product.description_html and len(product.description_html.strip()) >= 20),
-            'has_price': bool(product.price and product.price.amount > 0),
-            'has_images': bool(product.images and len(product.images) >= 1),
-            'https_images': all(img.url.startswith('https://') for img in product.images) if product.images else False,
-            'has_attributes': bool(product.attributes and len(product.attributes) >= 2),
-            'has_seo_data': bool(hasattr(product, 'seo_title') and product.seo_title),
-            'status_complete': product.status.value == 'complete'
+            'has_title': f['title_strip_len'] >= 5,
+            'has_description': f['desc_strip_len'] >= 20,
+            'has_price': f['price_ok'].astype(bool),
+            'has_images': f['image_count'] >= 1,
+            'https_images': (f['image_count'] > 0) & (f['https_images'] == f['image_count']),
+            'has_attributes': f['attr_count'] >= 2,
+            'has_seo_data': f['has_seo_title'].astype(bool),
+            'status_complete': f['status_complete'].astype(bool)
         }
 
 
@@ -251,18 +372,53 @@ class GuardRailEngine:
             (can_publish, blocking_reason, full_analysis)
         """
         
-        self.stats['total_validations'] += 1
-        product = task.product_dto
+        logger.info(f"🛡️  Validation guardrails pour: {task.product_dto.title[:30]}...")
+        
+        return self.validate_many([task])[0]
+    
+    def validate_many(self, tasks: List[PublishTask]) -> List[Tuple[bool, str, Dict]]:
+        """
+        Validation complète d'un lot de tâches (prix et qualité vectorisés)
         
-        logger.info(f"🛡️  Validation guardrails pour: {product.title[:30]}...")
+        Returns:
+            Liste de (can_publish, blocking_reason, full_analysis) dans l'ordre des tâches
+        """
+        
+        if not tasks:
+            return []
+        
+        products = [task.product_dto for task in tasks]
         
         # 1. Validation prix
-        price_valid, price_reason, price_analysis = self.price_guardrail.validate_price(product)
+        price_results = self.price_guardrail.validate_many(products)
         
         # 2. Validation qualité
-        quality_valid, quality_reason, quality_analysis = self.quality_guardrail.validate_quality(product)
+        quality_results = self.quality_guardrail.validate_many(products)
         
         # 3. Résultat global
+        timestamp = datetime.now().isoformat()
+        results = [
+            self._decide(product, price_result, quality_result, timestamp)
+            for product, price_result, quality_result in zip(products, price_results, quality_results)
+        ]
+        
+        # 4. Prix acceptés ajoutés au marché de référence des validations suivantes
+        self.price_guardrail.record_observed(products, price_results)
+        
+        if len(tasks) > 1:
+            passed = sum(1 for can_publish, _, _ in results if can_publish)
+            logger.info(f"🛡️  Guardrails lot: {passed}/{len(tasks)} tâches validées")
+        
+        return results
+    
+    def _decide(self, product: ProductDTO, price_result: Tuple[bool, str, Dict],
+                quality_result: Tuple[bool, str, Dict], timestamp: str) -> Tuple[bool, str, Dict]:
+        """Décision globale à partir des validations prix et qualité"""
+        
+        self.stats['total_validations'] += 1
+        
+        price_valid, price_reason, price_analysis = price_result
+        quality_valid, quality_reason, quality_analysis = quality_result
         can_publish = price_valid and quality_valid
         
         full_analysis = {
@@ -278,7 +434,7 @@ class GuardRailEngine:
             },
             'overall_decision': {
                 'can_publish': can_publish,
-                'timestamp': f"{datetime.now().isoformat()}"
+                'timestamp': timestamp
             }
         }
         
@@ -286,7 +442,7 @@ class GuardRailEngine:
         if can_publish:
             self.stats['passed_validations'] += 1
             blocking_reason = "Validation réussie"
-            logger.info(f"✅ Validation réussie: {product.title[:30]}")
+            logger.debug(f"✅ Validation réussie: {product.title[:30]}")
         else:
             # Catégoriser le blocage
             if not price_valid and not quality_valid:
@@ -323,29 +479,20 @@ class GuardRailEngine:
         if not products:
             return {"error": "Aucun produit fourni"}
         
-        all_scores = []
+        # Scores calculés sur tout le lot
+        confidences = self.quality_guardrail.score_many(products)['overall_confidence']
+        
+        excellent = confidences > 0.8
+        good = (confidences > 0.6) & ~excellent
+        average = (confidences > 0.4) & (confidences <= 0.6)
         quality_distribution = {
-            'excellent': 0,    # > 0.8
-            'good': 0,         # 0.6-0.8
-            'average': 0,      # 0.4-0.6
-            'poor': 0          # < 0.4
+            'excellent': int(excellent.sum()),    # > 0.8
+            'good': int(good.sum()),              # 0.6-0.8
+            'average': int(average.sum()),        # 0.4-0.6
+            'poor': int((confidences <= 0.4).sum())  # < 0.4
         }
         
-        for product in products:
-            scores = self.quality_guardrail._calculate_quality_scores(product)
-            confidence = scores['overall_confidence']
-            all_scores.append(confidence)
-            
-            if confidence > 0.8:
-                quality_distribution['excellent'] += 1
-            elif confidence > 0.6:
-                quality_distribution['good'] += 1
-            elif confidence > 0.4:
-                quality_distribution['average'] += 1
-            else:
-                quality_distribution['poor'] += 1
-        
-        avg_confidence = sum(all_scores) / len(all_scores)
+        avg_confidence = float(confidences.mean())
         
         return {
             'total_products': len(products),
@@ -0,0 +1,222 @@
+"""
+Historique des Publications - Rétention bornée des tâches terminées ECOMSIMPLY
+- TaskHistory : tampon circulaire des dernières tâches (ProductDTO complets)
+- Archives compactes des tâches évincées : fichier JSON Lines ou collection MongoDB
+"""
+
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+
+from .dto import PublishTask
+
+logger = logging.getLogger(__name__)
+
+HISTORY_ARCHIVE_BACKENDS = ('none', 'file', 'mongo')
+
+# Tâches évincées écrites en une fois dans l'archive
+DEFAULT_SPILL_BATCH_SIZE = 100
+
+
+def compact_task_record(task: PublishTask) -> Dict[str, Any]:
+    """Résumé d'une tâche terminée pour l'archive (sans le ProductDTO)"""
+
+    product = task.product_dto
+    result_data = task.result_data or {}
+    return {
+        'task_id': task.task_id,
+        'store_id': task.store_id,
+        'batch_id': task.publish_options.get('batch_id'),
+        'status': task.status.value,
+        'title': product.title[:120],
+        'source_url': product.source_url,
+        'payload_signature': product.payload_signature,
+        'external_id': result_data.get('external_id'),
+        'error_message': task.error_message,
+        'retry_count': task.retry_count,
+        'created_at': task.created_at.isoformat(),
+        'completed_at': task.completed_at.isoformat() if task.completed_at else None
+    }
+
+
+class FileTaskArchive:
+    """Archive JSON Lines (une tâche compacte par ligne, fichier en ajout seul)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records_written = 0
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        with open(self.path, 'a', encoding='utf-8') as archive:
+            archive.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+    async def archive_many(self, records: List[Dict[str, Any]]) -> None:
+        # Écriture disque hors boucle d'événements
+        await asyncio.to_thread(self._append, records)
+        self.records_written += len(records)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "file", "path": self.path, "records_written": self.records_written}
+
+
+class MongoTaskArchive:
+    """Archive MongoDB (index TTL sur la date d'archivage)"""
+
+    def __init__(self, database: Any = None, collection_name: str = "publication_history",
+                 retention_days: int = 30):
+        """
+        Args:
+            database: Base Motor (défaut: MONGO_URL / DB_NAME)
+            collection_name: Collection de l'historique
+            retention_days: Conservation des tâches archivées
+        """
+        if database is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+            database = AsyncIOMotorClient(mongo_url)[os.environ.get('DB_NAME', 'ecomsimply')]
+
+        self.collection = database[collection_name]
+        self.retention_days = retention_days
+        self.records_written = 0
+        self._indexes_ready = False
+
+    async def create_indexes(self) -> None:
+        """Créer les index (idempotent)"""
+
+        if self._indexes_ready:
+            return
+        await self.collection.create_index("archived_at", expireAfterSeconds=self.retention_days * 86400)
+        await self.collection.create_index("task_id")
+        await self.collection.create_index([("batch_id", 1), ("status", 1)])
+        self._indexes_ready = True
+
+    async def archive_many(self, records: List[Dict[str, Any]]) -> None:
+        """Insertion groupée non ordonnée"""
+
+        await self.create_indexes()
+        archived_at = datetime.now()  # Même horloge que les dates des tâches archivées
+        await self.collection.insert_many(
+            [{**record, 'archived_at': archived_at} for record in records],
+            ordered=False
+        )
+        self.records_written += len(records)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "mongo",
+            "records_written": self.records_written,
+            "db_records": await self.collection.estimated_document_count()
+        }
+
+
+def create_task_archive(backend: Optional[str] = None, database: Any = None):
+    """
+    Créer l'archive des tâches évincées de l'historique
+
+    Args:
+        backend: 'none', 'file' ou 'mongo' (défaut: variable d'environnement
+            PUBLICATION_HISTORY_ARCHIVE, sinon 'none')
+        database: Base Motor pour le backend 'mongo' (défaut: MONGO_URL / DB_NAME)
+
+    Returns:
+        Archive, ou None si les tâches évincées ne sont pas conservées
+    """
+    backend = backend or os.environ.get("PUBLICATION_HISTORY_ARCHIVE", "none")
+
+    if backend == 'none':
+        return None
+    if backend == 'file':
+        return FileTaskArchive(os.environ.get("PUBLICATION_HISTORY_ARCHIVE_PATH", "publication_history.jsonl"))
+    if backend == 'mongo':
+        return MongoTaskArchive(database)
+
+    raise ValueError(f"Archive d'historique inconnue: {backend} (attendu: {', '.join(HISTORY_ARCHIVE_BACKENDS)})")
+
+
+class TaskHistory:
+    """
+    Historique borné des tâches terminées
+
+    Les `max_size` dernières tâches restent en mémoire (accès par task_id en O(1)) ;
+    les plus anciennes sont évincées vers l'archive sous forme compacte, par lots.
+    """
+
+    def __init__(self, max_size: int, archive: Any = None,
+                 spill_batch_size: int = DEFAULT_SPILL_BATCH_SIZE):
+        """
+        Args:
+            max_size: Tâches conservées en mémoire
+            archive: Archive des tâches évincées (None = évincées oubliées)
+            spill_batch_size: Tâches évincées accumulées avant écriture dans l'archive
+        """
+        self.max_size = max_size
+        self.archive = archive
+        self.spill_batch_size = spill_batch_size
+
+        self._tasks: "OrderedDict[str, PublishTask]" = OrderedDict()
+        self._spill_buffer: List[Dict[str, Any]] = []
+
+        # Compteurs cumulés (indépendants de la taille du tampon)
+        self.total_recorded = 0
+        self.total_evicted = 0
+        self.total_archived = 0
+        self.archive_errors = 0
+
+    def append(self, task: PublishTask) -> None:
+        """Ajouter une tâche terminée (une tâche retentée remplace son entrée précédente)"""
+
+        self.total_recorded += 1
+        self._tasks.pop(task.task_id, None)
+        self._tasks[task.task_id] = task
+
+        while len(self._tasks) > self.max_size:
+            _, evicted = self._tasks.popitem(last=False)
+            self.total_evicted += 1
+            if self.archive is not None:
+                self._spill_buffer.append(compact_task_record(evicted))
+
+    def get(self, task_id: str) -> Optional[PublishTask]:
+        return self._tasks.get(task_id)
+
+    @property
+    def needs_flush(self) -> bool:
+        return len(self._spill_buffer) >= self.spill_batch_size
+
+    async def flush(self) -> int:
+        """Écrire les tâches évincées en attente dans l'archive"""
+
+        if not self._spill_buffer:
+            return 0
+
+        records, self._spill_buffer = self._spill_buffer, []
+        try:
+            await self.archive.archive_many(records)
+        except Exception as e:
+            # Archive best-effort : l'historique mémoire reste borné
+            self.archive_errors += 1
+            logger.warning(f"⚠️ Archivage historique échoué ({len(records)} tâches perdues): {e}")
+            return 0
+
+        self.total_archived += len(records)
+        return len(records)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[PublishTask]:
+        return iter(list(self._tasks.values()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'in_memory': len(self._tasks),
+            'max_size': self.max_size,
+            'total_recorded': self.total_recorded,
+            'total_evicted': self.total_evicted,
+            'total_archived': self.total_archived,
+            'pending_archive': len(self._spill_buffer),
+            'archive_errors': self.archive_errors
+        }
@@ -1,15 +1,32 @@
 """
 Idempotency Manager - Gestion des clés d'idempotence pour éviter doublons publication - ECOMSIMPLY
+- Vérifications et écritures groupées (exists_many / store_many : une requête par batch)
+- Filtre de Bloom en mémoire : réponses négatives sans recherche des clés (stockage partagé :
+  rechargement incrémental des clés récentes avant de conclure)
+- Cache local des clés connues, expiré clé par clé (TTL de la clé)
+- Adaptateur MongoDB avec index TTL (expiration automatique des clés)
 """
 
 import hashlib
+import math
+import os
 import time
-from typing import Dict, Optional, Set
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, field
+import logging
 
 from ..semantic import ProductDTO
 
+logger = logging.getLogger(__name__)
+
+# Durée de vie des clés d'idempotence
+DEFAULT_KEY_TTL_HOURS = 24
+
+# Backends de stockage disponibles (voir create_idempotency_manager)
+IDEMPOTENCY_BACKENDS = ('memory', 'mongo')
+
 
 @dataclass
 class IdempotencyKey:
@@ -21,7 +38,7 @@ class IdempotencyKey:
     payload_hash: str
     metadata: Dict = field(default_factory=dict)
     
-    def is_expired(self, ttl_hours: int = 24) -> bool:
+    def is_expired(self, ttl_hours: int = DEFAULT_KEY_TTL_HOURS) -> bool:
         """Vérifier si la clé a expiré"""
         return (time.time() - self.created_at) > (ttl_hours * 3600)
     
@@ -30,30 +47,126 @@ class IdempotencyKey:
         return (time.time() - self.created_at) / 60
 
 
+class BloomFilter:
+    """
+    Filtre de Bloom (tableau de bits, double hachage)
+    
+    Aucun faux négatif : une clé absente du filtre n'a jamais été ajoutée.
+    Les faux positifs (taux ~error_rate à capacité nominale) sont départagés
+    par le stockage. Pas de suppression : le filtre est reconstruit au besoin.
+    """
+    
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: Nombre de clés prévu
+            error_rate: Taux de faux positifs visé à capacité
+        """
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        
+        # Taille optimale : m = -n ln(p) / ln(2)², k = m/n ln(2)
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+    
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+    
+    @property
+    def is_saturated(self) -> bool:
+        """Au-delà de la capacité le taux de faux positifs se dégrade"""
+        return self.count > self.capacity
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'capacity': self.capacity,
+            'count': self.count,
+            'size_kb': round(len(self._bits) / 1024, 1),
+            'num_hashes': self.num_hashes,
+            'error_rate': self.error_rate
+        }
+
+
 class IdempotencyManager:
-    """Gestionnaire d'idempotence avec adaptateur DB/InMemory"""
+    """
+    Gestionnaire d'idempotence avec adaptateur DB/InMemory
     
-    def __init__(self, storage_adapter=None):
+    Ordre de vérification d'une clé : cache local des clés connues (positif),
+    filtre de Bloom (négatif), puis stockage. Avec un adaptateur partagé entre
+    process, un négatif du filtre n'est conclu qu'après un rechargement
+    incrémental (clés créées depuis le chargement précédent), au plus un par
+    `bloom_negative_reload_s` : une clé écrite par un autre process est vue
+    au plus tard après cet intervalle.
+    """
+    
+    def __init__(self, storage_adapter=None, use_bloom_filter: bool = True,
+                 bloom_capacity: int = 100_000, bloom_error_rate: float = 0.001,
+                 bloom_refresh_s: float = 30.0, bloom_negative_reload_s: float = 1.0,
+                 cache_size: int = 50_000,
+                 cache_ttl_s: float = 300.0, ttl_hours: int = DEFAULT_KEY_TTL_HOURS):
         """
         Args:
             storage_adapter: Adaptateur de stockage (DB, Redis, etc.)
                            Si None, utilise stockage en mémoire
+            use_bloom_filter: Filtre de Bloom devant le stockage
+            bloom_capacity: Clés prévues dans le filtre (doublé à saturation)
+            bloom_error_rate: Taux de faux positifs visé
+            bloom_refresh_s: Rechargement incrémental périodique du filtre depuis
+                l'adaptateur (en plus du rechargement avant un négatif)
+            bloom_negative_reload_s: Intervalle minimal entre deux rechargements
+                déclenchés par un négatif (négatifs conclus sans aller-retour entre-temps)
+            cache_size: Clés connues gardées en cache local (LRU)
+            cache_ttl_s: Durée de validité d'une clé en cache local
+            ttl_hours: Durée de vie des clés en mémoire
         """
         self.storage_adapter = storage_adapter
+        self.ttl_hours = ttl_hours
         
         # Stockage en mémoire (fallback)
         self._memory_storage: Dict[str, IdempotencyKey] = {}
         
-        # Cache local pour performance
-        self._local_cache: Set[str] = set()
-        self._cache_expire = time.time() + 300  # Cache 5min
+        # Cache local des clés connues : clé → expiration (LRU borné)
+        self._local_cache: "OrderedDict[str, float]" = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_ttl_s = cache_ttl_s
+        
+        # Filtre de Bloom (chargé depuis l'adaptateur à la première vérification)
+        self.use_bloom_filter = use_bloom_filter and (
+            storage_adapter is None or hasattr(storage_adapter, 'load_keys')
+        )
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.bloom_refresh_s = bloom_refresh_s
+        self.bloom_negative_reload_s = bloom_negative_reload_s
+        self._bloom: Optional[BloomFilter] = None
+        self._bloom_loaded_at: Optional[float] = None
+        if self.use_bloom_filter and storage_adapter is None:
+            # En mémoire toutes les écritures passent par ce manager : filtre complet dès le départ
+            self._bloom = BloomFilter(bloom_capacity, bloom_error_rate)
         
         # Statistiques
         self.stats = {
             'keys_generated': 0,
+            'keys_stored': 0,
             'duplicates_detected': 0,
             'cache_hits': 0,
-            'cache_misses': 0
+            'cache_misses': 0,
+            'bloom_negatives': 0,
+            'storage_lookups': 0,
+            'bloom_reloads': 0
         }
     
     def generate_idempotency_key(self, store_id: str, product_dto: ProductDTO) -> str:
@@ -96,36 +209,76 @@ class IdempotencyManager:
         Returns:
             True si déjà publiée, False sinon
         """
+        return idempotency_key in await self.exists_many([idempotency_key])
+    
+    async def exists_many(self, idempotency_keys: Iterable[str]) -> Set[str]:
+        """
+        Vérifier un lot de clés avec au plus une requête au stockage
+        
+        Returns:
+            Clés déjà publiées
+        """
+        
+        now = time.time()
+        found: Set[str] = set()
+        unknown: List[str] = []
         
         # 1. Cache local rapide
-        if self._is_cache_valid() and idempotency_key in self._local_cache:
-            self.stats['cache_hits'] += 1
-            return True
+        for key in dict.fromkeys(idempotency_keys):
+            if self._cache_contains(key, now):
+                found.add(key)
+            else:
+                unknown.append(key)
+        self.stats['cache_hits'] += len(found)
+        
+        # 2. Filtre de Bloom : absent du filtre → jamais publiée
+        if unknown and self.use_bloom_filter:
+            bloom = await self._get_bloom()
+            candidates = [key for key in unknown if key in bloom]
+            
+            # Adaptateur partagé : les clés écrites par d'autres process depuis le
+            # dernier chargement manquent au filtre, rechargement avant de conclure
+            # (borné : sinon un aller-retour load_keys par lot contenant une clé neuve)
+            if (len(candidates) < len(unknown) and self.storage_adapter is not None
+                    and now - self._bloom_loaded_at >= self.bloom_negative_reload_s):
+                await self._reload_bloom(time.time(), full=False)
+                candidates = [key for key in unknown if key in self._bloom]
+
+            self.stats['bloom_negatives'] += len(unknown) - len(candidates)
+            self.stats['cache_misses'] += len(unknown) - len(candidates)
+            unknown = candidates
         
-        # 2. Stockage persistant (DB ou mémoire)
-        exists = False
+        # 3. Stockage persistant (DB ou mémoire), une requête pour le lot
+        if unknown:
+            stored = await self._lookup_storage(unknown)
+            for key in stored:
+                self._cache_add(key, now)
+            found |= stored
+            self.stats['duplicates_detected'] += len(stored)
+            self.stats['cache_misses'] += len(unknown) - len(stored)
         
+        return found
+    
+    async def _lookup_storage(self, keys: List[str]) -> Set[str]:
+        """Clés présentes et non expirées dans le stockage"""
+        
+        self.stats['storage_lookups'] += 1
         if self.storage_adapter:
             # Stockage DB/Redis
-            exists = await self.storage_adapter.exists(idempotency_key)
-        else:
-            # Stockage en mémoire
-            if idempotency_key in self._memory_storage:
-                key_obj = self._memory_storage[idempotency_key]
-                if not key_obj.is_expired():
-                    exists = True
-                else:
-                    # Nettoyer clé expirée
-                    del self._memory_storage[idempotency_key]
-        
-        # 3. Mettre à jour cache local
-        if exists:
-            self._local_cache.add(idempotency_key)
-            self.stats['duplicates_detected'] += 1
-        else:
-            self.stats['cache_misses'] += 1
+            return set(await self.storage_adapter.exists_many(keys))
         
-        return exists
+        # Stockage en mémoire
+        existing = set()
+        for key in keys:
+            key_obj = self._memory_storage.get(key)
+            if key_obj is None:
+                continue
+            if key_obj.is_expired(self.ttl_hours):
+                # Nettoyer clé expirée
+                del self._memory_storage[key]
+            else:
+                existing.add(key)
+        return existing
     
     async def store(self, idempotency_key: str, store_id: str, product_dto: ProductDTO, 
                    metadata: Optional[Dict] = None) -> None:
@@ -138,25 +291,50 @@ class IdempotencyManager:
             product_dto: ProductDTO publié
             metadata: Métadonnées additionnelles
         """
+        await self.store_many([(idempotency_key, store_id, product_dto, metadata)])
+    
+    async def store_many(self, entries: Iterable[Tuple[str, str, ProductDTO, Optional[Dict]]]) -> int:
+        """
+        Stocker un lot de clés en une écriture groupée
         
-        key_obj = IdempotencyKey(
-            key=idempotency_key,
-            store_id=store_id,
-            product_id=product_dto.payload_signature,  # Utilise signature comme ID
-            created_at=time.time(),
-            payload_hash=product_dto.payload_signature,
-            metadata=metadata or {}
-        )
+        Args:
+            entries: (clé, store_id, ProductDTO, métadonnées) par publication réussie
+            
+        Returns:
+            Nombre de clés stockées
+        """
+        
+        now = time.time()
+        key_objs = [
+            IdempotencyKey(
+                key=idempotency_key,
+                store_id=store_id,
+                product_id=product_dto.payload_signature,  # Utilise signature comme ID
+                created_at=now,
+                payload_hash=product_dto.payload_signature,
+                metadata=metadata or {}
+            )
+            for idempotency_key, store_id, product_dto, metadata in entries
+        ]
+        if not key_objs:
+            return 0
         
         # Stockage persistant
         if self.storage_adapter:
-            await self.storage_adapter.store(key_obj)
+            await self.storage_adapter.store_many(key_objs)
         else:
             # Stockage en mémoire
-            self._memory_storage[idempotency_key] = key_obj
+            for key_obj in key_objs:
+                self._memory_storage[key_obj.key] = key_obj
         
-        # Cache local
-        self._local_cache.add(idempotency_key)
+        # Filtre et cache local
+        for key_obj in key_objs:
+            if self._bloom is not None:
+                self._bloom.add(key_obj.key)
+            self._cache_add(key_obj.key, now)
+        
+        self.stats['keys_stored'] += len(key_objs)
+        return len(key_objs)
     
     async def get_key_info(self, idempotency_key: str) -> Optional[IdempotencyKey]:
         """Obtenir informations détaillées sur une clé"""
@@ -165,7 +343,7 @@ class IdempotencyManager:
             return await self.storage_adapter.get(idempotency_key)
         else:
             key_obj = self._memory_storage.get(idempotency_key)
-            if key_obj and not key_obj.is_expired():
+            if key_obj and not key_obj.is_expired(self.ttl_hours):
                 return key_obj
         
         return None
@@ -181,27 +359,91 @@ class IdempotencyManager:
             # Nettoyage mémoire
             expired_keys = [
                 key for key, key_obj in self._memory_storage.items()
-                if key_obj.is_expired()
+                if key_obj.is_expired(self.ttl_hours)
             ]
             
             for key in expired_keys:
                 del self._memory_storage[key]
-                self._local_cache.discard(key)
+                self._local_cache.pop(key, None)
             
             cleaned_count = len(expired_keys)
+            
+            # Le filtre ne supporte pas la suppression : reconstruit depuis les clés restantes
+            if self._bloom is not None and expired_keys:
+                self._rebuild_memory_bloom()
+        
+        now = time.time()
+        for key in [key for key, expires_at in self._local_cache.items() if expires_at <= now]:
+            del self._local_cache[key]
         
         return cleaned_count
     
-    def _is_cache_valid(self) -> bool:
-        """Vérifier si le cache local est valide"""
-        current_time = time.time()
-        if current_time > self._cache_expire:
-            # Cache expiré → vider et renouveler
-            self._local_cache.clear()
-            self._cache_expire = current_time + 300  # 5 min
+    # Cache local
+    
+    def _cache_contains(self, key: str, now: float) -> bool:
+        expires_at = self._local_cache.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= now:
+            del self._local_cache[key]
             return False
+        self._local_cache.move_to_end(key)
         return True
     
+    def _cache_add(self, key: str, now: float) -> None:
+        self._local_cache[key] = now + self.cache_ttl_s
+        self._local_cache.move_to_end(key)
+        while len(self._local_cache) > self.cache_size:
+            self._local_cache.popitem(last=False)
+    
+    # Filtre de Bloom
+    
+    async def _get_bloom(self) -> BloomFilter:
+        """Filtre à jour : chargement initial, rechargement incrémental ou reconstruction"""
+        
+        if self.storage_adapter is None:
+            if self._bloom.is_saturated:
+                self._rebuild_memory_bloom()
+            return self._bloom
+        
+        now = time.time()
+        if self._bloom is None or self._bloom.is_saturated:
+            await self._reload_bloom(now, full=True)
+        elif now - self._bloom_loaded_at >= self.bloom_refresh_s:
+            await self._reload_bloom(now, full=False)
+        return self._bloom
+    
+    async def _reload_bloom(self, now: float, full: bool) -> None:
+        """Charger les clés de l'adaptateur (toutes, ou créées depuis le dernier chargement)"""
+        
+        if full:
+            capacity = self.bloom_capacity
+            if self._bloom is not None:
+                capacity = max(capacity, self._bloom.count * 2)
+            bloom = BloomFilter(capacity, self.bloom_error_rate)
+            since = None
+        else:
+            bloom = self._bloom
+            # Marge : écritures concurrentes horodatées juste avant le dernier chargement
+            since = self._bloom_loaded_at - 5.0
+        
+        loaded = 0
+        async for key in self.storage_adapter.load_keys(since=since):
+            bloom.add(key)
+            loaded += 1
+        
+        self._bloom = bloom
+        self._bloom_loaded_at = now
+        self.stats['bloom_reloads'] += 1
+        if full:
+            logger.info(f"✅ Filtre de Bloom idempotence chargé: {loaded} clés")
+    
+    def _rebuild_memory_bloom(self) -> None:
+        capacity = max(self.bloom_capacity, len(self._memory_storage) * 2)
+        self._bloom = BloomFilter(capacity, self.bloom_error_rate)
+        for key in self._memory_storage:
+            self._bloom.add(key)
+    
     async def get_stats(self) -> Dict[str, any]:
         """Obtenir statistiques d'utilisation"""
         
@@ -210,14 +452,14 @@ class IdempotencyManager:
             storage_stats = await self.storage_adapter.get_stats()
         else:
             storage_stats = {
-                "memory_keys": len(self._memory_storage),
-                "cache_keys": len(self._local_cache)
+                "memory_keys": len(self._memory_storage)
             }
         
         return {
             **self.stats,
             **storage_stats,
-            "cache_valid": self._is_cache_valid()
+            "cache_keys": len(self._local_cache),
+            "bloom_filter": self._bloom.get_stats() if self._bloom is not None else None
         }
     
     async def get_duplicate_analysis(self, store_id: str) -> Dict[str, any]:
@@ -229,7 +471,7 @@ class IdempotencyManager:
             # Analyse simple mémoire
             store_keys = [
                 key_obj for key_obj in self._memory_storage.values()
-                if key_obj.store_id == store_id and not key_obj.is_expired()
+                if key_obj.store_id == store_id and not key_obj.is_expired(self.ttl_hours)
             ]
             
             return {
@@ -240,47 +482,157 @@ class IdempotencyManager:
             }
 
 
-class MockDBAdapter:
-    """Adaptateur mock pour tests - simule base de données"""
+def _to_mongo_date(timestamp: float) -> datetime:
+    """Timestamp → datetime UTC naïf (type attendu par l'index TTL)"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def _from_mongo_date(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class MongoIdempotencyAdapter:
+    """
+    Adaptateur MongoDB : une clé = un document (_id = clé)
     
-    def __init__(self):
-        self.storage: Dict[str, IdempotencyKey] = {}
+    Index TTL sur created_at : MongoDB supprime les clés expirées (passe ~1/min),
+    les lectures filtrent aussi sur la date pour ne jamais voir une clé expirée.
+    """
+    
+    def __init__(self, database: Any = None, collection_name: str = "idempotency_keys",
+                 ttl_hours: int = DEFAULT_KEY_TTL_HOURS):
+        """
+        Args:
+            database: Base Motor (défaut: MONGO_URL / DB_NAME)
+            collection_name: Collection des clés
+            ttl_hours: Durée de vie des clés
+        """
+        if database is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+            database = AsyncIOMotorClient(mongo_url)[os.environ.get('DB_NAME', 'ecomsimply')]
+        
+        self.collection = database[collection_name]
+        self.ttl_hours = ttl_hours
+        self._indexes_ready = False
         self.access_count = 0
     
+    async def create_indexes(self) -> None:
+        """Créer les index (idempotent)"""
+        
+        if self._indexes_ready:
+            return
+        await self.collection.create_index("created_at", expireAfterSeconds=self.ttl_hours * 3600)
+        await self.collection.create_index("store_id")
+        self._indexes_ready = True
+    
+    def _cutoff(self) -> datetime:
+        return _to_mongo_date(time.time() - self.ttl_hours * 3600)
+    
     async def exists(self, key: str) -> bool:
+        return key in await self.exists_many([key])
+    
+    async def exists_many(self, keys: List[str]) -> Set[str]:
+        """Une requête $in pour tout le lot"""
+        
         self.access_count += 1
-        key_obj = self.storage.get(key)
-        return key_obj is not None and not key_obj.is_expired()
+        cursor = self.collection.find(
+            {'_id': {'$in': list(keys)}, 'created_at': {'$gt': self._cutoff()}},
+            {'_id': 1}
+        )
+        return {doc['_id'] async for doc in cursor}
     
     async def store(self, key_obj: IdempotencyKey) -> None:
+        await self.store_many([key_obj])
+    
+    async def store_many(self, key_objs: List[IdempotencyKey]) -> None:
+        """
+        Écriture groupée non ordonnée
+        
+        Remplacement par upsert plutôt qu'insertion : une clé expirée pas encore
+        purgée par l'index TTL est réécrite au lieu d'échouer en doublon.
+        """
+        
+        from pymongo import ReplaceOne
+        
+        await self.create_indexes()
         self.access_count += 1
-        self.storage[key_obj.key] = key_obj
+        await self.collection.bulk_write(
+            [
+                ReplaceOne(
+                    {'_id': key_obj.key},
+                    {
+                        'store_id': key_obj.store_id,
+                        'product_id': key_obj.product_id,
+                        'payload_hash': key_obj.payload_hash,
+                        'metadata': key_obj.metadata,
+                        'created_at': _to_mongo_date(key_obj.created_at)
+                    },
+                    upsert=True
+                )
+                for key_obj in key_objs
+            ],
+            ordered=False
+        )
     
     async def get(self, key: str) -> Optional[IdempotencyKey]:
         self.access_count += 1
-        key_obj = self.storage.get(key)
-        if key_obj and not key_obj.is_expired():
-            return key_obj
-        return None
+        doc = await self.collection.find_one({'_id': key, 'created_at': {'$gt': self._cutoff()}})
+        if doc is None:
+            return None
+        return IdempotencyKey(
+            key=doc['_id'],
+            store_id=doc['store_id'],
+            product_id=doc['product_id'],
+            created_at=_from_mongo_date(doc['created_at']),
+            payload_hash=doc['payload_hash'],
+            metadata=doc.get('metadata') or {}
+        )
+    
+    async def load_keys(self, since: Optional[float] = None) -> AsyncIterator[str]:
+        """Clés valides, éventuellement créées depuis `since` (chargement du filtre de Bloom)"""
+        
+        created_after = self._cutoff()
+        if since is not None:
+            created_after = max(created_after, _to_mongo_date(since))
+        cursor = self.collection.find({'created_at': {'$gt': created_after}}, {'_id': 1})
+        async for doc in cursor:
+            yield doc['_id']
     
     async def cleanup_expired(self) -> int:
-        expired_keys = [
-            k for k, v in self.storage.items() 
-            if v.is_expired()
-        ]
-        for k in expired_keys:
-            del self.storage[k]
-        return len(expired_keys)
+        """Purge immédiate (l'index TTL le fait aussi en arrière-plan)"""
+        result = await self.collection.delete_many({'created_at': {'$lte': self._cutoff()}})
+        return result.deleted_count
     
     async def get_stats(self) -> Dict[str, any]:
         return {
-            "db_keys": len(self.storage),
+            "db_keys": await self.collection.estimated_document_count(),
             "db_access_count": self.access_count
         }
     
     async def get_duplicate_analysis(self, store_id: str) -> Dict[str, any]:
-        store_keys = [v for v in self.storage.values() if v.store_id == store_id]
         return {
             "store_id": store_id,
-            "db_keys_for_store": len(store_keys)
-        }
\ No newline at end of file
+            "db_keys_for_store": await self.collection.count_documents(
+                {'store_id': store_id, 'created_at': {'$gt': self._cutoff()}}
+            )
+        }
+
+
+def create_idempotency_manager(backend: Optional[str] = None, database: Any = None) -> IdempotencyManager:
+    """
+    Créer le gestionnaire d'idempotence du backend demandé
+    
+    Args:
+        backend: 'memory' ou 'mongo' (défaut: variable d'environnement
+            PUBLICATION_IDEMPOTENCY_BACKEND, sinon 'memory')
+        database: Base Motor pour le backend 'mongo' (défaut: MONGO_URL / DB_NAME)
+    """
+    backend = backend or os.environ.get("PUBLICATION_IDEMPOTENCY_BACKEND", "memory")
+    
+    if backend == 'memory':
+        return IdempotencyManager()
+    if backend == 'mongo':
+        return IdempotencyManager(MongoIdempotencyAdapter(database))
+    
+    raise ValueError(f"Backend d'idempotence inconnu: {backend} (attendu: {', '.join(IDEMPOTENCY_BACKENDS)})")
@@ -0,0 +1,478 @@
+"""
+Queue de publication durable MongoDB - Déploiements multi-réplicas - ECOMSIMPLY
+- Une tâche = un document (_id = task_id), survit aux redémarrages
+- Récupération atomique par find_one_and_update (un seul réplica obtient la tâche)
+- Bail (visibility timeout) renouvelé pendant le traitement ; une tâche dont le
+  bail expire redevient disponible pour un autre réplica
+- Dead-letter après trop de récupérations sans acquittement (crash en boucle)
+- Cooldown et limite horaire par store partagés entre réplicas (document "gate" par store)
+- Retries différés : la tâche n'est récupérable qu'à partir de available_at
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from .dto import PublishTask, PublishBatch, PublicationConfig
+from .queue import PublishQueue
+from .rate_limit import StoreRateLimiters
+
+logger = logging.getLogger(__name__)
+
+# Status des documents de queue (les status terminaux reprennent PublicationStatus)
+QUEUE_PENDING = "pending"
+QUEUE_LEASED = "leased"
+QUEUE_DEAD_LETTER = "dead_letter"
+
+
+def _utcnow() -> datetime:
+    """Maintenant en UTC naïf (format des dates relues par Motor)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class MongoPublishQueue(PublishQueue):
+    """
+    PublishQueue persistante dans une collection MongoDB
+
+    Même interface que la queue en mémoire ; les workers doivent acquitter les
+    tâches terminées (complete_task) et garder leur bail (hold_lease).
+    """
+
+    def __init__(
+        self,
+        config: PublicationConfig,
+        database: Any = None,
+        collection_name: str = "publication_queue",
+        visibility_timeout_s: float = 300.0,
+        max_deliveries: int = 3,
+        poll_interval_s: float = 5.0,
+        completed_retention_days: int = 7,
+        rate_limiters: Optional[StoreRateLimiters] = None
+    ):
+        """
+        Args:
+            config: Configuration publication
+            database: Base Motor (défaut: MONGO_URL / DB_NAME)
+            collection_name: Collection des tâches (gates: <collection>_store_gates)
+            visibility_timeout_s: Durée du bail d'une tâche récupérée
+            max_deliveries: Récupérations sans acquittement avant dead-letter
+            poll_interval_s: Attente max entre deux vérifications (ajouts d'autres réplicas)
+            completed_retention_days: Conservation des tâches terminées (index TTL)
+            rate_limiters: Fenêtres horaires par store partagées avec le scheduler
+        """
+        super().__init__(config, rate_limiters=rate_limiters)
+
+        if database is None:
+            mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+            db_name = os.environ.get('DB_NAME', 'ecomsimply')
+            database = AsyncIOMotorClient(mongo_url)[db_name]
+
+        self.collection = database[collection_name]
+        self.gates = database[f"{collection_name}_store_gates"]
+
+        self.visibility_timeout_s = visibility_timeout_s
+        self.max_deliveries = max_deliveries
+        self.poll_interval_s = poll_interval_s
+        self.completed_retention_days = completed_retention_days
+        self.lease_renewal_interval_s = visibility_timeout_s / 3
+
+        # Identité du réplica et baux détenus (task_id → lease_id)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._leases: Dict[str, str] = {}
+        self._indexes_ready = False
+
+        # Profondeur connue (rafraîchie par size() / get_queue_stats, ajustée localement)
+        self._cached_size = 0
+
+        self.stats.update({
+            'claims_released': 0,
+            'leases_renewed': 0,
+            'leases_lost': 0,
+            'dead_lettered': 0
+        })
+
+    async def create_indexes(self) -> None:
+        """Créer les index de la collection (idempotent)"""
+
+        if self._indexes_ready:
+            return
+
+        # Récupération : prochaine tâche disponible par priorité
+        await self.collection.create_index([
+            ("status", ASCENDING), ("priority", ASCENDING), ("created_at", ASCENDING)
+        ])
+        # Prochaine échéance (attente des workers, baux expirés)
+        await self.collection.create_index([("status", ASCENDING), ("available_at", ASCENDING)])
+        # Purge des tâches terminées
+        await self.collection.create_index(
+            "completed_at", expireAfterSeconds=self.completed_retention_days * 86400
+        )
+        self._indexes_ready = True
+
+    def __len__(self) -> int:
+        """Dernière profondeur connue (ajouts des autres réplicas visibles après size())"""
+        return self._cached_size
+
+    async def size(self) -> int:
+        """Nombre de documents en attente dans la collection"""
+
+        self._cached_size = await self.collection.count_documents({'status': QUEUE_PENDING})
+        return self._cached_size
+
+    # Écriture
+
+    def _pending_update(self, task: PublishTask, now: datetime, delay_s: float = 0.0) -> Dict[str, Any]:
+        """Document en attente : remplace état, priorité et bail précédents"""
+        return {
+            '$set': {
+                'store_id': task.store_id,
+                'priority': task.priority,
+                'created_at': task.created_at,
+                'status': QUEUE_PENDING,
+                'available_at': now + timedelta(seconds=delay_s),
+                'deliveries': 0,
+                'lease_owner': None,
+                'lease_id': None,
+                'task': task.model_dump(mode='json'),
+                'updated_at': now
+            },
+            '$unset': {'completed_at': ""}
+        }
+
+    async def add_task(self, task: PublishTask, delay_s: float = 0.0) -> None:
+        """Ajouter (ou remettre, éventuellement différée) une tâche dans la collection"""
+
+        await self.create_indexes()
+        await self.collection.update_one(
+            {'_id': task.task_id}, self._pending_update(task, _utcnow(), delay_s), upsert=True
+        )
+        self._leases.pop(task.task_id, None)
+        self._cached_size += 1
+        self.stats['tasks_added'] += 1
+
+        # Réveil des workers locaux ; les autres réplicas voient la tâche au prochain poll
+        async with self._changed:
+            self._changed.notify_all()
+
+        logger.debug(f"Tâche persistée: {task.task_id} (priorité {task.priority})")
+
+    async def add_batch(self, batch: PublishBatch) -> None:
+        """Ajouter un batch de tâches en une écriture groupée"""
+
+        if not batch.tasks:
+            return
+
+        await self.create_indexes()
+        now = _utcnow()
+        await self.collection.bulk_write(
+            [UpdateOne({'_id': task.task_id}, self._pending_update(task, now), upsert=True)
+             for task in batch.tasks],
+            ordered=False
+        )
+        self._cached_size += len(batch.tasks)
+        self.stats['tasks_added'] += len(batch.tasks)
+
+        async with self._changed:
+            self._changed.notify_all()
+
+        logger.info(f"Batch persisté: {batch.batch_id} avec {len(batch.tasks)} tâches")
+
+    # Récupération
+
+    async def get_next_task(self, exclude_stores: Optional[Set[str]] = None) -> Optional[PublishTask]:
+        """
+        Récupérer atomiquement la prochaine tâche disponible
+
+        Un store en cooldown ou à sa limite horaire est exclu des récupérations suivantes
+        et sa tâche est relâchée jusqu'à sa prochaine disponibilité.
+        L'ordre est celui de la priorité (pas de tour DRR entre réplicas).
+
+        Args:
+            exclude_stores: Stores à ignorer (ex: concurrence max atteinte côté workers)
+
+        Returns:
+            Tâche prête ou None si rate limited / queue vide
+        """
+
+        if not self.config.is_active_hours():
+            self.stats['rate_limited_count'] += 1
+            return None
+
+        await self.create_indexes()
+        blocked_stores = set(exclude_stores or ())
+        rate_limited = False
+
+        while True:
+            now = _utcnow()
+            doc = await self._claim(now, blocked_stores)
+            if doc is None:
+                if rate_limited:
+                    self.stats['rate_limited_count'] += 1
+                return None
+
+            if doc.get('deliveries', 0) > self.max_deliveries:
+                await self._dead_letter(doc, f"{doc['deliveries'] - 1} baux expirés sans acquittement")
+                continue
+
+            store_id = doc['store_id']
+            wait_seconds = await self._acquire_store_slot(store_id, now)
+            if wait_seconds > 0:
+                rate_limited = True
+                blocked_stores.add(store_id)
+                await self._release(doc, now + timedelta(seconds=wait_seconds))
+                continue
+
+            task = PublishTask.model_validate(doc['task'])
+            task.mark_started()
+            self._leases[task.task_id] = doc['lease_id']
+            self._last_publication[store_id] = datetime.now()
+            self._cached_size = max(self._cached_size - 1, 0)
+            self.stats['tasks_processed'] += 1
+
+            logger.debug(f"Tâche récupérée: {task.task_id} pour store {store_id} (bail {self.worker_id})")
+            return task
+
+    async def _claim(self, now: datetime, blocked_stores: set) -> Optional[Dict[str, Any]]:
+        """Prendre le bail de la tâche disponible la plus prioritaire (ou au bail expiré)"""
+
+        query: Dict[str, Any] = {
+            'status': {'$in': [QUEUE_PENDING, QUEUE_LEASED]},
+            'available_at': {'$lte': now}
+        }
+        if blocked_stores:
+            query['store_id'] = {'$nin': sorted(blocked_stores)}
+
+        return await self.collection.find_one_and_update(
+            query,
+            {
+                '$set': {
+                    'status': QUEUE_LEASED,
+                    'lease_owner': self.worker_id,
+                    'lease_id': uuid.uuid4().hex,
+                    # Bail expiré = tâche de nouveau disponible
+                    'available_at': now + timedelta(seconds=self.visibility_timeout_s),
+                    'updated_at': now
+                },
+                '$inc': {'deliveries': 1}
+            },
+            sort=[('priority', ASCENDING), ('created_at', ASCENDING), ('_id', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _release(self, doc: Dict[str, Any], available_at: datetime) -> None:
+        """Rendre une tâche récupérée mais non traitable (store indisponible)"""
+
+        await self.collection.update_one(
+            {'_id': doc['_id'], 'lease_id': doc['lease_id']},
+            {
+                '$set': {'status': QUEUE_PENDING, 'available_at': available_at,
+                         'lease_owner': None, 'lease_id': None},
+                '$inc': {'deliveries': -1}
+            }
+        )
+        self.stats['claims_released'] += 1
+
+    async def _acquire_store_slot(self, store_id: str, now: datetime) -> float:
+        """
+        Réserver le créneau de publication d'un store (0 = réservé, sinon attente en s)
+
+        Cooldown et limite horaire partagés via un document par store : échéance du
+        cooldown et horodatages des `limit` dernières publications. Le document n'est
+        mis à jour que si le cooldown est échu et la fenêtre d'une heure non pleine
+        (upsert en conflit sinon).
+        """
+
+        rate_limiter = self._get_rate_limiter(store_id)
+        # Fenêtre locale = sous-ensemble de la fenêtre partagée : pleine ici, pleine partout
+        wait_seconds = rate_limiter.time_until_available()
+        if wait_seconds > 0:
+            return wait_seconds
+
+        limit = rate_limiter.limit
+        window_start = now - timedelta(seconds=rate_limiter.window_s)
+        cooldown_end = now + timedelta(seconds=self.config.cooldown_between_publications)
+        try:
+            await self.gates.update_one(
+                {
+                    '_id': store_id,
+                    'next_available_at': {'$lte': now},
+                    # Moins de `limit` publications, ou la plus ancienne sortie de la fenêtre
+                    '$or': [
+                        {f'publications.{limit - 1}': {'$exists': False}},
+                        {'publications.0': {'$lte': window_start}}
+                    ]
+                },
+                {
+                    '$set': {'next_available_at': cooldown_end, 'owner': self.worker_id},
+                    '$push': {'publications': {'$each': [now], '$slice': -limit}}
+                },
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Gate existante en cooldown ou fenêtre pleine (autres réplicas)
+            gate = await self.gates.find_one({'_id': store_id}, {'next_available_at': 1, 'publications': 1})
+            if gate:
+                return max(self._gate_wait_seconds(gate, limit, rate_limiter.window_s, now), 0.001)
+            return 0.001
+
+        rate_limiter.record(now.replace(tzinfo=timezone.utc).timestamp())
+        return 0.0
+
+    @staticmethod
+    def _gate_wait_seconds(gate: Dict[str, Any], limit: int, window_s: float, now: datetime) -> float:
+        """Attente imposée par une gate : fin du cooldown ou sortie de fenêtre de la plus ancienne publication"""
+
+        wait_seconds = (gate['next_available_at'] - now).total_seconds()
+        publications = gate.get('publications') or []
+        if len(publications) >= limit:
+            oldest = publications[-limit]
+            wait_seconds = max(wait_seconds, (oldest - now).total_seconds() + window_s)
+        return wait_seconds
+
+    # Bail et acquittement
+
+    async def renew_lease(self, task: PublishTask) -> bool:
+        """Prolonger le bail ; False si la tâche a été reprise par un autre réplica"""
+
+        lease_id = self._leases.get(task.task_id)
+        if lease_id is None:
+            return False
+
+        now = _utcnow()
+        result = await self.collection.update_one(
+            {'_id': task.task_id, 'lease_id': lease_id, 'status': QUEUE_LEASED},
+            {'$set': {'available_at': now + timedelta(seconds=self.visibility_timeout_s),
+                      'updated_at': now}}
+        )
+        if result.matched_count:
+            self.stats['leases_renewed'] += 1
+            return True
+
+        self._leases.pop(task.task_id, None)
+        self.stats['leases_lost'] += 1
+        return False
+
+    async def complete_task(self, task: PublishTask) -> None:
+        """Acquitter une tâche terminée : status final, conservée jusqu'au TTL"""
+
+        lease_id = self._leases.pop(task.task_id, None)
+        if lease_id is None:
+            return
+
+        now = _utcnow()
+        result = await self.collection.update_one(
+            {'_id': task.task_id, 'lease_id': lease_id},
+            {'$set': {
+                'status': task.status.value,
+                'completed_at': now,
+                'updated_at': now,
+                'lease_owner': None,
+                'lease_id': None,
+                'task': task.model_dump(mode='json')
+            }}
+        )
+        if not result.matched_count:
+            self.stats['leases_lost'] += 1
+            logger.warning(f"Acquittement ignoré, bail perdu: {task.task_id}")
+
+    async def _dead_letter(self, doc: Dict[str, Any], reason: str) -> None:
+        """Écarter définitivement une tâche qui fait échouer ses workers"""
+
+        now = _utcnow()
+        await self.collection.update_one(
+            {'_id': doc['_id'], 'lease_id': doc['lease_id']},
+            {'$set': {
+                'status': QUEUE_DEAD_LETTER,
+                'dead_letter_reason': reason,
+                'dead_lettered_at': now,
+                'updated_at': now,
+                'lease_owner': None,
+                'lease_id': None
+            }}
+        )
+        self.stats['dead_lettered'] += 1
+        logger.error(f"☠️ Tâche {doc['_id']} en dead-letter: {reason}")
+
+    # Attente
+
+    async def _next_available_delay(self, exclude_stores: Optional[Set[str]] = None) -> Optional[float]:
+        """Secondes avant la prochaine tâche disponible (None si aucune)"""
+
+        query: Dict[str, Any] = {'status': {'$in': [QUEUE_PENDING, QUEUE_LEASED]}}
+        if exclude_stores:
+            query['store_id'] = {'$nin': sorted(exclude_stores)}
+        doc = await self.collection.find_one(
+            query,
+            {'available_at': 1},
+            sort=[('available_at', ASCENDING)]
+        )
+        if doc is None:
+            return None
+        return max((doc['available_at'] - _utcnow()).total_seconds(), 0.0)
+
+    async def wait_until_ready(self, timeout: Optional[float] = None,
+                               exclude_stores: Optional[Set[str]] = None) -> bool:
+        """
+        Attendre un ajout local ou l'échéance de la prochaine tâche
+
+        Plafonné à poll_interval_s : les ajouts des autres réplicas ne sont pas notifiés.
+        """
+
+        delay = await self._next_available_delay(exclude_stores)
+        if delay == 0 and self.config.is_active_hours():
+            return True
+
+        delay = self.poll_interval_s if delay is None else min(delay, self.poll_interval_s)
+        if timeout is not None:
+            delay = min(delay, timeout)
+
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait(), delay)
+                return True
+            except asyncio.TimeoutError:
+                pass
+        return await self._next_available_delay(exclude_stores) == 0
+
+    # Statistiques
+
+    async def get_queue_stats(self) -> Dict[str, Any]:
+        """Statistiques de la collection (répartition par status, priorité, store)"""
+
+        status_counts: Dict[str, int] = {}
+        priority_counts: Dict[int, int] = {}
+        store_counts: Dict[str, int] = {}
+
+        cursor = self.collection.aggregate([
+            {'$group': {
+                '_id': {'status': '$status', 'priority': '$priority', 'store_id': '$store_id'},
+                'count': {'$sum': 1}
+            }}
+        ])
+        async for group in cursor:
+            key, count = group['_id'], group['count']
+            status_counts[key['status']] = status_counts.get(key['status'], 0) + count
+            if key['status'] in (QUEUE_PENDING, QUEUE_LEASED):
+                priority_counts[key['priority']] = priority_counts.get(key['priority'], 0) + count
+                store_counts[key['store_id']] = store_counts.get(key['store_id'], 0) + count
+        self._cached_size = status_counts.get(QUEUE_PENDING, 0)
+
+        return {
+            **self.stats,
+            'backend': 'mongo',
+            'worker_id': self.worker_id,
+            'current_queue_depth': status_counts.get(QUEUE_PENDING, 0) + status_counts.get(QUEUE_LEASED, 0),
+            'status_distribution': status_counts,
+            'priority_distribution': priority_counts,
+            'store_distribution': store_counts,
+            'leases_held': len(self._leases),
+            'active_rate_limiters': len(self._rate_limiters)
+        }
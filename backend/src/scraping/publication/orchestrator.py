@@ -7,29 +7,45 @@ import asyncio
 import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set
-from collections import defaultdict
+from typing import AsyncIterator, Deque, Dict, List, Optional, Any, Set
+from collections import defaultdict, deque, OrderedDict
 import logging
 
 from ..semantic import ProductDTO
 from .dto import PublishTask, PublishBatch, PublicationConfig, PublicationStatus, StoreType
-from .queue import PublishQueue, PublishWorker
+from .queue import PublishQueue, PublishWorker, PublishWorkerPool, create_publish_queue
 from .scheduler import PublicationScheduler
 from .guardrails import GuardRailEngine
-from .idempotency import IdempotencyManager
+from .idempotency import IdempotencyManager, create_idempotency_manager
 from .publishers import get_all_publishers, IdempotencyStore
+from .events import (
+    PublicationEventBus, PublicationEvent, ProgressCounters, EVENT_TYPES, OPEN_STATUSES,
+    format_ndjson, format_sse
+)
+from .history import TaskHistory, create_task_archive
+from ..metrics import PUBLICATION_QUEUE_DEPTH
 from .constants import STORES, DEFAULT_PUBLICATION_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# Batches dont la progression reste consultable (les plus anciens terminés sont oubliés)
+MAX_TRACKED_BATCHES = 1000
+
 
 class PublicationOrchestrator:
     """Orchestrateur principal pour publication multi-stores"""
     
-    def __init__(self, config: Optional[PublicationConfig] = None):
+    def __init__(self, config: Optional[PublicationConfig] = None, queue: Optional[PublishQueue] = None,
+                 idempotency_manager: Optional[IdempotencyManager] = None, history_archive: Any = None):
         """
         Args:
             config: Configuration publication (défaut depuis constants)
+            queue: Queue de publication (défaut: backend de PUBLICATION_QUEUE_BACKEND,
+                en mémoire si non défini)
+            idempotency_manager: Gestionnaire d'idempotence (défaut: backend de
+                PUBLICATION_IDEMPOTENCY_BACKEND, en mémoire si non défini)
+            history_archive: Archive des tâches évincées de l'historique (défaut:
+                backend de PUBLICATION_HISTORY_ARCHIVE, aucune si non défini)
         """
         # Configuration
         if config is None:
@@ -37,27 +53,48 @@ class PublicationOrchestrator:
         self.config = config
         
         # Composants principaux
-        self.scheduler = PublicationScheduler(config)
         self.guardrails = GuardRailEngine(
             price_variance_threshold=config.price_variance_threshold,
             min_confidence=config.min_confidence_score
         )
-        self.idempotency_manager = IdempotencyManager()
+        self.idempotency_manager = (
+            idempotency_manager if idempotency_manager is not None else create_idempotency_manager()
+        )
         
         # Publishers pour tous les stores
         self.idem_store = IdempotencyStore()
         self.publishers = get_all_publishers(self.idem_store)
         
         # Queue et workers
-        self.queue = PublishQueue(config)
+        self.queue = queue if queue is not None else create_publish_queue(config)
+        # Même fenêtre horaire par store que la queue (créneau réservé à la récupération)
+        self.scheduler = PublicationScheduler(config, rate_limiters=self.queue.rate_limiters)
         self.workers: Dict[str, PublishWorker] = {}
         self.is_running = False
         
-        # État des publications
+        # Pool de workers : concurrence globale et par store, équité DRR de la queue
+        self.worker_pool = PublishWorkerPool(
+            self.queue,
+            self._process_task,
+            max_concurrency=config.max_concurrent_workers,
+            max_per_store=config.max_concurrent_per_store
+        )
+        self._pool_runner: Optional[asyncio.Task] = None
+        
+        # État des publications : historiques bornés, tâches évincées archivées en compact
         self.active_publications: Set[str] = set()  # task_ids en cours
-        self.completed_tasks: List[PublishTask] = []
-        self.failed_tasks: List[PublishTask] = []
-        self.duplicate_tasks: List[PublishTask] = []
+        self.history_archive = history_archive if history_archive is not None else create_task_archive()
+        self.completed_tasks = TaskHistory(config.history_size, self.history_archive)
+        self.failed_tasks = TaskHistory(config.history_size, self.history_archive)
+        self.duplicate_tasks: Deque[PublishTask] = deque(maxlen=config.history_size)
+        
+        # Progression incrémentale (global, par store, par batch) et flux d'événements
+        self.events = PublicationEventBus()
+        self.progress = ProgressCounters()
+        self.store_progress: Dict[str, ProgressCounters] = defaultdict(ProgressCounters)
+        self.batch_progress: "OrderedDict[str, ProgressCounters]" = OrderedDict()
+        self.batch_owners: Dict[str, str] = {}  # Utilisateur ayant mis le batch en queue
+        self._open_tasks: Dict[str, PublicationStatus] = {}  # Statut des tâches non terminées
         
         # Statistiques globales
         self.stats = {
@@ -128,11 +165,13 @@ class PublicationOrchestrator:
             self.stats['total_skipped_duplicate'] += 1  # Ajouté
             self.stats['by_store'][store_id]['enqueued'] += 1
             self.stats['by_store'][store_id]['skipped'] += 1
+            self._record_transition(task)
             
             return task_id
         
         # Si pas de doublon, ajouter à la queue normale
         await self.queue.add_task(task)
+        self._record_transition(task)
         
         # Statistiques
         self.stats['total_enqueued'] += 1
@@ -144,7 +183,7 @@ class PublicationOrchestrator:
         return task_id
     
     async def enqueue_batch(self, products: List[ProductDTO], store_id: str,
-                           batch_priority: int = 5) -> PublishBatch:
+                           batch_priority: int = 5, owner_id: Optional[str] = None) -> PublishBatch:
         """
         Met en queue un batch de produits pour un store
         
@@ -152,6 +191,8 @@ class PublicationOrchestrator:
             products: Liste ProductDTO à publier
             store_id: Store cible
             batch_priority: Priorité du batch
+            owner_id: Utilisateur propriétaire (seul autorisé à suivre le batch,
+                transmis aux publishers dans publish_options['user_id'])
             
         Returns:
             PublishBatch créé
@@ -161,12 +202,12 @@ class PublicationOrchestrator:
             raise ValueError("Liste produits vide")
         
         batch_id = f"batch_{store_id}_{uuid.uuid4().hex[:8]}"
+        store_type = StoreType(store_id)
         tasks = []
         
         for i, product in enumerate(products):
             # Créer la tâche directement
             task_id = f"{store_id}_{uuid.uuid4().hex[:8]}"
-            store_type = StoreType(store_id)
             
             task = PublishTask(
                 task_id=task_id,
@@ -176,22 +217,72 @@ class PublicationOrchestrator:
                 priority=batch_priority,
                 publish_options={'batch_id': batch_id, 'batch_position': i}
             )
-            
-            # Ajouter à la queue
-            await self.queue.add_task(task)
+            if owner_id is not None:
+                task.publish_options['user_id'] = owner_id
             
             # Ajouter à la liste des tâches du batch
             tasks.append(task)
-            
-            # Statistiques
-            self.stats['total_enqueued'] += 1
-            self.stats['by_store'][store_id]['enqueued'] += 1
+        
+        # Vérification idempotence du lot en une requête AVANT mise en queue
+        keys = [
+            self.idempotency_manager.generate_idempotency_key(store_id, task.product_dto)
+            for task in tasks
+        ]
+        existing_keys = await self.idempotency_manager.exists_many(keys)
+        
+        to_enqueue = []
+        for task, idempotency_key in zip(tasks, keys):
+            if idempotency_key in existing_keys:
+                task.status = PublicationStatus.SKIPPED_DUPLICATE
+                task.error_message = f"Doublon détecté: {idempotency_key[:8]}"
+                self.duplicate_tasks.append(task)
+                self.stats['total_skipped'] += 1
+                self.stats['total_skipped_duplicate'] += 1
+                self.stats['by_store'][store_id]['skipped'] += 1
+            else:
+                to_enqueue.append(task)
+        
+        duplicate_count = len(tasks) - len(to_enqueue)
+        
+        # Guardrails évalués sur tout le lot : les tâches bloquées n'entrent pas en queue
+        validations = self.guardrails.validate_many(to_enqueue)
+        accepted = []
+        for task, (can_publish, blocking_reason, guardrail_analysis) in zip(to_enqueue, validations):
+            if can_publish:
+                # Analyse conservée pour le traitement (pas de seconde validation)
+                task.publish_options['guardrail_analysis'] = guardrail_analysis
+                accepted.append(task)
+            else:
+                task.mark_skipped(f"Guardrails: {blocking_reason}")
+                self.failed_tasks.append(task)
+                self.stats['total_skipped_guardrails'] += 1
+                self.stats['by_store'][store_id]['skipped'] += 1
+        
+        blocked_count = len(to_enqueue) - len(accepted)
+        to_enqueue = accepted
+        
+        # Ajouter à la queue en une écriture groupée
+        await self.queue.add_batch(PublishBatch(batch_id=batch_id, tasks=to_enqueue))
+        
+        # Statistiques
+        self.stats['total_enqueued'] += len(tasks)
+        self.stats['by_store'][store_id]['enqueued'] += len(tasks)
+        if owner_id is not None:
+            self.batch_owners[batch_id] = owner_id
+        for task in tasks:
+            self._record_transition(task)
+        
+        if duplicate_count:
+            logger.info(f"🔄 Batch {batch_id}: {duplicate_count} doublons ignorés")
+        if blocked_count:
+            logger.warning(f"🚫 Batch {batch_id}: {blocked_count} tâches bloquées par guardrails")
         
         batch = PublishBatch(
             batch_id=batch_id,
             tasks=tasks
         )
         batch.update_stats()
+        await self._spill_history()
         
         logger.info(f"📦 Batch {batch_id} créé avec {len(tasks)} tâches pour {store_id}")
         
@@ -207,23 +298,47 @@ class PublicationOrchestrator:
         
         # 1. Vérifier d'abord les tâches doublons (retour immédiat)
         if self.duplicate_tasks:
-            task = self.duplicate_tasks.pop(0)
+            task = self.duplicate_tasks.popleft()
             logger.info(f"🔄 Retour tâche doublon: {task.task_id}")
             return task
         
-        # 2. Récupérer prochaine tâche selon rate limits
-        task = await self.queue.get_next_task()
-        if not task:
-            return None
+        # 2. Récupérer prochaine tâche selon rate limits, traitée sous bail
+        tasks = await self.worker_pool.run_available(max_tasks=1)
+        return tasks[0] if tasks else None
+    
+    async def work_batch(self, max_tasks: Optional[int] = None) -> List[PublishTask]:
+        """
+        Traite en parallèle les tâches disponibles immédiatement
+        
+        Args:
+            max_tasks: Nombre max de tâches (défaut: max_concurrent_workers)
+            
+        Returns:
+            Tâches doublons en attente puis tâches traitées
+        """
+        
+        duplicates = list(self.duplicate_tasks)
+        self.duplicate_tasks.clear()
+        return duplicates + await self.worker_pool.run_available(max_tasks)
+    
+    async def _process_task(self, task: PublishTask) -> PublishTask:
+        """Guardrails, idempotence, scheduling puis publication d'une tâche récupérée"""
         
         start_time = time.time()
         self.active_publications.add(task.task_id)
+        if task.status != PublicationStatus.PROCESSING:
+            task.mark_started()
+        self._record_transition(task)
         
         try:
             logger.info(f"⚙️  Traitement tâche {task.task_id} pour {task.store_id}")
             
-            # 2. Vérification guardrails
-            can_publish, blocking_reason, guardrail_analysis = self.guardrails.validate_publication(task)
+            # 2. Vérification guardrails (déjà faite à la mise en queue d'un batch)
+            guardrail_analysis = task.publish_options.pop('guardrail_analysis', None)
+            if guardrail_analysis is not None:
+                can_publish, blocking_reason = True, None
+            else:
+                can_publish, blocking_reason, guardrail_analysis = self.guardrails.validate_publication(task)
             
             if not can_publish:
                 task.mark_skipped(f"Guardrails: {blocking_reason}")
@@ -249,8 +364,8 @@ class PublicationOrchestrator:
                 logger.warning(f"♻️  Tâche {task.task_id} ignorée (doublon)")
                 return task
             
-            # 5. Vérification scheduling (fenêtre horaire, cooldown)
-            if not self.scheduler.can_publish_now(task.store_id):
+            # 5. Vérification fenêtre horaire (cooldown et limite appliqués à la récupération)
+            if not self.scheduler.can_publish_now(task.store_id, slot_reserved=True):
                 next_slot = self.scheduler.get_next_available_slot(task.store_id)
                 logger.info(f"⏰ Tâche {task.task_id} reportée à {next_slot.strftime('%H:%M:%S')}")
                 
@@ -258,8 +373,9 @@ class PublicationOrchestrator:
                 task.status = PublicationStatus.PENDING
                 task.error_message = f"Cooldown/fenêtre horaire - reporté à {next_slot.strftime('%H:%M:%S')}"
                 
-                # Remettre en queue pour plus tard (optionnel en production)
-                await self.queue.requeue_task(task)
+                # Remettre en queue, récupérable au prochain créneau (le worker ne l'attend pas)
+                delay_s = max((next_slot - datetime.now()).total_seconds(), 0.0)
+                await self.queue.requeue_task(task, delay_s=delay_s)
                 return task
             
             # 6. Publication via publisher approprié
@@ -293,7 +409,7 @@ class PublicationOrchestrator:
                 )
                 
                 # Enregistrer publication dans scheduler
-                self.scheduler.record_publication(task.store_id)
+                self.scheduler.record_publication(task.store_id, slot_reserved=True)
                 
                 logger.info(f"✅ Publication réussie {task.task_id}: {publish_result.external_id}")
                 
@@ -324,6 +440,147 @@ class PublicationOrchestrator:
             self.stats['total_processed'] += 1
             self.stats['processing_time_total'] += processing_time
             self.active_publications.discard(task.task_id)
+            self._record_transition(task)
+            await self._spill_history()
+    
+    async def _spill_history(self, force: bool = False) -> None:
+        """Écrire dans l'archive les tâches évincées des historiques (par lots)"""
+        
+        for history in (self.completed_tasks, self.failed_tasks):
+            if force or history.needs_flush:
+                await history.flush()
+    
+    def _get_batch_progress(self, batch_id: str) -> ProgressCounters:
+        """Compteurs d'un batch (créés à la demande, nombre de batches suivis borné)"""
+        
+        counters = self.batch_progress.get(batch_id)
+        if counters is None:
+            counters = self.batch_progress[batch_id] = ProgressCounters()
+            if len(self.batch_progress) > MAX_TRACKED_BATCHES:
+                for old_batch_id, old_counters in list(self.batch_progress.items()):
+                    if old_counters.is_finished:
+                        del self.batch_progress[old_batch_id]
+                        self.batch_owners.pop(old_batch_id, None)
+                        break
+        return counters
+    
+    def _record_transition(self, task: PublishTask) -> None:
+        """
+        Mettre à jour les compteurs et émettre l'événement d'un changement de statut
+        
+        Le statut précédent vient du suivi des tâches ouvertes : les compteurs
+        restent justes même pour une tâche ajoutée directement à la queue.
+        """
+        
+        previous = self._open_tasks.get(task.task_id)
+        current = task.status
+        if previous == current:
+            return
+        
+        if current in OPEN_STATUSES:
+            self._open_tasks[task.task_id] = current
+        else:
+            self._open_tasks.pop(task.task_id, None)
+        
+        batch_id = task.publish_options.get('batch_id')
+        batch_counters = self._get_batch_progress(batch_id) if batch_id else None
+        for counters in (self.progress, self.store_progress[task.store_id], batch_counters):
+            if counters is not None:
+                counters.apply(previous, current)
+        PUBLICATION_QUEUE_DEPTH.set(
+            self.store_progress[task.store_id].counts[PublicationStatus.PENDING.value], task.store_id
+        )
+        
+        if previous == PublicationStatus.PROCESSING and current == PublicationStatus.PENDING:
+            event_type = "deferred"
+        else:
+            event_type = EVENT_TYPES[current]
+        
+        self.events.emit(PublicationEvent(
+            seq=self.events.next_seq(),
+            type=event_type,
+            timestamp=time.time(),
+            task_id=task.task_id,
+            store_id=task.store_id,
+            batch_id=batch_id,
+            status=current.value,
+            previous_status=previous.value if previous else None,
+            error_message=task.error_message,
+            counters=(batch_counters or self.progress).snapshot()
+        ))
+    
+    def get_batch_progress(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Compteurs courants d'un batch (None si inconnu ou oublié)"""
+        
+        counters = self.batch_progress.get(batch_id)
+        return counters.snapshot() if counters is not None else None
+    
+    def get_batch_owner(self, batch_id: str) -> Optional[str]:
+        """Utilisateur ayant mis le batch en queue (None si inconnu ou sans propriétaire)"""
+        
+        return self.batch_owners.get(batch_id)
+    
+    def _snapshot_event(self, batch_id: Optional[str]) -> PublicationEvent:
+        """Instantané des compteurs (seq du dernier événement émis, pour la reprise)"""
+        
+        counters = self.batch_progress.get(batch_id) if batch_id else self.progress
+        return PublicationEvent(
+            seq=self.events.last_seq,
+            type="snapshot",
+            timestamp=time.time(),
+            batch_id=batch_id,
+            counters=counters.snapshot() if counters is not None else {}
+        )
+    
+    async def stream_progress(self, batch_id: Optional[str] = None, fmt: str = "ndjson",
+                              last_event_id: Optional[int] = None,
+                              heartbeat_s: float = 15.0) -> AsyncIterator[str]:
+        """
+        Flux de progression : instantané des compteurs puis transitions des tâches
+        
+        Args:
+            batch_id: Suivre un batch (le flux se termine quand il est fini),
+                sinon toutes les tâches sans fin
+            fmt: "ndjson" (une ligne JSON par événement) ou "sse" (Server-Sent Events)
+            last_event_id: Reprise après ce seq (événements encore en historique)
+            heartbeat_s: Intervalle max sans émission (keepalive SSE, instantané NDJSON)
+            
+        Raises:
+            ValueError: Format inconnu ou batch non suivi
+        """
+        
+        if fmt not in ("ndjson", "sse"):
+            raise ValueError(f"Format '{fmt}' non supporté (ndjson, sse)")
+        if batch_id is not None and batch_id not in self.batch_progress:
+            raise ValueError(f"Batch '{batch_id}' inconnu")
+        
+        formatter = format_sse if fmt == "sse" else format_ndjson
+        subscription = self.events.subscribe(batch_id, after_seq=last_event_id)
+        dropped = 0
+        
+        def batch_finished() -> bool:
+            counters = self.batch_progress.get(batch_id)
+            return counters is None or counters.is_finished
+        
+        try:
+            yield formatter(self._snapshot_event(batch_id))
+            
+            while not (batch_id is not None and batch_finished() and subscription.queue.empty()):
+                event = await self.events.listen(subscription, heartbeat_s)
+                
+                # Consommateur en retard : événements écartés, resynchroniser les compteurs
+                if subscription.dropped != dropped:
+                    dropped = subscription.dropped
+                    yield formatter(self._snapshot_event(batch_id))
+                
+                if event is not None:
+                    yield formatter(event)
+                elif fmt == "sse":
+                    yield ": keepalive\n\n"
+                else:
+                    yield formatter(self._snapshot_event(batch_id))
+        finally:
+            self.events.unsubscribe(subscription)
     
     async def start_workers(self) -> None:
         """Démarre les workers pour traitement automatique"""
@@ -333,29 +590,11 @@ class PublicationOrchestrator:
             return
         
         self.is_running = True
-        logger.info(f"🚀 Démarrage {self.config.max_concurrent_workers} workers")
+        logger.info(f"🚀 Démarrage {self.config.max_concurrent_workers} workers "
+                   f"({self.config.max_concurrent_per_store} par store)")
         
-        # Créer workers
-        for i in range(self.config.max_concurrent_workers):
-            worker_id = f"worker_{i+1}"
-            
-            async def worker_loop(worker_id=worker_id):
-                """Boucle principale worker"""
-                logger.info(f"🔄 Worker {worker_id} démarré")
-                
-                while self.is_running:
-                    try:
-                        task = await self.work_once()
-                        if not task:
-                            await asyncio.sleep(5)  # Pas de tâche → attendre
-                    except Exception as e:
-                        logger.error(f"Erreur worker {worker_id}: {e}")
-                        await asyncio.sleep(10)  # Pause sur erreur
-                
-                logger.info(f"⏹️  Worker {worker_id} arrêté")
-            
-            # Démarrer worker async
-            asyncio.create_task(worker_loop())
+        # Un dispatch unique alimente le pool (slots globaux et par store)
+        self._pool_runner = asyncio.create_task(self.worker_pool.run())
     
     async def stop_workers(self) -> None:
         """Arrête tous les workers"""
@@ -368,28 +607,22 @@ class PublicationOrchestrator:
         
         # Attendre fin des publications en cours
         max_wait = 30  # 30s max
-        waited = 0
-        
-        while self.active_publications and waited < max_wait:
-            await asyncio.sleep(1)
-            waited += 1
+        finished = await self.worker_pool.stop(timeout=max_wait)
+        if self._pool_runner is not None:
+            await self._pool_runner
+            self._pool_runner = None
         
-        if self.active_publications:
+        if not finished:
             logger.warning(f"Publications encore actives après {max_wait}s: {self.active_publications}")
         
+        await self._spill_history(force=True)
         logger.info("✅ Workers arrêtés")
     
     async def _find_task_by_id(self, task_id: str) -> Optional[PublishTask]:
         """Trouve une tâche par son ID (helper)"""
         
-        # Rechercher dans les tâches créées
-        for task in self.completed_tasks + self.failed_tasks:
-            if task.task_id == task_id:
-                return task
-        
-        # Si pas trouvée, créer une tâche simulée pour les besoins du batch
-        # En production, ceci devrait être géré différemment
-        return None
+        # Rechercher dans les historiques en mémoire (tâches évincées : archive uniquement)
+        return self.completed_tasks.get(task_id) or self.failed_tasks.get(task_id)
     
     async def get_orchestrator_stats(self) -> Dict[str, Any]:
         """Statistiques complètes orchestrateur"""
@@ -431,8 +664,16 @@ class PublicationOrchestrator:
                 'uptime_seconds': uptime,
                 'is_running': self.is_running,
                 'active_publications': len(self.active_publications),
-                'completed_tasks': len(self.completed_tasks),
-                'failed_tasks': len(self.failed_tasks),
+                'worker_pool': self.worker_pool.get_stats(),
+                'completed_tasks': self.completed_tasks.total_recorded,
+                'failed_tasks': self.failed_tasks.total_recorded,
+                'history': {
+                    'completed': self.completed_tasks.get_stats(),
+                    'failed': self.failed_tasks.get_stats(),
+                    'pending_duplicates': len(self.duplicate_tasks)
+                },
+                'progress': self.progress.snapshot(),
+                'events': self.events.get_stats(),
                 'avg_processing_time': (
                     self.stats['processing_time_total'] / self.stats['total_processed']
                     if self.stats['total_processed'] > 0 else 0.0
@@ -467,6 +708,7 @@ class PublicationOrchestrator:
         return {
             'store_id': store_id,
             'orchestrator_stats': orchestrator_stats,
+            'progress': self.store_progress[store_id].snapshot(),
             'schedule_status': schedule_status,
             'publisher_stats': publisher_stats,
             'can_publish_now': schedule_status['can_publish_now'],
@@ -496,4 +738,22 @@ class PublicationOrchestrator:
                     'error': str(e)
                 }
         
-        return health_status
\ No newline at end of file
+        return health_status
+
+
+# Orchestrateur global du process (API de suivi des publications)
+_publication_orchestrator: Optional[PublicationOrchestrator] = None
+
+
+def get_publication_orchestrator() -> PublicationOrchestrator:
+    """Obtenir l'orchestrateur de publication global (configuration par défaut)"""
+    global _publication_orchestrator
+    if _publication_orchestrator is None:
+        _publication_orchestrator = PublicationOrchestrator()
+    return _publication_orchestrator
+
+
+async def close_publication_orchestrator() -> None:
+    """Arrêter les workers de l'orchestrateur global s'il a été créé (arrêt du process)"""
+    if _publication_orchestrator is not None:
+        await _publication_orchestrator.stop_workers()
@@ -1,15 +1,20 @@
 # Amazon SP-API Publisher - Intégration avec l'orchestrateur générique
 import logging
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
-from services.amazon_publisher_service import AmazonPublisherService
+from services.amazon_publisher_service import AmazonPublisherService, build_listing_attributes
 from services.amazon_connection_service import AmazonConnectionService
 from models.amazon_publishing import AmazonPublishingResult
 
+from ..dto import PublishTask, PublicationStatus
+from ...semantic.image_pipeline import AMAZON_MIN_IMAGE_DIMENSION
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_MARKETPLACE_ID = 'A13V1IB3VIYZZH'  # Amazon France
+
 class AmazonSPAPIPublisher:
     """
     Publisher Amazon SP-API pour l'orchestrateur générique
@@ -21,20 +26,23 @@ class AmazonSPAPIPublisher:
     - Stockage du feedId pour suivi
     """
     
-    def __init__(self, database, connection_service: Optional[AmazonConnectionService] = None):
+    def __init__(
+        self,
+        database,
+        connection_service: Optional[AmazonConnectionService] = None,
+        publisher_service: Optional[AmazonPublisherService] = None
+    ):
         """
         Initialise le publisher Amazon
         
         Args:
             database: Instance de base de données
             connection_service: Service de connexion Amazon (optionnel)
+            publisher_service: Service de publication SP-API (optionnel)
         """
         self.db = database
         self.connection_service = connection_service or AmazonConnectionService(database)
-        self.publisher_service = AmazonPublisherService(
-            database=database,
-            connection_service=self.connection_service
-        )
+        self.publisher_service = publisher_service or AmazonPublisherService()
         
         logger.info("✅ Amazon SP-API Publisher initialized")
     
@@ -60,7 +68,7 @@ class AmazonSPAPIPublisher:
             
             # Options par défaut
             options = options or {}
-            marketplace_id = options.get('marketplace_id', 'A13V1IB3VIYZZH')  # Amazon France par défaut
+            marketplace_id = options.get('marketplace_id', DEFAULT_MARKETPLACE_ID)
             max_retries = options.get('max_retries', 3)
             
             # Vérification de connexion Amazon active
@@ -129,6 +137,198 @@ class AmazonSPAPIPublisher:
                 "error": f"Erreur interne: {str(e)}"
             }
     
+    async def publish_many(
+        self,
+        tasks: List[PublishTask],
+        options: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Publication groupée : un feed JSON_LISTINGS_FEED par vendeur/marketplace
+        
+        Les publish_options de chaque tâche (user_id, marketplace_id, sku)
+        complètent `options`. Chaque tâche est marquée réussie ou échouée
+        selon le rapport de traitement de son feed ; si ce traitement n'est
+        pas confirmé, la tâche reste PENDING avec le feed_id à suivre.
+        
+        Args:
+            tasks: Tâches de publication
+            options: Options communes (marketplace_id, user_id, etc.)
+            
+        Returns:
+            Un résultat par tâche, dans l'ordre des tâches
+        """
+        options = options or {}
+        
+        groups: Dict[Tuple[Optional[str], str], List[PublishTask]] = {}
+        for task in tasks:
+            task_options = {**options, **task.publish_options}
+            key = (task_options.get('user_id'), task_options.get('marketplace_id', DEFAULT_MARKETPLACE_ID))
+            groups.setdefault(key, []).append(task)
+        
+        logger.info(f"📦 Amazon publication groupée: {len(tasks)} tâches, {len(groups)} feed(s) vendeur/marketplace")
+        
+        # Vendeurs indépendants (quotas séparés) : groupes traités en parallèle
+        group_results = await asyncio.gather(*(
+            self._publish_group(user_id, marketplace_id, group, options)
+            for (user_id, marketplace_id), group in groups.items()
+        ))
+        
+        results_by_task = {}
+        for results in group_results:
+            results_by_task.update(results)
+        
+        return [results_by_task[task.task_id] for task in tasks]
+    
+    async def _publish_group(
+        self,
+        user_id: Optional[str],
+        marketplace_id: str,
+        tasks: List[PublishTask],
+        options: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Publie les tâches d'un même vendeur/marketplace dans un seul feed
+        
+        Returns:
+            Résultats indexés par task_id
+        """
+        connection = None
+        if user_id:
+            connection = await self.connection_service.get_active_connection(
+                user_id=user_id,
+                marketplace_id=marketplace_id
+            )
+        
+        if not connection:
+            logger.warning(f"❌ Aucune connexion Amazon active pour {len(tasks)} tâches ({marketplace_id})")
+            return self._fail_group(tasks, {
+                "success": False,
+                "channel": "amazon",
+                "error_code": "HTTP_412",
+                "error": "Aucune connexion Amazon active. Connectez-vous d'abord à Amazon Seller Central.",
+                "needs_connection": True,
+                "marketplace_id": marketplace_id
+            })
+        
+        access_token = await self.connection_service.get_valid_access_token(connection)
+        if not access_token:
+            return self._fail_group(tasks, {
+                "success": False,
+                "channel": "amazon",
+                "error_code": "AUTH_ERROR",
+                "error": "Token Amazon invalide ou expiré",
+                "marketplace_id": marketplace_id,
+                "connection_id": connection.id
+            })
+        
+        messages = []
+        for task in tasks:
+            amazon_data = await self._map_product_dto_to_amazon(self._task_to_product_dto(task), options)
+            messages.append({
+                "sku": amazon_data["sku"],
+                "product_type": task.publish_options.get("product_type", options.get("product_type", "PRODUCT")),
+                "operation_type": "UPDATE",
+                "attributes": build_listing_attributes({
+                    "title": amazon_data["product_name"],
+                    "brand": amazon_data["brand"],
+                    "description": amazon_data["description"],
+                    "bullet_points": amazon_data["key_features"],
+                    "standard_price": amazon_data["price"] or None,
+                    "currency": amazon_data["currency"],
+                    "quantity": amazon_data["quantity"],
+                    "condition": amazon_data["condition"],
+                    "images": [image["url"] for image in amazon_data.get("images", [])]
+                }, marketplace_id)
+            })
+        
+        feed_results = await self.publisher_service.publish_listings_feed(
+            access_token=access_token,
+            seller_id=connection.seller_id,
+            marketplace_id=marketplace_id,
+            messages=messages
+        )
+        
+        results = {}
+        for task, feed_result in zip(tasks, feed_results):
+            response = {
+                "success": feed_result["success"],
+                "channel": "amazon",
+                "marketplace_id": marketplace_id,
+                "connection_id": connection.id,
+                "sku": feed_result["sku"],
+                "feed_id": feed_result.get("feed_id"),
+                "processing_status": feed_result.get("processing_status"),
+                "warnings": feed_result.get("warnings", [])
+            }
+            
+            if feed_result["success"]:
+                task.mark_success(response)
+            elif feed_result.get("pending"):
+                # Feed soumis sans résultat confirmé : ni succès ni échec
+                response["pending"] = True
+                task.status = PublicationStatus.PENDING
+                task.result_data = response
+                task.error_message = (
+                    f"Feed {response['feed_id']} {response['processing_status']}: traitement Amazon non confirmé"
+                )
+            else:
+                errors = feed_result.get("errors") or [feed_result.get("error", "Erreur feed Amazon")]
+                response.update({
+                    "errors": errors,
+                    "error_code": self._classify_error_code(errors)
+                })
+                task.mark_failed("; ".join(errors))
+            
+            results[task.task_id] = response
+        
+        # Un enregistrement de suivi par feed (et non par SKU), "pending" tant que non confirmé
+        feed_statuses = {}
+        for feed_result in feed_results:
+            if feed_result.get("feed_id"):
+                feed_statuses.setdefault(
+                    feed_result["feed_id"], "pending" if feed_result.get("pending") else "processed"
+                )
+        for feed_id, status in feed_statuses.items():
+            await self._store_feed_id(user_id, feed_id, marketplace_id, status)
+        
+        return results
+    
+    def _fail_group(self, tasks: List[PublishTask], response: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Marque toutes les tâches d'un groupe en échec avec la même réponse"""
+        for task in tasks:
+            task.mark_failed(response["error"])
+        return {task.task_id: dict(response) for task in tasks}
+    
+    def _task_to_product_dto(self, task: PublishTask) -> Dict[str, Any]:
+        """
+        Convertit le ProductDTO d'une tâche au format dict attendu par le mapping
+        
+        Le SKU vient des options de la tâche, sinon des attributs produit, sinon
+        de la signature du contenu (stable, unique par produit dans un feed).
+        """
+        product = task.product_dto
+        stock = str(product.attributes.get("stock", "1"))
+        sku = (
+            task.publish_options.get("sku")
+            or product.attributes.get("sku")
+            or f"ECOM-{product.payload_signature[:16].upper()}"
+        )
+        
+        return {
+            "title": product.title,
+            "brand": product.attributes.get("brand", "Generic"),
+            "description": product.description_html,
+            "features": task.publish_options.get("bullet_points", []),
+            "price": float(product.price.amount) if product.price else 0.0,
+            "currency": product.price.currency.value if product.price else "EUR",
+            "stock": int(stock) if stock.isdigit() else 1,
+            "identifiers": {"sku": sku},
+            "images": [
+                {"url": image.url, "alt_text": image.alt, "width": image.width, "height": image.height}
+                for image in product.images
+            ]
+        }
+    
     async def _map_product_dto_to_amazon(
         self, 
         product_dto: Dict[str, Any], 
@@ -168,16 +368,21 @@ class AmazonSPAPIPublisher:
                     "sku": identifiers.get("sku", f"ECOM-{datetime.now().strftime('%Y%m%d%H%M%S')}")
                 })
             
-            # Mapping des images
+            # Mapping des images (dimensions connues sous le minimum Amazon écartées)
             if "images" in product_dto:
                 amazon_images = []
-                for i, image in enumerate(product_dto["images"]):
+                for image in product_dto["images"]:
+                    width, height = image.get("width"), image.get("height")
+                    if width and height and max(width, height) < AMAZON_MIN_IMAGE_DIMENSION:
+                        logger.warning(f"Image {width}x{height} < {AMAZON_MIN_IMAGE_DIMENSION}px "
+                                       f"ignorée pour Amazon: {image.get('url', '')}")
+                        continue
                     amazon_image = {
                         "url": image.get("url", ""),
-                        "alt_text": image.get("alt_text", f"Image produit {i+1}"),
-                        "is_main": i == 0,
-                        "width": image.get("width", 1000),
-                        "height": image.get("height", 1000)
+                        "alt_text": image.get("alt_text", f"Image produit {len(amazon_images)+1}"),
+                        "is_main": not amazon_images,
+                        "width": width or 1000,
+                        "height": height or 1000
                     }
                     amazon_images.append(amazon_image)
                 
@@ -319,7 +524,7 @@ class AmazonSPAPIPublisher:
         else:
             return "API_ERROR"
     
-    async def _store_feed_id(self, user_id: str, feed_id: str, marketplace_id: str):
+    async def _store_feed_id(self, user_id: str, feed_id: str, marketplace_id: str, status: str = "submitted"):
         """
         Stocke le feedId pour suivi des publications
         
@@ -327,6 +532,7 @@ class AmazonSPAPIPublisher:
             user_id: ID utilisateur
             feed_id: ID du feed Amazon
             marketplace_id: Marketplace Amazon
+            status: Statut de suivi (submitted, pending, processed)
         """
         try:
             feed_record = {
@@ -334,7 +540,7 @@ class AmazonSPAPIPublisher:
                 "feed_id": feed_id,
                 "marketplace_id": marketplace_id,
                 "channel": "amazon",
-                "status": "submitted",
+                "status": status,
                 "created_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow()
             }
@@ -6,11 +6,12 @@ import hashlib
 import uuid
 import time
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 import logging
 
 from ...semantic import ProductDTO
+from ..dto import PublishTask
 from ..idempotency import IdempotencyManager
 
 logger = logging.getLogger(__name__)
@@ -240,6 +241,65 @@ class GenericMockPublisher:
                 duration_ms=duration_ms
             )
     
+    async def publish_many(
+        self,
+        tasks: List[PublishTask],
+        options: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Publie un lot de tâches (même interface que AmazonSPAPIPublisher.publish_many)
+
+        La clé d'idempotence vient des options de la tâche (`idempotency_key`),
+        sinon de la signature du contenu. Chaque tâche est marquée réussie ou
+        échouée.
+
+        Args:
+            tasks: Tâches de publication
+            options: Options communes (complétées par les publish_options de chaque tâche)
+
+        Returns:
+            Un résultat par tâche, dans l'ordre des tâches
+        """
+
+        options = options or {}
+        logger.info(f"📦 Publication groupée {self.name}: {len(tasks)} tâches")
+
+        publish_results = await asyncio.gather(*(
+            self.publish(
+                task.product_dto,
+                idempotency_key=(
+                    {**options, **task.publish_options}.get('idempotency_key')
+                    or task.product_dto.payload_signature
+                )
+            )
+            for task in tasks
+        ))
+
+        results = []
+        for task, publish_result in zip(tasks, publish_results):
+            response = {
+                "success": publish_result.success,
+                "channel": self.name,
+                "external_id": publish_result.external_id,
+                "status_code": publish_result.status_code,
+                "message": publish_result.message,
+                "duration_ms": publish_result.duration_ms
+            }
+
+            if publish_result.success:
+                task.mark_success({
+                    'external_id': publish_result.external_id,
+                    'store_response': publish_result.metadata,
+                    'duration_ms': publish_result.duration_ms
+                })
+            else:
+                response["error"] = publish_result.message
+                task.mark_failed(f"Publisher error: {publish_result.message}")
+
+            results.append(response)
+
+        return results
+
     async def _simulate_network_latency(self):
         """Simule latence réseau réaliste par store"""
         
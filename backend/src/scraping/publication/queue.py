@@ -1,89 +1,87 @@
 """
 Queue et Rate Limiting - Gestion des files de publication et limitation débit par boutique - ECOMSIMPLY
+Les limiteurs (TokenBucket, SlidingWindowLimiter) sont définis dans rate_limit.
 """
 
 import asyncio
+import heapq
+import itertools
+import os
 import time
 from collections import defaultdict, deque
-from typing import Dict, List, Optional, Any, Callable
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Dict, List, Optional, Any, Callable, Set, Tuple
 from datetime import datetime, timedelta
 import logging
 
 from .dto import PublishTask, PublishBatch, PublicationConfig, PublicationStatus
+from .rate_limit import SlidingWindowLimiter, StoreRateLimiters, TokenBucket
 
 logger = logging.getLogger(__name__)
 
+# Backends de queue disponibles (voir create_publish_queue)
+QUEUE_BACKENDS = ('memory', 'mongo')
 
-class TokenBucket:
-    """Token bucket pour rate limiting par store"""
+
+class PublishQueue:
+    """
+    Queue de publication avec priorité et rate limiting
+    
+    Un tas par store (priorité, date de création) et deux index de stores :
+    - prêts : ordonnés par tour deficit round robin, puis par la tâche en tête de leur tas
+    - en attente : ordonnés par l'instant où cooldown / limite horaire les libèrent
+    La prochaine tâche exécutable est trouvée en O(log n), sans parcourir la queue.
+    Les entrées d'index périmées sont ignorées à la lecture (invalidation paresseuse).
+    
+    Équité entre stores (DRR) : à chaque tour un store sert au plus son quantum
+    de tâches (config.store_weights, défaut 1) ; la priorité départage les stores
+    d'un même tour et ordonne les tâches d'un store. Un gros vendeur ne peut donc
+    pas affamer les autres, même avec des tâches plus anciennes ou plus urgentes.
+    Les tâches différées (retries) attendent dans un tas par date de disponibilité.
+    
+    Backend en mémoire (un seul process) ; MongoPublishQueue implémente la même
+    interface avec une collection partagée entre réplicas.
+    """
+    
+    # Intervalle de renouvellement du bail des tâches en cours (None = pas de bail)
+    lease_renewal_interval_s: Optional[float] = None
     
-    def __init__(self, capacity: int, refill_rate: float):
+    def __init__(self, config: PublicationConfig, rate_limiters: Optional[StoreRateLimiters] = None):
         """
         Args:
-            capacity: Nombre max de tokens
-            refill_rate: Tokens ajoutés par seconde
+            config: Configuration publication
+            rate_limiters: Fenêtres horaires par store à partager avec le scheduler
+                (défaut: registre propre à la queue)
         """
-        self.capacity = capacity
-        self.tokens = capacity
-        self.refill_rate = refill_rate
-        self.last_refill = time.time()
-    
-    def consume(self, tokens: int = 1) -> bool:
-        """
-        Consomme des tokens si disponibles
+        self.config = config
         
-        Returns:
-            True si tokens consommés, False sinon
-        """
-        self._refill()
+        # Tas de tâches par store : (priorité, created_at, seq, tâche)
+        self._store_heaps: Dict[str, List[Tuple[int, datetime, int, PublishTask]]] = defaultdict(list)
+        self._sequence = itertools.count()
+        self._size = 0
         
-        if self.tokens >= tokens:
-            self.tokens -= tokens
-            return True
-        return False
-    
-    def _refill(self):
-        """Recharge tokens selon le taux"""
-        now = time.time()
-        elapsed = now - self.last_refill
-        tokens_to_add = elapsed * self.refill_rate
+        # Index des stores prêts : (tour DRR, priorité, created_at, seq, store_id) de la tête du tas
+        self._ready: List[Tuple[int, int, datetime, int, str]] = []
+        self._ready_keys: Dict[str, Tuple[int, int, datetime, int]] = {}
         
-        self.tokens = min(self.capacity, self.tokens + tokens_to_add)
-        self.last_refill = now
-    
-    def time_until_available(self, tokens: int = 1) -> float:
-        """Temps d'attente pour avoir les tokens (secondes)"""
-        self._refill()
+        # Deficit round robin : tour courant et crédit restant de chaque store
+        self._store_rounds: Dict[str, int] = {}
+        self._store_deficits: Dict[str, int] = {}
+        self._current_round = 0
         
-        if self.tokens >= tokens:
-            return 0.0
+        # Tâches différées : (instant de disponibilité, seq, tâche)
+        self._delayed: List[Tuple[float, int, PublishTask]] = []
         
-        needed = tokens - self.tokens
-        return needed / self.refill_rate
-    
-    def get_stats(self) -> Dict[str, float]:
-        """Statistiques du bucket"""
-        self._refill()
-        return {
-            'available_tokens': self.tokens,
-            'capacity': self.capacity,
-            'fill_percentage': (self.tokens / self.capacity) * 100,
-            'refill_rate_per_sec': self.refill_rate
-        }
-
-
-class PublishQueue:
-    """Queue de publication avec priorité et rate limiting"""
-    
-    def __init__(self, config: PublicationConfig):
-        self.config = config
+        # Index des stores en attente : (instant de disponibilité, store_id)
+        self._waiting: List[Tuple[float, str]] = []
+        self._waiting_until: Dict[str, float] = {}
         
-        # Queue principale avec priorité
-        self._queue: List[PublishTask] = []
         self._queue_lock = asyncio.Lock()
+        # Réveil des workers : ajout de tâche
+        self._changed = asyncio.Condition(self._queue_lock)
         
-        # Rate limiters par store (Token Bucket)
-        self._rate_limiters: Dict[str, TokenBucket] = {}
+        # Rate limiters par store (fenêtre glissante, partageable avec le scheduler)
+        self._rate_limiters = rate_limiters if rate_limiters is not None else StoreRateLimiters(config)
         
         # Historique pour cooldown par store
         self._last_publication: Dict[str, datetime] = {}
@@ -93,120 +91,328 @@ class PublishQueue:
             'tasks_added': 0,
             'tasks_processed': 0,
             'rate_limited_count': 0,
+            'tasks_delayed': 0,
             'queue_depth_max': 0
         }
     
-    async def add_task(self, task: PublishTask) -> None:
-        """Ajouter tâche à la queue"""
+    def __len__(self) -> int:
+        return self._size
+    
+    async def size(self) -> int:
+        """Nombre de tâches en attente (prêtes ou différées)"""
+        return self._size
+    
+    async def add_task(self, task: PublishTask, delay_s: float = 0.0) -> None:
+        """
+        Ajouter tâche à la queue
+        
+        Args:
+            task: Tâche à publier
+            delay_s: Délai avant que la tâche soit récupérable (retry différé)
+        """
         
         async with self._queue_lock:
-            self._queue.append(task)
-            # Trier par priorité (1 = urgent, 10 = bas)
-            self._queue.sort(key=lambda t: (t.priority, t.created_at))
-            
-            current_depth = len(self._queue)
-            self.stats['queue_depth_max'] = max(self.stats['queue_depth_max'], current_depth)
-            self.stats['tasks_added'] += 1
+            if delay_s > 0:
+                self._push_delayed(task, time.time() + delay_s)
+            else:
+                self._push_task(task)
+            self._changed.notify_all()
             
             logger.debug(f"Tâche ajoutée à la queue: {task.task_id} (priorité {task.priority}), "
-                        f"depth: {current_depth}")
+                        f"depth: {self._size}")
     
     async def add_batch(self, batch: PublishBatch) -> None:
         """Ajouter un batch de tâches"""
         
-        for task in batch.tasks:
-            await self.add_task(task)
+        async with self._queue_lock:
+            for task in batch.tasks:
+                self._push_task(task)
+            self._changed.notify_all()
         
         logger.info(f"Batch ajouté: {batch.batch_id} avec {len(batch.tasks)} tâches")
     
-    async def get_next_task(self) -> Optional[PublishTask]:
+    def _push_task(self, task: PublishTask) -> None:
+        """Insérer dans le tas du store, O(log n) (verrou tenu)"""
+        
+        self._count_added()
+        self._insert_task(task)
+    
+    def _push_delayed(self, task: PublishTask, available_at: float) -> None:
+        """Mettre de côté une tâche jusqu'à available_at (verrou tenu)"""
+        
+        self._count_added()
+        self.stats['tasks_delayed'] += 1
+        heapq.heappush(self._delayed, (available_at, next(self._sequence), task))
+    
+    def _count_added(self) -> None:
+        self._size += 1
+        self.stats['queue_depth_max'] = max(self.stats['queue_depth_max'], self._size)
+        self.stats['tasks_added'] += 1
+    
+    def _insert_task(self, task: PublishTask) -> None:
+        """Insérer une tâche déjà comptée dans le tas de son store"""
+        
+        store_id = task.store_id
+        heap = self._store_heaps[store_id]
+        if not heap:
+            self._activate_store(store_id)
+        # Trier par priorité (1 = urgent, 10 = bas)
+        heapq.heappush(heap, (task.priority, task.created_at, next(self._sequence), task))
+        
+        # Store en attente : sa nouvelle tête sera indexée à sa libération
+        if store_id not in self._waiting_until:
+            self._index_ready(store_id)
+    
+    def _store_quantum(self, store_id: str) -> int:
+        """Tâches servies par tour DRR pour un store"""
+        return max(1, self.config.store_weights.get(store_id, 1))
+    
+    def _activate_store(self, store_id: str) -> None:
+        """Store qui redevient actif : rejoint le tour courant avec un crédit neuf"""
+        
+        self._store_rounds[store_id] = max(self._store_rounds.get(store_id, 0), self._current_round)
+        self._store_deficits[store_id] = self._store_quantum(store_id)
+    
+    def _charge_store(self, store_id: str) -> None:
+        """Débiter une tâche servie ; crédit épuisé → store reporté au tour suivant"""
+        
+        self._current_round = max(self._current_round, self._store_rounds[store_id])
+        self._store_deficits[store_id] -= 1
+        if self._store_deficits[store_id] <= 0:
+            self._store_rounds[store_id] += 1
+            self._store_deficits[store_id] += self._store_quantum(store_id)
+    
+    def _release_delayed(self, now: float) -> None:
+        """Rendre récupérables les tâches différées arrivées à échéance"""
+        
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, task = heapq.heappop(self._delayed)
+            self._insert_task(task)
+    
+    def _index_ready(self, store_id: str) -> None:
+        """(Ré)indexer un store comme prêt selon la tâche en tête de son tas"""
+        
+        heap = self._store_heaps.get(store_id)
+        if not heap:
+            self._ready_keys.pop(store_id, None)
+            return
+        
+        key = (self._store_rounds[store_id], *heap[0][:3])
+        if self._ready_keys.get(store_id) != key:
+            self._ready_keys[store_id] = key
+            heapq.heappush(self._ready, (*key, store_id))
+    
+    def _index_waiting(self, store_id: str, available_at: float) -> None:
+        """Indexer un store comme en attente jusqu'à available_at"""
+        
+        self._ready_keys.pop(store_id, None)
+        if self._store_heaps.get(store_id):
+            self._waiting_until[store_id] = available_at
+            heapq.heappush(self._waiting, (available_at, store_id))
+    
+    def _release_waiting(self, now: float) -> None:
+        """Repasser en prêts les stores dont l'attente est écoulée"""
+        
+        while self._waiting and self._waiting[0][0] <= now:
+            available_at, store_id = heapq.heappop(self._waiting)
+            if self._waiting_until.get(store_id) == available_at:
+                del self._waiting_until[store_id]
+                self._index_ready(store_id)
+    
+    async def get_next_task(self, exclude_stores: Optional[Set[str]] = None) -> Optional[PublishTask]:
         """
         Récupérer prochaine tâche disponible selon rate limiting
         
+        Args:
+            exclude_stores: Stores à ignorer (ex: concurrence max atteinte côté workers)
+        
         Returns:
             Tâche prête ou None si rate limited
         """
         
         async with self._queue_lock:
-            if not self._queue:
+            if not self._size:
                 return None
             
-            # Chercher première tâche disponible selon rate limits
-            for i, task in enumerate(self._queue):
-                if await self._can_process_task(task):
-                    # Retirer tâche de la queue
-                    task = self._queue.pop(i)
-                    self.stats['tasks_processed'] += 1
-                    
-                    # Marquer comme démarrée
-                    task.mark_started()
-                    
-                    # Enregistrer dernière publication pour cooldown
-                    self._last_publication[task.store_id] = datetime.now()
-                    
-                    logger.debug(f"Tâche récupérée: {task.task_id} pour store {task.store_id}")
-                    return task
-            
-            # Aucune tâche disponible → rate limited
-            self.stats['rate_limited_count'] += 1
-            return None
+            task = self._pop_ready_task(exclude_stores or set())
+            if task is None:
+                # Aucune tâche disponible → rate limited
+                self.stats['rate_limited_count'] += 1
+            return task
     
-    async def _can_process_task(self, task: PublishTask) -> bool:
-        """Vérifier si tâche peut être traitée selon rate limits"""
-        
-        store_id = task.store_id
+    def _pop_ready_task(self, exclude_stores: Set[str]) -> Optional[PublishTask]:
+        """Retirer la tâche du prochain store disponible dans l'ordre DRR (verrou tenu)"""
         
         # 1. Vérifier fenêtre horaire
         if not self.config.is_active_hours():
-            return False
+            return None
+        
+        now = time.time()
+        self._release_delayed(now)
+        self._release_waiting(now)
+        
+        skipped = []
+        try:
+            while self._ready:
+                entry = heapq.heappop(self._ready)
+                *key, store_id = entry
+                if self._ready_keys.get(store_id) != tuple(key):
+                    continue  # Entrée périmée
+                if store_id in exclude_stores:
+                    skipped.append(entry)
+                    continue
+                
+                # 2. Cooldown puis 3. limite horaire (consommée seulement si disponible)
+                wait_seconds = self._store_wait_seconds(store_id, now)
+                if wait_seconds > 0:
+                    self._index_waiting(store_id, now + wait_seconds)
+                    continue
+                
+                return self._take_task(store_id, now)
+        finally:
+            for entry in skipped:
+                heapq.heappush(self._ready, entry)
+        
+        return None
+    
+    def _take_task(self, store_id: str, now: float) -> PublishTask:
+        """Retirer la tête du tas d'un store autorisé à publier"""
+        
+        _, _, _, task = heapq.heappop(self._store_heaps[store_id])
+        self._size -= 1
+        self._ready_keys.pop(store_id, None)
+        self._charge_store(store_id)
+        self.stats['tasks_processed'] += 1
+        
+        # Marquer comme démarrée
+        task.mark_started()
+        
+        # Enregistrer dernière publication pour cooldown
+        self._last_publication[store_id] = datetime.now()
+        
+        # Prochaine tâche du store disponible à la fin du cooldown
+        self._index_waiting(store_id, now + self.config.cooldown_between_publications)
+        
+        logger.debug(f"Tâche récupérée: {task.task_id} pour store {store_id}")
+        return task
+    
+    def _store_wait_seconds(self, store_id: str, now: float) -> float:
+        """Attente avant publication possible pour un store (0 = créneau consommé)"""
         
-        # 2. Vérifier cooldown entre publications
         last_pub = self._last_publication.get(store_id)
         if last_pub:
-            time_since_last = datetime.now() - last_pub
-            if time_since_last.total_seconds() < self.config.cooldown_between_publications:
-                return False
+            time_since_last = (datetime.now() - last_pub).total_seconds()
+            if time_since_last < self.config.cooldown_between_publications:
+                return self.config.cooldown_between_publications - time_since_last
         
-        # 3. Vérifier token bucket
         rate_limiter = self._get_rate_limiter(store_id)
-        return rate_limiter.consume(1)
+        if rate_limiter.consume(1, now=now):
+            return 0.0
+        return max(rate_limiter.time_until_available(now=now), 0.001)
     
-    def _get_rate_limiter(self, store_id: str) -> TokenBucket:
+    def _next_wakeup_delay(self, exclude_stores: Optional[Set[str]] = None) -> Optional[float]:
+        """Secondes avant qu'une tâche puisse être prête (None si queue vide)"""
+        
+        if not self._size:
+            return None
+        exclude_stores = exclude_stores or set()
+        
+        if not self.config.is_active_hours():
+            # Fenêtres à l'heure près : revérifier au début de l'heure suivante
+            now = datetime.now()
+            next_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            return (next_hour - now).total_seconds()
+        
+        if any(store_id not in exclude_stores for store_id in self._ready_keys):
+            return 0.0
+        
+        now = time.time()
+        self._release_delayed(now)
+        self._release_waiting(now)
+        if any(store_id not in exclude_stores for store_id in self._ready_keys):
+            return 0.0
+        while self._waiting and self._waiting_until.get(self._waiting[0][1]) != self._waiting[0][0]:
+            heapq.heappop(self._waiting)
+        
+        deadlines = []
+        if self._waiting:
+            deadlines.append(self._waiting[0][0])
+        if self._delayed:
+            deadlines.append(self._delayed[0][0])
+        return max(min(deadlines) - now, 0.0) if deadlines else None
+    
+    async def wait_until_ready(self, timeout: Optional[float] = None,
+                               exclude_stores: Optional[Set[str]] = None) -> bool:
+        """
+        Attendre qu'une tâche puisse être prête (ajout, fin de cooldown, sortie de fenêtre horaire)
+        
+        Remplace le polling à intervalle fixe des workers : réveil immédiat à
+        l'ajout d'une tâche, sinon à l'échéance calculée depuis l'index d'attente.
+        
+        Args:
+            timeout: Attente max en secondes
+            exclude_stores: Stores dont les tâches prêtes ne comptent pas (saturés)
+        
+        Returns:
+            True si une tâche est potentiellement disponible, False au timeout
+        """
+        
+        async with self._changed:
+            delay = self._next_wakeup_delay(exclude_stores)
+            if delay == 0:
+                return True
+            if timeout is not None:
+                delay = timeout if delay is None else min(delay, timeout)
+            
+            try:
+                await asyncio.wait_for(self._changed.wait(), delay)
+                return True
+            except asyncio.TimeoutError:
+                return self._next_wakeup_delay(exclude_stores) == 0
+    
+    def _get_rate_limiter(self, store_id: str) -> SlidingWindowLimiter:
         """Obtenir rate limiter pour un store (lazy creation)"""
         
         if store_id not in self._rate_limiters:
-            # Créer token bucket: capacity = publications/heure, rate = tokens/seconde
-            capacity = self.config.max_publications_per_hour
-            refill_rate = capacity / 3600.0  # tokens par seconde
-            
-            self._rate_limiters[store_id] = TokenBucket(capacity, refill_rate)
             logger.debug(f"Rate limiter créé pour store {store_id}: "
-                        f"{capacity} tokens, {refill_rate:.4f}/sec")
+                        f"{self._rate_limiters[store_id].limit} publications/heure")
         
         return self._rate_limiters[store_id]
     
+    @property
+    def rate_limiters(self) -> StoreRateLimiters:
+        """Fenêtres horaires par store (à passer au PublicationScheduler)"""
+        return self._rate_limiters
+    
     async def get_queue_stats(self) -> Dict[str, Any]:
         """Statistiques de la queue"""
         
         async with self._queue_lock:
-            queue_depth = len(self._queue)
-            
             # Répartition par status
             status_counts = defaultdict(int)
             priority_counts = defaultdict(int)
-            store_counts = defaultdict(int)
+            store_counts = {
+                store_id: len(heap) for store_id, heap in self._store_heaps.items() if heap
+            }
             
-            for task in self._queue:
+            for heap in self._store_heaps.values():
+                for priority, _, _, task in heap:
+                    status_counts[task.status.value] += 1
+                    priority_counts[priority] += 1
+            for _, _, task in self._delayed:
                 status_counts[task.status.value] += 1
                 priority_counts[task.priority] += 1
-                store_counts[task.store_id] += 1
             
             return {
                 **self.stats,
-                'current_queue_depth': queue_depth,
+                'current_queue_depth': self._size,
                 'status_distribution': dict(status_counts),
                 'priority_distribution': dict(priority_counts),
-                'store_distribution': dict(store_counts),
+                'store_distribution': store_counts,
+                'ready_stores': len(self._ready_keys),
+                'waiting_stores': len(self._waiting_until),
+                'delayed_tasks': len(self._delayed),
+                'drr_round': self._current_round,
                 'active_rate_limiters': len(self._rate_limiters)
             }
     
@@ -246,8 +452,49 @@ class PublishQueue:
         
         return now + timedelta(seconds=wait_seconds)
     
-    async def requeue_task(self, task: PublishTask) -> None:
-        """Remettre tâche en queue (échec temporaire)"""
+    async def complete_task(self, task: PublishTask) -> None:
+        """Acquitter une tâche terminée (succès, échec définitif, ignorée)
+        
+        En mémoire la tâche a déjà quitté la queue à sa récupération.
+        """
+        return None
+    
+    async def renew_lease(self, task: PublishTask) -> bool:
+        """Prolonger le bail d'une tâche en cours (backends durables)"""
+        return True
+    
+    @asynccontextmanager
+    async def hold_lease(self, task: PublishTask) -> AsyncIterator[None]:
+        """Renouveler périodiquement le bail de la tâche pendant son traitement"""
+        
+        if not self.lease_renewal_interval_s:
+            yield
+            return
+        
+        async def _renew():
+            while True:
+                await asyncio.sleep(self.lease_renewal_interval_s)
+                try:
+                    if not await self.renew_lease(task):
+                        logger.warning(f"Bail perdu pour la tâche {task.task_id}")
+                        return
+                except Exception as e:
+                    logger.warning(f"Renouvellement du bail {task.task_id} échoué: {e}")
+        
+        renewer = asyncio.create_task(_renew())
+        try:
+            yield
+        finally:
+            renewer.cancel()
+    
+    async def requeue_task(self, task: PublishTask, delay_s: float = 0.0) -> None:
+        """
+        Remettre tâche en queue (échec temporaire)
+        
+        Args:
+            task: Tâche à retenter
+            delay_s: Délai avant nouvelle récupération (le worker n'attend pas)
+        """
         
         # Reset status
         task.status = PublicationStatus.PENDING
@@ -256,8 +503,34 @@ class PublishQueue:
         # Baisser priorité pour éviter boucle
         task.priority = min(10, task.priority + 1)
         
-        await self.add_task(task)
-        logger.warning(f"Tâche remise en queue: {task.task_id} (nouvelle priorité: {task.priority})")
+        await self.add_task(task, delay_s=delay_s)
+        logger.warning(f"Tâche remise en queue: {task.task_id} (nouvelle priorité: {task.priority}"
+                       f"{f', dans {delay_s:.0f}s' if delay_s > 0 else ''})")
+
+
+def create_publish_queue(config: PublicationConfig, backend: Optional[str] = None,
+                         database: Any = None,
+                         rate_limiters: Optional[StoreRateLimiters] = None) -> PublishQueue:
+    """
+    Créer la queue de publication du backend demandé
+    
+    Args:
+        config: Configuration publication
+        backend: 'memory' ou 'mongo' (défaut: variable d'environnement
+            PUBLICATION_QUEUE_BACKEND, sinon 'memory')
+        database: Base Motor pour le backend 'mongo' (défaut: MONGO_URL / DB_NAME)
+        rate_limiters: Fenêtres horaires par store partagées (défaut: propres à la queue)
+    """
+    backend = backend or os.environ.get("PUBLICATION_QUEUE_BACKEND", "memory")
+    
+    if backend == 'memory':
+        return PublishQueue(config, rate_limiters=rate_limiters)
+    if backend == 'mongo':
+        # Import paresseux : motor seulement si le backend durable est utilisé
+        from .mongo_queue import MongoPublishQueue
+        return MongoPublishQueue(config, database=database, rate_limiters=rate_limiters)
+    
+    raise ValueError(f"Backend de queue inconnu: {backend} (attendu: {', '.join(QUEUE_BACKENDS)})")
 
 
 class PublishWorker:
@@ -277,6 +550,8 @@ class PublishWorker:
         
         self.is_running = False
         self.current_task: Optional[PublishTask] = None
+        # Attente max sans tâche avant de revérifier is_running
+        self.idle_timeout_s = 5.0
         
         # Statistiques worker
         self.stats = {
@@ -301,10 +576,13 @@ class PublishWorker:
                 task = await self.queue.get_next_task()
                 
                 if task:
-                    await self._process_task(task)
+                    async with self.queue.hold_lease(task):
+                        await self._process_task(task)
+                    if task.is_completed():
+                        await self.queue.complete_task(task)
                 else:
-                    # Pas de tâche disponible → attendre
-                    await asyncio.sleep(5)
+                    # Pas de tâche disponible → attendre un ajout ou une fin de cooldown
+                    await self.queue.wait_until_ready(timeout=self.idle_timeout_s)
                     
             except Exception as e:
                 logger.error(f"Erreur worker {self.worker_id}: {e}")
@@ -347,10 +625,9 @@ class PublishWorker:
             duration = time.time() - start_time
             logger.error(f"❌ Tâche {task.task_id} échouée après {duration:.2f}s: {e}")
             
-            # Réessayer si éligible
+            # Réessayer si éligible : retry différé par la queue, le worker reste libre
             if task.is_retryable():
-                await asyncio.sleep(60)  # Attendre avant requeue
-                await self.queue.requeue_task(task)
+                await self.queue.requeue_task(task, delay_s=self.queue.config.retry_delay)
         
         finally:
             processing_time = time.time() - start_time
@@ -376,4 +653,183 @@ class PublishWorker:
             'uptime_seconds': uptime,
             'avg_processing_time': avg_processing_time,
             'current_task_id': self.current_task.task_id if self.current_task else None
-        }
\ No newline at end of file
+        }
+
+class PublishWorkerPool:
+    """
+    Pool de workers de publication avec concurrence globale et par store
+    
+    Les tâches sont récupérées dans l'ordre DRR de la queue tant qu'un slot
+    global est libre, en excluant les stores qui ont atteint leur concurrence
+    max ; chaque tâche est traitée dans sa propre coroutine, sous bail.
+    Les workers n'attendent jamais dans un handler : les retries sont différés
+    par la queue (requeue_task(delay_s=...)).
+    """
+    
+    def __init__(self, queue: PublishQueue, handler: Callable[[PublishTask], Awaitable[Any]],
+                 max_concurrency: int = 2, max_per_store: int = 1, idle_timeout_s: float = 5.0):
+        """
+        Args:
+            queue: Queue de tâches
+            handler: Coroutine de traitement d'une tâche récupérée
+            max_concurrency: Tâches traitées simultanément, tous stores confondus
+            max_per_store: Tâches traitées simultanément pour un même store
+            idle_timeout_s: Attente max sans tâche avant de revérifier is_running
+        """
+        self.queue = queue
+        self.handler = handler
+        self.max_concurrency = max_concurrency
+        self.max_per_store = max_per_store
+        self.idle_timeout_s = idle_timeout_s
+        
+        self.is_running = False
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._running: Set[asyncio.Task] = set()
+        # Réveil du dispatch : une tâche s'est terminée (slot libéré)
+        self._released = asyncio.Event()
+        
+        self.stats = {
+            'tasks_dispatched': 0,
+            'tasks_finished': 0,
+            'errors': 0,
+            'max_in_flight': 0
+        }
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._running)
+    
+    def _saturated_stores(self) -> Set[str]:
+        """Stores ayant atteint leur concurrence max"""
+        return {store_id for store_id, count in self._in_flight.items() if count >= self.max_per_store}
+    
+    def _start(self, task: PublishTask) -> asyncio.Task:
+        """Lancer le traitement d'une tâche récupérée"""
+        
+        self._in_flight[task.store_id] += 1
+        runner = asyncio.create_task(self._run_task(task))
+        self._running.add(runner)
+        runner.add_done_callback(self._running.discard)
+        
+        self.stats['tasks_dispatched'] += 1
+        self.stats['max_in_flight'] = max(self.stats['max_in_flight'], len(self._running))
+        return runner
+    
+    async def _run_task(self, task: PublishTask) -> PublishTask:
+        """Traiter sous bail puis acquitter ; libère toujours les slots"""
+        
+        try:
+            async with self.queue.hold_lease(task):
+                await self.handler(task)
+            if task.is_completed():
+                await self.queue.complete_task(task)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Erreur traitement tâche {task.task_id}: {e}")
+        finally:
+            self._in_flight[task.store_id] -= 1
+            if self._in_flight[task.store_id] <= 0:
+                del self._in_flight[task.store_id]
+            self.stats['tasks_finished'] += 1
+            self._released.set()
+        return task
+    
+    async def _claim_next(self) -> Optional[PublishTask]:
+        """Prochaine tâche d'un store non saturé, si un slot global est libre"""
+        
+        if len(self._running) >= self.max_concurrency:
+            return None
+        return await self.queue.get_next_task(exclude_stores=self._saturated_stores())
+    
+    async def run_available(self, max_tasks: Optional[int] = None) -> List[PublishTask]:
+        """
+        Traiter en parallèle les tâches disponibles immédiatement
+        
+        Args:
+            max_tasks: Nombre max de tâches (défaut: max_concurrency)
+        
+        Returns:
+            Tâches traitées, dans l'ordre de récupération
+        """
+        
+        limit = self.max_concurrency if max_tasks is None else max_tasks
+        runners = []
+        while len(runners) < limit:
+            task = await self._claim_next()
+            if task is None:
+                break
+            runners.append(self._start(task))
+        
+        return list(await asyncio.gather(*runners)) if runners else []
+    
+    async def _wait_for_work(self) -> None:
+        """Attendre une tâche prête sur un store non saturé ou une fin de traitement"""
+        
+        waiters = {
+            asyncio.create_task(self._released.wait()),
+            asyncio.create_task(self.queue.wait_until_ready(
+                timeout=self.idle_timeout_s, exclude_stores=self._saturated_stores()
+            ))
+        }
+        try:
+            await asyncio.wait(waiters, timeout=self.idle_timeout_s, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+    
+    async def run(self) -> None:
+        """Boucle de dispatch jusqu'à stop()"""
+        
+        self.is_running = True
+        logger.info(f"🚀 Pool de publication démarré ({self.max_concurrency} workers, "
+                    f"{self.max_per_store} par store)")
+        
+        while self.is_running:
+            try:
+                # Effacé avant la récupération : une fin de traitement ultérieure réveille l'attente
+                self._released.clear()
+                if len(self._running) >= self.max_concurrency:
+                    # Tous les slots occupés → attendre une fin de traitement
+                    try:
+                        await asyncio.wait_for(self._released.wait(), self.idle_timeout_s)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                
+                task = await self._claim_next()
+                if task:
+                    self._start(task)
+                else:
+                    await self._wait_for_work()
+            except Exception as e:
+                logger.error(f"Erreur dispatch pool de publication: {e}")
+                await asyncio.sleep(10)  # Pause sur erreur
+        
+        logger.info("⏹️  Pool de publication arrêté")
+    
+    async def stop(self, timeout: float = 30.0) -> bool:
+        """
+        Arrêter le dispatch et attendre les traitements en cours
+        
+        Returns:
+            True si tous les traitements se sont terminés avant le timeout
+        """
+        
+        self.is_running = False
+        self._released.set()
+        if not self._running:
+            return True
+        
+        _, pending = await asyncio.wait(set(self._running), timeout=timeout)
+        return not pending
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du pool"""
+        return {
+            **self.stats,
+            'is_running': self.is_running,
+            'max_concurrency': self.max_concurrency,
+            'max_per_store': self.max_per_store,
+            'in_flight': len(self._running),
+            'in_flight_by_store': dict(self._in_flight)
+        }
@@ -0,0 +1,191 @@
+"""
+Rate Limiting - Limiteurs de débit par store partagés par la queue et le scheduler - ECOMSIMPLY
+- SlidingWindowLimiter : fenêtre glissante exacte (N publications sur toute période d'1h),
+  bornée à N horodatages par store → réponses en temps constant
+- TokenBucket : seau à jetons (rafales puis débit moyen)
+- Une seule source pour la limite horaire d'un store (STORE_RATE_LIMITS, sinon config)
+- StoreRateLimiters : une seule fenêtre par store, partagée par la queue et le scheduler
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from .dto import PublicationConfig
+from .constants import STORE_RATE_LIMITS
+
+# Fenêtre de la limite de publications par store
+HOURLY_WINDOW_S = 3600.0
+
+
+class TokenBucket:
+    """Token bucket pour rate limiting par store"""
+
+    def __init__(self, capacity: int, refill_rate: float):
+        """
+        Args:
+            capacity: Nombre max de tokens
+            refill_rate: Tokens ajoutés par seconde
+        """
+        self.capacity = capacity
+        self.tokens = capacity
+        self.refill_rate = refill_rate
+        self.last_refill = time.time()
+
+    def consume(self, tokens: int = 1) -> bool:
+        """
+        Consomme des tokens si disponibles
+
+        Returns:
+            True si tokens consommés, False sinon
+        """
+        self._refill()
+
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def _refill(self):
+        """Recharge tokens selon le taux"""
+        now = time.time()
+        elapsed = now - self.last_refill
+        tokens_to_add = elapsed * self.refill_rate
+
+        self.tokens = min(self.capacity, self.tokens + tokens_to_add)
+        self.last_refill = now
+
+    def time_until_available(self, tokens: int = 1) -> float:
+        """Temps d'attente pour avoir les tokens (secondes)"""
+        self._refill()
+
+        if self.tokens >= tokens:
+            return 0.0
+
+        needed = tokens - self.tokens
+        return needed / self.refill_rate
+
+    def get_stats(self) -> Dict[str, float]:
+        """Statistiques du bucket"""
+        self._refill()
+        return {
+            'available_tokens': self.tokens,
+            'capacity': self.capacity,
+            'fill_percentage': (self.tokens / self.capacity) * 100,
+            'refill_rate_per_sec': self.refill_rate
+        }
+
+
+class SlidingWindowLimiter:
+    """
+    Limite glissante : au plus `limit` événements sur toute fenêtre de `window_s`
+
+    Seuls les `limit` derniers horodatages sont conservés (deque bornée) : quand
+    la fenêtre est pleine, le plus ancien donne directement la prochaine
+    disponibilité. Les horodatages sortis de la fenêtre sont évincés à l'écriture ;
+    les lectures ne modifient rien (elles peuvent porter sur un instant projeté).
+    """
+
+    def __init__(self, limit: int, window_s: float = HOURLY_WINDOW_S):
+        """
+        Args:
+            limit: Événements max dans la fenêtre
+            window_s: Durée de la fenêtre en secondes
+        """
+        self.limit = max(1, limit)
+        self.window_s = window_s
+        self._events: Deque[float] = deque(maxlen=self.limit)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _first_in_window(self, now: float) -> int:
+        """Index du premier événement encore dans la fenêtre (au plus `limit` pas)"""
+        cutoff = now - self.window_s
+        index = 0
+        while index < len(self._events) and self._events[index] < cutoff:
+            index += 1
+        return index
+
+    def record(self, now: Optional[float] = None) -> None:
+        """Enregistrer un événement sans vérifier la limite"""
+        now = time.time() if now is None else now
+        cutoff = now - self.window_s
+        while self._events and self._events[0] < cutoff:
+            self._events.popleft()
+        self._events.append(now)
+
+    def count(self, now: Optional[float] = None) -> int:
+        """Événements dans la fenêtre se terminant à `now`"""
+        now = time.time() if now is None else now
+        return len(self._events) - self._first_in_window(now)
+
+    def oldest(self, now: Optional[float] = None) -> Optional[float]:
+        """Plus ancien événement encore dans la fenêtre"""
+        now = time.time() if now is None else now
+        index = self._first_in_window(now)
+        return self._events[index] if index < len(self._events) else None
+
+    def time_until_available(self, tokens: int = 1, now: Optional[float] = None) -> float:
+        """Secondes avant que `tokens` événements tiennent dans la fenêtre"""
+        now = time.time() if now is None else now
+        index = self._first_in_window(now)
+        excess = len(self._events) - index + tokens - self.limit
+        if excess <= 0:
+            return 0.0
+        if tokens > self.limit:
+            return float('inf')
+        # Attendre la sortie des `excess` plus anciens événements de la fenêtre
+        return max(self._events[index + excess - 1] + self.window_s - now, 0.0)
+
+    def consume(self, tokens: int = 1, now: Optional[float] = None) -> bool:
+        """
+        Enregistrer `tokens` événements si la fenêtre le permet
+
+        Returns:
+            True si consommés, False sinon
+        """
+        now = time.time() if now is None else now
+        if self.time_until_available(tokens, now) > 0:
+            return False
+        for _ in range(tokens):
+            self.record(now)
+        return True
+
+    def get_stats(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Statistiques de la fenêtre (mêmes clés que TokenBucket)"""
+        used = self.count(now)
+        return {
+            'available_tokens': self.limit - used,
+            'capacity': self.limit,
+            'fill_percentage': ((self.limit - used) / self.limit) * 100,
+            'used_in_window': used,
+            'window_seconds': self.window_s
+        }
+
+
+def store_publication_limit(store_id: str, config: PublicationConfig) -> int:
+    """Publications max par heure pour un store (limite spécifique, sinon config)"""
+    return STORE_RATE_LIMITS.get(store_id, config.max_publications_per_hour)
+
+
+def create_store_rate_limiter(store_id: str, config: PublicationConfig) -> SlidingWindowLimiter:
+    """Limiteur horaire d'un store, identique pour la queue et le scheduler"""
+    return SlidingWindowLimiter(store_publication_limit(store_id, config), HOURLY_WINDOW_S)
+
+
+class StoreRateLimiters(dict):
+    """
+    Registre store_id → SlidingWindowLimiter (création à la première lecture)
+
+    Partagé par PublishQueue et PublicationScheduler : la réservation d'un créneau
+    par la queue et la limite vérifiée par le scheduler portent sur la même fenêtre.
+    """
+
+    def __init__(self, config: PublicationConfig):
+        super().__init__()
+        self.config = config
+
+    def __missing__(self, store_id: str) -> SlidingWindowLimiter:
+        limiter = self[store_id] = create_store_rate_limiter(store_id, self.config)
+        return limiter
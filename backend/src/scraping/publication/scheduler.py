@@ -5,11 +5,12 @@ Scheduler - Gestion fenêtres horaires, cooldown et planification - ECOMSIMPLY
 import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable
-from collections import defaultdict, deque
+from collections import defaultdict
 import logging
 
 from .dto import PublishTask, PublicationConfig, PublicationStatus
-from .constants import STORES, STORE_RATE_LIMITS
+from .constants import STORES
+from .rate_limit import SlidingWindowLimiter, StoreRateLimiters
 
 logger = logging.getLogger(__name__)
 
@@ -17,15 +18,19 @@ logger = logging.getLogger(__name__)
 class PublicationScheduler:
     """Planificateur de publications avec fenêtres horaires et cooldown"""
     
-    def __init__(self, config: PublicationConfig):
+    def __init__(self, config: PublicationConfig, rate_limiters: Optional[StoreRateLimiters] = None):
         """
         Args:
             config: Configuration publication
+            rate_limiters: Fenêtres horaires par store partagées avec PublishQueue
+                (défaut: registre propre au scheduler)
         """
         self.config = config
         
-        # Historique des publications par store
-        self._publication_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
+        # Fenêtre glissante d'une heure par store (la même que PublishQueue si partagée)
+        self._publication_history = rate_limiters if rate_limiters is not None else StoreRateLimiters(config)
+        self._last_publication: Dict[str, datetime] = {}
+        self._publication_counts: Dict[str, int] = defaultdict(int)
         
         # Prochains créneaux disponibles par store
         self._next_available_slots: Dict[str, datetime] = {}
@@ -59,12 +64,15 @@ class PublicationScheduler:
         current_hour = check_time.hour
         return self.config.active_hours_start <= current_hour <= self.config.active_hours_end
     
-    def can_publish_now(self, store_id: str) -> bool:
+    def can_publish_now(self, store_id: str, slot_reserved: bool = False) -> bool:
         """
         Vérifie si publication immédiate possible pour un store
         
         Args:
             store_id: ID du store
+            slot_reserved: Créneau déjà réservé par PublishQueue (tâche récupérée) :
+                la queue a appliqué cooldown et limite horaire, seule la fenêtre
+                horaire est revérifiée
             
         Returns:
             True si publication possible maintenant
@@ -76,6 +84,9 @@ class PublicationScheduler:
         if not self.is_active_hours(now):
             return False
         
+        if slot_reserved:
+            return True
+        
         # 2. Vérifier cooldown store
         if self._is_in_cooldown(store_id, now):
             return False
@@ -116,15 +127,10 @@ class PublicationScheduler:
         
         # 3. Vérifier rate limiting
         if self._is_rate_limited(store_id, candidate_slot):
-            # Ajouter délai pour respecter rate limit
-            publications_last_hour = self._count_publications_last_hour(store_id, candidate_slot)
-            max_per_hour = STORE_RATE_LIMITS.get(store_id, self.config.max_publications_per_hour)
-            
-            if publications_last_hour >= max_per_hour:
-                # Attendre jusqu'à ce qu'une publication sorte de la fenêtre d'1h
-                oldest_in_hour = self._get_oldest_publication_in_hour(store_id, candidate_slot)
-                if oldest_in_hour:
-                    candidate_slot = oldest_in_hour + timedelta(hours=1, seconds=1)
+            # Attendre jusqu'à ce qu'une publication sorte de la fenêtre d'1h
+            oldest_in_hour = self._get_oldest_publication_in_hour(store_id, candidate_slot)
+            if oldest_in_hour:
+                candidate_slot = oldest_in_hour + timedelta(hours=1, seconds=1)
         
         # 4. Re-vérifier fenêtre horaire après ajustement rate limit
         if not self.is_active_hours(candidate_slot):
@@ -165,19 +171,24 @@ class PublicationScheduler:
         
         return scheduled_time
     
-    def record_publication(self, store_id: str, publication_time: Optional[datetime] = None):
+    def record_publication(self, store_id: str, publication_time: Optional[datetime] = None,
+                           slot_reserved: bool = False):
         """
         Enregistre une publication effectuée
         
         Args:
             store_id: ID du store
             publication_time: Heure de publication (défaut: maintenant)
+            slot_reserved: Créneau déjà compté dans la fenêtre partagée par PublishQueue
         """
         
         if publication_time is None:
             publication_time = datetime.now()
         
-        self._publication_history[store_id].append(publication_time)
+        if not slot_reserved:
+            self._get_window(store_id).record(publication_time.timestamp())
+        self._last_publication[store_id] = publication_time
+        self._publication_counts[store_id] += 1
         
         # Nettoyer cache créneau suivant
         self._next_available_slots.pop(store_id, None)
@@ -205,9 +216,9 @@ class PublicationScheduler:
             'is_rate_limited': self._is_rate_limited(store_id, now),
             'next_available_slot': self.get_next_available_slot(store_id),
             'publications_last_hour': self._count_publications_last_hour(store_id, now),
-            'max_publications_per_hour': STORE_RATE_LIMITS.get(store_id, self.config.max_publications_per_hour),
+            'max_publications_per_hour': self._get_window(store_id).limit,
             'last_publication': self._get_last_publication_time(store_id),
-            'total_publications': len(self._publication_history[store_id])
+            'total_publications': self._publication_counts[store_id]
         }
     
     def get_all_stores_schedule(self) -> Dict[str, Dict[str, Any]]:
@@ -229,37 +240,35 @@ class PublicationScheduler:
         elapsed = check_time - last_pub
         return elapsed.total_seconds() < self.config.cooldown_between_publications
     
+    def _get_window(self, store_id: str) -> SlidingWindowLimiter:
+        """Fenêtre glissante du store (lazy creation)"""
+        
+        return self._publication_history[store_id]
+    
     def _is_rate_limited(self, store_id: str, check_time: datetime) -> bool:
         """Vérifie si store atteint sa limite de publications/heure"""
         
-        publications_count = self._count_publications_last_hour(store_id, check_time)
-        max_per_hour = STORE_RATE_LIMITS.get(store_id, self.config.max_publications_per_hour)
-        
-        return publications_count >= max_per_hour
+        return self._get_window(store_id).time_until_available(now=check_time.timestamp()) > 0
     
     def _get_last_publication_time(self, store_id: str) -> Optional[datetime]:
         """Dernière publication pour un store"""
         
-        history = self._publication_history[store_id]
-        return history[-1] if history else None
+        return self._last_publication.get(store_id)
     
     def _count_publications_last_hour(self, store_id: str, from_time: datetime) -> int:
         """Compte publications dans la dernière heure"""
         
-        one_hour_ago = from_time - timedelta(hours=1)
-        history = self._publication_history[store_id]
-        
-        return sum(1 for pub_time in history if pub_time >= one_hour_ago)
+        return self._get_window(store_id).count(from_time.timestamp())
     
     def _get_oldest_publication_in_hour(self, store_id: str, from_time: datetime) -> Optional[datetime]:
         """Publication la plus ancienne dans l'heure écoulée"""
         
-        one_hour_ago = from_time - timedelta(hours=1)
-        history = self._publication_history[store_id]
-        
-        publications_in_hour = [pub_time for pub_time in history if pub_time >= one_hour_ago]
-        
-        return min(publications_in_hour) if publications_in_hour else None
+        from_ts = from_time.timestamp()
+        oldest = self._get_window(store_id).oldest(from_ts)
+        if oldest is None:
+            return None
+        # Relatif à from_time : conserve le type (et le fuseau) des dates du scheduler
+        return from_time - timedelta(seconds=from_ts - oldest)
     
     def _get_next_active_hours_start(self, from_time: datetime) -> datetime:
         """Calcule prochaine heure de début de fenêtre active"""
@@ -303,7 +312,7 @@ class PublicationScheduler:
     def get_scheduler_stats(self) -> Dict[str, Any]:
         """Statistiques complètes du scheduler"""
         
-        total_publications = sum(len(history) for history in self._publication_history.values())
+        total_publications = sum(self._publication_counts.values())
         
         return {
             **self.stats,
@@ -5,9 +5,10 @@ Pipeline: HTML → Parser → Normalizer → ImagePipeline → ProductDTO
 """
 
 from .product_dto import ProductDTO, ImageDTO, PriceDTO, Currency, ProductStatus, ProductPlaceholder
-from .parser import SemanticParser
+from .parser import SemanticParser, create_semantic_parser
+from .streaming_parser import StreamingSemanticParser
 from .normalizer import DataNormalizer
-from .image_pipeline import ImagePipeline, ImageOptimizer
+from .image_pipeline import ImagePipeline, ImageOptimizer, ImageVariantCache, get_image_variant_cache
 from .orchestrator import SemanticOrchestrator
 from .seo_utils import SEOMetaGenerator, TrendingSEOGenerator
 from .robust_image_storage import ImageStorageSystem
@@ -20,9 +21,13 @@ __all__ = [
     'ProductStatus',
     'ProductPlaceholder',
     'SemanticParser',
+    'StreamingSemanticParser',
+    'create_semantic_parser',
     'DataNormalizer', 
     'ImagePipeline',
     'ImageOptimizer',
+    'ImageVariantCache',
+    'get_image_variant_cache',
     'SemanticOrchestrator',
     'SEOMetaGenerator',
     'TrendingSEOGenerator',
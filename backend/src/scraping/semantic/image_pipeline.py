@@ -4,9 +4,11 @@ Image Pipeline - Fetch, optimize, et persistence des images - ECOMSIMPLY
 
 import asyncio
 import hashlib
+import os
 import time
+from collections import OrderedDict
 from io import BytesIO
-from typing import List, Optional, Dict, Any
+from typing import Awaitable, Callable, List, Optional, Dict, Any, Tuple
 from urllib.parse import urlparse
 import logging
 
@@ -15,24 +17,143 @@ from PIL import Image, ImageOps
 from PIL.Image import Image as PILImage
 
 from .product_dto import ImageDTO
-from ..transport import RequestCoordinator
+from ..cpu_pool import CPUWorkerPool, get_cpu_pool
+from ..transport import RequestCoordinator, ResponseRejected
+from ..metrics import IMAGE_TRANSCODE_DURATION
+from ..single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Côté le plus long minimum accepté par Amazon pour une image produit
+AMAZON_MIN_IMAGE_DIMENSION = 500
+
+# Octets lus au plus pour identifier format et dimensions (segments EXIF inclus)
+IMAGE_SNIFF_BYTES = 64 * 1024
+
+
+def looks_like_image(content_bytes: bytes) -> bool:
+    """Valide que les bytes sont bien une image (signatures, rejet du HTML)"""
+    
+    if not content_bytes or len(content_bytes) < 100:
+        return False
+    
+    # Vérifier signatures images communes
+    image_signatures = [
+        b'\xFF\xD8\xFF',      # JPEG
+        b'\x89PNG\r\n\x1A\n', # PNG
+        b'GIF87a',            # GIF87a
+        b'GIF89a',            # GIF89a
+        b'RIFF',              # WEBP (contient RIFF)
+        b'\x00\x00\x01\x00', # ICO
+        b'BM',                # BMP
+    ]
+    
+    content_start = content_bytes[:16]
+    
+    for signature in image_signatures:
+        if content_start.startswith(signature):
+            return True
+    
+    # Vérifier WEBP plus spécifiquement
+    if content_start.startswith(b'RIFF') and b'WEBP' in content_bytes[:20]:
+        return True
+    
+    # Vérifier Content-Type si pas de signature (très basique)
+    if b'<html' in content_start.lower() or b'<!doctype' in content_start.lower():
+        return False
+    
+    return True
+
+
+def read_image_header(data: bytes) -> Optional[Tuple[str, int, int]]:
+    """Format et dimensions lus dans l'en-tête, sans décoder les pixels (None si incomplet)"""
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        # Le décodeur WEBP de Pillow exige le fichier complet
+        return _read_webp_header(data)
+    try:
+        with Image.open(BytesIO(data)) as img:
+            return img.format, img.width, img.height
+    except Exception:
+        return None
+
+
+def _read_webp_header(data: bytes) -> Optional[Tuple[str, int, int]]:
+    """Dimensions d'un WEBP depuis son premier chunk (VP8X, VP8L ou VP8)"""
+    chunk = data[12:16]
+    if chunk == b'VP8X' and len(data) >= 30:
+        width = 1 + int.from_bytes(data[24:27], 'little')
+        height = 1 + int.from_bytes(data[27:30], 'little')
+    elif chunk == b'VP8L' and len(data) >= 25 and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], 'little')
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+    elif chunk == b'VP8 ' and len(data) >= 30 and data[23:26] == b'\x9d\x01\x2a':
+        width = int.from_bytes(data[26:28], 'little') & 0x3FFF
+        height = int.from_bytes(data[28:30], 'little') & 0x3FFF
+    else:
+        return None
+    return 'WEBP', width, height
+
+
+class ImageHeaderSniffer:
+    """
+    Inspecteur des premiers octets d'un téléchargement d'image (RequestCoordinator.get)
+    
+    Abandonne le transfert dès que le contenu n'est pas une image, ou que les
+    dimensions lues dans l'en-tête sont sous le minimum, sans télécharger le reste.
+    """
+    
+    def __init__(self, url: str, min_dimension: int = 0, sniff_bytes: int = IMAGE_SNIFF_BYTES):
+        self.url = url
+        self.min_dimension = min_dimension
+        self.sniff_bytes = sniff_bytes
+        self.header: Optional[Tuple[str, int, int]] = None
+    
+    def __call__(self, prefix: bytes, headers: httpx.Headers) -> bool:
+        content_type = headers.get('content-type', '').lower()
+        if content_type.startswith(('text/', 'application/json')):
+            raise ResponseRejected(self.url, f"Content-Type non-image: {content_type}")
+        
+        if len(prefix) < 100:
+            return False
+        if not looks_like_image(prefix):
+            raise ResponseRejected(self.url, "contenu non-image")
+        
+        self.header = read_image_header(prefix)
+        if self.header is None:
+            # En-tête pas encore complet : continuer jusqu'à sniff_bytes
+            return len(prefix) >= self.sniff_bytes
+        
+        _, width, height = self.header
+        if max(width, height) < self.min_dimension:
+            raise ResponseRejected(self.url, f"image {width}x{height} < {self.min_dimension}px")
+        return True
+
 
 class ImageOptimizer:
-    """Optimise images pour le web (WEBP + JPEG fallback)"""
+    """Optimise images pour le web (WEBP + JPEG fallback) en un seul décodage"""
     
     def __init__(self):
         self.max_dimension = 1600  # Taille max côté 
         self.webp_quality = 80
+        self.webp_method = 4  # Effort encodeur WEBP (6 = ~3x plus lent pour quelques % gagnés)
         self.jpeg_quality = 85
+        self.reducing_gap = 3.0  # Réduction entière rapide avant le LANCZOS final
         self.max_file_size = 10 * 1024 * 1024  # 10MB limit
     
+    @property
+    def settings_key(self) -> str:
+        """Identifiant des paramètres de sortie (clé du cache de variantes)"""
+        return f"{self.max_dimension}:{self.webp_quality}:{self.webp_method}:{self.jpeg_quality}"
+    
     def optimize_image(self, image_bytes: bytes, original_url: str) -> Optional[Dict[str, Any]]:
         """
         Optimise image bytes → WEBP + JPEG fallback
         
+        Un seul décodage : les JPEG volumineux sont décodés directement à l'échelle
+        1/2, 1/4 ou 1/8 (mode draft), puis les deux variantes sont encodées depuis
+        la même image redimensionnée.
+        
         Returns:
             {
                 'webp_data': bytes,
@@ -48,30 +169,33 @@ class ImageOptimizer:
                 logger.warning(f"Image trop volumineuse: {len(image_bytes)} bytes depuis {original_url}")
                 return None
             
-            # Ouvrir image
-            with Image.open(BytesIO(image_bytes)) as img:
-                # Convertir RGBA → RGB si nécessaire
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    # Fond blanc pour transparence
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
+            # Ouvrir image (lecture de l'en-tête uniquement)
+            with Image.open(BytesIO(image_bytes)) as source:
                 original_size = len(image_bytes)
-                original_width, original_height = img.size
+                original_width, original_height = source.size
+                
+                # JPEG : décodage DCT réduit, au plus proche au-dessus de la cible
+                target_size = self._target_size(source.size)
+                if source.format == 'JPEG' and target_size != source.size:
+                    source.draft(None, target_size)
+                
+                # Orientation EXIF avant conversion (la conversion perd les métadonnées)
+                img = ImageOps.exif_transpose(source)
+                img = self._to_rgb(img)
                 
                 # Redimensionner si nécessaire
                 if max(img.size) > self.max_dimension:
-                    img = ImageOps.exif_transpose(img)  # Fix orientation EXIF
-                    img.thumbnail((self.max_dimension, self.max_dimension), Image.Resampling.LANCZOS)
+                    img.thumbnail(
+                        (self.max_dimension, self.max_dimension),
+                        Image.Resampling.LANCZOS,
+                        reducing_gap=self.reducing_gap
+                    )
                 
                 final_width, final_height = img.size
                 
                 # Générer WEBP
                 webp_buffer = BytesIO()
-                img.save(webp_buffer, format='WEBP', quality=self.webp_quality, optimize=True)
+                img.save(webp_buffer, format='WEBP', quality=self.webp_quality, method=self.webp_method)
                 webp_data = webp_buffer.getvalue()
                 
                 # Générer JPEG fallback
@@ -98,6 +222,144 @@ class ImageOptimizer:
         except Exception as e:
             logger.error(f"Erreur optimisation image depuis {original_url}: {e}")
             return None
+    
+    def _target_size(self, size: Tuple[int, int]) -> Tuple[int, int]:
+        """Dimensions finales (ratio préservé) pour une image de taille donnée"""
+        width, height = size
+        if max(width, height) <= self.max_dimension:
+            return size
+        scale = self.max_dimension / max(width, height)
+        return max(1, int(width * scale)), max(1, int(height * scale))
+    
+    @staticmethod
+    def _to_rgb(img: PILImage) -> PILImage:
+        """Convertir en RGB, transparence aplatie sur fond blanc"""
+        if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+            rgba = img.convert('RGBA')
+            background = Image.new('RGB', rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.split()[-1])
+            return background
+        if img.mode != 'RGB':
+            return img.convert('RGB')
+        return img
+
+
+class ImageVariantCache:
+    """
+    Cache adressé par contenu des variantes optimisées (LRU borné en octets)
+    
+    Clé = sha256 des octets source + paramètres de sortie : une image fournisseur
+    référencée par des centaines de variantes produit n'est transcodée qu'une fois.
+    Les transcodages concurrents d'une même clé sont fusionnés (single-flight).
+    """
+    
+    def __init__(self, max_size_mb: float = 256):
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Optional[Dict[str, Any]], int]]" = OrderedDict()
+        self._inflight: SingleFlight[Optional[Dict[str, Any]]] = SingleFlight()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0
+        }
+    
+    @staticmethod
+    def make_key(image_bytes: bytes, settings_key: str) -> str:
+        """Clé de cache : hash du contenu source + paramètres de sortie"""
+        return f"{hashlib.sha256(image_bytes).hexdigest()}:{settings_key}"
+    
+    def get(self, key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """(trouvé, variantes) ; un échec d'optimisation est aussi mis en cache (None)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[0]
+    
+    def put(self, key: str, value: Optional[Dict[str, Any]]) -> None:
+        """Stocker les variantes et évincer les moins récemment utilisées"""
+        size = self._entry_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.size_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size_bytes -= evicted_size
+            self.stats['evictions'] += 1
+    
+    async def get_or_create(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """Variantes en cache, ou transcodage unique partagé par les appelants concurrents"""
+        found, value = self.get(key)
+        if found:
+            self.stats['hits'] += 1
+            return value
+        
+        if key in self._inflight:
+            self.stats['coalesced'] += 1
+        else:
+            self.stats['misses'] += 1
+        
+        value, _ = await self._inflight.run(key, lambda: self._create(key, factory))
+        return value
+    
+    async def _create(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        value = await factory()
+        self.put(key, value)
+        return value
+    
+    @staticmethod
+    def _entry_size(value: Optional[Dict[str, Any]]) -> int:
+        if not value:
+            return 64
+        return 64 + sum(len(v) for v in value.values() if isinstance(v, (bytes, bytearray)))
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du cache (taux de hit, occupation)"""
+        lookups = self.stats['hits'] + self.stats['misses'] + self.stats['coalesced']
+        return {
+            'entries': len(self._entries),
+            'size_mb': round(self.size_bytes / (1024 * 1024), 2),
+            'max_size_mb': round(self.max_bytes / (1024 * 1024), 2),
+            'in_flight': len(self._inflight),
+            'hit_rate': round((self.stats['hits'] + self.stats['coalesced']) / lookups, 3) if lookups else 0.0,
+            **self.stats
+        }
+
+
+# Cache global du process (partagé par le pipeline et le stockage robuste)
+_image_variant_cache: Optional[ImageVariantCache] = None
+
+
+def get_image_variant_cache() -> ImageVariantCache:
+    """
+    Obtenir le cache de variantes global
+    
+    Variables d'environnement:
+        SCRAPING_IMAGE_CACHE_MB: taille max du cache en Mo (défaut: 256)
+    """
+    global _image_variant_cache
+    if _image_variant_cache is None:
+        _image_variant_cache = ImageVariantCache(
+            max_size_mb=float(os.environ.get("SCRAPING_IMAGE_CACHE_MB") or 256)
+        )
+    return _image_variant_cache
 
 
 class ImagePersistence:
@@ -144,9 +406,28 @@ class ImagePersistence:
 class ImagePipeline:
     """Pipeline complet pour traitement images asynchrone"""
     
-    def __init__(self, coordinator: RequestCoordinator):
+    def __init__(
+        self,
+        coordinator: RequestCoordinator,
+        cpu_pool: Optional[CPUWorkerPool] = None,
+        variant_cache: Optional[ImageVariantCache] = None,
+        min_dimension: int = 0
+    ):
+        """
+        Args:
+            coordinator: Transport HTTP partagé
+            cpu_pool: Pool CPU pour le transcodage (défaut: pool global)
+            variant_cache: Cache des variantes transcodées (défaut: cache dédié)
+            min_dimension: Côté le plus long minimum en pixels, 0 = pas de
+                minimum (Amazon: AMAZON_MIN_IMAGE_DIMENSION)
+        """
         self.coordinator = coordinator
         self.optimizer = ImageOptimizer()
+        self.min_dimension = min_dimension
+        # Transcodage Pillow hors event loop
+        self.cpu_pool = cpu_pool or get_cpu_pool()
+        # Variantes déjà transcodées, par hash du contenu source
+        self.variant_cache = variant_cache or ImageVariantCache()
         self.persistence = ImagePersistence()
         self.fetch_timeout = 10.0  # Timeout fetch image
         
@@ -209,9 +490,11 @@ class ImagePipeline:
             if not self._is_valid_image_content(image_bytes):
                 logger.warning(f"Contenu non-image détecté: {image_url}")
                 return None
+            if not self._meets_min_dimension(image_bytes, image_url):
+                return None
             
-            # 3. Optimize
-            optimized_data = self.optimizer.optimize_image(image_bytes, image_url)
+            # 3. Optimize (worker pool CPU, une seule fois par contenu source)
+            optimized_data = await self.optimize_cached(image_bytes, image_url)
             if not optimized_data:
                 return None
             
@@ -235,8 +518,23 @@ class ImagePipeline:
             logger.error(f"Erreur pipeline image {image_url}: {e}")
             return None
     
+    async def optimize_cached(self, image_bytes: bytes, image_url: str) -> Optional[Dict[str, Any]]:
+        """Variantes optimisées depuis le cache, sinon transcodage dans le pool CPU"""
+        
+        key = ImageVariantCache.make_key(image_bytes, self.optimizer.settings_key)
+        return await self.variant_cache.get_or_create(
+            key,
+            lambda: self.cpu_pool.run(
+                self.optimizer.optimize_image, image_bytes, image_url, histogram=IMAGE_TRANSCODE_DURATION
+            )
+        )
+    
     async def _fetch_image_bytes(self, image_url: str) -> Optional[bytes]:
-        """Fetch bytes image avec timeout"""
+        """Fetch bytes image avec timeout, en streaming borné
+        
+        Taille max, signature et dimensions vérifiées sur Content-Length et les
+        premiers octets : les URLs invalides sont abandonnées sans tout télécharger.
+        """
         
         try:
             headers = {
@@ -247,7 +545,9 @@ class ImagePipeline:
             response = await self.coordinator.get(
                 image_url, 
                 headers=headers,
-                use_cache=False  # Pas de cache pour images
+                use_cache=False,  # Pas de cache pour images
+                max_bytes=self.optimizer.max_file_size,
+                inspect=ImageHeaderSniffer(image_url, self.min_dimension)
             )
             
             if response.status_code != 200:
@@ -256,41 +556,25 @@ class ImagePipeline:
             
             return response.content
             
+        except ResponseRejected as e:
+            logger.warning(f"Image rejetée: {e}")
+            return None
         except Exception as e:
             logger.error(f"Erreur fetch image {image_url}: {e}")
             return None
     
     def _is_valid_image_content(self, content_bytes: bytes) -> bool:
         """Valide que les bytes sont bien une image"""
-        
-        if not content_bytes or len(content_bytes) < 100:
-            return False
-        
-        # Vérifier signatures images communes
-        image_signatures = [
-            b'\xFF\xD8\xFF',      # JPEG
-            b'\x89PNG\r\n\x1A\n', # PNG
-            b'GIF87a',            # GIF87a
-            b'GIF89a',            # GIF89a
-            b'RIFF',              # WEBP (contient RIFF)
-            b'\x00\x00\x01\x00', # ICO
-            b'BM',                # BMP
-        ]
-        
-        content_start = content_bytes[:16]
-        
-        for signature in image_signatures:
-            if content_start.startswith(signature):
-                return True
-        
-        # Vérifier WEBP plus spécifiquement
-        if content_start.startswith(b'RIFF') and b'WEBP' in content_bytes[:20]:
+        return looks_like_image(content_bytes)
+    
+    def _meets_min_dimension(self, image_bytes: bytes, image_url: str) -> bool:
+        """Rejeter les images sous le minimum (réponses dont l'en-tête n'a pas été inspecté)"""
+        if not self.min_dimension:
             return True
-        
-        # Vérifier Content-Type si pas de signature (très basique)
-        if b'<html' in content_start.lower() or b'<!doctype' in content_start.lower():
+        header = read_image_header(image_bytes)
+        if header is not None and max(header[1], header[2]) < self.min_dimension:
+            logger.warning(f"Image trop petite {header[1]}x{header[2]} (< {self.min_dimension}px): {image_url}")
             return False
-        
         return True
     
     def _generate_alt_text(self, original_url: str, optimized_data: Dict[str, Any]) -> str:
@@ -3,19 +3,22 @@ Orchestrator - Pipeline complet scraping sémantique avec SEO et images robustes
 RequestCoordinator → Parser → Normalizer → ImagePipeline → ProductDTO + SEO + Images robustes
 """
 
+import os
 import time
 import hashlib
 import asyncio
 from typing import Optional, Dict, Any
 import logging
 
-from .parser import SemanticParser
+from .parser import create_semantic_parser
 from .normalizer import DataNormalizer
-from .image_pipeline import ImagePipeline
+from .image_pipeline import ImagePipeline, get_image_variant_cache
 from .product_dto import ProductDTO, ProductStatus, ProductPlaceholder
 from .seo_utils import SEOMetaGenerator
 from .robust_image_storage import ImageStorageSystem
+from ..cpu_pool import CPUWorkerPool, get_cpu_pool
 from ..transport import RequestCoordinator
+from ..metrics import PARSE_DURATION
 
 logger = logging.getLogger(__name__)
 
@@ -23,15 +26,41 @@ logger = logging.getLogger(__name__)
 class SemanticOrchestrator:
     """Orchestrateur principal du pipeline de scraping sémantique avec SEO et images robustes"""
     
-    def __init__(self, coordinator: RequestCoordinator):
+    def __init__(
+        self,
+        coordinator: RequestCoordinator,
+        parser_backend: Optional[str] = None,
+        cpu_pool: Optional[CPUWorkerPool] = None
+    ):
+        """
+        Args:
+            coordinator: Transport HTTP partagé
+            parser_backend: 'soup' ou 'streaming' (défaut: variable
+                d'environnement SEMANTIC_PARSER_BACKEND, sinon 'soup')
+            cpu_pool: Pool CPU pour parsing et images (défaut: pool global)
+        """
         self.coordinator = coordinator
-        self.parser = SemanticParser()
+        self.parser = create_semantic_parser(
+            parser_backend or os.environ.get("SEMANTIC_PARSER_BACKEND", "soup")
+        )
+        self.cpu_pool = cpu_pool or get_cpu_pool()
         self.normalizer = DataNormalizer()
-        self.image_pipeline = ImagePipeline(coordinator)
+        # Cache de variantes partagé : une image source n'est transcodée qu'une fois
+        self.variant_cache = get_image_variant_cache()
+        # Images sous ce minimum rejetées dès l'en-tête (défaut 0 = pas de filtrage ;
+        # le minimum Amazon est appliqué à la publication Amazon)
+        min_image_dimension = int(os.environ.get("SCRAPING_IMAGE_MIN_DIMENSION") or 0)
+        self.image_pipeline = ImagePipeline(
+            coordinator, cpu_pool=self.cpu_pool, variant_cache=self.variant_cache,
+            min_dimension=min_image_dimension
+        )
         
         # Nouveaux composants Phase 1.5
         self.seo_generator = SEOMetaGenerator()
-        self.image_storage = ImageStorageSystem()
+        self.image_storage = ImageStorageSystem(
+            cpu_pool=self.cpu_pool, variant_cache=self.variant_cache,
+            min_dimension=min_image_dimension
+        )
     
     async def scrape_product_semantic(self, product_url: str) -> Optional[ProductDTO]:
         """
@@ -56,8 +85,10 @@ class SemanticOrchestrator:
                 logger.error(f"❌ Échec fetch HTML: {product_url}")
                 return None
             
-            # 2. Parse HTML → données structurées
-            parsed_data = self.parser.parse_html(html_content, product_url)
+            # 2. Parse HTML → données structurées (worker pool CPU, hors event loop)
+            parsed_data = await self.cpu_pool.run(
+                self.parser.parse_html, html_content, product_url, histogram=PARSE_DURATION
+            )
             logger.debug(f"Parser extractions: title={bool(parsed_data['title'])}, "
                         f"price={bool(parsed_data['price_text'])}, "
                         f"images={len(parsed_data['image_urls'])}")
@@ -485,8 +516,11 @@ class SemanticOrchestrator:
             'image_processing': {
                 'stored_images': stored_images_count,
                 'max_dimension': self.image_pipeline.optimizer.max_dimension,
-                'webp_quality': self.image_pipeline.optimizer.webp_quality
+                'webp_quality': self.image_pipeline.optimizer.webp_quality,
+                'min_dimension': self.image_pipeline.min_dimension,
+                'variant_cache': self.variant_cache.get_stats()
             },
+            'cpu_pool': self.cpu_pool.get_stats(),
             'pipeline_config': {
                 'fetch_timeout': self.coordinator.timeout_s,
                 'image_concurrency': self.image_pipeline.image_semaphore._value,
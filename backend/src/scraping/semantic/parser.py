@@ -4,7 +4,7 @@ Parse HTML → données structurées (title, description, price, images, attribu
 """
 
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup, Tag
 import logging
@@ -12,9 +12,34 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# Backends disponibles pour parse_html (voir create_semantic_parser)
+PARSER_BACKENDS = ('soup', 'streaming')
+
+# Contenu probable (divs avec classes description)
+DESCRIPTION_SELECTORS = [
+    '.product-description',
+    '.description',
+    '.product-details',
+    '.summary',
+    '[data-description]'
+]
+
+# Classes prix communes
+PRICE_SELECTORS = [
+    '.price',
+    '.product-price', 
+    '.current-price',
+    '.sale-price',
+    '[data-price]',
+    '.amount'
+]
+
+
 class SemanticParser:
     """Parser HTML sémantique avec support OpenGraph, Schema.org, meta tags"""
     
+    backend = "soup"
+    
     def __init__(self):
         # Patterns prix communs (€, $, £, prix avec séparateurs)
         self.price_patterns = [
@@ -35,6 +60,24 @@ class SemanticParser:
             'img[data-src]',
             'img[src]'
         ]
+        
+        # Schema.org structured data
+        self.schema_attribute_mappings = {
+            'brand': 'brand',
+            'model': 'model', 
+            'manufacturer': 'manufacturer',
+            'category': 'category',
+            'sku': 'sku',
+            'gtin': 'gtin'
+        }
+        
+        # OpenGraph product data
+        self.og_attribute_mappings = {
+            'brand': 'product:brand',
+            'category': 'product:category',
+            'price_amount': 'product:price:amount',
+            'price_currency': 'product:price:currency'
+        }
     
     def parse_html(self, html_content: str, base_url: str) -> Dict[str, Any]:
         """
@@ -120,15 +163,7 @@ class SemanticParser:
                 return f"<p>{desc}</p>"
         
         # 4. Contenu probable (divs avec classes description)
-        desc_selectors = [
-            '.product-description',
-            '.description',
-            '.product-details',
-            '.summary',
-            '[data-description]'
-        ]
-        
-        for selector in desc_selectors:
+        for selector in DESCRIPTION_SELECTORS:
             desc_element = soup.select_one(selector)
             if desc_element:
                 # Nettoyer et extraire HTML interne
@@ -149,16 +184,7 @@ class SemanticParser:
                 return price_text
         
         # 2. Classes prix communes
-        price_selectors = [
-            '.price',
-            '.product-price', 
-            '.current-price',
-            '.sale-price',
-            '[data-price]',
-            '.amount'
-        ]
-        
-        for selector in price_selectors:
+        for selector in PRICE_SELECTORS:
             price_element = soup.select_one(selector)
             if price_element:
                 price_text = price_element.get_text(strip=True)
@@ -166,7 +192,10 @@ class SemanticParser:
                     return price_text
         
         # 3. Recherche dans tout le texte avec patterns
-        all_text = soup.get_text()
+        return self._find_price_in_text(soup.get_text())
+    
+    def _find_price_in_text(self, all_text: str) -> Optional[str]:
+        """Premier prix trouvé dans le texte par ordre de patterns"""
         for pattern in self.compiled_price_patterns:
             matches = pattern.findall(all_text)
             if matches:
@@ -193,6 +222,22 @@ class SemanticParser:
                 return currency.upper()
         
         # 2. Domaine géographique
+        currency = self._currency_from_domain(base_url)
+        if currency:
+            return currency
+        
+        # 3. Langue HTML
+        html_lang = soup.find('html')
+        if html_lang and html_lang.get('lang'):
+            currency = self._currency_from_lang(html_lang['lang'])
+            if currency:
+                return currency
+        
+        # 4. Contenu page (chercher symboles)
+        return self._currency_from_text(soup.get_text())
+    
+    def _currency_from_domain(self, base_url: str) -> Optional[str]:
+        """Devise selon le TLD du domaine"""
         domain = urlparse(base_url).netloc.lower()
         if any(tld in domain for tld in ['.fr', '.be', '.lu']):
             return 'EUR'
@@ -200,49 +245,56 @@ class SemanticParser:
             return 'GBP'
         if any(tld in domain for tld in ['.com', '.us']):
             return 'USD'
-        
-        # 3. Langue HTML
-        html_lang = soup.find('html')
-        if html_lang and html_lang.get('lang'):
-            lang = html_lang['lang'].lower()
-            if lang.startswith('fr'):
-                return 'EUR'
-            if lang.startswith('en-gb'):
-                return 'GBP'
-            if lang.startswith('en'):
-                return 'USD'
-        
-        # 4. Contenu page (chercher symboles)
-        text_content = soup.get_text()
+        return None
+    
+    def _currency_from_lang(self, lang: str) -> Optional[str]:
+        """Devise selon l'attribut lang de <html>"""
+        lang = lang.lower()
+        if lang.startswith('fr'):
+            return 'EUR'
+        if lang.startswith('en-gb'):
+            return 'GBP'
+        if lang.startswith('en'):
+            return 'USD'
+        return None
+    
+    def _currency_from_text(self, text_content: str) -> Optional[str]:
+        """Devise selon les symboles présents dans le texte"""
         if '€' in text_content:
             return 'EUR'
         if '£' in text_content:
             return 'GBP'
         if '$' in text_content:
             return 'USD'
-        
         return None
     
     def _extract_image_urls(self, soup: BeautifulSoup, base_url: str) -> List[str]:
         """Extrait URLs images avec priorité sémantique"""
         
+        # Parcourir sélecteurs par priorité (select() évalué à la demande)
+        candidate_groups = (
+            (self._image_url_from_element(element) for element in soup.select(selector))
+            for selector in self.image_selectors
+        )
+        return self._collect_image_urls(candidate_groups, base_url)
+    
+    def _image_url_from_element(self, element: Tag) -> Optional[str]:
+        """Extraire URL selon type élément"""
+        if element.name == 'meta':
+            return element.get('content')
+        if element.name == 'img':
+            # Priorité data-src > src
+            return element.get('data-src') or element.get('src')
+        return None
+    
+    def _collect_image_urls(self, candidate_groups: Iterable[Iterable[Optional[str]]], base_url: str) -> List[str]:
+        """Résoudre, dédupliquer et limiter les URLs candidates (groupes par priorité)"""
+        
         image_urls = []
         seen_urls = set()
         
-        # Parcourir sélecteurs par priorité
-        for selector in self.image_selectors:
-            elements = soup.select(selector)
-            
-            for element in elements:
-                url = None
-                
-                # Extraire URL selon type élément
-                if element.name == 'meta':
-                    url = element.get('content')
-                elif element.name == 'img':
-                    # Priorité data-src > src
-                    url = element.get('data-src') or element.get('src')
-                
+        for candidates in candidate_groups:
+            for url in candidates:
                 if url:
                     # Résoudre URL relative en absolue HTTPS
                     absolute_url = urljoin(base_url, url)
@@ -276,16 +328,7 @@ class SemanticParser:
         attributes = {}
         
         # Schema.org structured data
-        schema_mappings = {
-            'brand': 'brand',
-            'model': 'model', 
-            'manufacturer': 'manufacturer',
-            'category': 'category',
-            'sku': 'sku',
-            'gtin': 'gtin'
-        }
-        
-        for attr_name, schema_prop in schema_mappings.items():
+        for attr_name, schema_prop in self.schema_attribute_mappings.items():
             element = soup.find(attrs={'itemprop': schema_prop})
             if element:
                 value = element.get('content') or element.get_text(strip=True)
@@ -293,17 +336,25 @@ class SemanticParser:
                     attributes[attr_name] = value
         
         # OpenGraph product data
-        og_mappings = {
-            'brand': 'product:brand',
-            'category': 'product:category',
-            'price_amount': 'product:price:amount',
-            'price_currency': 'product:price:currency'
-        }
-        
-        for attr_name, og_prop in og_mappings.items():
+        for attr_name, og_prop in self.og_attribute_mappings.items():
             og_element = soup.find('meta', property=og_prop)
             if og_element and og_element.get('content'):
                 attributes[attr_name] = og_element['content']
         
         logger.debug(f"Attributs extraits: {list(attributes.keys())}")
-        return attributes
\ No newline at end of file
+        return attributes
+
+
+def create_semantic_parser(backend: str = "soup") -> SemanticParser:
+    """
+    Instancier le parser du backend demandé
+    
+    - 'soup' : arbre BeautifulSoup complet (défaut)
+    - 'streaming' : passe unique html.parser sans arbre, mêmes résultats
+    """
+    if backend == "soup":
+        return SemanticParser()
+    if backend == "streaming":
+        from .streaming_parser import StreamingSemanticParser
+        return StreamingSemanticParser()
+    raise ValueError(f"Backend parser inconnu: {backend} (attendu: {', '.join(PARSER_BACKENDS)})")
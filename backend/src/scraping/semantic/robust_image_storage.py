@@ -6,14 +6,16 @@ import asyncio
 import hashlib
 import os
 import time
-from io import BytesIO
 from typing import Dict, List, Optional, Any, Union
 from urllib.parse import urlparse, urljoin
 import logging
 
 import httpx
-from PIL import Image, ImageOps
-from PIL.Image import Image as PILImage
+
+from .image_pipeline import ImageHeaderSniffer, ImageOptimizer, ImageVariantCache
+from ..cpu_pool import CPUWorkerPool, get_cpu_pool
+from ..metrics import IMAGE_TRANSCODE_DURATION
+from ..transport import ResponseRejected, read_bounded_body
 
 logger = logging.getLogger(__name__)
 
@@ -21,11 +23,25 @@ logger = logging.getLogger(__name__)
 class ImageStorageSystem:
     """Système de stockage d'images avec URLs stables HTTPS et CDN"""
     
-    def __init__(self, storage_config: Optional[Dict] = None):
+    def __init__(
+        self,
+        storage_config: Optional[Dict] = None,
+        cpu_pool: Optional[CPUWorkerPool] = None,
+        variant_cache: Optional[ImageVariantCache] = None,
+        min_dimension: int = 0
+    ):
         """
         Args:
             storage_config: Configuration stockage (S3, local, CDN)
+            cpu_pool: Pool CPU pour le transcodage (défaut: pool global)
+            variant_cache: Cache des variantes transcodées, partageable avec ImagePipeline
+            min_dimension: Côté le plus long minimum en pixels (0 = pas de minimum)
         """
+        self.cpu_pool = cpu_pool or get_cpu_pool()
+        self.min_dimension = min_dimension
+        self.optimizer = ImageOptimizer()
+        self.optimizer.webp_method = 6  # Variantes stockées : effort WEBP max, comme avant la mutualisation
+        self.variant_cache = variant_cache or ImageVariantCache()
         self.config = storage_config or {
             "type": "local_cdn_mock",
             "base_url": "https://cdn.ecomsimply.com/images",
@@ -145,7 +161,7 @@ class ImageStorageSystem:
         }
     
     async def _fetch_image_bytes(self, image_url: str, timeout: int = 10) -> Optional[bytes]:
-        """Fetch robuste des bytes image"""
+        """Fetch robuste des bytes image, en streaming borné (abandon dès les en-têtes si refusée)"""
         
         try:
             headers = {
@@ -157,129 +173,61 @@ class ImageStorageSystem:
             }
             
             async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(image_url, headers=headers, follow_redirects=True)
-                
-                if response.status_code != 200:
-                    logger.warning(f"Status {response.status_code} pour image: {image_url}")
-                    return None
-                
-                # Vérifier taille
-                content_length = len(response.content)
-                if content_length > self.config["max_file_size"]:
-                    logger.warning(f"Image trop volumineuse: {content_length} bytes")
-                    return None
-                
-                # Vérifier Content-Type
-                content_type = response.headers.get('content-type', '').lower()
-                if not content_type.startswith('image/'):
-                    logger.warning(f"Content-Type non-image: {content_type}")
-                    return None
-                
-                return response.content
+                async with client.stream('GET', image_url, headers=headers, follow_redirects=True) as response:
+                    
+                    if response.status_code != 200:
+                        logger.warning(f"Status {response.status_code} pour image: {image_url}")
+                        return None
+                    
+                    # Vérifier Content-Type avant de lire le corps
+                    content_type = response.headers.get('content-type', '').lower()
+                    if not content_type.startswith('image/'):
+                        logger.warning(f"Content-Type non-image: {content_type}")
+                        return None
+                    
+                    # Taille (Content-Length puis octets reçus), signature et dimensions
+                    return await read_bounded_body(
+                        response,
+                        self.config["max_file_size"],
+                        ImageHeaderSniffer(image_url, self.min_dimension)
+                    )
                 
+        except ResponseRejected as e:
+            logger.warning(f"Image rejetée: {e}")
+            return None
         except Exception as e:
             logger.error(f"Erreur fetch image {image_url}: {e}")
             return None
     
     async def _optimize_multi_format(self, image_bytes: bytes, source_url: str) -> Optional[Dict[str, bytes]]:
-        """Optimisation multi-format (WEBP + JPEG) avec validation"""
+        """Optimisation multi-format (WEBP + JPEG) : un décodage, résultat mis en cache par contenu"""
         
         try:
             # Validation basique
-            if not self._is_valid_image_data(image_bytes):
+            if not is_valid_image_data(image_bytes):
                 return None
             
-            with Image.open(BytesIO(image_bytes)) as img:
-                # Conversion RGB si nécessaire
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    # Fond blanc pour transparence
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode in ('RGBA', 'LA'):
-                        background.paste(img, mask=img.split()[-1])
-                    else:
-                        background.paste(img)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Orientation EXIF
-                img = ImageOps.exif_transpose(img)
-                
-                # Redimensionnement intelligent
-                img = self._smart_resize(img)
-                
-                optimized_formats = {}
-                
-                # WEBP (priorité)
-                webp_buffer = BytesIO()
-                img.save(webp_buffer, format='WEBP', quality=80, optimize=True, method=6)
-                optimized_formats['webp'] = webp_buffer.getvalue()
-                
-                # JPEG (fallback)
-                jpeg_buffer = BytesIO()
-                img.save(jpeg_buffer, format='JPEG', quality=85, optimize=True)
-                optimized_formats['jpg'] = jpeg_buffer.getvalue()
-                
-                # Statistiques optimisation
-                original_size = len(image_bytes)
-                webp_size = len(optimized_formats['webp'])
-                jpeg_size = len(optimized_formats['jpg'])
-                
-                logger.info(
-                    f"✨ Optimisation réussie {source_url}: "
-                    f"{original_size} → WEBP:{webp_size} ({webp_size/original_size*100:.1f}%), "
-                    f"JPEG:{jpeg_size} ({jpeg_size/original_size*100:.1f}%)"
+            key = ImageVariantCache.make_key(image_bytes, self.optimizer.settings_key)
+            optimized = await self.variant_cache.get_or_create(
+                key,
+                lambda: self.cpu_pool.run(
+                    self.optimizer.optimize_image, image_bytes, source_url, histogram=IMAGE_TRANSCODE_DURATION
                 )
-                
-                return optimized_formats
-                
+            )
+            if not optimized:
+                return None
+            
+            return {
+                'webp': optimized['webp_data'],
+                'jpg': optimized['jpeg_data']
+            }
         except Exception as e:
-            logger.error(f"Erreur optimisation {source_url}: {e}")
+            logger.error(f"Erreur optimisation {source_url}: {e!r}")
             return None
     
-    def _smart_resize(self, img: PILImage, max_dimension: int = 1600) -> PILImage:
-        """Redimensionnement intelligent préservant qualité"""
-        
-        width, height = img.size
-        
-        if max(width, height) <= max_dimension:
-            return img  # Pas besoin de redimensionner
-        
-        # Calculer nouvelles dimensions en préservant ratio
-        if width > height:
-            new_width = max_dimension
-            new_height = int((height * max_dimension) / width)
-        else:
-            new_height = max_dimension  
-            new_width = int((width * max_dimension) / height)
-        
-        # Redimensionnement avec qualité Lanczos
-        return img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-    
     def _is_valid_image_data(self, data: bytes) -> bool:
         """Validation rapide données image"""
-        
-        if len(data) < 100:  # Trop petit
-            return False
-        
-        # Signatures images
-        signatures = [
-            b'\xFF\xD8\xFF',      # JPEG
-            b'\x89PNG\r\n\x1A\n', # PNG  
-            b'GIF87a', b'GIF89a', # GIF
-            b'RIFF'               # WEBP (contient RIFF)
-        ]
-        
-        header = data[:16]
-        for sig in signatures:
-            if header.startswith(sig):
-                return True
-        
-        # WEBP spécifique
-        if header.startswith(b'RIFF') and b'WEBP' in data[:20]:
-            return True
-        
-        return False
+        return is_valid_image_data(data)
     
     def _generate_stable_hash(self, image_url: str, product_context: Dict = None, suffix: str = "") -> str:
         """Génère hash stable pour URLs permanentes"""
@@ -380,4 +328,30 @@ class ImageStorageSystem:
                     "jpg_files": len([f for f in files if f.endswith('.jpg')])
                 })
         
-        return stats
\ No newline at end of file
+        return stats
+
+
+def is_valid_image_data(data: bytes) -> bool:
+    """Validation rapide données image"""
+    
+    if len(data) < 100:  # Trop petit
+        return False
+    
+    # Signatures images
+    signatures = [
+        b'\xFF\xD8\xFF',      # JPEG
+        b'\x89PNG\r\n\x1A\n', # PNG  
+        b'GIF87a', b'GIF89a', # GIF
+        b'RIFF'               # WEBP (contient RIFF)
+    ]
+    
+    header = data[:16]
+    for sig in signatures:
+        if header.startswith(sig):
+            return True
+    
+    # WEBP spécifique
+    if header.startswith(b'RIFF') and b'WEBP' in data[:20]:
+        return True
+    
+    return False
@@ -0,0 +1,528 @@
+"""
+Streaming HTML Parser pour extraction sémantique - ECOMSIMPLY
+Backend alternatif à l'arbre BeautifulSoup complet : une seule passe d'événements
+html.parser (le tokenizer utilisé par BeautifulSoup 'html.parser') collecte meta
+OpenGraph/Twitter, Schema.org (itemprop), h1/title, blocs prix/description et
+candidats images. Les règles de priorité restent celles de SemanticParser.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+from bs4 import BeautifulSoup
+from bs4.dammit import EntitySubstitution
+import logging
+
+from .parser import SemanticParser, DESCRIPTION_SELECTORS, PRICE_SELECTORS
+
+logger = logging.getLogger(__name__)
+
+
+# Règles de construction reprises du tree builder html.parser de BeautifulSoup
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed',
+    'frame', 'hr', 'image', 'img', 'input', 'isindex', 'keygen', 'link',
+    'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr'
+})
+# Texte de ces balises exclu de get_text() (Script, Stylesheet, TemplateString...)
+STRING_CONTAINER_TAGS = frozenset({'script', 'style', 'template', 'rt', 'rp'})
+PRESERVE_WHITESPACE_TAGS = frozenset({'pre', 'textarea'})
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+# Champs collectés pendant la passe (premier élément rencontré, comme soup.find)
+META_PROPERTIES = frozenset({
+    'og:title', 'og:description', 'product:brand', 'product:category',
+    'product:price:amount', 'product:price:currency'
+})
+META_NAMES = frozenset({'twitter:title', 'description'})
+ITEMPROPS = frozenset({
+    'name', 'description', 'price', 'priceCurrency', 'brand', 'model',
+    'manufacturer', 'category', 'sku', 'gtin'
+})
+
+# Groupes de candidats images, dans l'ordre de SemanticParser.image_selectors
+IMAGE_GROUPS = ('og:image', 'twitter:image', 'itemprop', 'product-image', 'main-image', 'data-src', 'src')
+
+_WHITESPACE_RE = re.compile(r'\S+')
+
+
+def _compile_simple_selector(selector: str) -> Tuple[str, str]:
+    """Sélecteur simple '.classe' ou '[attribut]' → (type, valeur)"""
+    if selector.startswith('.'):
+        return 'class', selector[1:]
+    if selector.startswith('[') and selector.endswith(']') and '=' not in selector:
+        return 'attr', selector[1:-1].lower()
+    raise ValueError(f"Sélecteur non supporté par le backend streaming: {selector}")
+
+
+def _dereference_charref(name: str) -> str:
+    """Référence numérique → caractère (mêmes corrections que BeautifulSoup)"""
+    if name[:1] in ('x', 'X'):
+        code = int(name[1:], 16)
+    else:
+        code = int(name)
+
+    if code == 0 or code > 0x10FFFF or 0xD800 <= code <= 0xDFFF:
+        return '\ufffd'
+    if 0x80 <= code <= 0x9F:
+        # Références encodées en windows-1252 au lieu d'Unicode
+        try:
+            return bytes([code]).decode('windows-1252')
+        except UnicodeDecodeError:
+            pass
+    return chr(code)
+
+
+class _TextCollector:
+    """Accumule le texte d'un élément à la manière de get_text(strip=True)"""
+
+    __slots__ = ('parts', 'container')
+
+    def __init__(self, container: Optional[str] = None):
+        self.parts: List[str] = []
+        # Un élément script/style/... garde son propre texte
+        self.container = container
+
+    def text(self) -> str:
+        return ''.join(self.parts)
+
+
+class _Frame:
+    """Élément ouvert dans la pile de la passe"""
+
+    __slots__ = ('name', 'active_len', 'image_scopes', 'spans')
+
+    def __init__(self, name: str, active_len: int):
+        self.name = name
+        self.active_len = active_len
+        self.image_scopes: Tuple[str, ...] = ()
+        self.spans: Optional[List[str]] = None
+
+
+class StreamingHTMLCollector(HTMLParser):
+    """
+    Passe unique sur le HTML sans construire d'arbre
+
+    Reproduit la structure de BeautifulSoup 'html.parser' (éléments vides,
+    fermeture jusqu'à la dernière balise du même nom, fusion des blancs)
+    pour que les champs collectés soient identiques à ceux du parser soup.
+    """
+
+    def __init__(self, html_content: str):
+        super().__init__(convert_charrefs=False)
+        self.html_content = html_content
+
+        self.meta_properties: Dict[str, Optional[str]] = {}
+        self.meta_names: Dict[str, Optional[str]] = {}
+        self.itemprops: Dict[str, Tuple[Optional[str], _TextCollector]] = {}
+        self.first_h1: Optional[_TextCollector] = None
+        self.first_title: Optional[_TextCollector] = None
+        self.html_seen = False
+        self.html_lang: Optional[str] = None
+        self.price_elements: Dict[str, _TextCollector] = {}
+        self.description_spans: Dict[str, List[Any]] = {}
+        self.image_candidates: Dict[str, List[Optional[str]]] = {group: [] for group in IMAGE_GROUPS}
+
+        self._description_selectors = [(s, _compile_simple_selector(s)) for s in DESCRIPTION_SELECTORS]
+        self._price_selectors = [(s, _compile_simple_selector(s)) for s in PRICE_SELECTORS]
+
+        self._text_parts: List[str] = []
+        self._pending: List[str] = []
+        self._stack: List[_Frame] = []
+        self._open_counts: Dict[str, int] = {}
+        self._active: List[_TextCollector] = []
+        self._containers: List[str] = []
+        self._preserve_tags: List[str] = []
+        self._image_scope_depth = {'product-image': 0, 'main-image': 0}
+        self._already_closed_empty: Dict[str, int] = {}
+        self._open_spans = 0
+        self._line_starts: Optional[List[int]] = None
+
+    @classmethod
+    def collect(cls, html_content: str) -> 'StreamingHTMLCollector':
+        """Parser le document complet et retourner le collecteur"""
+        collector = cls(html_content)
+        collector.feed(html_content)
+        collector.close()
+        return collector
+
+    # ------------------------------------------------------------------
+    # Résultats
+    # ------------------------------------------------------------------
+
+    def get_text(self) -> str:
+        """Équivalent de soup.get_text()"""
+        return ''.join(self._text_parts)
+
+    def description_html(self, selector: str) -> Optional[str]:
+        """Équivalent de str(soup.select_one(selector)), None si absent"""
+        span = self.description_spans.get(selector)
+        if span is None:
+            return None
+        start, end, preserve_tag, already_closed = span
+        fragment = self.html_content[start:end if end >= 0 else len(self.html_content)]
+
+        # Seul le fragment est re-sérialisé (mêmes règles d'échappement que str(tag)).
+        # Contexte rejoué devant le fragment : éléments vides dont une balise
+        # fermante (</br>) sera ignorée, et <pre>/<textarea> qui conservent les blancs
+        lowered = fragment.lower()
+        prefix = "".join(
+            f"<{tag}>" * min(count, lowered.count(f"</{tag}"))
+            for tag, count in already_closed.items()
+        )
+        markup = prefix + fragment
+        if preserve_tag is not None:
+            markup = f"<{preserve_tag}>{markup}</{preserve_tag}>"
+
+        root = BeautifulSoup(markup, 'html.parser')
+        if preserve_tag is not None:
+            root = root.contents[0]
+        return str(root.contents[prefix.count('<')])
+
+    # ------------------------------------------------------------------
+    # Événements html.parser
+    # ------------------------------------------------------------------
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        frame = self._open_element(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self._pop_frame(frame, self._starttag_end(frame))
+            # Une balise fermante explicite (</br>) sera ignorée
+            self._already_closed_empty[tag] = self._already_closed_empty.get(tag, 0) + 1
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        frame = self._open_element(tag, attrs)
+        self._pop_frame(frame, self._starttag_end(frame))
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._already_closed_empty.get(tag):
+            self._already_closed_empty[tag] -= 1
+            return
+
+        self._flush_text()
+        if not self._open_counts.get(tag):
+            return
+
+        start = end = -1
+        if self._open_spans:
+            # Bornes utiles uniquement si un bloc description est en cours
+            start = self._offset()
+            end = self.html_content.find('>', start)
+            end = end + 1 if end >= 0 else len(self.html_content)
+        while self._stack:
+            frame = self._stack[-1]
+            if frame.name == tag:
+                self._pop_frame(frame, end)
+                break
+            # Éléments non fermés explicitement : se terminent avant la balise fermante
+            self._pop_frame(frame, start)
+
+    def handle_data(self, data: str) -> None:
+        self._pending.append(data)
+
+    def handle_charref(self, name: str) -> None:
+        self._pending.append(_dereference_charref(name))
+
+    def handle_entityref(self, name: str) -> None:
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self._pending.append(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data: str) -> None:
+        self._flush_text()
+
+    def handle_decl(self, decl: str) -> None:
+        self._flush_text()
+
+    def handle_pi(self, data: str) -> None:
+        self._flush_text()
+
+    def unknown_decl(self, data: str) -> None:
+        self._flush_text()
+        if data.upper().startswith('CDATA['):
+            # Les sections CDATA comptent dans get_text()
+            self._pending.append(data[len('CDATA['):])
+            self._flush_text(main_content=True)
+
+    def close(self) -> None:
+        super().close()
+        self._flush_text()
+        while self._stack:
+            self._pop_frame(self._stack[-1], len(self.html_content))
+
+    # ------------------------------------------------------------------
+    # Pile d'éléments
+    # ------------------------------------------------------------------
+
+    def _open_element(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> _Frame:
+        """Empiler un élément et enregistrer les champs qu'il alimente"""
+        self._flush_text()
+
+        # Dernière valeur gagnante pour les attributs dupliqués, None → ''
+        attributes = {key: ('' if value is None else value) for key, value in attrs}
+        classes = _WHITESPACE_RE.findall(attributes['class']) if 'class' in attributes else ()
+
+        frame = _Frame(tag, len(self._active))
+        container = tag if tag in STRING_CONTAINER_TAGS else None
+
+        if tag == 'meta':
+            self._record_meta(attributes)
+        elif tag == 'img':
+            self._record_img(attributes)
+        elif tag == 'h1' and self.first_h1 is None:
+            self.first_h1 = self._start_collector(container)
+        elif tag == 'title' and self.first_title is None:
+            self.first_title = self._start_collector(container)
+        elif tag == 'html' and not self.html_seen:
+            self.html_seen = True
+            self.html_lang = attributes.get('lang')
+
+        itemprop = attributes.get('itemprop')
+        if itemprop is not None:
+            if itemprop in ITEMPROPS and itemprop not in self.itemprops:
+                self.itemprops[itemprop] = (attributes.get('content'), self._start_collector(container))
+            elif itemprop == 'image':
+                if tag == 'meta':
+                    self.image_candidates['itemprop'].append(attributes.get('content'))
+                elif tag == 'img':
+                    self.image_candidates['itemprop'].append(attributes.get('data-src') or attributes.get('src'))
+
+        for selector, (kind, value) in self._price_selectors:
+            if selector not in self.price_elements and self._matches(kind, value, classes, attributes):
+                self.price_elements[selector] = self._start_collector(container)
+
+        for selector, (kind, value) in self._description_selectors:
+            if selector not in self.description_spans and self._matches(kind, value, classes, attributes):
+                self.description_spans[selector] = [
+                    self._offset(), -1,
+                    self._preserve_tags[-1] if self._preserve_tags else None,
+                    {tag: count for tag, count in self._already_closed_empty.items() if count}
+                ]
+                frame.spans = (frame.spans or []) + [selector]
+        if frame.spans:
+            self._open_spans += 1
+
+        scopes = tuple(scope for scope in self._image_scope_depth if scope in classes)
+        if scopes:
+            frame.image_scopes = scopes
+            for scope in scopes:
+                self._image_scope_depth[scope] += 1
+
+        if container:
+            self._containers.append(container)
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve_tags.append(tag)
+
+        self._stack.append(frame)
+        self._open_counts[tag] = self._open_counts.get(tag, 0) + 1
+        return frame
+
+    def _pop_frame(self, frame: _Frame, end_offset: int) -> None:
+        """Dépiler le dernier élément ouvert"""
+        self._flush_text()
+        self._stack.pop()
+        self._open_counts[frame.name] -= 1
+
+        del self._active[frame.active_len:]
+        for scope in frame.image_scopes:
+            self._image_scope_depth[scope] -= 1
+        if frame.name in STRING_CONTAINER_TAGS:
+            self._containers.pop()
+        if frame.name in PRESERVE_WHITESPACE_TAGS:
+            self._preserve_tags.pop()
+        if frame.spans:
+            self._open_spans -= 1
+            for selector in frame.spans:
+                self.description_spans[selector][1] = end_offset
+
+    def _start_collector(self, container: Optional[str]) -> _TextCollector:
+        collector = _TextCollector(container)
+        self._active.append(collector)
+        return collector
+
+    @staticmethod
+    def _matches(kind: str, value: str, classes: Iterable[str], attributes: Dict[str, str]) -> bool:
+        if kind == 'class':
+            return value in classes
+        return value in attributes
+
+    def _record_meta(self, attributes: Dict[str, str]) -> None:
+        content = attributes.get('content')
+
+        prop = attributes.get('property')
+        if prop is not None:
+            if prop == 'og:image':
+                self.image_candidates['og:image'].append(content)
+            elif prop in META_PROPERTIES and prop not in self.meta_properties:
+                self.meta_properties[prop] = content
+
+        name = attributes.get('name')
+        if name is not None:
+            if name == 'twitter:image':
+                self.image_candidates['twitter:image'].append(content)
+            elif name in META_NAMES and name not in self.meta_names:
+                self.meta_names[name] = content
+
+    def _record_img(self, attributes: Dict[str, str]) -> None:
+        # Priorité data-src > src
+        url = attributes.get('data-src') or attributes.get('src')
+        if self._image_scope_depth['product-image']:
+            self.image_candidates['product-image'].append(url)
+        if self._image_scope_depth['main-image']:
+            self.image_candidates['main-image'].append(url)
+        if 'data-src' in attributes:
+            self.image_candidates['data-src'].append(url)
+        if 'src' in attributes:
+            self.image_candidates['src'].append(url)
+
+    # ------------------------------------------------------------------
+    # Texte
+    # ------------------------------------------------------------------
+
+    def _flush_text(self, main_content: bool = False) -> None:
+        """Clôturer la chaîne de texte courante (équivalent de endData)"""
+        if not self._pending:
+            return
+        text = ''.join(self._pending)
+        self._pending = []
+
+        if not self._preserve_tags and not text.strip(ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+
+        container = None if main_content or not self._containers else self._containers[-1]
+        if container is None:
+            self._text_parts.append(text)
+
+        stripped = text.strip()
+        if stripped:
+            for collector in self._active:
+                if collector.container == container:
+                    collector.parts.append(stripped)
+
+    def _starttag_end(self, frame: _Frame) -> int:
+        """Fin de la balise ouvrante courante (élément vide ou auto-fermant)"""
+        if not frame.spans:
+            return -1
+        return self._offset() + len(self.get_starttag_text() or '')
+
+    def _offset(self) -> int:
+        """Position absolue de l'événement courant dans le HTML source"""
+        if self._line_starts is None:
+            self._line_starts = [0] + [m.end() for m in re.finditer('\n', self.html_content)]
+        lineno, column = self.getpos()
+        return self._line_starts[lineno - 1] + column
+
+
+class StreamingSemanticParser(SemanticParser):
+    """SemanticParser sans arbre DOM : mêmes règles d'extraction, une seule passe"""
+
+    backend = "streaming"
+
+    def parse_html(self, html_content: str, base_url: str) -> Dict[str, Any]:
+        """Parse HTML pour extraire données sémantiques (même format que SemanticParser)"""
+        document = StreamingHTMLCollector.collect(html_content)
+
+        return {
+            'title': self._title_from_stream(document),
+            'description_html': self._description_from_stream(document),
+            'price_text': self._price_text_from_stream(document),
+            'currency_hint': self._currency_hint_from_stream(document, base_url),
+            'image_urls': self._collect_image_urls(
+                (document.image_candidates[group] for group in IMAGE_GROUPS), base_url
+            ),
+            'attributes': self._attributes_from_stream(document)
+        }
+
+    def _title_from_stream(self, document: StreamingHTMLCollector) -> str:
+        """Titre avec priorité OpenGraph > Twitter > Schema.org > h1 > title"""
+        og_title = document.meta_properties.get('og:title')
+        if og_title:
+            return og_title.strip()
+
+        twitter_title = document.meta_names.get('twitter:title')
+        if twitter_title:
+            return twitter_title.strip()
+
+        schema_title = document.itemprops.get('name')
+        if schema_title and schema_title[1].text():
+            return schema_title[1].text()
+
+        if document.first_h1 and document.first_h1.text():
+            return document.first_h1.text()
+
+        if document.first_title:
+            return document.first_title.text()
+
+        return "Titre non disponible"
+
+    def _description_from_stream(self, document: StreamingHTMLCollector) -> str:
+        """Description avec priorité meta description > OpenGraph > Schema.org > contenu"""
+        for desc in (document.meta_names.get('description'), document.meta_properties.get('og:description')):
+            if desc and desc.strip():
+                return f"<p>{desc.strip()}</p>"
+
+        schema_desc = document.itemprops.get('description')
+        if schema_desc and schema_desc[1].text():
+            return f"<p>{schema_desc[1].text()}</p>"
+
+        for selector in DESCRIPTION_SELECTORS:
+            desc_html = document.description_html(selector)
+            if desc_html and desc_html.strip():
+                return desc_html
+
+        return "<p>Description non disponible</p>"
+
+    def _price_text_from_stream(self, document: StreamingHTMLCollector) -> Optional[str]:
+        """Prix brut : Schema.org > classes prix > patterns dans tout le texte"""
+        schema_price = document.itemprops.get('price')
+        if schema_price:
+            price_text = schema_price[0] or schema_price[1].text()
+            if price_text:
+                return price_text
+
+        for selector in PRICE_SELECTORS:
+            price_element = document.price_elements.get(selector)
+            if price_element:
+                price_text = price_element.text()
+                if price_text and self._contains_price_pattern(price_text):
+                    return price_text
+
+        return self._find_price_in_text(document.get_text())
+
+    def _currency_hint_from_stream(self, document: StreamingHTMLCollector, base_url: str) -> Optional[str]:
+        """Devise probable : Schema.org > domaine > langue > symboles"""
+        schema_currency = document.itemprops.get('priceCurrency')
+        if schema_currency:
+            currency = schema_currency[0] or schema_currency[1].text()
+            if currency:
+                return currency.upper()
+
+        currency = self._currency_from_domain(base_url)
+        if currency:
+            return currency
+
+        if document.html_lang:
+            currency = self._currency_from_lang(document.html_lang)
+            if currency:
+                return currency
+
+        return self._currency_from_text(document.get_text())
+
+    def _attributes_from_stream(self, document: StreamingHTMLCollector) -> Dict[str, str]:
+        """Attributs produit Schema.org puis OpenGraph product:*"""
+        attributes = {}
+
+        for attr_name, schema_prop in self.schema_attribute_mappings.items():
+            element = document.itemprops.get(schema_prop)
+            if element:
+                value = element[0] or element[1].text()
+                if value:
+                    attributes[attr_name] = value
+
+        for attr_name, og_prop in self.og_attribute_mappings.items():
+            content = document.meta_properties.get(og_prop)
+            if content:
+                attributes[attr_name] = content
+
+        logger.debug(f"Attributs extraits: {list(attributes.keys())}")
+        return attributes
@@ -0,0 +1,55 @@
+"""
+Single-flight pour le scraping ECOMSIMPLY
+Les appels concurrents pour une même clé partagent une seule exécution
+- La tâche partagée est protégée par asyncio.shield : l'annulation d'un
+  appelant n'interrompt pas les autres
+- La clé est libérée dès la fin de la tâche (succès, erreur ou annulation)
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Table des tâches en vol par clé"""
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, "asyncio.Task[T]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Exécuter factory() une seule fois pour les appels concurrents sur `key`
+
+        Returns:
+            (résultat, True si cet appel a lancé l'exécution)
+        """
+        task = self._tasks.get(key)
+        leader = task is None
+        if leader:
+            task = asyncio.create_task(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t, k=key: self._on_done(k, t))
+
+        return await asyncio.shield(task), leader
+
+    def cancel_all(self) -> None:
+        """Annuler les tâches en vol (fermeture du propriétaire)"""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def _on_done(self, key: Hashable, task: "asyncio.Task[T]") -> None:
+        """Retirer la tâche terminée de la table des tâches en vol"""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Marquer l'exception comme consommée si tous les appelants ont été annulés
+            task.exception()
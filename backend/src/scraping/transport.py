@@ -1,52 +1,274 @@
 """
 Transport Layer robuste pour scraping ECOMSIMPLY
-- Concurrence par domaine (Semaphore par host)
+- Concurrence par domaine adaptative (AIMD par host, respect de Retry-After)
 - Retry avec exponential backoff + jitter
-- Pool de proxys avec score de santé
-- Cache TTL court (180s) pour réponses HTML
+- Pool de proxys avec score de santé et clients HTTP réutilisés par proxy
+- Cache TTL court (180s) pour réponses HTML : LRU borné en octets, corps
+  compressés, second niveau SQLite optionnel partagé entre workers
+- Revalidation conditionnelle (ETag / Last-Modified) et stale-while-revalidate
+- Coalescence (single-flight) des GET concurrents sur une même ressource
+- Téléchargements bornés en streaming (Content-Length, taille max, inspection
+  des premiers octets) avec abandon anticipé
 """
 
 import asyncio
 import hashlib
+import json
+import os
 import random
+import sqlite3
+import threading
 import time
-from collections import defaultdict
+import zlib
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Any, Union
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, Tuple, Union
 from urllib.parse import urlparse
 import logging
 
 import httpx
 from httpx import Response, TimeoutException
 
+from .metrics import FETCH_LATENCY
+from .single_flight import SingleFlight
+
 # Configuration du logger
 logger = logging.getLogger(__name__)
 
 
 @dataclass
 class CacheEntry:
-    """Entrée de cache avec TTL"""
-    content: str
+    """Entrée de cache avec TTL (corps stocké compressé zlib)"""
+    body: bytes
     timestamp: float
     status_code: int
     headers: Dict[str, str]
+    encoding: str = "utf-8"
+    
+    @property
+    def raw_content(self) -> bytes:
+        """Corps brut décompressé"""
+        return zlib.decompress(self.body)
+    
+    @property
+    def content(self) -> str:
+        """Corps décodé en texte"""
+        return self.raw_content.decode(self.encoding or "utf-8", errors="replace")
+    
+    @property
+    def size_bytes(self) -> int:
+        """Empreinte approximative de l'entrée en mémoire"""
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
     
     def is_expired(self, ttl_seconds: int = 180) -> bool:
         """Vérifier si l'entrée de cache a expiré"""
         return (time.time() - self.timestamp) > ttl_seconds
+    
+    def get_header(self, name: str) -> Optional[str]:
+        """Lire un header de la réponse mise en cache (insensible à la casse)"""
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return None
+    
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers de revalidation conditionnelle (If-None-Match / If-Modified-Since)"""
+        conditional = {}
+        etag = self.get_header('etag')
+        if etag:
+            conditional['If-None-Match'] = etag
+        last_modified = self.get_header('last-modified')
+        if last_modified:
+            conditional['If-Modified-Since'] = last_modified
+        return conditional
+
+
+# Headers à ne pas rejouer depuis le cache : le corps stocké est déjà décodé
+_UNCACHEABLE_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+# Headers d'une réponse 304 qui remplacent ceux de l'entrée revalidée
+_REVALIDATION_HEADERS = {'etag', 'last-modified', 'cache-control', 'expires', 'date'}
+
+
+class DiskCacheTier:
+    """
+    Second niveau de cache sur disque (SQLite en mode WAL)
+    
+    Partagé entre les workers uvicorn d'une même machine et persistant entre
+    redémarrages. Les appels sont bloquants : ResponseCache les exécute via
+    asyncio.to_thread pour ne pas bloquer l'event loop.
+    """
+    
+    # Nombre d'écritures entre deux passes d'éviction
+    TRIM_EVERY_N_WRITES = 64
+    
+    def __init__(self, path: str, max_size_mb: int = 512):
+        """
+        Args:
+            path: Chemin du fichier SQLite
+            max_size_mb: Taille maximale cumulée des corps stockés (Mo)
+        """
+        self.path = path
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self._writes_since_trim = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " cache_key TEXT PRIMARY KEY,"
+            " body BLOB NOT NULL,"
+            " timestamp REAL NOT NULL,"
+            " status_code INTEGER NOT NULL,"
+            " headers TEXT NOT NULL,"
+            " encoding TEXT NOT NULL,"
+            " size INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_response_cache_timestamp ON response_cache(timestamp)"
+        )
+    
+    def get(self, cache_key: str) -> Optional[CacheEntry]:
+        """Lire une entrée (sans contrôle de TTL)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, timestamp, status_code, headers, encoding FROM response_cache WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        body, timestamp, status_code, headers, encoding = row
+        return CacheEntry(
+            body=bytes(body),
+            timestamp=timestamp,
+            status_code=status_code,
+            headers=json.loads(headers),
+            encoding=encoding
+        )
+    
+    def set(self, cache_key: str, entry: CacheEntry) -> None:
+        """Écrire (ou remplacer) une entrée"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache "
+                "(cache_key, body, timestamp, status_code, headers, encoding, size) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cache_key, entry.body, entry.timestamp, entry.status_code,
+                 json.dumps(entry.headers), entry.encoding, entry.size_bytes)
+            )
+            self._writes_since_trim += 1
+            if self._writes_since_trim >= self.TRIM_EVERY_N_WRITES:
+                self._writes_since_trim = 0
+                self._trim_locked()
+    
+    def delete(self, cache_key: str) -> None:
+        """Supprimer une entrée"""
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE cache_key = ?", (cache_key,))
+    
+    def clear_older_than(self, cutoff: float) -> int:
+        """Supprimer les entrées écrites avant `cutoff`"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM response_cache WHERE timestamp < ?", (cutoff,))
+            return cursor.rowcount
+    
+    def _trim_locked(self) -> None:
+        """Évincer les entrées les plus anciennes au-delà du budget disque"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for cache_key, size in self._conn.execute(
+            "SELECT cache_key, size FROM response_cache ORDER BY timestamp ASC"
+        ):
+            doomed.append((cache_key,))
+            freed += size
+            if freed >= excess:
+                break
+        
+        self._conn.executemany("DELETE FROM response_cache WHERE cache_key = ?", doomed)
+        logger.info(f"Cache disque: {len(doomed)} entrées évincées ({freed} octets)")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du tier disque"""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache"
+            ).fetchone()
+        return {
+            "path": self.path,
+            "entries": count,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes
+        }
+    
+    def close(self) -> None:
+        """Fermer la connexion SQLite"""
+        with self._lock:
+            self._conn.close()
 
 
 class ResponseCache:
-    """Cache simple avec TTL pour les réponses HTML"""
+    """
+    Cache LRU borné en octets pour les réponses HTML
     
-    def __init__(self, ttl_seconds: int = 180):
+    - Corps compressés (zlib) pour réduire l'empreinte mémoire
+    - Lectures sans verrou : les opérations sur le dict ne comportent aucun
+      await et sont donc atomiques vis-à-vis de l'event loop
+    - Second niveau optionnel sur disque (DiskCacheTier) partagé entre workers
+    """
+    
+    def __init__(self, ttl_seconds: int = 180, max_size_mb: float = 64,
+                 disk_path: Optional[str] = None, disk_max_size_mb: int = 512,
+                 compression_level: int = 6, stale_ttl_seconds: int = 3600):
         """
         Args:
             ttl_seconds: Durée de vie du cache en secondes
+            stale_ttl_seconds: Durée de conservation après expiration pour la
+                revalidation conditionnelle / stale-while-revalidate
+            max_size_mb: Budget mémoire du cache (Mo, corps compressés)
+            disk_path: Fichier SQLite du second niveau (désactivé si None)
+            disk_max_size_mb: Budget du second niveau (Mo)
+            compression_level: Niveau de compression zlib (1-9)
         """
         self.ttl_seconds = ttl_seconds
-        self.cache: Dict[str, CacheEntry] = {}
-        self._lock = asyncio.Lock()
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.compression_level = compression_level
+        self.cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.current_bytes = 0
+        
+        self.disk: Optional[DiskCacheTier] = None
+        if disk_path:
+            try:
+                self.disk = DiskCacheTier(disk_path, max_size_mb=disk_max_size_mb)
+            except sqlite3.Error as e:
+                logger.warning(f"Cache disque désactivé ({disk_path}): {e}")
+        
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+    
+    @property
+    def retention_seconds(self) -> int:
+        """Âge maximal d'une entrée conservée (fraîche ou périmée)"""
+        return self.ttl_seconds + self.stale_ttl_seconds
     
     def _get_cache_key(self, url: str, method: str = "GET", headers: Optional[Dict] = None) -> str:
         """Générer une clé de cache"""
@@ -61,24 +283,118 @@ class ResponseCache:
         
         return hashlib.md5(key_data.encode()).hexdigest()
     
+    def _store(self, cache_key: str, entry: CacheEntry) -> None:
+        """Insérer en tête de LRU et évincer jusqu'à respecter le budget"""
+        previous = self.cache.pop(cache_key, None)
+        if previous is not None:
+            self.current_bytes -= previous.size_bytes
+        
+        size = entry.size_bytes
+        if size > self.max_bytes:
+            # Entrée plus grosse que tout le budget : ne pas polluer la mémoire
+            return
+        
+        self.cache[cache_key] = entry
+        self.current_bytes += size
+        
+        while self.current_bytes > self.max_bytes and self.cache:
+            _, evicted = self.cache.popitem(last=False)
+            self.current_bytes -= evicted.size_bytes
+            self.evictions += 1
+    
+    def _discard(self, cache_key: str) -> None:
+        """Retirer une entrée du niveau mémoire"""
+        entry = self.cache.pop(cache_key, None)
+        if entry is not None:
+            self.current_bytes -= entry.size_bytes
+    
+    async def _lookup(self, cache_key: str, url: str, max_age: int) -> Tuple[Optional[CacheEntry], bool]:
+        """Chercher une entrée d'âge <= max_age (mémoire puis disque)
+        
+        Returns:
+            (entrée, trouvée_sur_disque)
+        """
+        entry = self.cache.get(cache_key)
+        if entry is not None:
+            if not entry.is_expired(max_age):
+                self.cache.move_to_end(cache_key)
+                return entry, False
+            if entry.is_expired(self.retention_seconds):
+                # Supprimer l'entrée trop ancienne pour être revalidée
+                self._discard(cache_key)
+        
+        if self.disk is not None:
+            try:
+                disk_entry = await asyncio.to_thread(self.disk.get, cache_key)
+            except sqlite3.Error as e:
+                logger.warning(f"Lecture cache disque échouée pour {url}: {e}")
+                disk_entry = None
+            
+            # Un autre worker a pu rafraîchir l'entrée entre-temps
+            if disk_entry is not None and not disk_entry.is_expired(max_age):
+                self._store(cache_key, disk_entry)
+                return disk_entry, True
+        
+        return None, False
+    
     async def get(self, url: str, method: str = "GET", headers: Optional[Dict] = None) -> Optional[CacheEntry]:
         """Récupérer une entrée du cache si elle existe et n'a pas expiré"""
         cache_key = self._get_cache_key(url, method, headers)
         
-        async with self._lock:
-            if cache_key in self.cache:
-                entry = self.cache[cache_key]
-                if not entry.is_expired(self.ttl_seconds):
-                    logger.debug(f"Cache HIT pour {url} (âge: {time.time() - entry.timestamp:.1f}s)")
-                    return entry
-                else:
-                    # Supprimer l'entrée expirée
-                    del self.cache[cache_key]
-                    logger.debug(f"Cache EXPIRED pour {url}")
+        entry, from_disk = await self._lookup(cache_key, url, self.ttl_seconds)
+        if entry is not None:
+            if from_disk:
+                self.disk_hits += 1
+                logger.debug(f"Cache disque HIT pour {url}")
+            else:
+                self.hits += 1
+                logger.debug(f"Cache HIT pour {url} (âge: {time.time() - entry.timestamp:.1f}s)")
+            return entry
         
+        self.misses += 1
         logger.debug(f"Cache MISS pour {url}")
         return None
     
+    async def get_stale(self, url: str, method: str = "GET", headers: Optional[Dict] = None) -> Optional[CacheEntry]:
+        """Récupérer une entrée expirée mais encore revalidable"""
+        cache_key = self._get_cache_key(url, method, headers)
+        entry, _ = await self._lookup(cache_key, url, self.retention_seconds)
+        return entry
+    
+    async def refresh(self, url: str, entry: CacheEntry, response: Response,
+                      method: str = "GET", headers: Optional[Dict] = None) -> CacheEntry:
+        """Rafraîchir une entrée après une réponse 304 Not Modified
+        
+        Le corps est conservé, le timestamp et les validateurs sont mis à jour.
+        """
+        cache_key = self._get_cache_key(url, method, headers)
+        
+        refreshed_headers = dict(entry.headers)
+        for key, value in response.headers.items():
+            if key.lower() in _REVALIDATION_HEADERS:
+                refreshed_headers = {k: v for k, v in refreshed_headers.items() if k.lower() != key.lower()}
+                refreshed_headers[key.lower()] = value
+        
+        refreshed = CacheEntry(
+            body=entry.body,
+            timestamp=time.time(),
+            status_code=entry.status_code,
+            headers=refreshed_headers,
+            encoding=entry.encoding
+        )
+        
+        self._store(cache_key, refreshed)
+        self.refreshes += 1
+        logger.debug(f"Cache REVALIDATED (304) pour {url}")
+        
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, cache_key, refreshed)
+            except sqlite3.Error as e:
+                logger.warning(f"Écriture cache disque échouée pour {url}: {e}")
+        
+        return refreshed
+    
     async def set(self, url: str, response: Response, method: str = "GET", headers: Optional[Dict] = None) -> None:
         """Mettre en cache une réponse (seulement si HTML et succès)"""
         # Ne mettre en cache que les réponses HTML avec succès
@@ -87,47 +403,84 @@ class ResponseCache:
             ('text/html' in content_type or 'application/xhtml' in content_type)):
             
             cache_key = self._get_cache_key(url, method, headers)
+            raw = response.content
+            entry = CacheEntry(
+                body=zlib.compress(raw, self.compression_level),
+                timestamp=time.time(),
+                status_code=response.status_code,
+                headers={k: v for k, v in response.headers.items()
+                         if k.lower() not in _UNCACHEABLE_HEADERS},
+                encoding=response.encoding or "utf-8"
+            )
             
-            async with self._lock:
-                self.cache[cache_key] = CacheEntry(
-                    content=response.text,
-                    timestamp=time.time(),
-                    status_code=response.status_code,
-                    headers=dict(response.headers)
-                )
-                logger.debug(f"Cache SET pour {url} (taille: {len(response.text)} chars)")
+            self._store(cache_key, entry)
+            logger.debug(f"Cache SET pour {url} (taille: {len(raw)} octets, compressé: {len(entry.body)})")
+            
+            if self.disk is not None:
+                try:
+                    await asyncio.to_thread(self.disk.set, cache_key, entry)
+                except sqlite3.Error as e:
+                    logger.warning(f"Écriture cache disque échouée pour {url}: {e}")
     
     async def clear_expired(self) -> int:
         """Nettoyer les entrées expirées du cache"""
-        async with self._lock:
-            expired_keys = [
-                key for key, entry in self.cache.items()
-                if entry.is_expired(self.ttl_seconds)
-            ]
-            
-            for key in expired_keys:
-                del self.cache[key]
-            
-            if expired_keys:
-                logger.info(f"Cache nettoyé: {len(expired_keys)} entrées expirées supprimées")
-            
-            return len(expired_keys)
+        # Les entrées périmées restent revalidables jusqu'à retention_seconds
+        expired_keys = [
+            key for key, entry in self.cache.items()
+            if entry.is_expired(self.retention_seconds)
+        ]
+        
+        for key in expired_keys:
+            self._discard(key)
+        
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.clear_older_than, time.time() - self.retention_seconds)
+            except sqlite3.Error as e:
+                logger.warning(f"Nettoyage cache disque échoué: {e}")
+        
+        if expired_keys:
+            logger.info(f"Cache nettoyé: {len(expired_keys)} entrées expirées supprimées")
+        
+        return len(expired_keys)
     
     async def get_stats(self) -> Dict[str, Any]:
         """Obtenir les statistiques du cache"""
-        async with self._lock:
-            total_entries = len(self.cache)
-            expired_entries = sum(
-                1 for entry in self.cache.values()
-                if entry.is_expired(self.ttl_seconds)
-            )
-            
-            return {
-                "total_entries": total_entries,
-                "active_entries": total_entries - expired_entries,
-                "expired_entries": expired_entries,
-                "ttl_seconds": self.ttl_seconds
-            }
+        total_entries = len(self.cache)
+        expired_entries = sum(
+            1 for entry in self.cache.values()
+            if entry.is_expired(self.ttl_seconds)
+        )
+        lookups = self.hits + self.disk_hits + self.misses
+        
+        stats = {
+            "total_entries": total_entries,
+            "active_entries": total_entries - expired_entries,
+            "expired_entries": expired_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "size_bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
+        
+        if self.disk is not None:
+            try:
+                stats["disk"] = await asyncio.to_thread(self.disk.get_stats)
+            except sqlite3.Error as e:
+                stats["disk"] = {"error": str(e)}
+        
+        return stats
+    
+    def close(self) -> None:
+        """Fermer le second niveau éventuel"""
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
 
 
 @dataclass
@@ -152,6 +505,11 @@ class ProxyPool:
         self.proxies: Dict[str, ProxyInfo] = {}
         self.eviction_threshold = eviction_threshold
         self._lock = asyncio.Lock()
+        self._eviction_callbacks: List[Callable[[str], Awaitable[None]]] = []
+    
+    def add_eviction_callback(self, callback: Callable[[str], Awaitable[None]]) -> None:
+        """Enregistrer une coroutine appelée quand un proxy passe sous le seuil d'éviction"""
+        self._eviction_callbacks.append(callback)
         
     async def add(self, proxy_url: str) -> None:
         """Ajouter un proxy au pool"""
@@ -202,9 +560,11 @@ class ProxyPool:
     
     async def report_failure(self, proxy_url: str, error_type: str = "unknown") -> None:
         """Rapporter un échec pour un proxy"""
+        newly_evicted = False
         async with self._lock:
             if proxy_url in self.proxies:
                 proxy = self.proxies[proxy_url]
+                was_available = proxy.score >= self.eviction_threshold
                 proxy.failure_count += 1
                 proxy.consecutive_failures += 1
                 
@@ -218,6 +578,15 @@ class ProxyPool:
                 # Éviction automatique si score trop bas
                 if proxy.score < self.eviction_threshold:
                     logger.info(f"Proxy évincé: {proxy_url} (score: {proxy.score:.2f})")
+                    newly_evicted = was_available
+        
+        # Notifier hors verrou (ex: fermeture du client HTTP poolé du proxy)
+        if newly_evicted:
+            for callback in self._eviction_callbacks:
+                try:
+                    await callback(proxy_url)
+                except Exception as e:
+                    logger.warning(f"Callback d'éviction échoué pour {proxy_url}: {e}")
     
     async def get_stats(self) -> Dict[str, Any]:
         """Obtenir les statistiques du pool"""
@@ -246,29 +615,392 @@ class ProxyPool:
             }
 
 
+class ResponseRejected(Exception):
+    """Téléchargement borné abandonné (taille excessive ou contenu refusé à l'inspection)"""
+    
+    def __init__(self, url: str, reason: str):
+        super().__init__(f"{reason} ({url})")
+        self.url = url
+        self.reason = reason
+
+
+# Inspection des premiers octets d'un corps en streaming : retourne True quand
+# elle a vu assez de données, lève ResponseRejected pour abandonner le transfert
+BodyInspector = Callable[[bytes, httpx.Headers], bool]
+
+
+async def read_bounded_body(response: Response, max_bytes: Optional[int],
+                            inspect: Optional[BodyInspector] = None) -> bytes:
+    """Lire le corps d'une réponse en streaming en s'arrêtant dès qu'il est refusé
+    
+    - Content-Length annoncé > max_bytes : abandon avant tout transfert
+    - corps dépassant max_bytes (Content-Length absent ou faux) : abandon
+    - inspect appelé sur les octets reçus jusqu'à ce qu'il retourne True
+    
+    Raises:
+        ResponseRejected: transfert abandonné (la connexion est fermée sans être vidée)
+    """
+    url = str(response.request.url)
+    content_length = response.headers.get('content-length', '')
+    if max_bytes is not None and content_length.isdigit() and int(content_length) > max_bytes:
+        raise ResponseRejected(url, f"Content-Length {content_length} > {max_bytes} bytes")
+    
+    buffer = bytearray()
+    inspecting = inspect is not None
+    async for chunk in response.aiter_bytes():
+        buffer += chunk
+        if max_bytes is not None and len(buffer) > max_bytes:
+            raise ResponseRejected(url, f"corps > {max_bytes} bytes")
+        if inspecting:
+            inspecting = not inspect(bytes(buffer), response.headers)
+    
+    return bytes(buffer)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convertir un header Retry-After (secondes ou date HTTP) en délai en secondes"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveHostLimiter:
+    """
+    Limiteur de concurrence adaptatif (AIMD) pour un host
+    
+    - Additive increase : +1/limite par succès rapide (≈ +1 par fenêtre complète)
+    - Multiplicative decrease : limite × decrease_factor sur 429/503/timeout,
+      au plus une fois par decrease_cooldown_s pour absorber les rafales d'échecs
+    - Retry-After : suspend les nouvelles acquisitions jusqu'à l'échéance
+    """
+    
+    def __init__(self, initial_limit: int = 3, min_limit: int = 1, max_limit: int = 16,
+                 latency_target_s: float = 2.0, decrease_factor: float = 0.5,
+                 decrease_cooldown_s: float = 1.0):
+        """
+        Args:
+            initial_limit: Concurrence initiale
+            min_limit: Concurrence plancher
+            max_limit: Concurrence plafond
+            latency_target_s: Latence au-delà de laquelle un succès n'augmente pas la limite
+            decrease_factor: Facteur de réduction sur surcharge
+            decrease_cooldown_s: Délai minimal entre deux réductions
+        """
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self.latency_target_s = latency_target_s
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown_s = decrease_cooldown_s
+        
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+        
+        self.successes = 0
+        self.throttles = 0
+        self.timeouts = 0
+        self.latency_ewma: Optional[float] = None
+    
+    @property
+    def current_limit(self) -> int:
+        """Limite entière effective"""
+        return max(self.min_limit, int(self.limit))
+    
+    async def acquire(self) -> None:
+        """Attendre un créneau de concurrence"""
+        while True:
+            delay = self.blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            
+            async with self._cond:
+                if time.monotonic() < self.blocked_until:
+                    continue
+                if self.in_flight < self.current_limit:
+                    self.in_flight += 1
+                    return
+                await self._cond.wait()
+    
+    async def release(self) -> None:
+        """Libérer un créneau"""
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.release()
+    
+    async def record_success(self, latency_s: float) -> None:
+        """Succès : augmentation additive si la latence reste sous la cible"""
+        self.successes += 1
+        self.latency_ewma = latency_s if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency_s
+        
+        if latency_s > self.latency_target_s or self.limit >= self.max_limit:
+            return
+        
+        async with self._cond:
+            previous = self.current_limit
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            if self.current_limit > previous:
+                self._cond.notify(self.current_limit - previous)
+    
+    async def record_overload(self, retry_after_s: Optional[float] = None, timeout: bool = False) -> None:
+        """Surcharge (429/503/timeout) : réduction multiplicative et respect de Retry-After"""
+        now = time.monotonic()
+        if timeout:
+            self.timeouts += 1
+        else:
+            self.throttles += 1
+        
+        if retry_after_s:
+            self.blocked_until = max(self.blocked_until, now + retry_after_s)
+        
+        if now - self._last_decrease >= self.decrease_cooldown_s:
+            self._last_decrease = now
+            self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du limiteur"""
+        return {
+            "limit": self.current_limit,
+            "raw_limit": round(self.limit, 2),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "blocked_for_s": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+            "successes": self.successes,
+            "throttles": self.throttles,
+            "timeouts": self.timeouts,
+            "latency_ewma_s": round(self.latency_ewma, 3) if self.latency_ewma is not None else None
+        }
+
+
+@dataclass
+class PooledProxyClient:
+    """Client HTTP poolé pour un proxy donné"""
+    client: httpx.AsyncClient
+    created_at: float
+    last_used: float
+    in_use: int = 0
+    requests: int = 0
+    closing: bool = False
+
+
+class ProxyClientPool:
+    """
+    Pool borné de clients httpx par proxy
+    
+    Réutilise les connexions et sessions TLS d'un proxy d'une requête à l'autre.
+    Les clients inactifs au-delà de `idle_timeout_s` ou en excès de
+    `max_clients` (LRU) sont fermés ; un client en cours d'utilisation n'est
+    fermé qu'une fois libéré.
+    """
+    
+    def __init__(self, timeout_s: float = 10.0, max_clients: int = 32, idle_timeout_s: float = 300.0,
+                 max_keepalive_connections: int = 10, max_connections: int = 50):
+        """
+        Args:
+            timeout_s: Timeout des clients créés
+            max_clients: Nombre max de clients (proxys) conservés
+            idle_timeout_s: Durée d'inactivité avant fermeture d'un client
+            max_keepalive_connections: Connexions keep-alive par client
+            max_connections: Connexions max par client
+        """
+        self.timeout_s = timeout_s
+        self.max_clients = max_clients
+        self.idle_timeout_s = idle_timeout_s
+        self.limits = httpx.Limits(
+            max_keepalive_connections=max_keepalive_connections,
+            max_connections=max_connections
+        )
+        self.clients: "OrderedDict[str, PooledProxyClient]" = OrderedDict()
+        self._last_sweep = time.time()
+        
+        self.created = 0
+        self.reused = 0
+        self.closed = 0
+    
+    def _create_client(self, proxy_url: str) -> httpx.AsyncClient:
+        """Créer un client httpx configuré pour un proxy"""
+        return httpx.AsyncClient(
+            proxy=proxy_url,
+            timeout=httpx.Timeout(self.timeout_s),
+            limits=self.limits,
+            follow_redirects=True
+        )
+    
+    @asynccontextmanager
+    async def lease(self, proxy_url: str) -> AsyncIterator[httpx.AsyncClient]:
+        """Emprunter le client du proxy le temps d'une requête"""
+        pooled = self.clients.get(proxy_url)
+        if pooled is None or pooled.closing:
+            pooled = PooledProxyClient(
+                client=self._create_client(proxy_url),
+                created_at=time.time(),
+                last_used=time.time()
+            )
+            self.clients[proxy_url] = pooled
+            self.created += 1
+        else:
+            self.reused += 1
+        
+        self.clients.move_to_end(proxy_url)
+        pooled.in_use += 1
+        pooled.requests += 1
+        
+        await self._enforce_limits()
+        
+        try:
+            yield pooled.client
+        finally:
+            pooled.in_use -= 1
+            pooled.last_used = time.time()
+            if pooled.closing and pooled.in_use == 0:
+                await self._close_client(pooled)
+    
+    async def _close_client(self, pooled: PooledProxyClient) -> None:
+        """Fermer un client (erreurs ignorées)"""
+        try:
+            await pooled.client.aclose()
+        except Exception as e:
+            logger.debug(f"Erreur à la fermeture d'un client proxy: {e}")
+        self.closed += 1
+    
+    async def _retire(self, proxy_url: str) -> None:
+        """Retirer un client du pool ; fermeture différée s'il est en cours d'utilisation"""
+        pooled = self.clients.pop(proxy_url, None)
+        if pooled is None:
+            return
+        
+        pooled.closing = True
+        if pooled.in_use == 0:
+            await self._close_client(pooled)
+    
+    async def _enforce_limits(self) -> None:
+        """Fermer les clients inactifs et les plus anciens au-delà de max_clients"""
+        now = time.time()
+        
+        # Balayage des clients inactifs, au plus deux fois par idle_timeout
+        if now - self._last_sweep >= self.idle_timeout_s / 2:
+            self._last_sweep = now
+            idle = [
+                url for url, pooled in self.clients.items()
+                if pooled.in_use == 0 and now - pooled.last_used > self.idle_timeout_s
+            ]
+            for url in idle:
+                await self._retire(url)
+        
+        # Éviction LRU des clients libres (dépassement temporaire toléré si tous sont occupés)
+        if len(self.clients) > self.max_clients:
+            for url in [url for url, pooled in self.clients.items() if pooled.in_use == 0]:
+                if len(self.clients) <= self.max_clients:
+                    break
+                await self._retire(url)
+    
+    async def evict(self, proxy_url: str) -> None:
+        """Fermer le client d'un proxy évincé du ProxyPool"""
+        if proxy_url in self.clients:
+            logger.info(f"Fermeture du client poolé du proxy évincé: {proxy_url}")
+            await self._retire(proxy_url)
+    
+    async def close_all(self) -> None:
+        """Fermer tous les clients"""
+        for url in list(self.clients.keys()):
+            pooled = self.clients.pop(url)
+            await self._close_client(pooled)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du pool de clients"""
+        return {
+            "open_clients": len(self.clients),
+            "max_clients": self.max_clients,
+            "in_use": sum(p.in_use for p in self.clients.values()),
+            "created": self.created,
+            "reused": self.reused,
+            "closed": self.closed
+        }
+
+
 class RequestCoordinator:
     """Coordinateur de requêtes avec gestion de concurrence, retry et cache"""
     
-    def __init__(self, max_per_host: int = 3, timeout_s: float = 10.0, cache_ttl_s: int = 180):
+    def __init__(self, max_per_host: int = 3, timeout_s: float = 10.0, cache_ttl_s: int = 180,
+                 cache_max_mb: float = 64, cache_disk_path: Optional[str] = None,
+                 cache_stale_ttl_s: int = 3600, stale_while_revalidate: bool = False,
+                 adaptive_concurrency: bool = True, max_per_host_ceiling: int = 16):
         """
         Args:
-            max_per_host: Nombre max de requêtes simultanées par host (défaut: 3)
+            max_per_host: Nombre de requêtes simultanées par host (défaut: 3) ;
+                limite initiale si la concurrence adaptative est activée
             timeout_s: Timeout global en secondes (défaut: 10s)
             cache_ttl_s: TTL du cache en secondes (défaut: 180s)
+            cache_max_mb: Budget mémoire du cache de réponses en Mo (défaut: 64)
+            cache_disk_path: Fichier SQLite du cache partagé entre workers
+                (défaut: variable d'environnement SCRAPING_CACHE_PATH, sinon désactivé)
+            cache_stale_ttl_s: Conservation des entrées expirées pour revalidation (défaut: 1h)
+            stale_while_revalidate: Servir immédiatement une entrée expirée et la
+                rafraîchir en arrière-plan (défaut: False)
+            adaptive_concurrency: Ajuster la concurrence par host en AIMD (défaut: True)
+            max_per_host_ceiling: Plafond de concurrence adaptative par host (défaut: 16)
         """
         self.max_per_host = max_per_host
         self.timeout_s = timeout_s
         
-        # Semaphores par host pour limiter la concurrence
-        self.host_semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
-            lambda: asyncio.Semaphore(max_per_host)
+        # Limiteurs de concurrence par host (AIMD, fixes si adaptive_concurrency=False)
+        self.adaptive_concurrency = adaptive_concurrency
+        ceiling = max_per_host_ceiling if adaptive_concurrency else max_per_host
+        floor = 1 if adaptive_concurrency else max_per_host
+        self.host_limiters: Dict[str, AdaptiveHostLimiter] = defaultdict(
+            lambda: AdaptiveHostLimiter(initial_limit=max_per_host, min_limit=floor, max_limit=ceiling)
         )
         
-        # Pool de proxys
+        # Pool de proxys, et clients HTTP réutilisés par proxy
         self.proxy_pool = ProxyPool()
+        self.proxy_clients = ProxyClientPool(timeout_s=timeout_s)
+        self.proxy_pool.add_eviction_callback(self.proxy_clients.evict)
         
         # Cache de réponses avec TTL
-        self.cache = ResponseCache(ttl_seconds=cache_ttl_s)
+        self.cache = ResponseCache(
+            ttl_seconds=cache_ttl_s,
+            max_size_mb=cache_max_mb,
+            disk_path=cache_disk_path or os.environ.get("SCRAPING_CACHE_PATH"),
+            stale_ttl_seconds=cache_stale_ttl_s
+        )
+        self.stale_while_revalidate = stale_while_revalidate
+        
+        # Revalidations en arrière-plan (stale-while-revalidate) par clé de cache
+        self._revalidation_tasks: Dict[str, asyncio.Task] = {}
+        self.revalidation_stats = {
+            "conditional_requests": 0,
+            "not_modified": 0,
+            "stale_served": 0,
+            "background_failures": 0
+        }
+        
+        # Requêtes GET cachables en vol (single-flight) par clé de cache
+        self._inflight: SingleFlight[Response] = SingleFlight()
+        self.coalescing_stats = {
+            "leader_requests": 0,
+            "coalesced_requests": 0
+        }
         
         # Client HTTP avec configuration robuste
         self.client = httpx.AsyncClient(
@@ -279,6 +1011,7 @@ class RequestCoordinator:
         
         # Configuration retry
         self.retry_codes = {408, 429, 500, 502, 503, 504}  # Codes à retry
+        self.overload_codes = {429, 503}  # Codes réduisant la concurrence du host
         self.max_retries = 3
         self.base_delay = 1.0  # Délai de base en secondes
         self.max_delay = 30.0  # Délai maximum
@@ -291,8 +1024,14 @@ class RequestCoordinator:
         await self.close()
     
     async def close(self):
-        """Fermer le client HTTP"""
+        """Fermer le client HTTP et le cache disque"""
+        for task in self._revalidation_tasks.values():
+            task.cancel()
+        self._revalidation_tasks.clear()
+        self._inflight.cancel_all()
         await self.client.aclose()
+        await self.proxy_clients.close_all()
+        self.cache.close()
     
     def _get_host(self, url: str) -> str:
         """Extraire le host d'une URL"""
@@ -325,8 +1064,17 @@ class RequestCoordinator:
         return False
     
     async def get(self, url: str, *, headers: Optional[Dict[str, str]] = None, 
-                  proxy: Optional[str] = None, use_cache: bool = True) -> Response:
-        """Méthode GET simplifiée avec cache"""
+                  proxy: Optional[str] = None, use_cache: bool = True,
+                  max_bytes: Optional[int] = None,
+                  inspect: Optional[BodyInspector] = None) -> Response:
+        """Méthode GET simplifiée avec cache
+        
+        max_bytes / inspect activent le téléchargement borné en streaming
+        (jamais mis en cache) : voir read_bounded_body.
+        """
+        if max_bytes is not None or inspect is not None:
+            return await self.fetch(url, method="GET", headers=headers, proxy=proxy, use_cache=False,
+                                    max_bytes=max_bytes, inspect=inspect)
         return await self.fetch(url, method="GET", headers=headers, proxy=proxy, use_cache=use_cache)
     
     async def fetch(self, url: str, method: str = "GET", *,
@@ -345,52 +1093,162 @@ class RequestCoordinator:
             data: Données à envoyer
             proxy: Proxy spécifique à utiliser (sinon sélection automatique)
             use_cache: Utiliser le cache pour les requêtes GET HTML
-            **kwargs: Arguments supplémentaires pour httpx
+            **kwargs: Arguments supplémentaires pour httpx (dont max_bytes / inspect
+                pour un téléchargement borné, voir read_bounded_body)
         
         Returns:
             Response HTTP
         
         Raises:
             httpx.HTTPStatusError: Si tous les retries échouent
+            ResponseRejected: Si un téléchargement borné est abandonné
         """
+        cacheable = (use_cache and method.upper() == "GET" and data is None
+                     and kwargs.get("max_bytes") is None and kwargs.get("inspect") is None)
+        
         # Vérifier le cache pour les requêtes GET HTML
-        if use_cache and method.upper() == "GET" and data is None:
+        if cacheable:
             cached_response = await self.cache.get(url, method, headers)
             if cached_response:
-                # Créer une Response simulée à partir du cache
-                mock_response = httpx.Response(
-                    status_code=cached_response.status_code,
-                    headers=cached_response.headers,
-                    content=cached_response.content.encode('utf-8')
-                )
-                return mock_response
+                return self._response_from_cache(cached_response)
+            
+            return await self._fetch_coalesced(url, method, headers, proxy, kwargs)
         
         host = self._get_host(url)
-        semaphore = self.host_semaphores[host]
+        limiter = self.host_limiters[host]
         
         # Gestion de la concurrence par host
-        async with semaphore:
-            response = await self._fetch_with_retry(
+        async with limiter:
+            return await self._fetch_with_retry(
                 url, method, headers=headers, data=data, proxy=proxy, **kwargs
             )
+    
+    async def _fetch_coalesced(self, url: str, method: str, headers: Optional[Dict[str, str]],
+                               proxy: Optional[str], kwargs: Dict[str, Any]) -> Response:
+        """Single-flight : les appels concurrents pour une même clé de cache
+        partagent une seule requête réseau.
+        
+        La requête tourne dans une tâche dédiée protégée par asyncio.shield :
+        l'annulation d'un appelant n'interrompt pas les autres.
+        """
+        cache_key = self.cache._get_cache_key(url, method, headers)
+        
+        if cache_key in self._inflight:
+            self.coalescing_stats["coalesced_requests"] += 1
+            logger.debug(f"Requête coalescée pour {url}")
+        else:
+            self.coalescing_stats["leader_requests"] += 1
+        
+        response, leader = await self._inflight.run(
+            cache_key, lambda: self._fetch_cacheable(url, method, headers, proxy, kwargs)
+        )
+        # Chaque appelant suiveur reçoit sa propre copie de la réponse
+        return response if leader else self._clone_response(response)
+    
+    async def _fetch_cacheable(self, url: str, method: str, headers: Optional[Dict[str, str]],
+                               proxy: Optional[str], kwargs: Dict[str, Any]) -> Response:
+        """Récupérer une ressource cachable absente du cache frais"""
+        # Entrée expirée mais revalidable
+        stale_entry = await self.cache.get_stale(url, method, headers)
+        if stale_entry:
+            if self.stale_while_revalidate:
+                self._schedule_revalidation(url, method, headers, stale_entry, proxy, kwargs)
+                self.revalidation_stats["stale_served"] += 1
+                return self._response_from_cache(stale_entry)
             
-            # Mettre en cache si applicable
-            if use_cache and method.upper() == "GET" and data is None:
-                await self.cache.set(url, response, method, headers)
-            
-            return response
+            return await self._revalidate(url, method, headers, stale_entry, proxy, kwargs)
+        
+        host = self._get_host(url)
+        limiter = self.host_limiters[host]
+        
+        # Gestion de la concurrence par host
+        async with limiter:
+            response = await self._fetch_with_retry(
+                url, method, headers=headers, proxy=proxy, **kwargs
+            )
+        
+        await self.cache.set(url, response, method, headers)
+        return response
+    
+    def _clone_response(self, response: Response) -> Response:
+        """Copier une réponse déjà lue (corps décodé, sans headers d'encodage)"""
+        return httpx.Response(
+            status_code=response.status_code,
+            headers={k: v for k, v in response.headers.items()
+                     if k.lower() not in _UNCACHEABLE_HEADERS},
+            content=response.content
+        )
+    
+    def _response_from_cache(self, entry: CacheEntry) -> Response:
+        """Créer une Response simulée à partir du cache"""
+        return httpx.Response(
+            status_code=entry.status_code,
+            headers=entry.headers,
+            content=entry.raw_content
+        )
+    
+    async def _revalidate(self, url: str, method: str, headers: Optional[Dict[str, str]],
+                          entry: CacheEntry, proxy: Optional[str], kwargs: Dict[str, Any]) -> Response:
+        """Revalider une entrée expirée (requête conditionnelle si validateurs disponibles)
+        
+        Un 304 rafraîchit l'entrée sans retransférer le corps ; un 200 la remplace.
+        """
+        conditional = entry.conditional_headers()
+        # Les headers explicites de l'appelant restent prioritaires
+        request_headers = {**conditional, **(headers or {})}
+        if conditional:
+            self.revalidation_stats["conditional_requests"] += 1
+        
+        limiter = self.host_limiters[self._get_host(url)]
+        async with limiter:
+            response = await self._fetch_with_retry(
+                url, method, headers=request_headers, proxy=proxy, **kwargs
+            )
+        
+        if response.status_code == 304:
+            self.revalidation_stats["not_modified"] += 1
+            refreshed = await self.cache.refresh(url, entry, response, method, headers)
+            return self._response_from_cache(refreshed)
+        
+        await self.cache.set(url, response, method, headers)
+        return response
+    
+    def _schedule_revalidation(self, url: str, method: str, headers: Optional[Dict[str, str]],
+                               entry: CacheEntry, proxy: Optional[str], kwargs: Dict[str, Any]) -> None:
+        """Lancer une revalidation en arrière-plan (une seule par clé de cache)"""
+        cache_key = self.cache._get_cache_key(url, method, headers)
+        if cache_key in self._revalidation_tasks:
+            return
+        
+        async def _run():
+            try:
+                await self._revalidate(url, method, headers, entry, proxy, kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.revalidation_stats["background_failures"] += 1
+                logger.warning(f"Revalidation en arrière-plan échouée pour {url}: {e}")
+            finally:
+                self._revalidation_tasks.pop(cache_key, None)
+        
+        self._revalidation_tasks[cache_key] = asyncio.create_task(_run())
     
     async def _fetch_with_retry(self, url: str, method: str, *,
                                headers: Optional[Dict[str, str]] = None,
                                data: Optional[Union[str, bytes, Dict]] = None,
                                proxy: Optional[str] = None,
+                               max_bytes: Optional[int] = None,
+                               inspect: Optional[BodyInspector] = None,
                                **kwargs) -> Response:
         """Effectuer la requête avec logique de retry"""
         
         last_exception = None
         last_response = None
+        retry_after = None
+        limiter = self.host_limiters[self._get_host(url)]
         
         for attempt in range(self.max_retries + 1):
+            current_proxy = None
             try:
                 # Sélectionner un proxy si non spécifié
                 current_proxy = proxy or await self.proxy_pool.pick()
@@ -402,19 +1260,6 @@ class RequestCoordinator:
                     "timeout": self.timeout_s
                 }
                 
-                # Configuration du proxy si nécessaire
-                if current_proxy:
-                    # Créer un nouveau client avec proxy pour cette requête
-                    proxy_client = httpx.AsyncClient(
-                        proxy=current_proxy,
-                        timeout=httpx.Timeout(self.timeout_s),
-                        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
-                        follow_redirects=True
-                    )
-                    client = proxy_client
-                else:
-                    client = self.client
-                
                 if data is not None:
                     if method.upper() in ["POST", "PUT", "PATCH"]:
                         if isinstance(data, dict):
@@ -422,19 +1267,29 @@ class RequestCoordinator:
                         else:
                             request_kwargs["content"] = data
                 
-                # Effectuer la requête
+                # Effectuer la requête (client poolé réutilisé si proxy)
                 start_time = time.time()
-                response = await client.request(method, url, **request_kwargs)
-                duration = time.time() - start_time
-                
-                # Fermer le client proxy temporaire si utilisé
                 if current_proxy:
-                    await proxy_client.aclose()
+                    async with self.proxy_clients.lease(current_proxy) as proxy_client:
+                        response = await self._send(proxy_client, method, url, request_kwargs,
+                                                    max_bytes, inspect)
+                else:
+                    response = await self._send(self.client, method, url, request_kwargs,
+                                                max_bytes, inspect)
+                duration = time.time() - start_time
+                FETCH_LATENCY.observe(duration, self._get_host(url), f"{response.status_code // 100}xx")
                 
                 # Log de la requête
                 logger.info(f"Requête {method} {url} - Status: {response.status_code} "
                            f"- Durée: {duration:.2f}s - Proxy: {current_proxy or 'None'}")
                 
+                # Ajuster la concurrence du host (AIMD)
+                if response.status_code in self.overload_codes:
+                    retry_after = _parse_retry_after(response.headers.get('retry-after'))
+                    await limiter.record_overload(retry_after)
+                elif response.status_code < 400:
+                    await limiter.record_success(duration)
+                
                 # Vérifier si la réponse est un succès
                 if response.status_code < 400:
                     # Rapporter le succès du proxy
@@ -455,15 +1310,16 @@ class RequestCoordinator:
                     response.raise_for_status()
                     return response
                 
+            except ResponseRejected as e:
+                # Contenu refusé : ni échec du proxy, ni retry
+                logger.info(f"Téléchargement abandonné: {e}")
+                raise
+                
             except Exception as e:
                 last_exception = e
                 
-                # Fermer le client proxy temporaire si utilisé
-                if current_proxy and 'proxy_client' in locals():
-                    try:
-                        await proxy_client.aclose()
-                    except:
-                        pass
+                if isinstance(e, TimeoutException):
+                    await limiter.record_overload(timeout=True)
                 
                 # Rapporter l'échec du proxy
                 if current_proxy:
@@ -479,6 +1335,10 @@ class RequestCoordinator:
             # Si ce n'est pas la dernière tentative, attendre avant de retry
             if attempt < self.max_retries:
                 delay = self._calculate_backoff_delay(attempt)
+                if retry_after:
+                    # Respecter Retry-After (borné par max_delay)
+                    delay = min(max(delay, retry_after), self.max_delay)
+                    retry_after = None
                 logger.info(f"Retry dans {delay:.2f}s pour {url}")
                 await asyncio.sleep(delay)
         
@@ -495,17 +1355,61 @@ class RequestCoordinator:
         # Ne devrait jamais arriver
         raise RuntimeError(f"Erreur inattendue pour {url}")
     
+    async def _send(self, client: httpx.AsyncClient, method: str, url: str, request_kwargs: Dict[str, Any],
+                    max_bytes: Optional[int], inspect: Optional[BodyInspector]) -> Response:
+        """Envoyer la requête, en streaming borné si max_bytes ou inspect est fourni"""
+        if max_bytes is None and inspect is None:
+            return await client.request(method, url, **request_kwargs)
+        
+        async with client.stream(method, url, **request_kwargs) as response:
+            if response.status_code >= 300:
+                # Corps d'erreur ignoré : seul le status est exploité
+                content = b""
+            else:
+                content = await read_bounded_body(response, max_bytes, inspect)
+        
+        return httpx.Response(
+            status_code=response.status_code,
+            headers={k: v for k, v in response.headers.items()
+                     if k.lower() not in _UNCACHEABLE_HEADERS},
+            content=content,
+            request=response.request
+        )
+    
     async def add_proxy(self, proxy_url: str) -> None:
         """Ajouter un proxy au pool"""
         await self.proxy_pool.add(proxy_url)
     
     async def get_proxy_stats(self) -> Dict[str, Any]:
         """Obtenir les statistiques des proxys"""
-        return await self.proxy_pool.get_stats()
+        stats = await self.proxy_pool.get_stats()
+        stats["client_pool"] = self.proxy_clients.get_stats()
+        return stats
+    
+    async def get_host_stats(self) -> Dict[str, Any]:
+        """Obtenir les limites de concurrence courantes par host"""
+        return {
+            "adaptive_concurrency": self.adaptive_concurrency,
+            "total_hosts": len(self.host_limiters),
+            "hosts": {
+                host: limiter.get_stats()
+                for host, limiter in self.host_limiters.items()
+            }
+        }
     
     async def get_cache_stats(self) -> Dict[str, Any]:
         """Obtenir les statistiques du cache"""
-        return await self.cache.get_stats()
+        stats = await self.cache.get_stats()
+        stats["revalidation"] = {
+            **self.revalidation_stats,
+            "pending_background": len(self._revalidation_tasks),
+            "stale_while_revalidate": self.stale_while_revalidate
+        }
+        stats["coalescing"] = {
+            **self.coalescing_stats,
+            "in_flight": len(self._inflight)
+        }
+        return stats
     
     async def clear_cache(self) -> int:
         """Nettoyer le cache et retourner le nombre d'entrées supprimées"""
@@ -0,0 +1,48 @@
+"""
+Fixtures partagées des tests de publication
+"""
+
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+
+# Import modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from scraping.publication.dto import PublicationConfig
+from scraping.semantic.product_dto import ProductDTO, ImageDTO, PriceDTO, Currency
+# Routes : mêmes chemins que le serveur (classe distincte de celle importée via src/)
+from src.scraping.publication.dto import PublicationConfig as ServerPublicationConfig
+
+
+@pytest.fixture(autouse=True)
+def active_hours():
+    """Heures actives forcées : les tests ne dépendent pas de l'heure réelle"""
+    with patch.object(PublicationConfig, 'is_active_hours', return_value=True), \
+            patch.object(ServerPublicationConfig, 'is_active_hours', return_value=True):
+        yield
+
+
+def make_product(signature, price=None, rich=False, **fields):
+    """Produit de test ; rich=True remplit titre, description, images, attributs et SEO"""
+    values = dict(
+        title=f"Produit test {signature} Premium Edition Ultra" if rich else f"Produit test {signature}",
+        description_html=("<p>Description détaillée du produit avec caractéristiques complètes.</p>" * 3
+                          if rich else "<p>Test publication</p>"),
+        price=PriceDTO(amount=Decimal(price), currency=Currency.EUR) if price else None,
+        images=[ImageDTO(url=f"https://test.com/{signature}_{i}.webp", alt=f"Vue produit {i}")
+                for i in range(3 if rich else 1)],
+        source_url=f"https://test.com/{signature}",
+        attributes=({'brand': 'Test', 'model': 'T1', 'category': 'Tests', 'sku': f"SKU-{signature}", 'color': 'noir'}
+                    if rich else {}),
+        payload_signature=signature,
+        extraction_timestamp=1703001234.567
+    )
+    if rich:
+        values.update(seo_title="Titre SEO", seo_description="Description SEO",
+                      seo_keywords=["test", "produit", "guardrails"])
+    values.update(fields)
+    return ProductDTO(**values)
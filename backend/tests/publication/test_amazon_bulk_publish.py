@@ -0,0 +1,290 @@
+"""
+Tests pour la publication Amazon groupée - Feeds JSON_LISTINGS_FEED
+"""
+
+import pytest
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+# Import modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from integrations.amazon.client import AmazonSPAPIClient, JSON_LISTINGS_FEED, SPAPIError
+from services.amazon_publisher_service import AmazonPublisherService, build_listing_attributes
+from scraping.publication.publishers.amazon_spapi import AmazonSPAPIPublisher
+from scraping.publication.dto import PublishTask, PublicationStatus, StoreType
+from scraping.semantic.product_dto import ProductDTO, ImageDTO, PriceDTO, Currency
+
+
+@pytest.fixture(autouse=True)
+def oauth_env(monkeypatch):
+    """Configuration OAuth factice requise par AmazonPublisherService"""
+    monkeypatch.setenv("AMAZON_LWA_CLIENT_ID", "test_client")
+    monkeypatch.setenv("AMAZON_LWA_CLIENT_SECRET", "test_secret")
+    monkeypatch.setenv("AMAZON_REFRESH_TOKEN_ENCRYPTION_KEY", "test_key")
+
+
+@pytest.fixture
+def sp_client():
+    """Client SP-API simulé : un feedId par soumission, traitement terminé"""
+    client = MagicMock()
+    client.submit_json_listings_feed = AsyncMock(side_effect=[f"feed_{i}" for i in range(1, 10)])
+    client.wait_for_feed_result = AsyncMock(return_value={'processing_status': 'DONE', 'report': {'issues': []}})
+    return client
+
+
+@pytest.fixture
+def service(sp_client):
+    return AmazonPublisherService(sp_client=sp_client)
+
+
+def make_task(index, user_id="user_1", marketplace_id="A13V1IB3VIYZZH"):
+    product = ProductDTO(
+        title=f"Produit Amazon {index}",
+        description_html="<p>Produit publié en masse</p>",
+        price=PriceDTO(amount=Decimal('19.99'), currency=Currency.EUR),
+        images=[ImageDTO(url=f"https://test.com/{index}.webp", alt="Image test")],
+        source_url=f"https://test.com/product/{index}",
+        payload_signature=f"signature_{index:04d}",
+        extraction_timestamp=1703001234.567
+    )
+    return PublishTask(
+        task_id=f"task_{index}",
+        store_id="amazon",
+        store_type=StoreType.MOCK_STORE,
+        product_dto=product,
+        publish_options={'user_id': user_id, 'marketplace_id': marketplace_id, 'sku': f"SKU-{index}"}
+    )
+
+
+def messages(count):
+    return [{'sku': f"SKU-{i}", 'attributes': {}} for i in range(1, count + 1)]
+
+
+class TestAmazonSPAPIClientFeeds:
+    """Tests du cycle Feeds API du client"""
+
+    @pytest.mark.asyncio
+    async def test_submit_json_listings_feed(self):
+        client = AmazonSPAPIClient(http_registry=MagicMock())
+        client.create_feed_document = AsyncMock(return_value={'feedDocumentId': "doc_1", 'url': "https://upload"})
+        client.upload_feed_document = AsyncMock()
+        client.create_feed = AsyncMock(return_value={'feedId': "feed_42"})
+
+        feed_id = await client.submit_json_listings_feed("token", "SELLER", "A13V1IB3VIYZZH", {'messages': []})
+
+        assert feed_id == "feed_42"
+        assert client.upload_feed_document.call_args.args[0] == "https://upload"
+        assert client.create_feed.call_args.kwargs['feed_type'] == JSON_LISTINGS_FEED
+        assert client.create_feed.call_args.kwargs['input_feed_document_id'] == "doc_1"
+
+    @pytest.mark.asyncio
+    async def test_wait_for_feed_result_polls_until_done(self):
+        client = AmazonSPAPIClient(http_registry=MagicMock())
+        client.get_feed = AsyncMock(side_effect=[
+            {'processingStatus': 'IN_QUEUE'},
+            {'processingStatus': 'IN_PROGRESS'},
+            {'processingStatus': 'DONE', 'resultFeedDocumentId': "result_doc"}
+        ])
+        client.get_feed_document = AsyncMock(return_value={'url': "https://report", 'compressionAlgorithm': 'GZIP'})
+        client.download_feed_document = AsyncMock(return_value={'issues': []})
+
+        outcome = await client.wait_for_feed_result("token", "SELLER", "feed_1", poll_interval=0)
+
+        assert outcome == {'processing_status': 'DONE', 'report': {'issues': []}}
+        assert client.get_feed.await_count == 3
+        client.download_feed_document.assert_awaited_once_with("https://report", 'GZIP')
+
+    @pytest.mark.asyncio
+    async def test_wait_for_feed_result_timeout(self):
+        client = AmazonSPAPIClient(http_registry=MagicMock())
+        client.get_feed = AsyncMock(return_value={'processingStatus': 'IN_PROGRESS'})
+
+        outcome = await client.wait_for_feed_result("token", "SELLER", "feed_1", poll_interval=0, timeout=0)
+
+        assert outcome == {'processing_status': 'IN_PROGRESS', 'report': None}
+
+
+class TestPublishListingsFeed:
+    """Tests de la publication groupée du service"""
+
+    @pytest.mark.asyncio
+    async def test_messages_chunked_into_feeds(self, service, sp_client):
+        """Test un feed par lot de batch_size messages, résultats dans l'ordre"""
+
+        service.publication_config['batch_size'] = 2
+
+        results = await service.publish_listings_feed("token", "SELLER", "A13V1IB3VIYZZH", messages(5))
+
+        assert sp_client.submit_json_listings_feed.await_count == 3
+        feed = sp_client.submit_json_listings_feed.call_args_list[0].kwargs['feed']
+        assert feed['header'] == {'sellerId': "SELLER", 'version': '2.0', 'issueLocale': 'fr_FR'}
+        assert [m['messageId'] for m in feed['messages']] == [1, 2]
+        assert [r['sku'] for r in results] == [f"SKU-{i}" for i in range(1, 6)]
+        assert [r['feed_id'] for r in results] == ["feed_1", "feed_1", "feed_2", "feed_2", "feed_3"]
+        assert all(r['processing_status'] == 'ACCEPTED' for r in results)
+
+    @pytest.mark.asyncio
+    async def test_report_issues_mapped_to_messages(self, service, sp_client):
+        """Test erreurs et avertissements rattachés par messageId"""
+
+        sp_client.wait_for_feed_result.return_value = {
+            'processing_status': 'DONE',
+            'report': {'issues': [
+                {'messageId': 2, 'code': '90220', 'severity': 'ERROR', 'message': "item_name requis"},
+                {'messageId': 3, 'code': '99022', 'severity': 'WARNING', 'message': "image ignorée"}
+            ]}
+        }
+
+        results = await service.publish_listings_feed("token", "SELLER", "A13V1IB3VIYZZH", messages(3))
+
+        assert [r['success'] for r in results] == [True, False, True]
+        assert results[1]['error_code'] == '90220'
+        assert results[1]['processing_status'] == 'INVALID'
+        assert results[2]['warnings'] == ["99022: image ignorée"]
+
+    @pytest.mark.asyncio
+    async def test_failed_feeds(self, service, sp_client):
+        """Test feed refusé à la soumission et feed FATAL"""
+
+        service.publication_config['batch_size'] = 1
+        sp_client.submit_json_listings_feed.side_effect = [SPAPIError("upload"), "feed_2"]
+        sp_client.wait_for_feed_result.return_value = {'processing_status': 'FATAL', 'report': None}
+
+        results = await service.publish_listings_feed("token", "SELLER", "A13V1IB3VIYZZH", messages(2))
+
+        assert [r['success'] for r in results] == [False, False]
+        assert results[0]['error_code'] == 'SPAPIError'
+        assert results[1]['error_code'] == 'FEED_FATAL'
+        assert results[1]['feed_id'] == "feed_2"
+
+    @pytest.mark.asyncio
+    async def test_unconfirmed_feeds_pending(self, service, sp_client):
+        """Test feed en cours après le délai, suivi en erreur ou non attendu : ni succès ni échec"""
+
+        service.publication_config['batch_size'] = 1
+        sp_client.wait_for_feed_result.side_effect = [
+            {'processing_status': 'IN_PROGRESS', 'report': None},
+            SPAPIError("getFeed")
+        ]
+
+        results = await service.publish_listings_feed("token", "SELLER", "A13V1IB3VIYZZH", messages(2))
+        not_awaited = await service.publish_listings_feed(
+            "token", "SELLER", "A13V1IB3VIYZZH", messages(1), wait_for_result=False
+        )
+
+        for result in results + not_awaited:
+            assert result['success'] is False
+            assert result['pending'] is True
+            assert 'error' not in result
+        assert [r['processing_status'] for r in results + not_awaited] == ['IN_PROGRESS', 'SUBMITTED', 'SUBMITTED']
+        assert [r['feed_id'] for r in results + not_awaited] == ["feed_1", "feed_2", "feed_3"]
+
+        summary = service._compile_publication_results(
+            results, {'session_id': "s1", 'started_at': "2026-01-01T00:00:00"}
+        )
+        assert summary['success'] is False
+        assert summary['summary']['pending_count'] == 2
+        assert summary['summary']['error_count'] == 0
+        assert summary['feed_tracking']['pending_feed_ids'] == ["feed_1", "feed_2"]
+
+    def test_listing_attributes(self):
+        attributes = build_listing_attributes(
+            {'title': "Titre", 'standard_price': 19.99, 'currency': 'EUR', 'images': ["https://a", "https://b"]},
+            "A1PA6795UKMFR9"
+        )
+
+        assert attributes['item_name'][0]['language_tag'] == 'de_DE'
+        assert attributes['purchasable_offer'][0]['our_price'][0]['schedule'][0]['value_with_tax'] == 19.99
+        assert attributes['other_product_image_locator_1'][0]['media_location'] == "https://b"
+
+
+class TestAmazonSPAPIPublisherPublishMany:
+    """Tests de publish_many sur les PublishTask"""
+
+    @pytest.fixture
+    def connection_service(self):
+        connection_service = MagicMock()
+
+        async def get_active_connection(user_id, marketplace_id=None):
+            if user_id == "no_connection":
+                return None
+            return SimpleNamespace(id=f"conn_{user_id}", seller_id=f"SELLER_{user_id}")
+
+        connection_service.get_active_connection = get_active_connection
+        connection_service.get_valid_access_token = AsyncMock(return_value="access_token")
+        return connection_service
+
+    @pytest.fixture
+    def publisher(self, service, connection_service):
+        database = MagicMock()
+        database.amazon_feeds.insert_one = AsyncMock()
+        return AmazonSPAPIPublisher(database, connection_service=connection_service, publisher_service=service)
+
+    @pytest.mark.asyncio
+    async def test_one_feed_per_seller(self, publisher, sp_client):
+        """Test regroupement par vendeur/marketplace et tâches marquées"""
+
+        tasks = [make_task(1, "user_a"), make_task(2, "user_b"), make_task(3, "user_a")]
+
+        results = await publisher.publish_many(tasks)
+
+        assert sp_client.submit_json_listings_feed.await_count == 2
+        sellers = {call.kwargs['seller_id']: len(call.kwargs['feed']['messages'])
+                   for call in sp_client.submit_json_listings_feed.call_args_list}
+        assert sellers == {"SELLER_user_a": 2, "SELLER_user_b": 1}
+        assert [r['sku'] for r in results] == ["SKU-1", "SKU-2", "SKU-3"]
+        assert all(task.status == PublicationStatus.SUCCESS for task in tasks)
+        assert tasks[0].result_data['feed_id'] == tasks[2].result_data['feed_id']
+        assert publisher.db.amazon_feeds.insert_one.await_count == 2
+
+        message = sp_client.submit_json_listings_feed.call_args_list[0].kwargs['feed']['messages'][0]
+        assert message['operationType'] == 'UPDATE'
+        assert message['attributes']['item_name'][0]['value'] == "Produit Amazon 1"
+
+    @pytest.mark.asyncio
+    async def test_missing_connection_fails_group(self, publisher, sp_client):
+        tasks = [make_task(1, "no_connection"), make_task(2, "user_a")]
+
+        results = await publisher.publish_many(tasks)
+
+        assert results[0]['error_code'] == "HTTP_412"
+        assert tasks[0].status == PublicationStatus.FAILED
+        assert tasks[1].status == PublicationStatus.SUCCESS
+        assert sp_client.submit_json_listings_feed.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_unconfirmed_feed_leaves_tasks_pending(self, publisher, sp_client):
+        """Test tâches d'un feed non confirmé : PENDING avec feed_id, suivi en attente"""
+
+        sp_client.wait_for_feed_result.return_value = {'processing_status': 'IN_QUEUE', 'report': None}
+        tasks = [make_task(1), make_task(2)]
+
+        results = await publisher.publish_many(tasks)
+
+        assert all(result['pending'] and not result['success'] for result in results)
+        assert all(task.status == PublicationStatus.PENDING for task in tasks)
+        assert tasks[0].result_data['feed_id'] == "feed_1"
+        assert publisher.db.amazon_feeds.insert_one.call_args.args[0]['status'] == "pending"
+
+    @pytest.mark.asyncio
+    async def test_images_below_amazon_minimum_dropped(self, publisher):
+        """Test minimum Amazon appliqué au mapping : petites images écartées, dimensions inconnues gardées"""
+
+        task = make_task(1)
+        task.product_dto.images = [
+            ImageDTO(url="https://test.com/thumb.webp", alt="Miniature", width=300, height=200),
+            ImageDTO(url="https://test.com/main.webp", alt="Principale", width=1200, height=1200),
+            ImageDTO(url="https://test.com/unknown.webp", alt="Sans dimensions")
+        ]
+
+        amazon_data = await publisher._map_product_dto_to_amazon(publisher._task_to_product_dto(task), {})
+
+        assert [image['url'] for image in amazon_data['images']] == [
+            "https://test.com/main.webp", "https://test.com/unknown.webp"
+        ]
+        assert amazon_data['images'][0]['is_main'] is True
@@ -0,0 +1,171 @@
+"""
+Tests pour le flux de progression - Compteurs incrémentaux, bus d'événements, NDJSON/SSE
+"""
+
+import pytest
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+# Import modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from scraping.publication.events import (
+    ProgressCounters, PublicationEventBus, PublicationEvent, format_ndjson, format_sse
+)
+from scraping.publication.orchestrator import PublicationOrchestrator
+from scraping.publication.dto import PublicationConfig, PublicationStatus
+
+from conftest import make_product
+
+
+@pytest.fixture
+def orchestrator():
+    config = PublicationConfig(max_publications_per_hour=1000)
+    config.cooldown_between_publications = 0
+    orchestrator = PublicationOrchestrator(config)
+    orchestrator.scheduler.can_publish_now = lambda store_id, **kwargs: True
+    orchestrator.guardrails.validate_publication = lambda task: (True, None, {})
+    orchestrator.guardrails.validate_many = lambda tasks: [(True, None, {}) for _ in tasks]
+    orchestrator.publishers["shopify"]._simulate_network_latency = AsyncMock()
+    return orchestrator
+
+
+async def drain(orchestrator, max_passes=20):
+    """Traiter toutes les tâches (une par store et par passe), en nombre de passes borné"""
+    for _ in range(max_passes):
+        if not len(orchestrator.queue):
+            break
+        await orchestrator.work_batch()
+    assert len(orchestrator.queue) == 0, "queue non vidée après max_passes"
+
+
+def make_event(seq, batch_id="batch_1"):
+    return PublicationEvent(seq=seq, type="enqueued", timestamp=0.0, task_id=f"task_{seq}", batch_id=batch_id)
+
+
+class TestProgressCounters:
+    """Tests pour ProgressCounters"""
+
+    def test_transitions_update_counts(self):
+        counters = ProgressCounters()
+        counters.apply(None, PublicationStatus.PENDING)
+        counters.apply(None, PublicationStatus.PENDING)
+        counters.apply(PublicationStatus.PENDING, PublicationStatus.PROCESSING)
+        counters.apply(PublicationStatus.PROCESSING, PublicationStatus.SUCCESS)
+
+        snapshot = counters.snapshot()
+        assert snapshot['total'] == 2
+        assert snapshot['pending'] == 1
+        assert snapshot['processing'] == 0
+        assert snapshot['success'] == 1
+        assert snapshot['progress_percent'] == 50.0
+        assert snapshot['finished'] is False
+
+        counters.apply(PublicationStatus.PENDING, PublicationStatus.SKIPPED_DUPLICATE)
+        assert counters.is_finished
+
+
+class TestPublicationEventBus:
+    """Tests pour PublicationEventBus"""
+
+    @pytest.mark.asyncio
+    async def test_filter_by_batch(self):
+        bus = PublicationEventBus()
+        subscription = bus.subscribe(batch_id="batch_1")
+
+        bus.emit(make_event(1, "batch_2"))
+        bus.emit(make_event(2, "batch_1"))
+
+        event = await bus.listen(subscription, timeout=0.1)
+        assert event.seq == 2
+        assert await bus.listen(subscription, timeout=0.01) is None
+
+    def test_slow_consumer_drops_oldest(self):
+        bus = PublicationEventBus(max_queue_size=2)
+        subscription = bus.subscribe()
+
+        for seq in range(1, 5):
+            bus.emit(make_event(seq))
+
+        assert subscription.dropped == 2
+        assert [subscription.queue.get_nowait().seq for _ in range(2)] == [3, 4]
+        assert bus.stats['events_dropped'] == 2
+
+    def test_replay_after_seq(self):
+        bus = PublicationEventBus(history_size=10)
+        for seq in range(1, 6):
+            bus.emit(make_event(seq))
+
+        subscription = bus.subscribe(after_seq=3)
+
+        assert subscription.queue.qsize() == 2
+
+    def test_formats(self):
+        event = make_event(7)
+
+        assert json.loads(format_ndjson(event))['seq'] == 7
+        assert format_ndjson(event).endswith("\n")
+        sse = format_sse(event)
+        assert sse.startswith("id: 7\nevent: enqueued\ndata: {")
+        assert sse.endswith("\n\n")
+
+
+class TestOrchestratorProgress:
+    """Tests des compteurs et du flux de l'orchestrateur"""
+
+    @pytest.mark.asyncio
+    async def test_batch_counters_follow_transitions(self, orchestrator):
+        products = [make_product(f"progress_{i}") for i in range(3)]
+        manager = orchestrator.idempotency_manager
+        await manager.store(manager.generate_idempotency_key("shopify", products[0]), "shopify", products[0])
+
+        batch = await orchestrator.enqueue_batch(products, "shopify")
+        progress = orchestrator.get_batch_progress(batch.batch_id)
+        assert progress['total'] == 3
+        assert progress['pending'] == 2
+        assert progress['skipped_duplicate'] == 1
+
+        await drain(orchestrator)
+
+        progress = orchestrator.get_batch_progress(batch.batch_id)
+        assert progress['success'] == 2
+        assert progress['finished'] is True
+        assert orchestrator.store_progress["shopify"].counts['success'] == 2
+        stats = await orchestrator.get_orchestrator_stats()
+        assert stats['orchestrator']['progress']['total'] == 3
+
+    @pytest.mark.asyncio
+    async def test_ndjson_stream_until_batch_finished(self, orchestrator):
+        batch = await orchestrator.enqueue_batch(
+            [make_product(f"stream_{i}") for i in range(2)], "shopify"
+        )
+
+        async def consume():
+            return [json.loads(line) async for line in orchestrator.stream_progress(batch.batch_id)]
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        await drain(orchestrator)
+        events = await asyncio.wait_for(consumer, timeout=5)
+
+        assert events[0]['type'] == "snapshot"
+        assert events[0]['counters']['pending'] == 2
+        assert [e['type'] for e in events[1:]].count("succeeded") == 2
+        assert events[-1]['counters']['finished'] is True
+        assert orchestrator.events.get_stats()['subscribers'] == 0
+
+    @pytest.mark.asyncio
+    async def test_sse_resume_and_unknown_batch(self, orchestrator):
+        batch = await orchestrator.enqueue_batch([make_product("sse_0")], "shopify")
+        await drain(orchestrator)
+
+        chunks = [chunk async for chunk in orchestrator.stream_progress(batch.batch_id, fmt="sse", last_event_id=0)]
+
+        assert chunks[0].startswith("id: ")
+        assert any("event: succeeded" in chunk for chunk in chunks)
+        with pytest.raises(ValueError):
+            async for _ in orchestrator.stream_progress("batch_inconnu"):
+                pass
@@ -0,0 +1,162 @@
+"""
+Tests pour Guardrails - Validation vectorisée des lots de produits
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+# Import modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from scraping.publication.guardrails import PriceGuardrail, QualityGuardrail, GuardRailEngine
+from scraping.publication.orchestrator import PublicationOrchestrator
+from scraping.publication.dto import PublicationConfig, PublicationStatus, PublishTask, StoreType
+
+from conftest import make_product
+
+
+def make_task(product):
+    return PublishTask(
+        task_id=f"task_{product.payload_signature}",
+        store_id="shopify",
+        store_type=StoreType.SHOPIFY,
+        product_dto=product
+    )
+
+
+class TestPriceGuardrailBatch:
+    """Tests de la validation prix par lot"""
+
+    def test_outliers_against_recorded_market(self):
+        guardrail = PriceGuardrail(variance_threshold=0.20)
+        products = [make_product(f"guardrails_{i}", price=price, attributes={'sku': "SKU-COMMON"})
+                    for i, price in enumerate(["100", "130", "70", "110"])]
+        guardrail.record_market_prices("sku:SKU-COMMON", [95.0, 100.0, 105.0])
+
+        results = guardrail.validate_many(products)
+
+        assert [valid for valid, _, _ in results] == [True, False, False, True]
+        assert results[0][2]['market_median'] == 100.0
+        assert results[0][2]['market_data_points'] == 3
+        assert results[1][2]['outlier_type'] == "above"
+        assert results[2][2]['outlier_type'] == "below"
+        assert results[1][1] == "Prix aberrant - écart: 30.0% > seuil: 20.0%"
+
+    def test_missing_price_and_insufficient_data(self):
+        guardrail = PriceGuardrail()
+        guardrail.record_market_prices("https://test.com/guardrails_1", [50.0])
+
+        results = guardrail.validate_many([make_product("guardrails_0"), make_product("guardrails_1", price="500")])
+
+        assert results[0] == (False, "Aucun prix détecté", {"price_available": False})
+        assert results[1][0] is True
+        assert results[1][2]['status'] == "insufficient_data"
+
+    def test_unknown_market_accepted_without_simulation(self):
+        """Sans prix observés : accepté comme données insuffisantes (pas de marché simulé)"""
+        guardrail = PriceGuardrail(variance_threshold=0.20)
+
+        results = guardrail.validate_many([make_product(f"guardrails_{i}", price="49.90") for i in range(3)])
+
+        assert all(valid for valid, _, _ in results)
+        assert all(analysis['market_data_points'] == 0 for _, _, analysis in results)
+        assert guardrail.validate_price(make_product("guardrails_0", price="49.90")) == results[0]
+
+    def test_single_and_batch_agree(self):
+        guardrail = PriceGuardrail()
+        product = make_product("guardrails_3", price="120", attributes={'ean': "3700000000001"})
+        guardrail.record_market_prices(PriceGuardrail.market_key(product), [80.0, 82.0, 84.0])
+
+        assert guardrail.validate_price(product) == guardrail.validate_many([product])[0]
+
+
+class TestQualityGuardrailBatch:
+    """Tests des scores qualité par lot"""
+
+    def test_batch_matches_single_product(self):
+        guardrail = QualityGuardrail(min_confidence=0.6)
+        products = [make_product(f"guardrails_{i}", price="10" if i % 2 else None, rich=i % 3 == 0) for i in range(6)]
+
+        batch_results = guardrail.validate_many(products)
+
+        for product, result in zip(products, batch_results):
+            assert result == guardrail.validate_quality(product)
+        assert batch_results[4][0] is False  # pauvre et sans prix
+        assert batch_results[3][0] is True
+
+    def test_quality_report(self):
+        engine = GuardRailEngine()
+        report = engine.get_quality_report([make_product(f"guardrails_{i}", price="10", rich=i < 2) for i in range(4)])
+
+        assert report['total_products'] == 4
+        assert report['publishable_count'] == 2
+        assert sum(report['quality_distribution'].values()) == 4
+
+
+class TestGuardRailEngineBatch:
+    """Tests de validate_many sur des tâches"""
+
+    def test_reasons_and_stats(self):
+        engine = GuardRailEngine()
+        tasks = [make_task(make_product("guardrails_0", price="25", rich=True)),
+                 make_task(make_product("guardrails_1", rich=True)),
+                 make_task(make_product("guardrails_2"))]
+
+        results = engine.validate_many(tasks)
+
+        assert results[0][:2] == (True, "Validation réussie")
+        assert results[1][1].startswith("Prix: Aucun prix détecté")
+        assert results[2][1].startswith("Prix ET qualité:")
+        assert engine.stats['total_validations'] == 3
+        assert engine.stats['blocked_by_price'] == 1
+        assert engine.stats['blocked_by_both'] == 1
+
+    def test_validated_prices_feed_market(self):
+        """Prix acceptés enregistrés par clé marché : référence des validations suivantes"""
+        engine = GuardRailEngine()
+        attributes = {'ean': "3700000000002"}
+        engine.validate_many([make_task(make_product(f"guardrails_{i}", price=price, rich=True, attributes=attributes))
+                              for i, price in enumerate(["100", "102"])])
+
+        results = engine.validate_many([make_task(make_product("guardrails_2", price="300", rich=True,
+                                                               attributes=attributes))])
+
+        assert results[0][2]['price_validation']['valid'] is False
+        assert results[0][2]['price_validation']['analysis']['market_data_points'] == 2
+        assert engine.price_guardrail._price_history["ean:3700000000002"] == [100.0, 102.0]
+
+
+class TestEnqueueBatchPrefilter:
+    """Tests du pré-filtrage guardrails à la mise en queue d'un batch"""
+
+    @pytest.mark.asyncio
+    async def test_blocked_tasks_never_enter_queue(self):
+        orchestrator = PublicationOrchestrator(PublicationConfig(max_publications_per_hour=1000))
+        orchestrator.config.cooldown_between_publications = 0
+        products = [make_product("guardrails_0", price="25", rich=True), make_product("guardrails_1"),
+                    make_product("guardrails_2", price="40", rich=True)]
+
+        batch = await orchestrator.enqueue_batch(products, "shopify")
+
+        assert len(orchestrator.queue) == 2
+        assert batch.tasks[1].status == PublicationStatus.SKIPPED_GUARDRAIL
+        assert batch.tasks[1].error_message.startswith("Guardrails: ")
+        assert orchestrator.stats['total_skipped_guardrails'] == 1
+        assert orchestrator.stats['by_store']['shopify']['skipped'] == 1
+        assert orchestrator.get_batch_progress(batch.batch_id)['skipped_guardrail'] == 1
+
+        # Analyse réutilisée au traitement : pas de seconde validation
+        orchestrator.scheduler.can_publish_now = lambda store_id, **kwargs: True
+        orchestrator.guardrails.validate_publication = MagicMock()
+        orchestrator.publishers["shopify"]._simulate_network_latency = AsyncMock()
+        for _ in range(10):
+            if not len(orchestrator.queue):
+                break
+            await orchestrator.work_batch()
+        assert len(orchestrator.queue) == 0
+
+        orchestrator.guardrails.validate_publication.assert_not_called()
+        assert batch.tasks[0].status == PublicationStatus.SUCCESS
+        assert 'guardrail_analysis' in batch.tasks[0].result_data
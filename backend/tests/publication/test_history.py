@@ -0,0 +1,168 @@
+"""
+Tests pour l'historique des publications - Rétention bornée et archivage compact
+"""
+
+import pytest
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+# Import modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from scraping.publication.history import (
+    TaskHistory, FileTaskArchive, MongoTaskArchive, compact_task_record, create_task_archive
+)
+from scraping.publication.orchestrator import PublicationOrchestrator
+from scraping.publication.dto import PublicationConfig, PublicationStatus, PublishTask, StoreType
+
+from conftest import make_product
+
+
+def make_task(index, status=PublicationStatus.SUCCESS):
+    task = PublishTask(
+        task_id=f"task_{index}",
+        store_id="shopify",
+        store_type=StoreType.SHOPIFY,
+        product_dto=make_product(f"history_{index}"),
+        publish_options={'batch_id': "batch_1"}
+    )
+    if status == PublicationStatus.SUCCESS:
+        task.mark_success({'external_id': f"ext_{index}", 'store_response': {'large': "x" * 100}})
+    else:
+        task.mark_failed("Publisher error")
+    return task
+
+
+class TestTaskHistory:
+    """Tests pour TaskHistory"""
+
+    def test_bounded_with_running_counters(self):
+        history = TaskHistory(max_size=3)
+
+        for i in range(10):
+            history.append(make_task(i))
+
+        assert len(history) == 3
+        assert [task.task_id for task in history] == ["task_7", "task_8", "task_9"]
+        assert history.get("task_9").task_id == "task_9"
+        assert history.get("task_0") is None
+        assert history.total_recorded == 10
+        assert history.total_evicted == 7
+
+    @pytest.mark.asyncio
+    async def test_evicted_tasks_spilled_in_batches(self):
+        archive = MagicMock()
+        archive.archive_many = AsyncMock()
+        history = TaskHistory(max_size=2, archive=archive, spill_batch_size=3)
+
+        for i in range(4):
+            history.append(make_task(i))
+        assert not history.needs_flush
+
+        history.append(make_task(4))
+        assert history.needs_flush
+        assert await history.flush() == 3
+
+        records = archive.archive_many.call_args.args[0]
+        assert [record['task_id'] for record in records] == ["task_0", "task_1", "task_2"]
+        assert history.get_stats()['total_archived'] == 3
+        assert history.get_stats()['pending_archive'] == 0
+
+    @pytest.mark.asyncio
+    async def test_archive_failure_keeps_history_bounded(self):
+        archive = MagicMock()
+        archive.archive_many = AsyncMock(side_effect=ConnectionError("mongo down"))
+        history = TaskHistory(max_size=1, archive=archive, spill_batch_size=1)
+
+        history.append(make_task(0))
+        history.append(make_task(1))
+
+        assert await history.flush() == 0
+        assert history.archive_errors == 1
+        assert history.get_stats()['pending_archive'] == 0
+
+    def test_compact_record_excludes_product(self):
+        record = compact_task_record(make_task(5))
+
+        assert record['external_id'] == "ext_5"
+        assert record['batch_id'] == "batch_1"
+        assert record['status'] == "success"
+        assert 'product_dto' not in record and 'result_data' not in record
+        json.dumps(record)
+
+
+class TestTaskArchives:
+    """Tests des archives fichier et MongoDB"""
+
+    @pytest.mark.asyncio
+    async def test_file_archive_appends_json_lines(self, tmp_path):
+        archive = FileTaskArchive(str(tmp_path / "history.jsonl"))
+
+        await archive.archive_many([{'task_id': "a"}, {'task_id': "b"}])
+        await archive.archive_many([{'task_id': "c"}])
+
+        lines = (tmp_path / "history.jsonl").read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line)['task_id'] for line in lines] == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_mongo_archive_bulk_insert(self):
+        collection = MagicMock()
+        collection.create_index = AsyncMock()
+        collection.insert_many = AsyncMock()
+        archive = MongoTaskArchive({'publication_history': collection})
+
+        await archive.archive_many([{'task_id': "a"}, {'task_id': "b"}])
+
+        documents = collection.insert_many.call_args.args[0]
+        assert [doc['task_id'] for doc in documents] == ["a", "b"]
+        assert all('archived_at' in doc for doc in documents)
+        assert collection.insert_many.call_args.kwargs['ordered'] is False
+
+    def test_create_task_archive(self, monkeypatch, tmp_path):
+        monkeypatch.delenv("PUBLICATION_HISTORY_ARCHIVE", raising=False)
+        assert create_task_archive() is None
+
+        monkeypatch.setenv("PUBLICATION_HISTORY_ARCHIVE_PATH", str(tmp_path / "h.jsonl"))
+        assert isinstance(create_task_archive('file'), FileTaskArchive)
+
+        with pytest.raises(ValueError):
+            create_task_archive('redis')
+
+
+class TestOrchestratorHistory:
+    """Tests de la rétention bornée dans l'orchestrateur"""
+
+    @pytest.mark.asyncio
+    async def test_history_bounded_and_spilled(self, tmp_path):
+        config = PublicationConfig(max_publications_per_hour=1000, history_size=2)
+        config.cooldown_between_publications = 0
+        archive = FileTaskArchive(str(tmp_path / "history.jsonl"))
+        orchestrator = PublicationOrchestrator(config, history_archive=archive)
+        orchestrator.scheduler.can_publish_now = lambda store_id, **kwargs: True
+        orchestrator.guardrails.validate_publication = lambda task: (True, None, {})
+        orchestrator.publishers["shopify"]._simulate_network_latency = AsyncMock()
+
+        for i in range(5):
+            await orchestrator.enqueue(make_product(f"orch_history_{i}"), "shopify")
+            await orchestrator.work_batch()
+        await orchestrator._spill_history(force=True)
+
+        stats = await orchestrator.get_orchestrator_stats()
+        assert len(orchestrator.completed_tasks) == 2
+        assert stats['orchestrator']['completed_tasks'] == 5
+        assert stats['orchestrator']['history']['completed']['total_archived'] == 3
+        assert len((tmp_path / "history.jsonl").read_text(encoding='utf-8').splitlines()) == 3
+
+        last_task_id = list(orchestrator.completed_tasks)[-1].task_id
+        assert await orchestrator._find_task_by_id(last_task_id) is not None
+
+    def test_duplicate_buffer_bounded(self):
+        orchestrator = PublicationOrchestrator(PublicationConfig(history_size=3))
+
+        for i in range(5):
+            orchestrator.duplicate_tasks.append(make_task(i))
+
+        assert len(orchestrator.duplicate_tasks) == 3
+        assert orchestrator.duplicate_tasks.popleft().task_id == "task_2"
@@ -0,0 +1,254 @@
+"""
+Tests pour IdempotencyManager - Vérifications groupées, filtre de Bloom et adaptateur MongoDB
+"""
+
+import pytest
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+# Import modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from scraping.publication.idempotency import (
+    BloomFilter, IdempotencyManager, MongoIdempotencyAdapter, create_idempotency_manager
+)
+from scraping.publication.orchestrator import PublicationOrchestrator
+from scraping.publication.dto import PublicationConfig, PublicationStatus
+
+from conftest import make_product
+
+
+class AsyncCursor:
+    """Curseur Motor simulé (itération async sur des documents)"""
+
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._docs:
+            yield doc
+
+
+class TestBloomFilter:
+    """Tests pour BloomFilter"""
+
+    def test_no_false_negatives_and_low_false_positive_rate(self):
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        for i in range(5000):
+            bloom.add(f"key_{i}")
+
+        assert all(f"key_{i}" in bloom for i in range(5000))
+        false_positives = sum(f"other_{i}" in bloom for i in range(10000))
+        assert false_positives / 10000 < 0.03
+
+    def test_saturation(self):
+        bloom = BloomFilter(capacity=2)
+        for key in ("a", "b", "c"):
+            bloom.add(key)
+
+        assert bloom.is_saturated
+
+
+class TestIdempotencyManager:
+    """Tests pour IdempotencyManager (stockage mémoire)"""
+
+    @pytest.mark.asyncio
+    async def test_exists_many_single_storage_lookup(self):
+        """Test lot : clés inconnues écartées par le filtre, une seule lecture pour le reste"""
+
+        manager = IdempotencyManager()
+        products = [make_product(f"sig_{i}") for i in range(100)]
+        keys = [manager.generate_idempotency_key("shopify", p) for p in products]
+
+        stored = await manager.store_many(
+            [(key, "shopify", product, {'batch': True}) for key, product in zip(keys[:10], products[:10])]
+        )
+        manager._local_cache.clear()
+
+        found = await manager.exists_many(keys)
+
+        assert stored == 10
+        assert found == set(keys[:10])
+        assert manager.stats['storage_lookups'] <= 1
+        assert manager.stats['bloom_negatives'] >= 85
+        assert manager.stats['duplicates_detected'] == 10
+
+    @pytest.mark.asyncio
+    async def test_local_cache_expires_per_key(self):
+        """Test cache local : expiration clé par clé, sans vider les autres"""
+
+        manager = IdempotencyManager(cache_ttl_s=60)
+        product = make_product("cache")
+        key = manager.generate_idempotency_key("shopify", product)
+        await manager.store(key, "shopify", product)
+        manager._local_cache["other"] = time.time() + 60
+        manager._local_cache[key] = time.time() - 1
+
+        assert await manager.exists(key) is True  # Relu depuis le stockage
+        assert "other" in manager._local_cache
+        assert manager.stats['cache_hits'] == 0
+
+        assert await manager.exists(key) is True
+        assert manager.stats['cache_hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_cleanup_rebuilds_bloom(self):
+        """Test clés expirées retirées du stockage, du cache et du filtre"""
+
+        manager = IdempotencyManager()
+        product = make_product("expired")
+        key = manager.generate_idempotency_key("shopify", product)
+        await manager.store(key, "shopify", product)
+        manager._memory_storage[key].created_at -= 25 * 3600
+
+        assert await manager.cleanup_expired() == 1
+        assert key not in manager._bloom
+        assert await manager.exists(key) is False
+
+    @pytest.mark.asyncio
+    async def test_adapter_bloom_loaded_once_then_incremental(self):
+        """Test filtre chargé depuis l'adaptateur puis rechargé par incréments"""
+
+        adapter = MagicMock()
+        loads = []
+
+        async def load_keys(since=None):
+            loads.append(since)
+            for key in (["known"] if since is None else ["recent"]):
+                yield key
+
+        adapter.load_keys = load_keys
+        adapter.exists_many = AsyncMock(return_value={"known"})
+        manager = IdempotencyManager(adapter, bloom_refresh_s=0)
+
+        assert await manager.exists_many(["known", "unknown_1", "unknown_2"]) == {"known"}
+        adapter.exists_many.assert_awaited_once_with(["known"])
+
+        manager._local_cache.clear()
+        await manager.exists_many(["recent"])
+        assert loads[0] is None and loads[1] is not None
+        assert adapter.exists_many.await_args.args[0] == ["recent"]
+
+    @pytest.mark.asyncio
+    async def test_key_stored_by_other_replica_seen_before_refresh_interval(self):
+        """Test négatif du filtre confirmé par rechargement incrémental (adaptateur partagé)"""
+
+        shared_keys = {"known": time.time()}
+        adapter = MagicMock()
+
+        async def load_keys(since=None):
+            for key, created_at in list(shared_keys.items()):
+                if since is None or created_at > since:
+                    yield key
+
+        async def exists_many(keys):
+            return {key for key in keys if key in shared_keys}
+
+        adapter.load_keys = load_keys
+        adapter.exists_many = exists_many
+        manager = IdempotencyManager(adapter, bloom_refresh_s=3600, bloom_negative_reload_s=0)
+
+        assert await manager.exists("peer_key") is False
+
+        # Écrite par une autre réplique, bien avant le rechargement périodique
+        shared_keys["peer_key"] = time.time()
+        assert await manager.exists("peer_key") is True
+        assert await manager.exists("never_published") is False
+
+    @pytest.mark.asyncio
+    async def test_negative_reloads_rate_limited(self):
+        """Test négatifs successifs : au plus un rechargement par intervalle"""
+
+        adapter = MagicMock()
+        loads = []
+
+        async def load_keys(since=None):
+            loads.append(since)
+            return
+            yield
+
+        adapter.load_keys = load_keys
+        adapter.exists_many = AsyncMock(return_value=set())
+        manager = IdempotencyManager(adapter, bloom_refresh_s=3600, bloom_negative_reload_s=60)
+
+        for i in range(5):
+            assert await manager.exists(f"new_{i}") is False
+        assert loads == [None]
+
+        manager._bloom_loaded_at -= 60
+        assert await manager.exists("new_5") is False
+        assert len(loads) == 2 and loads[1] is not None
+        adapter.exists_many.assert_not_awaited()
+
+    def test_factory(self, monkeypatch):
+        monkeypatch.delenv("PUBLICATION_IDEMPOTENCY_BACKEND", raising=False)
+
+        assert create_idempotency_manager().storage_adapter is None
+        manager = create_idempotency_manager('mongo', database=MagicMock())
+        assert isinstance(manager.storage_adapter, MongoIdempotencyAdapter)
+        with pytest.raises(ValueError):
+            create_idempotency_manager('redis')
+
+
+class TestMongoIdempotencyAdapter:
+    """Tests pour MongoIdempotencyAdapter"""
+
+    @pytest.fixture
+    def collection(self):
+        collection = MagicMock()
+        collection.create_index = AsyncMock()
+        collection.bulk_write = AsyncMock()
+        return collection
+
+    @pytest.fixture
+    def adapter(self, collection):
+        return MongoIdempotencyAdapter({'idempotency_keys': collection})
+
+    @pytest.mark.asyncio
+    async def test_exists_many_uses_single_in_query(self, adapter, collection):
+        collection.find.return_value = AsyncCursor([{'_id': "k1"}])
+
+        assert await adapter.exists_many(["k1", "k2", "k3"]) == {"k1"}
+
+        query, projection = collection.find.call_args.args
+        assert query['_id'] == {'$in': ["k1", "k2", "k3"]}
+        assert '$gt' in query['created_at']
+        assert projection == {'_id': 1}
+
+    @pytest.mark.asyncio
+    async def test_store_many_bulk_upsert_with_ttl_index(self, adapter, collection):
+        manager = IdempotencyManager(adapter)
+        products = [make_product(f"mongo_{i}") for i in range(3)]
+
+        await manager.store_many([(f"key_{i}", "shopify", p, None) for i, p in enumerate(products)])
+
+        operations = collection.bulk_write.call_args.args[0]
+        assert len(operations) == 3
+        assert collection.bulk_write.call_args.kwargs['ordered'] is False
+        ttl_call = collection.create_index.call_args_list[0]
+        assert ttl_call.args[0] == "created_at"
+        assert ttl_call.kwargs['expireAfterSeconds'] == 24 * 3600
+
+
+class TestOrchestratorBatchIdempotency:
+    """Tests de l'idempotence groupée à la mise en queue d'un batch"""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_batch_skips_known_products(self):
+        orchestrator = PublicationOrchestrator(PublicationConfig(cooldown_between_publications=60))
+        orchestrator.guardrails.validate_many = lambda tasks: [(True, None, {}) for _ in tasks]
+        products = [make_product(f"batch_{i}") for i in range(5)]
+        manager = orchestrator.idempotency_manager
+        await manager.store(manager.generate_idempotency_key("shopify", products[1]), "shopify", products[1])
+
+        batch = await orchestrator.enqueue_batch(products, "shopify")
+
+        assert batch.total_tasks == 5
+        assert batch.tasks[1].status == PublicationStatus.SKIPPED_DUPLICATE
+        assert len(orchestrator.queue) == 4
+        assert orchestrator.stats['total_skipped_duplicate'] == 1
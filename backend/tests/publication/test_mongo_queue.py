@@ -0,0 +1,230 @@
+"""
+Tests pour MongoPublishQueue - Récupération atomique, baux et dead-letter
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+# Import modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from pymongo.errors import DuplicateKeyError
+
+from scraping.publication.queue import PublishQueue, create_publish_queue
+from scraping.publication.mongo_queue import MongoPublishQueue, QUEUE_LEASED, QUEUE_DEAD_LETTER
+from scraping.publication.dto import PublicationConfig, PublishTask, PublicationStatus, StoreType
+
+from conftest import make_product
+
+
+@pytest.fixture
+def config():
+    return PublicationConfig(
+        cooldown_between_publications=60,
+        max_publications_per_hour=10
+    )
+
+
+@pytest.fixture
+def database():
+    """Base Motor simulée : une collection de tâches et une collection de gates"""
+    collections = {
+        'publication_queue': MagicMock(),
+        'publication_queue_store_gates': MagicMock()
+    }
+    for collection in collections.values():
+        collection.create_index = AsyncMock()
+        collection.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=1))
+        collection.find_one_and_update = AsyncMock(return_value=None)
+        collection.find_one = AsyncMock(return_value=None)
+        collection.bulk_write = AsyncMock()
+    return collections
+
+
+@pytest.fixture
+def queue(config, database):
+    return MongoPublishQueue(config, database=database, visibility_timeout_s=300, max_deliveries=3)
+
+
+@pytest.fixture
+def task():
+    return PublishTask(
+        task_id="task_1",
+        store_id="shopify",
+        store_type=StoreType.MOCK_STORE,
+        product_dto=make_product("mongo_queue_sig"),
+        priority=3
+    )
+
+
+def leased_doc(task, deliveries=1):
+    return {
+        '_id': task.task_id,
+        'store_id': task.store_id,
+        'lease_id': 'lease_abc',
+        'deliveries': deliveries,
+        'task': task.model_dump(mode='json')
+    }
+
+
+class TestCreatePublishQueue:
+    """Tests pour la factory de queue"""
+
+    def test_memory_backend_default(self, config, monkeypatch):
+        monkeypatch.delenv("PUBLICATION_QUEUE_BACKEND", raising=False)
+
+        queue = create_publish_queue(config)
+
+        assert type(queue) is PublishQueue
+
+    def test_mongo_backend_from_env(self, config, database, monkeypatch):
+        monkeypatch.setenv("PUBLICATION_QUEUE_BACKEND", "mongo")
+
+        queue = create_publish_queue(config, database=database)
+
+        assert isinstance(queue, MongoPublishQueue)
+        assert queue.lease_renewal_interval_s == pytest.approx(100)
+
+    def test_unknown_backend(self, config):
+        with pytest.raises(ValueError):
+            create_publish_queue(config, backend='redis')
+
+
+class TestMongoPublishQueue:
+    """Tests pour MongoPublishQueue"""
+
+    @pytest.mark.asyncio
+    async def test_add_task_upserts_pending_document(self, queue, database, task):
+        """Test persistance de la tâche, bail et livraisons remis à zéro"""
+
+        await queue.add_task(task)
+
+        filter_, update = database['publication_queue'].update_one.call_args.args
+        assert filter_ == {'_id': "task_1"}
+        assert update['$set']['status'] == "pending"
+        assert update['$set']['deliveries'] == 0
+        assert update['$set']['priority'] == 3
+        assert PublishTask.model_validate(update['$set']['task']).task_id == "task_1"
+        assert database['publication_queue'].update_one.call_args.kwargs['upsert'] is True
+        assert database['publication_queue'].create_index.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_claim_leases_task(self, queue, database, task):
+        """Test récupération atomique : bail posé et tâche démarrée"""
+
+        database['publication_queue'].find_one_and_update.return_value = leased_doc(task)
+
+        claimed = await queue.get_next_task()
+
+        assert claimed.task_id == "task_1"
+        assert claimed.status == PublicationStatus.PROCESSING
+        query, update = database['publication_queue'].find_one_and_update.call_args.args
+        assert query['status'] == {'$in': ["pending", QUEUE_LEASED]}
+        assert update['$set']['status'] == QUEUE_LEASED
+        assert update['$inc'] == {'deliveries': 1}
+        # Cooldown partagé réservé pour le store
+        gate_filter = database['publication_queue_store_gates'].update_one.call_args.args[0]
+        assert gate_filter['_id'] == "shopify"
+        assert queue._leases == {"task_1": "lease_abc"}
+
+    @pytest.mark.asyncio
+    async def test_store_in_shared_cooldown_is_released(self, queue, database, task):
+        """Test tâche relâchée quand un autre réplica vient de publier sur le store"""
+
+        gates = database['publication_queue_store_gates']
+        gates.update_one.side_effect = DuplicateKeyError("gate")
+        gates.find_one.return_value = {'next_available_at': datetime.utcnow() + timedelta(seconds=30)}
+        database['publication_queue'].find_one_and_update.side_effect = [leased_doc(task), None]
+
+        assert await queue.get_next_task() is None
+
+        # Store exclu de la seconde récupération
+        second_query = database['publication_queue'].find_one_and_update.call_args_list[1].args[0]
+        assert second_query['store_id'] == {'$nin': ["shopify"]}
+        # Tâche rendue avec sa livraison annulée
+        filter_, update = database['publication_queue'].update_one.call_args.args
+        assert filter_ == {'_id': "task_1", 'lease_id': "lease_abc"}
+        assert update['$set']['status'] == "pending"
+        assert update['$inc'] == {'deliveries': -1}
+        assert queue.stats['claims_released'] == 1
+        assert queue.stats['rate_limited_count'] == 1
+
+    @pytest.mark.asyncio
+    async def test_hourly_limit_shared_through_gate(self, queue, database, task):
+        """Test limite horaire tenue dans la gate : réservation atomique et attente calculée sur la fenêtre partagée"""
+
+        gates = database['publication_queue_store_gates']
+        database['publication_queue'].find_one_and_update.return_value = leased_doc(task)
+
+        await queue.get_next_task()
+
+        gate_filter, gate_update = gates.update_one.call_args.args
+        limit = queue._get_rate_limiter("shopify").limit
+        assert gate_filter['$or'][0] == {f'publications.{limit - 1}': {'$exists': False}}
+        assert gate_update['$push']['publications']['$slice'] == -limit
+        assert queue._get_rate_limiter("shopify").count() == 1
+
+        # Fenêtre pleine côté autres réplicas : attente jusqu'à la sortie de la plus ancienne
+        now = datetime.utcnow()
+        gate = {'next_available_at': now - timedelta(seconds=1),
+                'publications': [now - timedelta(minutes=50 - i) for i in range(limit)]}
+        assert MongoPublishQueue._gate_wait_seconds(gate, limit, 3600, now) == pytest.approx(600)
+        gate['publications'] = gate['publications'][1:]
+        assert MongoPublishQueue._gate_wait_seconds(gate, limit, 3600, now) < 0
+
+    @pytest.mark.asyncio
+    async def test_poison_task_dead_lettered(self, queue, database, task):
+        """Test dead-letter après trop de baux expirés"""
+
+        database['publication_queue'].find_one_and_update.side_effect = [leased_doc(task, deliveries=4), None]
+
+        assert await queue.get_next_task() is None
+
+        update = database['publication_queue'].update_one.call_args.args[1]
+        assert update['$set']['status'] == QUEUE_DEAD_LETTER
+        assert queue.stats['dead_lettered'] == 1
+        database['publication_queue_store_gates'].update_one.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_complete_and_lost_lease(self, queue, database, task):
+        """Test acquittement avec le bail détenu, et perte du bail"""
+
+        database['publication_queue'].find_one_and_update.return_value = leased_doc(task)
+        claimed = await queue.get_next_task()
+
+        assert await queue.renew_lease(claimed) is True
+
+        claimed.mark_success({"product_id": "p_1"})
+        await queue.complete_task(claimed)
+        filter_, update = database['publication_queue'].update_one.call_args.args
+        assert filter_ == {'_id': "task_1", 'lease_id': "lease_abc"}
+        assert update['$set']['status'] == PublicationStatus.SUCCESS.value
+        assert 'completed_at' in update['$set']
+
+        # Bail repris par un autre réplica
+        await queue.add_task(task)
+        database['publication_queue'].update_one.return_value = SimpleNamespace(matched_count=0)
+        claimed = await queue.get_next_task()
+        assert await queue.renew_lease(claimed) is False
+        assert queue.stats['leases_lost'] == 1
+
+    @pytest.mark.asyncio
+    async def test_size_counts_pending_documents(self, queue, database, task):
+        """Test profondeur : len() suit les écritures locales, size() relit la collection"""
+
+        await queue.add_task(task)
+        assert len(queue) == 1
+
+        database['publication_queue'].find_one_and_update.return_value = leased_doc(task)
+        await queue.get_next_task()
+        assert len(queue) == 0
+
+        # Tâches ajoutées par d'autres réplicas
+        database['publication_queue'].count_documents = AsyncMock(return_value=4)
+        assert await queue.size() == 4
+        database['publication_queue'].count_documents.assert_awaited_once_with({'status': "pending"})
+        assert len(queue) == 4
@@ -0,0 +1,107 @@
+"""
+Tests pour les routes de publication - Mise en queue de batches et suivi de progression
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Import modules à tester (mêmes chemins que le serveur)
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from routes.publication_routes import publication_router, get_current_user
+from src.scraping.publication.orchestrator import PublicationOrchestrator, get_publication_orchestrator
+from src.scraping.publication.dto import PublicationConfig
+
+
+@pytest.fixture
+def orchestrator():
+    orchestrator = PublicationOrchestrator(PublicationConfig(max_publications_per_hour=1000))
+    orchestrator.guardrails.validate_many = lambda tasks: [(True, None, {}) for _ in tasks]
+    orchestrator.start_workers = AsyncMock()
+    return orchestrator
+
+
+@pytest.fixture
+def current_user():
+    """Utilisateur authentifié (modifiable par test)"""
+    return {"user_id": "user_1", "is_admin": False}
+
+
+@pytest.fixture
+def client(orchestrator, current_user):
+    app = FastAPI()
+    app.include_router(publication_router)
+    app.dependency_overrides[get_publication_orchestrator] = lambda: orchestrator
+    app.dependency_overrides[get_current_user] = lambda: current_user
+    return TestClient(app)
+
+
+def product_payload(signature):
+    return {
+        "title": f"Produit route {signature}",
+        "description_html": "<p>Test routes de publication</p>",
+        "images": [{"url": "https://test.com/img.webp", "alt": "Test image"}],
+        "source_url": f"https://test.com/{signature}",
+        "payload_signature": signature,
+        "extraction_timestamp": 1703001234.567
+    }
+
+
+class TestPublicationRoutes:
+    """Tests des routes sur l'orchestrateur injecté"""
+
+    def test_enqueued_batch_is_tracked(self, client, orchestrator):
+        response = client.post("/api/publication/batches", json={
+            "store_id": "shopify",
+            "products": [product_payload("route_1"), product_payload("route_2")]
+        })
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total_tasks"] == 2
+        assert body["progress"]["pending"] == 2
+        assert len(orchestrator.queue) == 2
+        orchestrator.start_workers.assert_awaited_once()
+
+        progress = client.get(body["progress_url"])
+        assert progress.status_code == 200
+        assert progress.json()["progress"]["total"] == 2
+        assert orchestrator.get_batch_owner(body["batch_id"]) == "user_1"
+        task = asyncio.run(orchestrator.queue.get_next_task())
+        assert task.publish_options["user_id"] == "user_1"
+
+    def test_unknown_store_rejected(self, client):
+        response = client.post("/api/publication/batches", json={
+            "store_id": "unknown_store",
+            "products": [product_payload("route_3")]
+        })
+
+        assert response.status_code == 400
+
+    def test_unknown_batch_not_found(self, client):
+        assert client.get("/api/publication/batches/batch_inconnu/progress").status_code == 404
+
+
+class TestPublicationRoutesTenancy:
+    """Tests du cloisonnement des batches par utilisateur"""
+
+    def test_other_users_batch_hidden(self, client, current_user):
+        batch_id = client.post("/api/publication/batches", json={
+            "store_id": "shopify",
+            "products": [product_payload("tenant_1")]
+        }).json()["batch_id"]
+
+        current_user["user_id"] = "user_2"
+        assert client.get(f"/api/publication/batches/{batch_id}/progress").status_code == 404
+        assert client.get(f"/api/publication/batches/{batch_id}/events").status_code == 404
+
+        current_user["is_admin"] = True
+        assert client.get(f"/api/publication/batches/{batch_id}/progress").status_code == 200
+
+    def test_global_stream_admin_only(self, client, current_user):
+        assert client.get("/api/publication/events").status_code == 403
@@ -14,6 +14,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 from scraping.publication.publishers.base import GenericMockPublisher, IdempotencyStore, PublishResult
 from scraping.publication.publishers import get_all_publishers, get_publisher, get_supported_stores
 from scraping.publication.constants import STORES
+from scraping.publication.dto import PublishTask, PublicationStatus, StoreType
 from scraping.semantic.product_dto import ProductDTO, ImageDTO, PriceDTO, Currency
 
 
@@ -146,7 +147,33 @@ class TestGenericMockPublisher:
         assert result1.external_id != result2.external_id
         assert result1.success is True
         assert result2.success is True
-    
+
+    @pytest.mark.asyncio
+    async def test_publish_many_preserves_order(self, idem_store, sample_product):
+        """Test publication groupée : un résultat par tâche, dans l'ordre, tâches marquées"""
+        publisher = GenericMockPublisher("bigcommerce", idem_store)
+        tasks = [
+            PublishTask(
+                task_id=f"task_{i}",
+                store_id="bigcommerce",
+                store_type=StoreType.BIGCOMMERCE,
+                product_dto=sample_product,
+                publish_options={'idempotency_key': key} if key else {}
+            )
+            for i, key in enumerate(["bulk_key_1", "bulk_key_2", "bulk_key_1", None])
+        ]
+
+        results = await publisher.publish_many(tasks)
+
+        assert len(results) == 4
+        assert all(result['success'] for result in results)
+        assert results[0]['external_id'] == publisher._generate_external_id("bulk_key_1")
+        assert results[1]['external_id'] == publisher._generate_external_id("bulk_key_2")
+        assert results[3]['external_id'] == publisher._generate_external_id(sample_product.payload_signature)
+        assert all(task.status == PublicationStatus.SUCCESS for task in tasks)
+        assert tasks[1].result_data['external_id'] == results[1]['external_id']
+        assert publisher.stats['total_publishes'] == 4
+
     @pytest.mark.asyncio
     async def test_store_specific_validation(self, idem_store, sample_product):
         """Test validations spécifiques par store"""
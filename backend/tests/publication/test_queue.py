@@ -0,0 +1,355 @@
+"""
+Tests pour PublishQueue - Tas par store, index de disponibilité et réveils
+"""
+
+import pytest
+import asyncio
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+# Import modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from scraping.publication.queue import PublishQueue, PublishWorker, PublishWorkerPool
+from scraping.publication.dto import PublicationConfig, PublishTask, PublicationStatus, StoreType
+
+from conftest import make_product
+
+
+@pytest.fixture
+def config():
+    return PublicationConfig(
+        cooldown_between_publications=60,
+        max_publications_per_hour=10
+    )
+
+
+@pytest.fixture
+def queue(config):
+    return PublishQueue(config)
+
+
+@pytest.fixture
+def fast_config():
+    """Sans cooldown ni limite horaire effective : seule l'équité DRR ordonne"""
+    config = PublicationConfig(max_publications_per_hour=1000)
+    config.cooldown_between_publications = 0
+    return config
+
+
+@pytest.fixture
+def product():
+    return make_product("queue_test_sig")
+
+
+def make_task(product, task_id, store_id="shopify", priority=5):
+    return PublishTask(
+        task_id=task_id,
+        store_id=store_id,
+        store_type=StoreType.MOCK_STORE,
+        product_dto=product,
+        priority=priority
+    )
+
+
+class TestPublishQueue:
+    """Tests pour PublishQueue"""
+
+    @pytest.mark.asyncio
+    async def test_priority_order_across_stores(self, queue, product):
+        """Test ordre priorité puis ancienneté, tous stores confondus"""
+
+        await queue.add_task(make_task(product, "low", "shopify", priority=8))
+        await queue.add_task(make_task(product, "urgent", "woocommerce", priority=1))
+        await queue.add_task(make_task(product, "normal_1", "prestashop", priority=5))
+        await queue.add_task(make_task(product, "normal_2", "magento", priority=5))
+
+        order = [(await queue.get_next_task()).task_id for _ in range(4)]
+
+        assert order == ["urgent", "normal_1", "normal_2", "low"]
+        assert len(queue) == 0
+
+    @pytest.mark.asyncio
+    async def test_cooldown_skips_store_without_consuming_tokens(self, queue, product):
+        """Test store en cooldown ignoré, autre store servi"""
+
+        await queue.add_task(make_task(product, "shop_1", "shopify", priority=1))
+        await queue.add_task(make_task(product, "shop_2", "shopify", priority=1))
+        await queue.add_task(make_task(product, "woo_1", "woocommerce", priority=9))
+
+        first = await queue.get_next_task()
+        second = await queue.get_next_task()
+        third = await queue.get_next_task()
+
+        assert first.task_id == "shop_1"
+        assert first.status == PublicationStatus.PROCESSING
+        assert second.task_id == "woo_1"  # shopify en cooldown
+        assert third is None
+        assert queue.stats['rate_limited_count'] == 1
+        # Une seule publication comptée par store (shopify : 15/heure)
+        assert queue._rate_limiters["shopify"].get_stats()['used_in_window'] == 1
+
+        stats = await queue.get_queue_stats()
+        assert stats['current_queue_depth'] == 1
+        assert stats['store_distribution'] == {"shopify": 1}
+        assert stats['waiting_stores'] == 1
+
+    @pytest.mark.asyncio
+    async def test_task_available_after_cooldown(self, queue, product):
+        """Test tâche à nouveau disponible une fois le cooldown écoulé"""
+
+        await queue.add_task(make_task(product, "shop_1"))
+        await queue.add_task(make_task(product, "shop_2"))
+        await queue.get_next_task()
+
+        assert await queue.get_next_task() is None
+        assert queue._next_wakeup_delay() == pytest.approx(60, abs=1)
+
+        # Cooldown écoulé
+        later = time.time() + 61
+        queue._last_publication["shopify"] -= timedelta(seconds=61)
+        with patch('scraping.publication.queue.time.time', return_value=later):
+            task = await queue.get_next_task()
+
+        assert task.task_id == "shop_2"
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_store_waits_for_window(self, config, product):
+        """Test store à sa limite horaire mis en attente jusqu'à la sortie de fenêtre"""
+
+        queue = PublishQueue(config)
+        limiter = queue._get_rate_limiter("shopify")
+        start = time.time() - 1800
+        for i in range(limiter.limit):
+            limiter.record(start + i)
+        await queue.add_task(make_task(product, "shop_1"))
+
+        assert await queue.get_next_task() is None
+        # La plus ancienne publication sort de la fenêtre d'1h dans ~1800s
+        assert queue._next_wakeup_delay() == pytest.approx(1800, abs=2)
+
+    @pytest.mark.asyncio
+    async def test_requeue_lowers_priority(self, queue, product):
+        """Test remise en queue avec priorité abaissée"""
+
+        task = make_task(product, "retry", "shopify", priority=3)
+        await queue.add_task(task)
+        task = await queue.get_next_task()
+
+        await queue.requeue_task(task)
+
+        assert task.status == PublicationStatus.PENDING
+        assert task.priority == 4
+        assert len(queue) == 1
+
+    @pytest.mark.asyncio
+    async def test_wait_until_ready_wakes_on_add(self, queue, product):
+        """Test réveil immédiat d'un worker en attente à l'ajout d'une tâche"""
+
+        waiter = asyncio.create_task(queue.wait_until_ready(timeout=5))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        start = time.perf_counter()
+        await queue.add_task(make_task(product, "new"))
+
+        assert await waiter is True
+        assert time.perf_counter() - start < 1
+
+    @pytest.mark.asyncio
+    async def test_wait_until_ready_timeout(self, queue, product):
+        """Test timeout quand aucune tâche ne peut être prête"""
+
+        await queue.add_task(make_task(product, "shop_1"))
+        await queue.add_task(make_task(product, "shop_2"))
+        await queue.get_next_task()
+
+        assert await queue.wait_until_ready(timeout=0.05) is False
+
+    @pytest.mark.asyncio
+    async def test_large_queue_scales(self, queue, product):
+        """Test insertion et extraction en O(log n) sur une queue volumineuse"""
+
+        template = make_task(product, "template")
+        tasks = [
+            template.model_copy(update={
+                'task_id': f"task_{i}",
+                'store_id': f"store_{i % 500}",
+                'priority': 1 + i % 10
+            })
+            for i in range(20000)
+        ]
+
+        start = time.perf_counter()
+        for task in tasks:
+            await queue.add_task(task)
+
+        served = [await queue.get_next_task() for _ in range(500)]
+        duration = time.perf_counter() - start
+
+        assert all(task is not None for task in served)
+        assert len({task.store_id for task in served}) == 500  # Un par store (cooldown)
+        assert await queue.get_next_task() is None
+        assert duration < 5
+
+    @pytest.mark.asyncio
+    async def test_drr_big_store_does_not_starve_others(self, fast_config, product):
+        """Test équité : un store très chargé et prioritaire ne bloque pas les autres"""
+
+        queue = PublishQueue(fast_config)
+        for i in range(6):
+            await queue.add_task(make_task(product, f"big_{i}", "shopify", priority=1))
+        for i in range(2):
+            await queue.add_task(make_task(product, f"woo_{i}", "woocommerce", priority=5))
+            await queue.add_task(make_task(product, f"presta_{i}", "prestashop", priority=5))
+
+        order = [(await queue.get_next_task()).task_id for _ in range(10)]
+
+        assert order == [
+            "big_0", "woo_0", "presta_0",
+            "big_1", "woo_1", "presta_1",
+            "big_2", "big_3", "big_4", "big_5"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_drr_store_weight_is_quantum(self, fast_config, product):
+        """Test quantum DRR : un store de poids 2 sert deux tâches par tour"""
+
+        fast_config.store_weights = {"shopify": 2}
+        queue = PublishQueue(fast_config)
+        for i in range(4):
+            await queue.add_task(make_task(product, f"big_{i}", "shopify"))
+        for i in range(2):
+            await queue.add_task(make_task(product, f"woo_{i}", "woocommerce"))
+
+        order = [(await queue.get_next_task()).task_id for _ in range(6)]
+
+        assert order == ["big_0", "big_1", "woo_0", "big_2", "big_3", "woo_1"]
+
+    @pytest.mark.asyncio
+    async def test_idle_store_rejoins_current_round(self, fast_config, product):
+        """Test store redevenu actif : pas de crédit accumulé pendant l'inactivité"""
+
+        queue = PublishQueue(fast_config)
+        for i in range(4):
+            await queue.add_task(make_task(product, f"big_{i}", "shopify"))
+        for _ in range(3):
+            await queue.get_next_task()
+
+        await queue.add_task(make_task(product, "woo_0", "woocommerce"))
+        await queue.add_task(make_task(product, "woo_1", "woocommerce"))
+
+        order = [(await queue.get_next_task()).task_id for _ in range(3)]
+
+        # Tour courant pour woocommerce, puis alternance (pas trois tours de rattrapage)
+        assert order == ["woo_0", "big_3", "woo_1"]
+
+    @pytest.mark.asyncio
+    async def test_delayed_requeue(self, queue, product):
+        """Test retry différé : tâche invisible jusqu'à son échéance"""
+
+        task = make_task(product, "retry", "shopify")
+        await queue.requeue_task(task, delay_s=30)
+
+        assert len(queue) == 1
+        assert await queue.get_next_task() is None
+        assert queue._next_wakeup_delay() == pytest.approx(30, abs=1)
+        stats = await queue.get_queue_stats()
+        assert stats['delayed_tasks'] == 1
+
+        with patch('scraping.publication.queue.time.time', return_value=time.time() + 31):
+            assert (await queue.get_next_task()).task_id == "retry"
+
+    @pytest.mark.asyncio
+    async def test_exclude_stores(self, queue, product):
+        """Test stores exclus ignorés sans perdre leur place"""
+
+        await queue.add_task(make_task(product, "shop_1", "shopify", priority=1))
+        await queue.add_task(make_task(product, "woo_1", "woocommerce", priority=5))
+
+        assert (await queue.get_next_task(exclude_stores={"shopify"})).task_id == "woo_1"
+        assert await queue.get_next_task(exclude_stores={"shopify"}) is None
+        assert await queue.wait_until_ready(timeout=0.01, exclude_stores={"shopify"}) is False
+        assert (await queue.get_next_task()).task_id == "shop_1"
+
+
+class TestPublishWorkerPool:
+    """Tests pour PublishWorkerPool"""
+
+    @pytest.mark.asyncio
+    async def test_run_available_processes_concurrently(self, fast_config, product):
+        """Test traitement parallèle, borné par la concurrence par store"""
+
+        queue = PublishQueue(fast_config)
+        for store_id in ("shopify", "woocommerce", "prestashop"):
+            for i in range(2):
+                await queue.add_task(make_task(product, f"{store_id}_{i}", store_id))
+
+        active = {}
+        peak = {}
+
+        async def handler(task):
+            active[task.store_id] = active.get(task.store_id, 0) + 1
+            peak[task.store_id] = max(peak.get(task.store_id, 0), active[task.store_id])
+            await asyncio.sleep(0.05)
+            active[task.store_id] -= 1
+            task.mark_success({})
+
+        pool = PublishWorkerPool(queue, handler, max_concurrency=4, max_per_store=1)
+        start = time.perf_counter()
+        tasks = await pool.run_available()
+
+        assert [task.task_id for task in tasks] == ["shopify_0", "woocommerce_0", "prestashop_0"]
+        assert time.perf_counter() - start < 0.14
+        assert max(peak.values()) == 1
+        assert pool.get_stats()['in_flight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_run_loop_respects_global_limit(self, fast_config, product):
+        """Test boucle de dispatch : slots globaux et réveil à la fin d'un traitement"""
+
+        queue = PublishQueue(fast_config)
+        for i in range(6):
+            store_id = ("shopify", "woocommerce", "prestashop")[i % 3]
+            await queue.add_task(make_task(product, f"task_{i}", store_id))
+
+        done = []
+
+        async def handler(task):
+            await asyncio.sleep(0.02)
+            task.mark_success({})
+            done.append(task.task_id)
+
+        pool = PublishWorkerPool(queue, handler, max_concurrency=2, max_per_store=1, idle_timeout_s=0.1)
+        runner = asyncio.create_task(pool.run())
+        for _ in range(100):
+            if len(done) == 6:
+                break
+            await asyncio.sleep(0.01)
+
+        assert await pool.stop(timeout=1) is True
+        await runner
+        assert sorted(done) == [f"task_{i}" for i in range(6)]
+        assert pool.get_stats()['max_in_flight'] == 2
+
+    @pytest.mark.asyncio
+    async def test_worker_retry_is_delayed_not_slept(self, queue, product):
+        """Test échec retentable : remis en queue différé, sans bloquer le worker"""
+
+        class FailingPublisher:
+            async def publish_product(self, task):
+                raise RuntimeError("HTTP 503")
+
+        worker = PublishWorker("worker_1", queue, lambda store_type: FailingPublisher())
+        task = make_task(product, "failing")
+
+        start = time.perf_counter()
+        await worker._process_task(task)
+
+        assert time.perf_counter() - start < 1
+        assert task.status == PublicationStatus.PENDING
+        assert len(queue) == 1
+        assert queue._delayed[0][0] == pytest.approx(time.time() + queue.config.retry_delay, abs=5)
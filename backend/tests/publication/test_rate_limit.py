@@ -0,0 +1,159 @@
+"""
+Tests pour les limiteurs de débit partagés (fenêtre glissante, token bucket)
+"""
+
+import pytest
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+# Import modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from scraping.publication.rate_limit import (
+    SlidingWindowLimiter, StoreRateLimiters, TokenBucket, create_store_rate_limiter, store_publication_limit
+)
+from scraping.publication.queue import PublishQueue
+from scraping.publication.scheduler import PublicationScheduler
+from scraping.publication.orchestrator import PublicationOrchestrator
+from scraping.publication.dto import PublicationConfig, PublicationStatus
+from scraping.publication.constants import STORE_RATE_LIMITS
+
+from conftest import make_product
+
+
+class TestSlidingWindowLimiter:
+    """Tests pour SlidingWindowLimiter"""
+
+    def test_limit_within_window(self):
+        """Test limite atteinte puis libérée par la sortie du plus ancien"""
+
+        limiter = SlidingWindowLimiter(limit=3, window_s=60)
+        for t in (0, 10, 20):
+            assert limiter.consume(now=t) is True
+
+        assert limiter.consume(now=30) is False
+        assert limiter.time_until_available(now=30) == pytest.approx(30)
+        assert limiter.count(now=30) == 3
+        assert limiter.consume(now=60.5) is True
+        assert limiter.oldest(now=60.5) == 10
+
+    def test_history_bounded_by_limit(self):
+        """Test mémoire bornée : au plus `limit` horodatages conservés"""
+
+        limiter = SlidingWindowLimiter(limit=5, window_s=3600)
+        for t in range(10000):
+            limiter.record(float(t))
+
+        assert len(limiter) == 5
+        assert limiter.count(now=10000) == 5
+        assert limiter.time_until_available(now=10000) == pytest.approx(9995 + 3600 - 10000)
+
+    def test_reads_do_not_evict(self):
+        """Test lecture à un instant projeté sans perte d'historique"""
+
+        limiter = SlidingWindowLimiter(limit=2, window_s=60)
+        limiter.record(0)
+        limiter.record(10)
+
+        assert limiter.count(now=1000) == 0
+        assert limiter.count(now=30) == 2
+
+    def test_multi_token_wait(self):
+        """Test attente pour plusieurs événements simultanés"""
+
+        limiter = SlidingWindowLimiter(limit=3, window_s=60)
+        for t in (0, 10, 20):
+            limiter.record(t)
+
+        assert limiter.time_until_available(tokens=2, now=30) == pytest.approx(40)
+        assert limiter.time_until_available(tokens=4, now=30) == float('inf')
+
+    def test_stats_match_token_bucket_keys(self):
+        """Test statistiques compatibles avec TokenBucket"""
+
+        limiter = SlidingWindowLimiter(limit=4)
+        limiter.consume()
+
+        stats = limiter.get_stats()
+        assert set(TokenBucket(4, 1.0).get_stats()) - {'refill_rate_per_sec'} <= set(stats)
+        assert stats['available_tokens'] == 3
+
+
+class TestSharedStoreLimits:
+    """Tests de cohérence queue / scheduler"""
+
+    def test_store_specific_limit(self):
+        config = PublicationConfig(max_publications_per_hour=10)
+
+        assert store_publication_limit("shopify", config) == STORE_RATE_LIMITS["shopify"]
+        assert store_publication_limit("unknown_store", config) == 10
+        assert create_store_rate_limiter("magento", config).limit == STORE_RATE_LIMITS["magento"]
+
+    def test_queue_and_scheduler_agree(self):
+        """Test même limite et même prochaine disponibilité des deux côtés"""
+
+        config = PublicationConfig(max_publications_per_hour=10)
+        queue = PublishQueue(config)
+        scheduler = PublicationScheduler(config)
+
+        base = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0)
+        queue_limiter = queue._get_rate_limiter("wix")
+        for i in range(queue_limiter.limit):
+            pub_time = base + timedelta(minutes=i)
+            queue_limiter.record(pub_time.timestamp())
+            scheduler.record_publication("wix", pub_time)
+
+        check = base + timedelta(minutes=30)
+        assert scheduler._is_rate_limited("wix", check) is True
+        assert scheduler._get_window("wix").limit == queue_limiter.limit
+        assert scheduler._get_oldest_publication_in_hour("wix", check) == base
+        assert queue_limiter.time_until_available(now=check.timestamp()) == pytest.approx(1800)
+
+    def test_orchestrator_shares_one_window_per_store(self):
+        """Test fenêtre unique : une réservation de la queue est vue par le scheduler, sans double comptage"""
+
+        config = PublicationConfig(max_publications_per_hour=10)
+        orchestrator = PublicationOrchestrator(config)
+        orchestrator.scheduler.is_active_hours = lambda check_time=None: True
+        window = orchestrator.queue._get_rate_limiter("wix")
+
+        assert orchestrator.scheduler._get_window("wix") is window
+        assert isinstance(orchestrator.queue.rate_limiters, StoreRateLimiters)
+
+        for _ in range(window.limit):
+            assert window.consume() is True
+        assert orchestrator.scheduler._is_rate_limited("wix", datetime.now()) is True
+
+        # Tâche déjà récupérée : son créneau est compté une seule fois
+        assert orchestrator.scheduler.can_publish_now("wix", slot_reserved=True) is True
+        orchestrator.scheduler.record_publication("wix", slot_reserved=True)
+        assert window.count() == window.limit
+
+    @pytest.mark.asyncio
+    async def test_consecutive_claims_publish_once_each(self):
+        """Test N récupérations successives d'un store : N publications, N créneaux consommés"""
+
+        config = PublicationConfig(max_publications_per_hour=10)
+        orchestrator = PublicationOrchestrator(config)
+        orchestrator.scheduler.is_active_hours = lambda check_time=None: True
+        orchestrator.guardrails.validate_publication = lambda task: (True, None, {})
+        orchestrator.publishers["shopify"]._simulate_network_latency = AsyncMock()
+        queue = orchestrator.queue
+        for i in range(3):
+            await orchestrator.enqueue(make_product(f"claim_{i}"), "shopify")
+
+        clock = time.time()
+        for _ in range(3):
+            with patch('scraping.publication.queue.time.time', return_value=clock):
+                tasks = await orchestrator.work_batch()
+            assert [task.status for task in tasks] == [PublicationStatus.SUCCESS]
+
+            # Cooldown écoulé avant la récupération suivante
+            clock += config.cooldown_between_publications + 1
+            queue._last_publication["shopify"] -= timedelta(seconds=config.cooldown_between_publications + 1)
+
+        assert orchestrator.stats['total_successful'] == 3
+        assert queue._get_rate_limiter("shopify").count(now=clock) == 3
@@ -14,9 +14,13 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 
-from scraping.semantic.image_pipeline import ImageOptimizer, ImagePersistence, ImagePipeline
+import httpx
+
+from scraping.semantic.image_pipeline import (
+    ImageOptimizer, ImagePersistence, ImagePipeline, ImageVariantCache, ImageHeaderSniffer, read_image_header
+)
 from scraping.semantic.product_dto import ImageDTO
-from scraping.transport import RequestCoordinator
+from scraping.transport import RequestCoordinator, ResponseRejected
 
 
 class TestImageOptimizer:
@@ -118,6 +122,170 @@ class TestImageOptimizer:
         assert result is None
 
 
+    def test_optimize_image_large_jpeg_draft_decode(self, optimizer):
+        """Test JPEG volumineux décodé en mode draft, dimensions finales exactes"""
+        img = Image.new('RGB', (6400, 4000), color='purple')
+        img_buffer = BytesIO()
+        img.save(img_buffer, format='JPEG')
+        
+        result = optimizer.optimize_image(img_buffer.getvalue(), "https://example.com/hero.jpg")
+        
+        assert result is not None
+        assert (result['width'], result['height']) == (1600, 1000)
+        with Image.open(BytesIO(result['jpeg_data'])) as decoded:
+            assert decoded.size == (1600, 1000)
+    
+    def test_optimize_image_exif_orientation(self, optimizer):
+        """Test orientation EXIF appliquée, y compris sans redimensionnement"""
+        img = Image.new('RGB', (400, 200), color='orange')
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotation 90°
+        img_buffer = BytesIO()
+        img.save(img_buffer, format='JPEG', exif=exif)
+        
+        result = optimizer.optimize_image(img_buffer.getvalue(), "https://example.com/rotated.jpg")
+        
+        assert (result['width'], result['height']) == (200, 400)
+    
+    def test_optimize_image_palette_transparency(self, optimizer):
+        """Test image palette avec transparence aplatie sur fond blanc"""
+        img = Image.new('RGBA', (200, 200), color=(0, 0, 0, 0)).convert('P')
+        img_buffer = BytesIO()
+        img.save(img_buffer, format='PNG')
+        
+        result = optimizer.optimize_image(img_buffer.getvalue(), "https://example.com/logo.png")
+        
+        with Image.open(BytesIO(result['jpeg_data'])) as decoded:
+            assert all(channel > 240 for channel in decoded.getpixel((100, 100)))
+
+
+class TestImageVariantCache:
+    """Tests pour le cache de variantes adressé par contenu"""
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_content_transcoded_once(self):
+        """Test même contenu source → un seul transcodage"""
+        cache = ImageVariantCache()
+        factory = AsyncMock(return_value={'webp_data': b'w' * 10, 'jpeg_data': b'j' * 10})
+        key = ImageVariantCache.make_key(b'image', 'settings')
+        
+        first = await cache.get_or_create(key, factory)
+        second = await cache.get_or_create(key, factory)
+        
+        assert first is second
+        assert factory.await_count == 1
+        assert cache.get_stats()['hits'] == 1
+        assert cache.get_stats()['misses'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_coalesced(self):
+        """Test transcodages concurrents d'une même clé fusionnés"""
+        cache = ImageVariantCache()
+        calls = 0
+        
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {'webp_data': b'w'}
+        
+        results = await asyncio.gather(*(cache.get_or_create("k", factory) for _ in range(5)))
+        
+        assert calls == 1
+        assert all(result == {'webp_data': b'w'} for result in results)
+        assert cache.get_stats()['coalesced'] == 4
+        assert cache.get_stats()['in_flight'] == 0
+    
+    @pytest.mark.asyncio
+    async def test_failures_cached_and_exceptions_not_cached(self):
+        """Test échec d'optimisation (None) mis en cache, exception propagée sans cache"""
+        cache = ImageVariantCache()
+        failing = AsyncMock(return_value=None)
+        
+        assert await cache.get_or_create("invalid", failing) is None
+        assert await cache.get_or_create("invalid", failing) is None
+        assert failing.await_count == 1
+        
+        raising = AsyncMock(side_effect=asyncio.TimeoutError())
+        with pytest.raises(asyncio.TimeoutError):
+            await cache.get_or_create("timeout", raising)
+        assert cache.get("timeout") == (False, None)
+    
+    def test_lru_eviction_by_size(self):
+        """Test éviction LRU quand la taille max est dépassée"""
+        cache = ImageVariantCache(max_size_mb=1)
+        chunk = {'webp_data': b'x' * (400 * 1024)}
+        
+        cache.put("a", chunk)
+        cache.put("b", chunk)
+        cache.get("a")  # "a" devient le plus récent
+        cache.put("c", chunk)
+        
+        assert cache.get("b") == (False, None)
+        assert cache.get("a")[0] and cache.get("c")[0]
+        assert cache.size_bytes <= cache.max_bytes
+        assert cache.stats['evictions'] == 1
+    
+    def test_key_depends_on_content_and_settings(self):
+        """Test clé dépendante du contenu et des paramètres de sortie"""
+        key = ImageVariantCache.make_key(b'abc', '1600:80')
+        
+        assert key == ImageVariantCache.make_key(b'abc', '1600:80')
+        assert key != ImageVariantCache.make_key(b'abd', '1600:80')
+        assert key != ImageVariantCache.make_key(b'abc', '1200:80')
+
+
+class TestImageHeaderSniffer:
+    """Tests pour l'inspection des premiers octets d'un téléchargement"""
+    
+    def _image_bytes(self, size, fmt):
+        buffer = BytesIO()
+        Image.new('RGB', size, color='gray').save(buffer, format=fmt)
+        return buffer.getvalue()
+    
+    @pytest.mark.parametrize("fmt", ['JPEG', 'PNG', 'GIF', 'WEBP'])
+    def test_read_image_header_from_prefix(self, fmt):
+        """Test dimensions lues depuis les premiers octets seulement"""
+        data = self._image_bytes((1200, 900), fmt)
+        
+        assert read_image_header(data[:1024]) == (fmt, 1200, 900)
+    
+    def test_accepts_large_image(self):
+        """Test image au-dessus du minimum acceptée dès l'en-tête"""
+        sniffer = ImageHeaderSniffer("https://example.com/a.jpg", min_dimension=500)
+        data = self._image_bytes((800, 300), 'JPEG')
+        
+        assert sniffer(data[:2048], httpx.Headers({'content-type': 'image/jpeg'})) is True
+        assert sniffer.header == ('JPEG', 800, 300)
+    
+    def test_rejects_small_image(self):
+        """Test image sous le minimum Amazon rejetée sans téléchargement complet"""
+        sniffer = ImageHeaderSniffer("https://example.com/thumb.png", min_dimension=500)
+        data = self._image_bytes((320, 240), 'PNG')
+        
+        with pytest.raises(ResponseRejected):
+            sniffer(data[:200], httpx.Headers())
+    
+    def test_rejects_html(self):
+        """Test page HTML rejetée sur Content-Type puis sur contenu"""
+        html = b'<!DOCTYPE html><html>' + b' ' * 200
+        
+        with pytest.raises(ResponseRejected):
+            ImageHeaderSniffer("https://example.com/x")(html, httpx.Headers({'content-type': 'text/html'}))
+        with pytest.raises(ResponseRejected):
+            ImageHeaderSniffer("https://example.com/x")(html, httpx.Headers())
+    
+    def test_waits_for_more_data(self):
+        """Test en-tête incomplet : attendre la suite jusqu'à sniff_bytes"""
+        sniffer = ImageHeaderSniffer("https://example.com/a.jpg", sniff_bytes=4096)
+        prefix = b'\xFF\xD8\xFF\xE1' + b'\x00' * 1000
+        
+        assert sniffer(prefix[:50], httpx.Headers()) is False
+        assert sniffer(prefix, httpx.Headers()) is False
+        assert sniffer(prefix + b'\x00' * 4096, httpx.Headers()) is True
+        assert sniffer.header is None
+
+
 class TestImagePersistence:
     """Tests pour la classe ImagePersistence"""
     
@@ -179,6 +347,32 @@ class TestImagePipeline:
         call_args = pipeline.coordinator.get.call_args
         assert call_args[0][0] == "https://example.com/image.jpg"
         assert call_args[1]['use_cache'] is False  # Pas de cache pour images
+        assert call_args[1]['max_bytes'] == pipeline.optimizer.max_file_size
+        assert isinstance(call_args[1]['inspect'], ImageHeaderSniffer)
+    
+    @pytest.mark.asyncio
+    async def test_fetch_image_bytes_rejected(self, pipeline):
+        """Test téléchargement abandonné (taille, contenu ou dimensions)"""
+        pipeline.coordinator.get.side_effect = ResponseRejected("https://example.com/big.jpg", "trop gros")
+        
+        result = await pipeline._fetch_image_bytes("https://example.com/big.jpg")
+        
+        assert result is None
+    
+    @pytest.mark.asyncio
+    async def test_min_dimension_rejects_small_images(self, coordinator):
+        """Test images sous le minimum rejetées même sans inspection en streaming"""
+        pipeline = ImagePipeline(coordinator, min_dimension=500)
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = self._create_fake_jpeg_bytes()  # 400x300
+        coordinator.get.return_value = mock_response
+        
+        with patch.object(pipeline.optimizer, 'optimize_image') as optimize:
+            result = await pipeline._fetch_and_process_image("https://example.com/small.jpg")
+        
+        assert result is None
+        optimize.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_fetch_image_bytes_http_error(self, pipeline):
@@ -356,6 +550,22 @@ class TestImagePipeline:
             result = await pipeline._fetch_and_process_image("https://example.com/test.jpg")
         
         assert result is None
+    
+    @pytest.mark.asyncio
+    async def test_same_image_from_several_urls_optimized_once(self, pipeline):
+        """Test image fournisseur référencée par plusieurs URLs transcodée une seule fois"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = self._create_fake_jpeg_bytes()
+        pipeline.coordinator.get.return_value = mock_response
+        urls = [f"https://cdn.supplier.com/hero.jpg?variant={i}" for i in range(4)]
+        
+        with patch.object(pipeline.optimizer, 'optimize_image', wraps=pipeline.optimizer.optimize_image) as optimize:
+            results = await pipeline.process_image_urls(urls)
+        
+        assert len(results) == 4
+        assert optimize.call_count == 1
+        assert len({dto.url for dto in results}) == 1
 
 
 class TestImagePipelineIntegration:
@@ -0,0 +1,155 @@
+"""
+Tests de parité entre les backends SemanticParser 'soup' et 'streaming'
+"""
+
+import pytest
+
+# Import du module à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from scraping.semantic.parser import SemanticParser, create_semantic_parser
+from scraping.semantic.streaming_parser import StreamingSemanticParser, StreamingHTMLCollector
+
+
+PARITY_CASES = {
+    "opengraph_complet": """
+        <html lang="fr">
+            <head>
+                <meta property="og:title" content="  iPhone 15 Pro - Apple Store  " />
+                <meta property="og:description" content="Smartphone premium" />
+                <meta property="og:image" content="/images/iphone.jpg" />
+                <meta name="twitter:image" content="//cdn.example.com/iphone-tw.jpg" />
+                <meta property="product:brand" content="Apple" />
+                <meta property="product:price:amount" content="1229.00" />
+                <meta property="product:price:currency" content="EUR" />
+                <title>Page Title</title>
+            </head>
+            <body><h1>Autre titre</h1></body>
+        </html>
+    """,
+    "schema_org_itemprops": """
+        <div itemscope itemtype="https://schema.org/Product">
+            <h2 itemprop="name">  MacBook <b>Pro</b> 16 pouces </h2>
+            <div itemprop="description"><p>Puce M3</p> <p>36 Go</p></div>
+            <meta itemprop="price" content="2899.99">
+            <span itemprop="priceCurrency">eur</span>
+            <span itemprop="brand">Apple</span>
+            <span itemprop="sku">MBP16-M3</span>
+            <meta itemprop="gtin" content="">
+            <span itemprop="gtin">0194253</span>
+            <img itemprop="image" data-src="/img/mbp.jpg" src="/img/placeholder.gif">
+            <link itemprop="image" href="/img/ignored.jpg">
+        </div>
+    """,
+    "fallbacks_contenu": """
+        <html lang="en-GB">
+        <head><title>  Generic Site  </title><script>var price = "$999";</script></head>
+        <body>
+            <h1>   </h1>
+            <div class="col product-description">
+                <p>Très <em>bon</em> produit &amp; garanti &copy; 2024</p>
+                <ul><li>Point 1<li>Point 2</ul>
+                <br>
+            </div>
+            <span class="price">Promo !</span>
+            <span class="product-price">  1 299,99&nbsp;€ </span>
+            <div class="product-image"><a href="#"><img src="http://shop.test/a.jpg"></a></div>
+            <div class="main-image"><img data-src="b.jpg"><img src="a.jpg"></div>
+        </body>
+        </html>
+    """,
+    "prix_dans_le_texte": """
+        <body>
+            <style>.x { content: "£12"; }</style>
+            <template><span class="price">€1</span></template>
+            <p>Livraison offerte</p>
+            <p>Seulement
+               49,90   €
+            </p>
+            <!-- 10 € en commentaire -->
+        </body>
+    """,
+    "html_malforme": """
+        <div class="summary"><p>Résumé <b>gras <i>italique</p> fin</div></span>
+        <div data-price="1">Prix: <span>USD 15.00</div>
+        <img src="one.jpg"/><img src="one.jpg"></img>
+        <p>&#128; &#x20AC; &#8364; &unknown; &lt;tag&gt;</p>
+        <![CDATA[ £ 5 ]]>
+    """,
+    "description_auto_fermante": """
+        <meta name="description" content="   ">
+        <meta property="og:description" content="">
+        <div class="description"/>
+        <div data-description="x">Bloc data</div>
+    """,
+    "limite_images": "".join(f'<img src="/img/{i}.jpg">' for i in range(12)),
+    "vide": "",
+    "sans_contenu": "<html><head></head><body></body></html>",
+}
+
+
+class TestStreamingParserParity:
+    """Le backend streaming doit produire exactement la sortie du backend soup"""
+
+    @pytest.fixture
+    def soup_parser(self):
+        return SemanticParser()
+
+    @pytest.fixture
+    def streaming_parser(self):
+        return StreamingSemanticParser()
+
+    @pytest.mark.parametrize("case", sorted(PARITY_CASES))
+    @pytest.mark.parametrize("base_url", [
+        "https://www.example.fr/produit/123",
+        "https://shop.example.de/item",
+    ])
+    def test_parse_html_parity(self, soup_parser, streaming_parser, case, base_url):
+        """Test parité complète de parse_html sur les pages de référence"""
+        html = PARITY_CASES[case]
+
+        expected = soup_parser.parse_html(html, base_url)
+        result = streaming_parser.parse_html(html, base_url)
+
+        assert result == expected
+
+    def test_parse_html_parity_large_page(self, soup_parser, streaming_parser):
+        """Test parité sur une page volumineuse (listing type Amazon)"""
+        blocks = "".join(
+            f'<div class="item"><img data-src="/p/{i}.jpg"><span class="amount">{i},99 €</span>'
+            f'<p>Produit {i} &mdash; <a href="/p/{i}">voir</a></p></div>'
+            for i in range(2000)
+        )
+        html = f"<html><body><h1>Catalogue</h1>{blocks}<div class='product-details'>Fin</div></body></html>"
+
+        expected = soup_parser.parse_html(html, "https://shop.example.de/list")
+        result = streaming_parser.parse_html(html, "https://shop.example.de/list")
+
+        assert result == expected
+        assert result['price_text'] == "0,99 €"
+
+    def test_collector_text_matches_soup_get_text(self):
+        """Test que le texte collecté correspond à soup.get_text()"""
+        from bs4 import BeautifulSoup
+
+        html = PARITY_CASES["prix_dans_le_texte"] + PARITY_CASES["html_malforme"]
+        document = StreamingHTMLCollector.collect(html)
+
+        assert document.get_text() == BeautifulSoup(html, 'html.parser').get_text()
+
+
+class TestCreateSemanticParser:
+    """Tests pour la sélection du backend"""
+
+    def test_backends(self):
+        """Test instanciation par nom de backend"""
+        assert type(create_semantic_parser()) is SemanticParser
+        assert isinstance(create_semantic_parser("streaming"), StreamingSemanticParser)
+        assert create_semantic_parser("streaming").backend == "streaming"
+
+    def test_unknown_backend(self):
+        """Test erreur sur backend inconnu"""
+        with pytest.raises(ValueError):
+            create_semantic_parser("lxml")
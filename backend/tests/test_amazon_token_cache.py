@@ -0,0 +1,161 @@
+"""
+Tests pour le cache des access tokens SP-API - Réutilisation, single-flight et écritures différées
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+# Import des modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from models.amazon_spapi import AmazonConnection, SPAPIRegion, SPAPITokenData
+from services.amazon_connection_service import AmazonConnectionService
+from services.amazon_token_cache import AccessTokenCache
+
+
+def make_token(access_token="access_1", expires_in=timedelta(hours=1)):
+    return SPAPITokenData(
+        access_token=access_token,
+        refresh_token="refresh_token",
+        expires_in=int(expires_in.total_seconds()),
+        expires_at=datetime.utcnow() + expires_in
+    )
+
+
+class TestAccessTokenCache:
+    """Tests pour AccessTokenCache"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_load(self):
+        cache = AccessTokenCache()
+        calls = []
+
+        async def loader(force_refresh):
+            calls.append(force_refresh)
+            await asyncio.sleep(0.01)
+            return make_token()
+
+        tokens = await asyncio.gather(*(cache.get_token("conn_1", loader) for _ in range(10)))
+
+        assert tokens == ["access_1"] * 10
+        assert calls == [False]
+        assert await cache.get_token("conn_1", loader) == "access_1"
+        assert calls == [False]
+        assert cache.get_stats()['hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_token_near_expiry_refreshed_in_background(self):
+        cache = AccessTokenCache()
+        loader = AsyncMock(side_effect=[make_token("old", timedelta(minutes=7)), make_token("new")])
+
+        assert await cache.get_token("conn_1", loader) == "old"
+        assert await cache.get_token("conn_1", loader) == "old"  # Servi pendant le rafraîchissement
+        await asyncio.sleep(0)
+
+        assert loader.call_args_list[1].args == (True,)
+        assert await cache.get_token("conn_1", loader) == "new"
+        assert cache.stats['background_refreshes'] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_token_and_failures(self):
+        cache = AccessTokenCache()
+        loader = AsyncMock(side_effect=[make_token("short", timedelta(minutes=2)), ConnectionError("LWA down")])
+
+        assert await cache.get_token("conn_1", loader) == "short"
+        with pytest.raises(ConnectionError):
+            await cache.get_token("conn_1", loader)  # Marge d'expiration dépassée : rechargement
+
+        cache.invalidate("conn_1")
+        assert cache.get_stats()['cached_tokens'] == 0
+        assert cache.get_stats()['inflight_loads'] == 0
+
+    @pytest.mark.asyncio
+    async def test_last_used_writes_debounced(self):
+        cache = AccessTokenCache(last_used_flush_interval=0.01)
+        collection = MagicMock()
+        collection.bulk_write = AsyncMock()
+
+        for connection_id in ("conn_1", "conn_2", "conn_1"):
+            cache.mark_used(connection_id, collection)
+        await asyncio.sleep(0.03)
+
+        collection.bulk_write.assert_called_once()
+        operations = collection.bulk_write.call_args.args[0]
+        assert [operation._filter for operation in operations] == [{"id": "conn_1"}, {"id": "conn_2"}]
+        assert cache.stats['last_used_writes'] == 2
+
+
+class TestConnectionServiceTokenCache:
+    """Tests de get_valid_access_token avec le cache"""
+
+    def make_service(self, cache):
+        database = MagicMock()
+        database.amazon_connections = MagicMock()
+        database.amazon_connections.update_one = AsyncMock()
+        database.amazon_connections.bulk_write = AsyncMock()
+        with patch('services.amazon_connection_service.AmazonTokenEncryptionService'), \
+                patch('services.amazon_connection_service.AmazonOAuthService'):
+            return AmazonConnectionService(database, token_cache=cache)
+
+    def make_connection(self):
+        return AmazonConnection(
+            id="conn_1", user_id="user_1", region=SPAPIRegion.EU, marketplace_id="A13V1IB3VIYZZH",
+            seller_id="A2SELLER", encrypted_refresh_token="blob", token_encryption_nonce="nonce",
+            encryption_key_id="kms-key"
+        )
+
+    @pytest.mark.asyncio
+    async def test_expired_token_refreshed_once_for_concurrent_calls(self):
+        cache = AccessTokenCache()
+        service = self.make_service(cache)
+        expired = make_token("expired", timedelta(minutes=1))
+
+        async def refresh_access_token(refresh_token, region):
+            await asyncio.sleep(0.01)
+            return make_token("fresh")
+
+        service.encryption_service.decrypt_token_data = AsyncMock(return_value=expired.dict())
+        service.encryption_service.encrypt_token_data = AsyncMock(return_value=("new_blob", "new_nonce"))
+        service.oauth_service.refresh_access_token = AsyncMock(side_effect=refresh_access_token)
+
+        connection = self.make_connection()
+        tokens = await asyncio.gather(*(service.get_valid_access_token(connection) for _ in range(5)))
+
+        assert tokens == ["fresh"] * 5
+        service.encryption_service.decrypt_token_data.assert_called_once()
+        service.oauth_service.refresh_access_token.assert_called_once()
+        service.connections_collection.update_one.assert_called_once()  # Tokens chiffrés uniquement
+
+        await cache.close()
+        service.connections_collection.bulk_write.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failure_marks_connection_error(self):
+        service = self.make_service(AccessTokenCache())
+        service.encryption_service.decrypt_token_data = AsyncMock(side_effect=ValueError("bad blob"))
+
+        assert await service.get_valid_access_token(self.make_connection()) is None
+
+        update = service.connections_collection.update_one.call_args.args[1]["$set"]
+        assert update["error_message"] == "Token retrieval failed: ValueError"
+
+    @pytest.mark.asyncio
+    async def test_sp_api_credentials_from_active_connection(self):
+        service = self.make_service(AccessTokenCache())
+        service.connections_collection.find_one = AsyncMock(return_value=self.make_connection().dict())
+        service.encryption_service.decrypt_token_data = AsyncMock(return_value=make_token("fresh").dict())
+
+        first = await service.get_sp_api_credentials("user_1", "A13V1IB3VIYZZH")
+        second = await service.get_sp_api_credentials("user_1", "A13V1IB3VIYZZH")
+
+        assert first == second == ("fresh", "A2SELLER")
+        assert first.seller_id == "A2SELLER"
+        service.encryption_service.decrypt_token_data.assert_called_once()  # Token en cache
+
+        service.connections_collection.find_one.return_value = None
+        assert await service.get_sp_api_credentials("user_2") is None
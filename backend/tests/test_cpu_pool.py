@@ -0,0 +1,157 @@
+"""
+Tests pour le pool de workers CPU du scraping
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Import du module à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from scraping.cpu_pool import CPUWorkerPool
+from scraping.metrics import Histogram
+
+
+def _square(value):
+    return value * value
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class TestCPUWorkerPool:
+    """Tests pour la classe CPUWorkerPool"""
+
+    def test_invalid_mode(self):
+        """Test erreur sur mode inconnu"""
+        with pytest.raises(ValueError):
+            CPUWorkerPool(mode='gpu')
+
+    @pytest.mark.asyncio
+    async def test_inline_mode(self):
+        """Test exécution directe en mode inline"""
+        pool = CPUWorkerPool(mode='inline')
+
+        assert await pool.run(_square, 7) == 49
+        assert pool.get_stats()['completed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_process_mode_runs_out_of_process(self):
+        """Test exécution dans un processus séparé"""
+        pool = CPUWorkerPool(max_workers=1, mode='process', task_timeout_s=60)
+        try:
+            results = await asyncio.gather(*(pool.run(_square, i) for i in range(5)))
+            pid = await pool.run(os.getpid)
+
+            assert results == [0, 1, 4, 9, 16]
+            assert pid != os.getpid()
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_unpicklable_callable_falls_back_to_thread(self):
+        """Test qu'un callable non picklable (mock) s'exécute en thread"""
+        pool = CPUWorkerPool(max_workers=1, mode='process')
+        try:
+            func = Mock(return_value="ok")
+
+            assert await pool.run(func, 1) == "ok"
+            assert pool.get_stats()['thread_fallbacks'] == 1
+            assert pool._executor is None
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_backpressure_limits_pending_tasks(self):
+        """Test que max_pending borne les tâches soumises simultanément"""
+        pool = CPUWorkerPool(max_workers=4, mode='thread', max_pending=2)
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+
+        try:
+            await asyncio.gather(*(pool.run(work) for _ in range(6)))
+            stats = pool.get_stats()
+
+            assert peak <= 2
+            assert stats['completed'] == 6
+            assert stats['max_queue_depth'] == 6
+            assert stats['queue_depth'] == 0
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_task_timeout(self):
+        """Test timeout par tâche et libération de la place"""
+        pool = CPUWorkerPool(max_workers=1, mode='thread', max_pending=1)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await pool.run(time.sleep, 0.5, timeout_s=0.05)
+
+            assert pool.get_stats()['timeouts'] == 1
+            assert pool.in_flight == 0
+            # Le thread dort encore : son slot reste pris jusqu'à sa fin réelle
+            assert pool.abandoned_running == 1
+
+            start = time.perf_counter()
+            assert await pool.run(divmod, 7, 2) == (3, 1)
+            assert time.perf_counter() - start >= 0.3
+            assert pool.abandoned_running == 0
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_picklable_check_cached_per_function(self):
+        """Test qu'une même fonction n'est sérialisée qu'une fois pour choisir l'executor"""
+        pool = CPUWorkerPool(max_workers=1, mode='process')
+        try:
+            with patch('scraping.cpu_pool.pickle.dumps', side_effect=TypeError("unpicklable")) as dumps:
+                for _ in range(3):
+                    assert await pool.run(divmod, 7, 2) == (3, 1)
+
+            assert dumps.call_count == 1
+            assert pool.get_stats()['thread_fallbacks'] == 3
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_task_exception_propagates(self):
+        """Test propagation des exceptions et comptage des échecs"""
+        pool = CPUWorkerPool(mode='inline')
+
+        with pytest.raises(ZeroDivisionError):
+            await pool.run(divmod, 1, 0)
+
+        assert pool.get_stats()['failed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_histogram_measures_worker_time_only(self):
+        """Test durée mesurée dans le worker : l'attente d'un slot n'est pas comptée"""
+        pool = CPUWorkerPool(max_workers=1, mode='process', max_pending=1, task_timeout_s=60)
+        histogram = Histogram("test_cpu_task_seconds", "Durée")
+        try:
+            await asyncio.gather(*(pool.run(_sleep, 0.2, histogram=histogram) for _ in range(3)))
+        finally:
+            pool.shutdown()
+
+        sample = histogram.get_sample()
+        assert sample['count'] == 3
+        # Tâches sérialisées : 0.2 + 0.4 + 0.6 s si l'attente était incluse
+        assert 0.6 <= sample['sum'] < 0.9
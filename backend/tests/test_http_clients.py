@@ -0,0 +1,55 @@
+"""
+Tests pour le registre de sessions HTTP partagées
+"""
+
+import pytest
+
+from core.http_clients import HTTPClientRegistry, HTTPClientProfile
+
+
+class TestHTTPClientRegistry:
+    """Tests pour la classe HTTPClientRegistry"""
+
+    @pytest.mark.asyncio
+    async def test_session_reused_per_purpose(self):
+        """Test que la même session est réutilisée pour un usage donné"""
+        registry = HTTPClientRegistry()
+        try:
+            first = await registry.get_session("sp_api")
+            second = await registry.get_session("sp_api")
+            other = await registry.get_session("shopify")
+
+            assert first is second
+            assert first is not other
+            assert registry.sessions_created == 2
+        finally:
+            await registry.close()
+
+    @pytest.mark.asyncio
+    async def test_profile_limits_applied(self):
+        """Test que les limites du profil sont appliquées au connecteur"""
+        registry = HTTPClientRegistry(profiles={
+            "default": HTTPClientProfile(limit=7, limit_per_host=3)
+        })
+        try:
+            session = await registry.get_session("unknown_purpose")
+
+            assert session.connector.limit == 7
+            assert session.connector.limit_per_host == 3
+        finally:
+            await registry.close()
+
+    @pytest.mark.asyncio
+    async def test_close_releases_sessions(self):
+        """Test que close() ferme les sessions et qu'une nouvelle est recréée ensuite"""
+        registry = HTTPClientRegistry()
+        session = await registry.get_session("lwa")
+
+        await registry.close()
+        assert session.closed
+        assert registry.get_stats()["open_sessions"] == {}
+
+        new_session = await registry.get_session("lwa")
+        assert new_session is not session
+        assert not new_session.closed
+        await registry.close()
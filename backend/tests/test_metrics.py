@@ -0,0 +1,140 @@
+"""
+Tests pour les métriques Prometheus, le retard de boucle et les logs non bloquants
+"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+# Import des modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from scraping.metrics import Counter, EventLoopLagMonitor, Gauge, Histogram, MetricsRegistry
+from services.logging_service import attach_queue_handler, _queue_listeners
+
+
+class TestHistogram:
+    """Tests pour Histogram"""
+
+    def test_cumulative_buckets_rendering(self):
+        histogram = Histogram("test_fetch_seconds", "Durée", ("host",), buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "shop.example")
+
+        lines = histogram.render()
+        assert lines[:2] == ["# HELP test_fetch_seconds Durée", "# TYPE test_fetch_seconds histogram"]
+        assert 'test_fetch_seconds_bucket{host="shop.example",le="0.1"} 2' in lines
+        assert 'test_fetch_seconds_bucket{host="shop.example",le="1.0"} 3' in lines
+        assert 'test_fetch_seconds_bucket{host="shop.example",le="+Inf"} 4' in lines
+        assert 'test_fetch_seconds_count{host="shop.example"} 4' in lines
+        assert histogram.get_sample("shop.example") == {'count': 4, 'sum': 3.65}
+
+    def test_series_cardinality_bounded(self):
+        histogram = Histogram("test_hosts_seconds", "Durée", ("host",), max_series=2)
+
+        for i in range(5):
+            histogram.observe(0.2, f"host{i}.example")
+
+        assert histogram.get_sample("host0.example")['count'] == 1
+        assert histogram.get_sample("host2.example") is None
+        assert histogram.get_sample("other")['count'] == 3
+
+    def test_time_context_and_label_check(self):
+        histogram = Histogram("test_parse_seconds", "Durée")
+
+        with histogram.time():
+            time.sleep(0.01)
+
+        assert histogram.get_sample()['sum'] >= 0.01
+        with pytest.raises(ValueError):
+            histogram.observe(0.1, "label_inattendu")
+
+
+class TestGaugeAndRegistry:
+    """Tests pour Gauge, Counter et MetricsRegistry"""
+
+    def test_gauge_values_and_function(self):
+        depth = Gauge("test_queue_depth", "Profondeur", ("store",))
+        depth.set(3, "shopify")
+        depth.inc(2, "shopify")
+        assert depth.get("shopify") == 5
+        assert 'test_queue_depth{store="shopify"} 5' in depth.render()
+
+        lag = Gauge("test_lag", "Retard")
+        lag.set_function(lambda: 0.25)
+        assert lag.render()[-1] == "test_lag 0.25"
+
+    def test_counter_monotonic(self):
+        counter = Counter("test_total", "Total")
+        counter.inc()
+        with pytest.raises(ValueError):
+            counter.inc(-1)
+
+    def test_registry_render_and_reuse(self):
+        registry = MetricsRegistry()
+        first = registry.histogram("test_latency_seconds", "Latence", ("operation",))
+        assert registry.histogram("test_latency_seconds", "Latence", ("operation",)) is first
+
+        first.observe(0.2, 'PUT listings/items')
+        text = registry.render()
+
+        assert text.endswith("\n")
+        assert 'test_latency_seconds_count{operation="PUT listings/items"} 1' in text
+
+
+class TestEventLoopLagMonitor:
+    """Tests pour EventLoopLagMonitor"""
+
+    @pytest.mark.asyncio
+    async def test_detects_blocking_code(self):
+        histogram = Histogram("test_loop_lag_seconds", "Retard")
+        monitor = EventLoopLagMonitor(interval_s=0.01, histogram=histogram)
+        monitor.start()
+
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # Code bloquant sur la boucle
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+        assert not monitor.is_running
+        assert monitor.max_lag_s >= 0.05
+        assert histogram.get_sample()['count'] >= 2
+
+
+class _SlowHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        time.sleep(0.05)
+        self.messages.append(record.getMessage())
+
+
+class TestQueueLogging:
+    """Tests des logs déportés sur un thread"""
+
+    def test_log_calls_do_not_wait_for_handlers(self):
+        logger = logging.getLogger("ecomsimply.test_queue_logging")
+        logger.propagate = False
+        slow_handler = _SlowHandler()
+        logger.addHandler(slow_handler)
+
+        listener = attach_queue_handler(logger)
+        start = time.perf_counter()
+        for i in range(5):
+            logger.warning("message %d", i)
+        elapsed = time.perf_counter() - start
+
+        listener.stop()
+        _queue_listeners.pop(logger.name, None)
+
+        assert elapsed < 0.05
+        assert slow_handler.messages == [f"message {i}" for i in range(5)]
+        assert attach_queue_handler(logger) is None  # Déjà déporté
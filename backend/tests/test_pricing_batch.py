@@ -0,0 +1,285 @@
+"""
+Tests pour le pricing Amazon par lot - Appels groupés Product Pricing API
+"""
+
+import pytest
+import random
+from decimal import Decimal, ROUND_HALF_UP
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+
+# Import des modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from amazon.pricing_engine import AmazonPricingEngine, PRICING_MAX_SKUS_PER_REQUEST
+from amazon.pricing_vectorized import PricingColumns, compute_prices, round_half_up_cents
+from integrations.amazon.client import SPAPICredentials
+from models.amazon_pricing import BuyBoxStatus, CompetitorOffer, PricingBatch, PricingRule, PricingStrategy
+from routes import amazon_pricing_routes
+from services.amazon_pricing_rules_service import PricingRuleIndex
+
+MARKETPLACE_FR = "A13V1IB3VIYZZH"
+
+
+def make_engine(handler):
+    engine = AmazonPricingEngine()
+    engine.sp_api_client.make_request = AsyncMock(side_effect=handler)
+    return engine
+
+
+def pricing_response(**kwargs):
+    """Réponse getPricing : une entrée par SKU demandé, prix dérivé de l'index du SKU"""
+    skus = kwargs['params']['Skus'].split(',')
+    return {
+        'success': True,
+        'data': {'payload': [
+            {
+                'SellerSKU': sku,
+                'status': 'Success',
+                'Product': {
+                    'CompetitivePricing': {'CompetitivePrices': [{
+                        'CompetitivePriceId': '1',
+                        'Price': {
+                            'ListingPrice': {'Amount': 20 + int(sku.split('-')[1])},
+                            'Shipping': {'Amount': 0},
+                            'LandedPrice': {'Amount': 20 + int(sku.split('-')[1])}
+                        }
+                    }]}
+                }
+            }
+            for sku in skus
+        ]}
+    }
+
+
+def make_rule(sku, strategy=PricingStrategy.FLOOR_CEILING, marketplace_id=MARKETPLACE_FR, **kwargs):
+    fields = {'min_price': 10.0, 'max_price': 50.0, **kwargs}
+    if strategy == PricingStrategy.MARGIN_TARGET:
+        fields.setdefault('margin_target', 30.0)
+    return PricingRule(user_id="user_1", sku=sku, marketplace_id=marketplace_id, strategy=strategy, **fields)
+
+
+def comparable(calculation):
+    return calculation.model_dump(exclude={'calculated_at', 'calculation_duration_ms'})
+
+
+class TestCompetitivePricingBatch:
+    """Tests de get_competitive_pricing_many"""
+
+    @pytest.mark.asyncio
+    async def test_skus_chunked_by_api_maximum(self):
+        engine = make_engine(lambda **kwargs: pricing_response(**kwargs))
+        skus = [f"SKU-{i}" for i in range(45)] + ["SKU-0"]
+
+        results = await engine.get_competitive_pricing_many(skus, MARKETPLACE_FR)
+
+        calls = engine.sp_api_client.make_request.call_args_list
+        assert len(calls) == 3
+        assert [len(call.kwargs['params']['Skus'].split(',')) for call in calls] == [20, 20, 5]
+        assert all(len(call.kwargs['params']['Skus'].split(',')) <= PRICING_MAX_SKUS_PER_REQUEST for call in calls)
+        assert len(results) == 45
+        competitors, metadata = results["SKU-44"]
+        assert competitors[0].landed_price == 64.0
+        assert metadata['batch_size'] == 5
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_only_affects_its_skus(self):
+        def handler(**kwargs):
+            if "SKU-0" in kwargs['params']['Skus'].split(','):
+                return {'success': False, 'error': 'QuotaExceeded'}
+            return pricing_response(**kwargs)
+
+        engine = make_engine(handler)
+        results = await engine.get_competitive_pricing_many([f"SKU-{i}" for i in range(25)], MARKETPLACE_FR)
+
+        assert results["SKU-3"] == ([], {'error': 'QuotaExceeded', 'duration_ms': results["SKU-3"][1]['duration_ms']})
+        assert len(results["SKU-24"][0]) == 1
+
+    @pytest.mark.asyncio
+    async def test_single_sku_delegates_to_batch(self):
+        engine = make_engine(lambda **kwargs: pricing_response(**kwargs))
+
+        competitors, metadata = await engine.get_competitive_pricing("SKU-7", MARKETPLACE_FR)
+
+        assert competitors[0].price == 27.0
+        assert metadata['competitors_count'] == 1
+        assert engine.sp_api_client.make_request.call_args.kwargs['params']['ItemType'] == "Sku"
+
+    @pytest.mark.asyncio
+    async def test_listing_offers_batch(self):
+        def handler(**kwargs):
+            return {'success': True, 'data': {'responses': [
+                {
+                    'status': {'statusCode': 200},
+                    'request': {'SellerSKU': "SKU-1"},
+                    'body': {'payload': {'SKU': "SKU-1", 'Offers': [
+                        {'SellerId': "A1", 'ListingPrice': {'Amount': 30}, 'Shipping': {'Amount': 2},
+                         'IsBuyBoxWinner': True},
+                        {'SellerId': "A2", 'ListingPrice': {'Amount': 31}, 'Shipping': {'Amount': 0}}
+                    ]}}
+                },
+                {'status': {'statusCode': 404}, 'request': {'SellerSKU': "SKU-2"}, 'body': {}}
+            ]}}
+
+        engine = make_engine(handler)
+        results = await engine.get_competitive_pricing_many(["SKU-1", "SKU-2"], MARKETPLACE_FR, use_offers_batch=True)
+
+        request = engine.sp_api_client.make_request.call_args.kwargs
+        assert request['method'] == "POST"
+        assert [r['uri'] for r in request['json_data']['requests']] == [
+            "/products/pricing/v0/listings/SKU-1/offers", "/products/pricing/v0/listings/SKU-2/offers"
+        ]
+        competitors, metadata = results["SKU-1"]
+        assert competitors[0].landed_price == 32.0
+        assert metadata['buybox_info']['seller_id'] == "A1"
+        assert 'error' in results["SKU-2"][1]
+
+
+class TestCalculateOptimalPriceMany:
+    """Tests de calculate_optimal_price_many"""
+
+    @pytest.mark.asyncio
+    async def test_fetches_once_per_chunk_and_matches_single(self):
+        engine = make_engine(lambda **kwargs: pricing_response(**kwargs))
+        rules = [make_rule(f"SKU-{i}", PricingStrategy.BUYBOX_MATCH if i % 2 else PricingStrategy.FLOOR_CEILING)
+                 for i in range(30)]
+
+        calculations = await engine.calculate_optimal_price_many(rules, current_prices={"SKU-3": 22.0})
+
+        assert engine.sp_api_client.make_request.call_count == 2
+        assert [calculation.sku for calculation in calculations] == [rule.sku for rule in rules]
+        single = await engine.calculate_optimal_price(rules[3], 22.0, calculations[3].competitors)
+        assert calculations[3].recommended_price == single.recommended_price
+        assert calculations[3].confidence == single.confidence
+
+    @pytest.mark.asyncio
+    async def test_provided_competitors_skip_api(self):
+        engine = make_engine(lambda **kwargs: pricing_response(**kwargs))
+        offer = CompetitorOffer(seller_id="A1", price=25.0, landed_price=25.0, is_buy_box_winner=True)
+
+        calculations = await engine.calculate_optimal_price_many(
+            [make_rule("SKU-1", PricingStrategy.BUYBOX_MATCH)], competitors_by_sku={"SKU-1": [offer]}
+        )
+
+        engine.sp_api_client.make_request.assert_not_called()
+        assert calculations[0].recommended_price == 24.99
+        assert calculations[0].buybox_status == BuyBoxStatus.UNKNOWN
+
+
+class TestProcessBatchPricing:
+    """Tests du traitement d'un lot (route batch)"""
+
+    @pytest.mark.asyncio
+    async def test_connection_loaded_once_for_batch(self):
+        engine = make_engine(lambda **kwargs: pricing_response(**kwargs))
+        engine.publish_price = AsyncMock(return_value={'success': True})
+        batch = PricingBatch(user_id="user_1", skus=[f"SKU-{i}" for i in range(3)], marketplace_id=MARKETPLACE_FR)
+        credentials = SPAPICredentials("token", "SELLER")
+
+        rules_service = MagicMock()
+        rules_service.get_pricing_batch = AsyncMock(return_value=batch)
+        rules_service.pricing_batches_collection.update_one = AsyncMock()
+        rules_service.load_pricing_rule_index = AsyncMock(
+            return_value=PricingRuleIndex([make_rule(sku) for sku in batch.skus])
+        )
+        rules_service.save_pricing_history_many = AsyncMock()
+        rules_service.update_rules_last_applied_many = AsyncMock()
+        rules_service.update_batch_progress = AsyncMock()
+        get_credentials = AsyncMock(return_value=credentials)
+
+        with patch.object(amazon_pricing_routes, 'pricing_engine', engine), \
+                patch.object(amazon_pricing_routes, 'pricing_rules_service', rules_service), \
+                patch.object(amazon_pricing_routes, 'get_sp_api_credentials', get_credentials):
+            await amazon_pricing_routes.process_batch_pricing(batch.id, "user_1")
+
+        get_credentials.assert_awaited_once_with("user_1", MARKETPLACE_FR)
+        assert engine.sp_api_client.make_request.call_count == 1
+        assert engine.sp_api_client.make_request.call_args.kwargs['credentials'] == credentials
+        assert engine.publish_price.await_count == 3
+        assert all(call.kwargs['credentials'] == credentials for call in engine.publish_price.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_last_applied_only_for_published_rules(self):
+        engine = make_engine(lambda **kwargs: pricing_response(**kwargs))
+        engine.publish_price = AsyncMock(side_effect=[{'success': True}, {'success': False, 'error': 'Rejected'},
+                                                      {'success': True}])
+        batch = PricingBatch(user_id="user_1", skus=[f"SKU-{i}" for i in range(3)], marketplace_id=MARKETPLACE_FR)
+        rules = [make_rule(sku) for sku in batch.skus]
+
+        rules_service = MagicMock()
+        rules_service.get_pricing_batch = AsyncMock(return_value=batch)
+        rules_service.pricing_batches_collection.update_one = AsyncMock()
+        rules_service.load_pricing_rule_index = AsyncMock(return_value=PricingRuleIndex(rules))
+        rules_service.save_pricing_history_many = AsyncMock()
+        rules_service.update_rules_last_applied_many = AsyncMock()
+        rules_service.update_batch_progress = AsyncMock()
+
+        with patch.object(amazon_pricing_routes, 'pricing_engine', engine), \
+                patch.object(amazon_pricing_routes, 'pricing_rules_service', rules_service), \
+                patch.object(amazon_pricing_routes, 'get_sp_api_credentials', AsyncMock(return_value=None)):
+            await amazon_pricing_routes.process_batch_pricing(batch.id, "user_1")
+
+        assert len(rules_service.save_pricing_history_many.call_args.args[0]) == 3
+        rules_service.update_rules_last_applied_many.assert_awaited_once_with([rules[0].id, rules[2].id])
+
+
+class TestVectorizedPricing:
+    """Tests du calcul vectorisé face au calcul règle par règle"""
+
+    def test_round_half_up_matches_decimal(self):
+        prices = np.concatenate([np.arange(0, 20000) / 1000, np.random.default_rng(0).uniform(0, 500, 5000)])
+
+        expected = [float(Decimal(str(p)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)) for p in prices.tolist()]
+
+        assert round_half_up_cents(prices).tolist() == expected
+
+    @pytest.mark.asyncio
+    async def test_identical_to_scalar_path(self):
+        rng = random.Random(7)
+        engine = AmazonPricingEngine()
+        rules, current_prices, competitors = [], {}, {}
+
+        for i in range(400):
+            sku = f"SKU-{i}"
+            min_price = round(rng.uniform(5, 100), rng.choice([2, 3]))
+            strategy = rng.choice(list(PricingStrategy))
+            rules.append(make_rule(
+                sku, strategy,
+                min_price=min_price,
+                max_price=min_price + rng.uniform(1, 80),
+                variance_pct=rng.choice([0, 5.0, 12.5]),
+                map_price=rng.choice([None, 0, round(min_price * 1.1, 2)]),
+                margin_target=rng.choice([0, 25.0, 62.5]) if strategy == PricingStrategy.MARGIN_TARGET else None
+            ))
+            current = rng.choice([None, 0, min_price, round(min_price * rng.uniform(0.5, 2), 2)])
+            if current is not None:
+                current_prices[sku] = current
+            competitors[sku] = [
+                CompetitorOffer(
+                    seller_id=rng.choice(["A1", "A2", "our_seller_id"]),
+                    price=price, landed_price=rng.choice([price, price + 3.99, 0.0]),
+                    is_buy_box_winner=rng.random() < 0.4
+                )
+                for price in (round(rng.uniform(5, 150), 2) for _ in range(rng.randint(0, 4)))
+            ]
+
+        batch = await engine.calculate_optimal_price_many(rules, current_prices, competitors)
+
+        for rule, calculation in zip(rules, batch):
+            single = await engine.calculate_optimal_price(rule, current_prices.get(rule.sku), competitors[rule.sku])
+            assert comparable(calculation) == comparable(single)
+
+    @pytest.mark.asyncio
+    async def test_degenerate_rows_use_scalar_path(self):
+        engine = AmazonPricingEngine()
+        rule = make_rule("SKU-1", PricingStrategy.MARGIN_TARGET, margin_target=100.0)
+
+        columns = PricingColumns.from_rules([rule], [None], [[]])
+        assert compute_prices(columns)['fallback'].tolist() == [True]
+
+        calculation = (await engine.calculate_optimal_price_many([rule], competitors_by_sku={}))[0]
+        assert calculation.reasoning.startswith("Erreur de calcul")
+        assert comparable(calculation) == comparable(await engine.calculate_optimal_price(rule, None, []))
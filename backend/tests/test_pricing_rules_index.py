@@ -0,0 +1,127 @@
+"""
+Tests pour l'index des règles de pricing et les écritures groupées
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+# Import des modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from services.amazon_pricing_rules_service import (
+    AmazonPricingRulesService, PricingRuleIndex, BULK_WRITE_CHUNK_SIZE
+)
+from models.amazon_pricing import BuyBoxStatus, PricingHistory, PricingRule, PricingStrategy
+
+MARKETPLACE_FR = "A13V1IB3VIYZZH"
+
+
+def make_rule(sku, min_price=10.0):
+    return PricingRule(
+        user_id="user_1", sku=sku, marketplace_id=MARKETPLACE_FR,
+        min_price=min_price, max_price=min_price * 5, strategy=PricingStrategy.FLOOR_CEILING
+    )
+
+
+def make_history(index):
+    return PricingHistory(
+        user_id="user_1", sku=f"SKU-{index}", marketplace_id=MARKETPLACE_FR, rule_id=f"rule_{index % 3}",
+        new_price=20.0, price_change=1.0, price_change_pct=5.0, buybox_status_before=BuyBoxStatus.UNKNOWN,
+        publication_success=True, reasoning="Test", confidence=80.0, calculation_duration_ms=1
+    )
+
+
+class _AsyncCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        self._iterator = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class TestPricingRuleIndex:
+    """Tests de la résolution SKU → règle"""
+
+    def test_exact_variant_and_wildcard_resolution(self):
+        index = PricingRuleIndex([
+            make_rule("SHIRT-RED-M", 10.0),
+            make_rule("SHIRT", 20.0),
+            make_rule("SHOE-*", 30.0),
+            make_rule("SHOE-RUN-*", 40.0),
+        ])
+
+        assert index.resolve("SHIRT-RED-M").min_price == 10.0
+        assert index.resolve("SHIRT-BLUE-L").min_price == 20.0
+        assert index.resolve("SHOE-RUN-42").min_price == 40.0
+        assert index.resolve("SHOE-CITY-40").min_price == 30.0
+        assert index.resolve("HAT") is None
+        assert len(index) == 4
+
+    def test_inherited_rule_keeps_id_with_requested_sku(self):
+        parent = make_rule("SHIRT")
+        index = PricingRuleIndex([parent])
+
+        variant_rule = index.resolve("SHIRT-RED")
+
+        assert variant_rule.sku == "SHIRT-RED"
+        assert variant_rule.id == parent.id
+        assert parent.sku == "SHIRT"
+        assert index.resolve("SHIRT") is parent
+
+
+class TestBulkPricingWrites:
+    """Tests des lectures et écritures MongoDB groupées"""
+
+    def make_service(self):
+        service = AmazonPricingRulesService()
+        service.pricing_rules_collection = MagicMock()
+        service.pricing_history_collection = MagicMock()
+        return service
+
+    @pytest.mark.asyncio
+    async def test_index_loaded_in_one_query(self):
+        service = self.make_service()
+        documents = [make_rule(f"SKU-{i}").model_dump() for i in range(3)] + [{"sku": "invalide"}]
+        service.pricing_rules_collection.find = MagicMock(return_value=_AsyncCursor(documents))
+
+        index = await service.load_pricing_rule_index("user_1", MARKETPLACE_FR)
+
+        service.pricing_rules_collection.find.assert_called_once_with(
+            {"user_id": "user_1", "marketplace_id": MARKETPLACE_FR}
+        )
+        assert len(index) == 3
+        assert index.resolve("SKU-2").sku == "SKU-2"
+
+    @pytest.mark.asyncio
+    async def test_history_inserted_in_chunks(self):
+        service = self.make_service()
+        service.pricing_history_collection.insert_many = AsyncMock()
+        entries = [make_history(i) for i in range(BULK_WRITE_CHUNK_SIZE + 10)]
+
+        saved_ids = await service.save_pricing_history_many(entries)
+
+        calls = service.pricing_history_collection.insert_many.call_args_list
+        assert [len(call.args[0]) for call in calls] == [BULK_WRITE_CHUNK_SIZE, 10]
+        assert all(call.kwargs['ordered'] is False for call in calls)
+        assert saved_ids == [entry.id for entry in entries]
+
+    @pytest.mark.asyncio
+    async def test_last_applied_updated_once_per_chunk(self):
+        service = self.make_service()
+        service.pricing_rules_collection.update_many = AsyncMock(return_value=MagicMock(modified_count=3))
+
+        modified = await service.update_rules_last_applied_many(["rule_0", "rule_1", "rule_0", "rule_2"])
+
+        query, update = service.pricing_rules_collection.update_many.call_args.args
+        assert query == {"id": {"$in": ["rule_0", "rule_1", "rule_2"]}}
+        assert "last_applied_at" in update["$set"]
+        assert modified == 3
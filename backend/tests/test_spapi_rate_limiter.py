@@ -0,0 +1,287 @@
+"""
+Tests pour le limiteur de débit SP-API côté client
+"""
+
+import asyncio
+import time
+
+import pytest
+
+# Import des modules à tester
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from amazon.pricing_engine import AmazonPricingEngine
+from integrations.amazon.client import AmazonSPAPIClient, SPAPICredentials
+from integrations.amazon.rate_limiter import (
+    RATE_LIMIT_HEADER, RETRY_AFTER_HEADER, SPAPIRateLimiter, TokenBucket, parse_retry_after
+)
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Tests pour TokenBucket"""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_paced(self):
+        bucket = TokenBucket(rate=20.0, burst=2)
+
+        start = time.perf_counter()
+        waits = [await bucket.acquire() for _ in range(4)]
+        elapsed = time.perf_counter() - start
+
+        assert waits[:2] == [0.0, 0.0]
+        assert all(wait > 0 for wait in waits[2:])
+        assert 0.09 <= elapsed < 0.3
+
+    def test_refill_capped_at_burst(self):
+        clock = _FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=3, clock=clock)
+        bucket.tokens = 0.0
+
+        clock.now = 100.0
+        bucket._refill()
+
+        assert bucket.tokens == 3.0
+
+    def test_set_rate_and_drain(self):
+        clock = _FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=5, clock=clock)
+        bucket.tokens = 0.0
+
+        clock.now = 2.0
+        bucket.set_rate(0.5)  # Jetons accumulés à l'ancien débit conservés
+        assert bucket.tokens == 2.0
+        assert bucket.rate == 0.5
+
+        bucket.drain()
+        assert bucket.tokens == 0.0
+
+    def test_drain_until_retry_after(self):
+        bucket = TokenBucket(rate=2.0, burst=5, clock=_FakeClock())
+
+        bucket.drain(3.0)
+
+        # Prochain jeton dans 3 s au débit de 2 jetons/s
+        assert bucket.tokens == -5.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(" 0.5 ") == 0.5
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # Date passée
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("inf") is None
+
+
+class TestSPAPIRateLimiter:
+    """Tests pour SPAPIRateLimiter"""
+
+    def test_buckets_per_seller_and_operation(self):
+        limiter = SPAPIRateLimiter({'GET products/pricing': (0.5, 1)}, default_rate=(1.0, 1))
+
+        pricing = limiter.get_bucket("SELLER1", 'GET products/pricing')
+        assert limiter.get_bucket("SELLER1", 'GET products/pricing') is pricing
+        assert limiter.get_bucket("SELLER2", 'GET products/pricing') is not pricing
+        assert pricing.rate == 0.5
+        assert limiter.get_bucket("SELLER1", 'GET catalog/items').rate == 1.0
+
+    def test_rate_from_headers(self):
+        limiter = SPAPIRateLimiter({'PUT listings/items': (5.0, 10)})
+
+        assert limiter.update_from_headers("S", 'PUT listings/items', {RATE_LIMIT_HEADER: "2.0"}) == 2.0
+        assert limiter.get_bucket("S", 'PUT listings/items').rate == 2.0
+
+        # En-tête absent ou invalide : débit inchangé
+        assert limiter.update_from_headers("S", 'PUT listings/items', {}) is None
+        assert limiter.update_from_headers("S", 'PUT listings/items', {RATE_LIMIT_HEADER: "abc"}) is None
+        assert limiter.update_from_headers("S", 'PUT listings/items', {RATE_LIMIT_HEADER: "0"}) is None
+        assert limiter.get_bucket("S", 'PUT listings/items').rate == 2.0
+        assert limiter.get_stats()['rate_updates'] == 1
+
+    @pytest.mark.asyncio
+    async def test_throttled_operation_waits_for_next_token(self):
+        limiter = SPAPIRateLimiter({'GET products/pricing': (20.0, 5)})
+
+        assert await limiter.acquire("S", 'GET products/pricing') == 0.0
+        limiter.on_throttled("S", 'GET products/pricing')
+        waited = await limiter.acquire("S", 'GET products/pricing')
+
+        assert 0.04 <= waited <= 0.06
+        stats = limiter.get_stats()
+        assert stats['throttled'] == 1
+        assert stats['waits'] == 1
+
+
+class _FakeResponse:
+    def __init__(self, status, headers=None, payload=None):
+        self.status = status
+        self.headers = headers or {}
+        self.payload = payload or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def json(self):
+        return self.payload
+
+    async def text(self):
+        return ""
+
+
+class _FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.request_times = []
+        self.requests = []
+
+    def request(self, **kwargs):
+        self.request_times.append(time.perf_counter())
+        self.requests.append(kwargs)
+        return self.responses.pop(0)
+
+
+class _FakeRegistry:
+    def __init__(self, session):
+        self.session = session
+
+    async def get_session(self, purpose):
+        return self.session
+
+
+class TestClientRateLimiting:
+    """Tests du limiteur dans AmazonSPAPIClient"""
+
+    @pytest.mark.asyncio
+    async def test_429_retries_at_quota_pace_without_fixed_sleep(self):
+        session = _FakeSession([
+            _FakeResponse(429),
+            _FakeResponse(200, {RATE_LIMIT_HEADER: "10.0"}, {"ok": True})
+        ])
+        limiter = SPAPIRateLimiter({'GET products/pricing': (20.0, 1)})
+        client = AmazonSPAPIClient(http_registry=_FakeRegistry(session), rate_limiter=limiter)
+
+        start = time.perf_counter()
+        result = await client.make_authenticated_request(
+            'GET', '/products/pricing/v0/price', "token", "SELLER", "A13V1IB3VIYZZH"
+        )
+        elapsed = time.perf_counter() - start
+
+        assert result == {"ok": True}
+        assert 0.04 <= session.request_times[1] - session.request_times[0] < 0.5
+        assert elapsed < 1.0  # Plus d'attente fixe de 60 s sans Retry-After
+        assert limiter.get_bucket("SELLER", 'GET products/pricing').rate == 10.0
+        assert limiter.get_stats()['throttled'] == 1
+
+    @pytest.mark.asyncio
+    async def test_429_retry_after_feeds_bucket_once(self):
+        """Test Retry-After décimal : une seule attente, portée par le seau"""
+        session = _FakeSession([
+            _FakeResponse(429, {RETRY_AFTER_HEADER: "0.2"}),
+            _FakeResponse(200, payload={"ok": True})
+        ])
+        limiter = SPAPIRateLimiter({'GET products/pricing': (20.0, 1)})
+        client = AmazonSPAPIClient(http_registry=_FakeRegistry(session), rate_limiter=limiter)
+
+        result = await client.make_authenticated_request(
+            'GET', '/products/pricing/v0/price', "token", "SELLER", "A13V1IB3VIYZZH"
+        )
+
+        assert result == {"ok": True}
+        gap = session.request_times[1] - session.request_times[0]
+        assert 0.18 <= gap < 0.35
+        assert limiter.get_stats()['total_wait_s'] == pytest.approx(0.2, abs=0.02)
+
+    @pytest.mark.asyncio
+    async def test_marketplace_param_only_when_given(self):
+        """Test Feeds API (marketplace vide) : pas de marketplaceIds= envoyé"""
+        session = _FakeSession([_FakeResponse(201), _FakeResponse(200)])
+        client = AmazonSPAPIClient(http_registry=_FakeRegistry(session), rate_limiter=SPAPIRateLimiter())
+
+        await client.create_feed_document("token", "SELLER")
+        await client.make_authenticated_request(
+            'GET', '/catalog/2022-04-01/items/B0TEST', "token", "SELLER", "A13V1IB3VIYZZH"
+        )
+
+        assert session.requests[0]['params'] == {}
+        assert session.requests[1]['params'] == {'marketplaceIds': "A13V1IB3VIYZZH"}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_quota(self):
+        session = _FakeSession([_FakeResponse(200) for _ in range(3)])
+        limiter = SPAPIRateLimiter({'PUT listings/items': (20.0, 1)})
+        client = AmazonSPAPIClient(http_registry=_FakeRegistry(session), rate_limiter=limiter)
+
+        await asyncio.gather(*[
+            client.make_authenticated_request(
+                'PUT', f'/listings/2021-08-01/items/SELLER/SKU-{i}', "token", "SELLER", "A13V1IB3VIYZZH"
+            )
+            for i in range(3)
+        ])
+
+        gaps = [b - a for a, b in zip(session.request_times, session.request_times[1:])]
+        assert all(gap >= 0.04 for gap in gaps)
+
+    @pytest.mark.asyncio
+    async def test_make_request_adapter_goes_through_limiter(self):
+        """Test make_request (appel des moteurs Amazon) : quota appliqué, format success/data"""
+        session = _FakeSession([_FakeResponse(200, payload={"sku": "SKU-1"}), _FakeResponse(404)])
+        limiter = SPAPIRateLimiter({'GET catalog/items': (20.0, 1)})
+        client = AmazonSPAPIClient(http_registry=_FakeRegistry(session), rate_limiter=limiter,
+                                   access_token="token", seller_id="SELLER")
+
+        first = await client.make_request(method="GET", endpoint="/catalog/2022-04-01/items/SKU-1",
+                                          marketplace_id="A13V1IB3VIYZZH")
+        second = await client.make_request(method="GET", endpoint="/catalog/2022-04-01/items/SKU-2",
+                                           marketplace_id="A13V1IB3VIYZZH")
+
+        assert first == {'success': True, 'data': {"sku": "SKU-1"}}
+        assert second['success'] is False and second['error_type'] == 'SPAPIError'
+        assert session.request_times[1] - session.request_times[0] >= 0.04
+        assert limiter.get_stats()['acquired'] == 2
+
+    @pytest.mark.asyncio
+    async def test_make_request_without_credentials_sends_nothing(self):
+        session = _FakeSession([])
+        client = AmazonSPAPIClient(http_registry=_FakeRegistry(session), rate_limiter=SPAPIRateLimiter())
+
+        response = await client.make_request(method="GET", endpoint="/catalog/2022-04-01/items/SKU-1")
+
+        assert response['success'] is False
+        assert session.request_times == []
+
+    @pytest.mark.asyncio
+    async def test_engine_call_uses_connection_credentials(self):
+        """Test moteur Amazon réel : identifiants de la connexion transmis, quota du vendeur appliqué"""
+        session = _FakeSession([_FakeResponse(200, payload={'payload': [{'SellerSKU': "SKU-1", 'Product': {}}]})])
+        limiter = SPAPIRateLimiter({'GET products/pricing': (20.0, 1)})
+        engine = AmazonPricingEngine()
+        engine.sp_api_client = AmazonSPAPIClient(http_registry=_FakeRegistry(session), rate_limiter=limiter)
+
+        competitors, metadata = await engine.get_competitive_pricing(
+            "SKU-1", "A13V1IB3VIYZZH", credentials=SPAPICredentials("token", "SELLER")
+        )
+
+        assert 'error' not in metadata
+        assert limiter.get_stats()['acquired'] == 1
+        assert limiter.get_stats()['buckets'] == 1
+        assert limiter.get_bucket("SELLER", 'GET products/pricing').tokens < 1
+        assert session.requests[0]['headers']['x-amz-access-token'] == "token"
+
+        # Sans connexion : aucun appel émis
+        _, metadata = await engine.get_competitive_pricing("SKU-1", "A13V1IB3VIYZZH")
+        assert metadata['error'] == 'SP-API credentials not configured'
+        assert len(session.requests) == 1
@@ -3,6 +3,7 @@ Tests pour la couche de transport du scraping
 """
 
 import asyncio
+import random
 import time
 from unittest.mock import patch
 
@@ -16,7 +17,10 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from scraping.transport import RequestCoordinator, ProxyPool, ProxyInfo, ResponseCache, CacheEntry
+from scraping.transport import (
+    RequestCoordinator, ProxyPool, ProxyInfo, ProxyClientPool, ResponseCache, CacheEntry,
+    AdaptiveHostLimiter, ResponseRejected, _parse_retry_after
+)
 
 
 class TestResponseCache:
@@ -122,6 +126,73 @@ class TestResponseCache:
         assert stats["active_entries"] == 1
         assert stats["expired_entries"] == 0
 
+    @pytest.mark.asyncio
+    async def test_cache_body_stored_compressed(self, cache):
+        """Test que le corps est stocké compressé et restitué à l'identique"""
+        html = "<html><body>" + "produit " * 2000 + "</body></html>"
+        response = httpx.Response(
+            200,
+            content=html.encode("utf-8"),
+            headers={"content-type": "text/html; charset=utf-8"}
+        )
+        
+        await cache.set("https://example.com/big", response)
+        entry = await cache.get("https://example.com/big")
+        
+        assert entry is not None
+        assert entry.content == html
+        assert len(entry.body) < len(html)
+        
+    @pytest.mark.asyncio
+    async def test_cache_lru_eviction_by_size(self):
+        """Test d'éviction LRU quand le budget en octets est dépassé"""
+        cache = ResponseCache(ttl_seconds=60, max_size_mb=0.002)  # ~2 Ko
+        
+        def make_response(seed: int) -> httpx.Response:
+            # Contenu peu compressible pour remplir le budget
+            body = random.Random(seed).randbytes(800)
+            return httpx.Response(200, content=body, headers={"content-type": "text/html"})
+        
+        await cache.set("https://example.com/1", make_response(1))
+        await cache.set("https://example.com/2", make_response(2))
+        # Accès à /1 : /2 devient le moins récemment utilisé
+        assert await cache.get("https://example.com/1") is not None
+        await cache.set("https://example.com/3", make_response(3))
+        
+        assert await cache.get("https://example.com/2") is None
+        assert await cache.get("https://example.com/1") is not None
+        assert await cache.get("https://example.com/3") is not None
+        
+        stats = await cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["size_bytes"] <= stats["max_bytes"]
+        
+    @pytest.mark.asyncio
+    async def test_disk_tier_shared_between_caches(self, tmp_path):
+        """Test que le second niveau disque est partagé entre instances"""
+        db_path = str(tmp_path / "response_cache.sqlite")
+        writer = ResponseCache(ttl_seconds=60, disk_path=db_path)
+        reader = ResponseCache(ttl_seconds=60, disk_path=db_path)
+        
+        response = httpx.Response(
+            200,
+            content=b"<html><body>Warm</body></html>",
+            headers={"content-type": "text/html", "connection": "keep-alive"}
+        )
+        await writer.set("https://example.com/warm", response)
+        
+        entry = await reader.get("https://example.com/warm")
+        assert entry is not None
+        assert entry.content == "<html><body>Warm</body></html>"
+        assert "connection" not in entry.headers
+        
+        stats = await reader.get_stats()
+        assert stats["disk_hits"] == 1
+        
+        writer.close()
+        reader.close()
+
+
 
 class TestProxyPool:
     """Tests pour la classe ProxyPool"""
@@ -205,6 +276,144 @@ class TestProxyPool:
         assert len(stats["proxies"]) == 2
 
 
+class TestAdaptiveHostLimiter:
+    """Tests pour la classe AdaptiveHostLimiter (AIMD)"""
+    
+    @pytest.mark.asyncio
+    async def test_additive_increase_on_fast_successes(self):
+        """Test que des succès rapides augmentent la limite"""
+        limiter = AdaptiveHostLimiter(initial_limit=3, max_limit=10, latency_target_s=1.0)
+        
+        for _ in range(12):
+            await limiter.record_success(0.1)
+        
+        assert limiter.current_limit > 3
+        assert limiter.current_limit <= 10
+        
+    @pytest.mark.asyncio
+    async def test_slow_successes_do_not_increase(self):
+        """Test que des succès lents ne font pas monter la limite"""
+        limiter = AdaptiveHostLimiter(initial_limit=3, latency_target_s=1.0)
+        
+        for _ in range(12):
+            await limiter.record_success(2.5)
+        
+        assert limiter.current_limit == 3
+        
+    @pytest.mark.asyncio
+    async def test_multiplicative_decrease_on_overload(self):
+        """Test que 429/timeout divisent la limite, une fois par cooldown"""
+        limiter = AdaptiveHostLimiter(initial_limit=8, decrease_cooldown_s=60)
+        
+        await limiter.record_overload()
+        await limiter.record_overload(timeout=True)  # Rafale : ignorée par le cooldown
+        
+        assert limiter.current_limit == 4
+        assert limiter.throttles == 1
+        assert limiter.timeouts == 1
+        
+    @pytest.mark.asyncio
+    async def test_retry_after_blocks_acquisition(self):
+        """Test que Retry-After suspend les nouvelles acquisitions"""
+        limiter = AdaptiveHostLimiter(initial_limit=3)
+        await limiter.record_overload(retry_after_s=0.3)
+        
+        start_time = time.monotonic()
+        async with limiter:
+            pass
+        
+        assert time.monotonic() - start_time >= 0.25
+        
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded_by_current_limit(self):
+        """Test que la concurrence ne dépasse pas la limite courante"""
+        limiter = AdaptiveHostLimiter(initial_limit=2, max_limit=2)
+        concurrent = 0
+        max_concurrent = 0
+        
+        async def worker():
+            nonlocal concurrent, max_concurrent
+            async with limiter:
+                concurrent += 1
+                max_concurrent = max(max_concurrent, concurrent)
+                await asyncio.sleep(0.05)
+                concurrent -= 1
+        
+        await asyncio.gather(*[worker() for _ in range(6)])
+        
+        assert max_concurrent == 2
+        
+    def test_parse_retry_after(self):
+        """Test du parsing de Retry-After (secondes et date HTTP)"""
+        assert _parse_retry_after("5") == 5.0
+        assert _parse_retry_after(None) is None
+        assert _parse_retry_after("not-a-date") is None
+        assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+class TestProxyClientPool:
+    """Tests pour la classe ProxyClientPool"""
+    
+    @pytest_asyncio.fixture
+    async def client_pool(self):
+        """Fixture pour créer un pool de clients proxy"""
+        pool = ProxyClientPool(timeout_s=5.0, max_clients=2)
+        yield pool
+        await pool.close_all()
+    
+    @pytest.mark.asyncio
+    async def test_client_reused_for_same_proxy(self, client_pool):
+        """Test que le même client est réutilisé pour un proxy donné"""
+        async with client_pool.lease("http://proxy1.com:8080") as first:
+            pass
+        async with client_pool.lease("http://proxy1.com:8080") as second:
+            pass
+        
+        assert first is second
+        stats = client_pool.get_stats()
+        assert stats["created"] == 1
+        assert stats["reused"] == 1
+        
+    @pytest.mark.asyncio
+    async def test_lru_client_closed_beyond_max_clients(self, client_pool):
+        """Test que le client le moins récemment utilisé est fermé au-delà de max_clients"""
+        for proxy in ["http://proxy1.com:8080", "http://proxy2.com:8080", "http://proxy3.com:8080"]:
+            async with client_pool.lease(proxy):
+                pass
+        
+        assert "http://proxy1.com:8080" not in client_pool.clients
+        assert len(client_pool.clients) == 2
+        assert client_pool.get_stats()["closed"] == 1
+        
+    @pytest.mark.asyncio
+    async def test_evicted_proxy_client_closed_after_release(self, client_pool):
+        """Test qu'un proxy évincé pendant une requête voit son client fermé à la libération"""
+        async with client_pool.lease("http://proxy1.com:8080") as client:
+            await client_pool.evict("http://proxy1.com:8080")
+            assert not client.is_closed
+        
+        assert client.is_closed
+        assert "http://proxy1.com:8080" not in client_pool.clients
+        
+    @pytest.mark.asyncio
+    async def test_proxy_pool_eviction_closes_client(self):
+        """Test que l'éviction d'un proxy du ProxyPool ferme son client poolé"""
+        coordinator = RequestCoordinator(timeout_s=5.0)
+        try:
+            await coordinator.add_proxy("http://proxy1.com:8080")
+            async with coordinator.proxy_clients.lease("http://proxy1.com:8080") as client:
+                pass
+            
+            for _ in range(10):
+                await coordinator.proxy_pool.report_failure("http://proxy1.com:8080", "timeout")
+            
+            assert client.is_closed
+            stats = await coordinator.get_proxy_stats()
+            assert stats["client_pool"]["open_clients"] == 0
+        finally:
+            await coordinator.close()
+
+
 class TestRequestCoordinator:
     """Tests pour la classe RequestCoordinator"""
     
@@ -425,6 +634,138 @@ class TestRequestCoordinator:
             request = route.calls[0].request
             assert request.headers.get("User-Agent") == "Custom-Agent"
     
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_conditional_revalidation_on_expiry(self, coordinator):
+        """Test qu'une entrée expirée est revalidée via If-None-Match (304)"""
+        html_content = "<html><body><h1>Produit</h1></body></html>"
+        route = respx.get("https://example.com/product").mock(
+            side_effect=[
+                httpx.Response(
+                    200,
+                    content=html_content.encode("utf-8"),
+                    headers={"content-type": "text/html", "etag": '"v1"',
+                             "last-modified": "Wed, 21 Oct 2025 07:28:00 GMT"}
+                ),
+                httpx.Response(304, headers={"etag": '"v1"'})
+            ]
+        )
+        
+        await coordinator.get("https://example.com/product")
+        await asyncio.sleep(1.1)  # Expiration du TTL (1s)
+        
+        response = await coordinator.get("https://example.com/product")
+        
+        assert response.status_code == 200
+        assert response.text == html_content
+        revalidation_request = route.calls[1].request
+        assert revalidation_request.headers.get("If-None-Match") == '"v1"'
+        assert revalidation_request.headers.get("If-Modified-Since") == "Wed, 21 Oct 2025 07:28:00 GMT"
+        
+        # L'entrée est de nouveau fraîche : pas de troisième requête
+        await coordinator.get("https://example.com/product")
+        assert route.call_count == 2
+        
+        stats = await coordinator.get_cache_stats()
+        assert stats["revalidation"]["not_modified"] == 1
+        
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_stale_while_revalidate_serves_stale(self):
+        """Test que le mode stale-while-revalidate sert l'entrée périmée immédiatement"""
+        coordinator = RequestCoordinator(cache_ttl_s=1, stale_while_revalidate=True)
+        try:
+            route = respx.get("https://example.com/page").mock(
+                side_effect=[
+                    httpx.Response(200, content=b"<html>v1</html>",
+                                   headers={"content-type": "text/html", "etag": '"v1"'}),
+                    httpx.Response(200, content=b"<html>v2</html>",
+                                   headers={"content-type": "text/html", "etag": '"v2"'})
+                ]
+            )
+            
+            await coordinator.get("https://example.com/page")
+            await asyncio.sleep(1.1)
+            
+            stale = await coordinator.get("https://example.com/page")
+            assert stale.text == "<html>v1</html>"
+            
+            # Laisser la revalidation en arrière-plan se terminer
+            await asyncio.gather(*coordinator._revalidation_tasks.values())
+            
+            fresh = await coordinator.get("https://example.com/page")
+            assert fresh.text == "<html>v2</html>"
+            assert route.call_count == 2
+        finally:
+            await coordinator.close()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_are_coalesced(self, coordinator):
+        """Test que des GET concurrents sur la même URL ne font qu'une requête réseau"""
+        request_count = 0
+        
+        async def mock_request(method, url, **kwargs):
+            nonlocal request_count
+            request_count += 1
+            await asyncio.sleep(0.1)
+            return httpx.Response(
+                200,
+                content=b"<html><body>Listing</body></html>",
+                headers={"content-type": "text/html"}
+            )
+        
+        with patch.object(coordinator.client, 'request', side_effect=mock_request):
+            responses = await asyncio.gather(*[
+                coordinator.get("https://example.com/category")
+                for _ in range(10)
+            ])
+        
+        assert request_count == 1
+        assert all(r.text == "<html><body>Listing</body></html>" for r in responses)
+        
+        stats = await coordinator.get_cache_stats()
+        assert stats["coalescing"]["leader_requests"] == 1
+        assert stats["coalescing"]["coalesced_requests"] == 9
+        assert stats["coalescing"]["in_flight"] == 0
+        
+    @pytest.mark.asyncio
+    async def test_coalesced_requests_share_errors(self, coordinator):
+        """Test qu'une erreur de la requête partagée est propagée à tous les appelants"""
+        async def mock_request(method, url, **kwargs):
+            await asyncio.sleep(0.05)
+            return httpx.Response(404, text="Not Found", request=httpx.Request(method, url))
+        
+        with patch.object(coordinator.client, 'request', side_effect=mock_request):
+            results = await asyncio.gather(*[
+                coordinator.get("https://example.com/missing")
+                for _ in range(3)
+            ], return_exceptions=True)
+        
+        assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+    
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_host_limit_reduced_on_429_with_retry_after(self, coordinator):
+        """Test que 429 + Retry-After réduit la concurrence du host et est respecté"""
+        respx.get("https://example.com/throttled").mock(
+            side_effect=[
+                httpx.Response(429, headers={"retry-after": "1"}),
+                httpx.Response(200, json={"success": True})
+            ]
+        )
+        
+        start_time = time.time()
+        response = await coordinator.get("https://example.com/throttled")
+        duration = time.time() - start_time
+        
+        assert response.status_code == 200
+        assert duration >= 0.95
+        
+        host_stats = await coordinator.get_host_stats()
+        limiter_stats = host_stats["hosts"]["example.com"]
+        assert limiter_stats["throttles"] == 1
+        assert limiter_stats["limit"] < coordinator.max_per_host
+    
     @pytest.mark.asyncio
     async def test_cache_and_proxy_stats(self, coordinator):
         """Test des statistiques complètes"""
@@ -443,6 +784,64 @@ class TestRequestCoordinator:
         # Nettoyer le cache
         cleared = await coordinator.clear_cache()
         assert cleared == 0  # Aucune entrée expirée à nettoyer
+    
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_bounded_get_reads_streamed_body(self, coordinator):
+        """Test téléchargement borné : corps complet, jamais mis en cache"""
+        respx.get("https://example.com/image.jpg").mock(
+            return_value=httpx.Response(200, content=b"x" * 1000)
+        )
+        
+        response = await coordinator.get("https://example.com/image.jpg", max_bytes=1000)
+        
+        assert response.status_code == 200
+        assert response.content == b"x" * 1000
+        assert (await coordinator.get_cache_stats())["total_entries"] == 0
+    
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_bounded_get_rejects_content_length(self, coordinator):
+        """Test rejet sur Content-Length annoncé, sans retry"""
+        route = respx.get("https://example.com/huge.jpg").mock(
+            return_value=httpx.Response(200, content=b"x" * 2048)
+        )
+        
+        with pytest.raises(ResponseRejected):
+            await coordinator.get("https://example.com/huge.jpg", max_bytes=1024)
+        
+        assert route.call_count == 1
+    
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_bounded_get_aborts_stream_early(self, coordinator):
+        """Test abandon du transfert dès le refus de l'inspecteur ou le dépassement de taille"""
+        chunks_sent = 0
+        
+        async def body():
+            nonlocal chunks_sent
+            for _ in range(100):
+                chunks_sent += 1
+                yield b"<html>" + b"x" * 1018
+        
+        respx.get("https://example.com/fake.jpg").mock(
+            side_effect=lambda request: httpx.Response(200, content=body())
+        )
+        
+        def inspect(prefix, headers):
+            if prefix.startswith(b"<html>"):
+                raise ResponseRejected("https://example.com/fake.jpg", "contenu non-image")
+            return True
+        
+        with pytest.raises(ResponseRejected):
+            await coordinator.get("https://example.com/fake.jpg", inspect=inspect)
+        assert chunks_sent == 1
+        
+        # Sans Content-Length : arrêt au premier chunk dépassant la limite
+        chunks_sent = 0
+        with pytest.raises(ResponseRejected):
+            await coordinator.get("https://example.com/fake.jpg", max_bytes=4096)
+        assert chunks_sent == 5
 
 
 class TestIntegration: